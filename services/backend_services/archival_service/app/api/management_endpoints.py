@@ -215,7 +215,8 @@ async def get_archived_data(
     offset: int = Query(0, description="Offset for pagination"),
     columns: Optional[str] = Query(None, description="Comma-separated list of columns to include"),
     metadata_only: bool = Query(False, description="If true, returns only metadata without data"),
-    optimize_cost: bool = Query(True, description="If true, optimizes for compute cost over performance")
+    optimize_cost: bool = Query(True, description="If true, optimizes for compute cost over performance"),
+    schema_name: str = Query("public", description="Schema of the table")
 ) -> Dict[str, Any]:
     """Retrieve archived data for a specific table within a time frame.
     
@@ -228,6 +229,7 @@ async def get_archived_data(
         columns: Optional comma-separated list of columns to include (reduces data transfer)
         metadata_only: If true, returns only metadata without actual data
         optimize_cost: If true, optimizes for compute cost over performance
+        schema_name: Schema of the table
         
     Returns:
         Dict with retrieved data and metadata
@@ -239,6 +241,7 @@ async def get_archived_data(
             "endpoint": "management.get_archived_data",
             "timestamp": datetime.utcnow().isoformat(),
             "archival.table_name": table_name,
+            "archival.schema_name": schema_name,
             "archival.start_time": start_time,
             "archival.end_time": end_time,
             "archival.limit": limit,
@@ -263,7 +266,8 @@ async def get_archived_data(
             limit=effective_limit,
             offset=offset,
             columns=column_list,
-            optimize_cost=optimize_cost
+            optimize_cost=optimize_cost,
+            schema_name=schema_name
         )
         
         # Add span attributes for result
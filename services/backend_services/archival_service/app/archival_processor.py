@@ -9,14 +9,16 @@ import asyncio
 import logging
 import uuid
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Union
+from typing import AsyncIterator, Dict, List, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
 from azure.storage.blob.aio import BlobServiceClient
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .lakehouse_client import LakehouseClient
+from .lakehouse_client import LakehouseClient, source_arrow_schema
+from .clients import archive_manifest
 from .config import settings
 from .database import get_db_session
 from .models import ArchivalConfirmation, ArchivalEvent, ArchivalStatus
@@ -39,6 +41,7 @@ class ArchivalProcessor:
         """
         self.redis_client = redis_client
         self.lakehouse_client = None
+        self.manifest = None
         self.monitor = get_monitor()
     
     @trace_method(name="ArchivalProcessor.initialize", kind="INTERNAL")
@@ -49,8 +52,13 @@ class ArchivalProcessor:
             self.lakehouse_client = LakehouseClient(
                 storage_account=settings.azure_storage_account_name,
                 container_name=settings.azure_storage_container,
-                connection_string=settings.azure_storage_connection_string
+                connection_string=settings.azure_storage_connection_string,
+                local_root=settings.lakehouse_local_path or None,
+                upload_block_size=settings.upload_block_size
             )
+            # Share the service's manifest store so that updates to a table's
+            # manifest are serialized under one lock
+            self.manifest = archive_manifest
             
             # Add span attributes for storage context
             add_span_attributes({
@@ -90,11 +98,10 @@ class ArchivalProcessor:
             try:
                 logger.info(f"Processing archival event for chunk {event.chunk_id} of table {event.table_name}")
                 
-                # Extract data from the chunk
-                chunk_data, chunk_size_bytes = await self._extract_chunk_data(event)
-                
-                # Write data to Azure Data Lake Storage
-                await self._write_to_lakehouse(event, chunk_data)
+                # Stream data from the chunk to Azure Data Lake Storage
+                extracted = {"rows": 0, "bytes": 0}
+                await self._write_to_lakehouse(event, self._stream_chunk_data(event, extracted))
+                chunk_size_bytes = extracted["bytes"]
                 
                 # Send confirmation event
                 await self._send_confirmation(
@@ -131,23 +138,29 @@ class ArchivalProcessor:
                     error_message=error_message
                 )
     
-    @trace_method(name="ArchivalProcessor._extract_chunk_data", kind="CLIENT")
-    async def _extract_chunk_data(self, event: ArchivalEvent) -> Tuple[pd.DataFrame, int]:
-        """Extract data from a TimescaleDB chunk.
+    @trace_method(name="ArchivalProcessor._stream_chunk_data", kind="CLIENT")
+    async def _stream_chunk_data(
+        self,
+        event: ArchivalEvent,
+        stats: Dict[str, int]
+    ) -> AsyncIterator[pd.DataFrame]:
+        """Stream data from a TimescaleDB chunk in batches.
+        
+        Rows are read through a server-side cursor, so only one batch of
+        settings.archive_batch_rows rows is held in memory at a time.
         
         Args:
             event: The archival event containing chunk information.
+            stats: Updated with the rows read and their approximate size in bytes.
             
-        Returns:
-            Tuple containing:
-                - DataFrame with the chunk data
-                - Size of the chunk data in bytes
+        Yields:
+            DataFrames with consecutive batches of the chunk data
         """
         # Add span attributes for database operation
         add_span_attributes({
             "db.system": "timescaledb",
             "db.name": "timescaledb",
-            "db.operation": "extract_chunk_data",
+            "db.operation": "stream_chunk_data",
             "db.table": event.table_name,
             "db.schema": event.schema_name,
             "chunk_id": event.chunk_id,
@@ -155,47 +168,69 @@ class ArchivalProcessor:
             "time_range.end": str(event.chunk_end_time)
         })
         
+        batch_rows = settings.archive_batch_rows
         async with get_db_session() as session:
             # Construct query to extract data from the chunk
             query = text(f"""
                 SELECT * FROM {event.schema_name}.{event.table_name}
                 WHERE {event.time_column} >= :start_time
                 AND {event.time_column} < :end_time
-            """)
+            """).execution_options(yield_per=batch_rows)
             
-            # Execute query
-            result = await session.execute(
+            result = await session.stream(
                 query,
                 {
                     "start_time": event.chunk_start_time,
                     "end_time": event.chunk_end_time
                 }
             )
+            columns = list(result.keys())
             
-            # Convert to DataFrame
-            rows = result.fetchall()
-            if not rows:
-                logger.warning(f"No data found in chunk {event.chunk_id}")
-                return pd.DataFrame(), 0
-            
-            df = pd.DataFrame(rows)
-            
-            # Calculate approximate size
-            chunk_size_bytes = df.memory_usage(deep=True).sum()
-            
+            async for rows in result.partitions(batch_rows):
+                df = pd.DataFrame(rows, columns=columns)
+                stats["rows"] += len(df)
+                stats["bytes"] += int(df.memory_usage(deep=True).sum())
+                yield df
+        
+        if not stats["rows"]:
+            logger.warning(f"No data found in chunk {event.chunk_id}")
+        else:
             logger.info(
-                f"Extracted {len(df)} rows ({chunk_size_bytes} bytes) from chunk {event.chunk_id}"
+                f"Extracted {stats['rows']} rows ({stats['bytes']} bytes) from chunk {event.chunk_id}"
             )
-            
-            return df, chunk_size_bytes
+    
+    async def _source_schema(self, event: ArchivalEvent) -> pa.Schema:
+        """Arrow schema from the column types of the table being archived.
+        
+        Typing the file from the source rather than the first batch keeps a
+        column that happens to be all NULL in that batch from being written
+        as type null, which later batches with values would not fit.
+        """
+        async with get_db_session() as session:
+            result = await session.execute(
+                text("""
+                    SELECT column_name, udt_name FROM information_schema.columns
+                    WHERE table_schema = :schema_name AND table_name = :table_name
+                    ORDER BY ordinal_position
+                """),
+                {"schema_name": event.schema_name, "table_name": event.table_name}
+            )
+            return source_arrow_schema([tuple(row) for row in result.all()])
     
     @trace_method(name="ArchivalProcessor._write_to_lakehouse", kind="CLIENT")
-    async def _write_to_lakehouse(self, event: ArchivalEvent, df: pd.DataFrame):
-        """Write data to Azure Data Lake Storage.
+    async def _write_to_lakehouse(
+        self,
+        event: ArchivalEvent,
+        batches: AsyncIterator[pd.DataFrame]
+    ) -> Dict[str, int]:
+        """Stream chunk data to Azure Data Lake Storage as Parquet row groups.
         
         Args:
             event: The archival event.
-            df: DataFrame containing the chunk data.
+            batches: Batches of the chunk data.
+            
+        Returns:
+            Rows, row groups and bytes written
         """
         # Add span attributes for storage operation
         add_span_attributes({
@@ -204,14 +239,9 @@ class ArchivalProcessor:
             "storage.operation": "write_to_lakehouse",
             "chunk_id": event.chunk_id,
             "table_name": event.table_name,
-            "schema_name": event.schema_name,
-            "row_count": len(df) if not df.empty else 0
+            "schema_name": event.schema_name
         })
         
-        if df.empty:
-            logger.warning(f"No data to write for chunk {event.chunk_id}")
-            return
-        
         # Generate blob path with {year}/{month}/{day} structure
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
         date_obj = event.chunk_start_time
@@ -221,23 +251,41 @@ class ArchivalProcessor:
         blob_path = (
             f"{event.schema_name}/{event.table_name}/"
             f"{date_obj.year}/{date_obj.month:02d}/{date_obj.day:02d}/"
-            f"{event.chunk_id}_{timestamp}.parquet"
+            f"{event.chunk_id}_{timestamp}"
         )
         
-        # Write data using Lakehouse Client
-        success = await self.lakehouse_client.write_data(
+        # Stream data using Lakehouse Client
+        written = await self.lakehouse_client.write_batches(
             path=blob_path,
-            data=df,
+            batches=batches,
             format="parquet",
+            schema=await self._source_schema(event),
             correlation_id=event.event_id
         )
         
-        if success:
+        if written is None:
+            raise Exception(f"Failed to write chunk {event.chunk_id} to lakehouse at {blob_path}")
+        
+        if written["rows"]:
             logger.info(
-                f"Uploaded chunk {event.chunk_id} to {blob_path}"
+                f"Uploaded chunk {event.chunk_id} to {blob_path}.parquet "
+                f"({written['row_groups']} row groups, {written['bytes']} bytes)"
+            )
+            await self.manifest.record(
+                table_name=event.table_name,
+                path=f"{blob_path}.parquet",
+                row_count=written["rows"],
+                columns=written["columns"],
+                schema=written["schema"],
+                time_column=event.time_column,
+                start_time=event.chunk_start_time,
+                end_time=event.chunk_end_time,
+                row_groups=written["row_groups"],
+                schema_name=event.schema_name
             )
         else:
-            raise Exception(f"Failed to write chunk {event.chunk_id} to lakehouse at {blob_path}")
+            logger.warning(f"No data to write for chunk {event.chunk_id}")
+        return written
     
     @trace_method(name="ArchivalProcessor._send_confirmation", kind="PRODUCER")
     async def _send_confirmation(
@@ -1,14 +1,27 @@
 from app.config import settings
 from app.lakehouse_client import LakehouseClient
+from app.manifest import ArchiveManifest
+from app.read_cache import ArchiveReadCache
 from app.messaging_client import MessagingClient
 
 # Initialize LakehouseClient with settings
 lakehouse_client = LakehouseClient(
     storage_account=settings.storage_account,
     container_name=settings.container_name,
-    connection_string=settings.storage_connection_string
+    connection_string=settings.storage_connection_string,
+    local_root=settings.lakehouse_local_path or None,
+    upload_block_size=settings.upload_block_size,
+    max_workers=settings.lakehouse_max_workers,
+    read_cache=ArchiveReadCache(
+        settings.read_cache_dir,
+        max_bytes=settings.read_cache_max_bytes,
+        memory_max_bytes=settings.read_cache_memory_bytes
+    ) if settings.read_cache_dir else None
 )
 
+# Per-table archive manifests, stored alongside the archived data
+archive_manifest = ArchiveManifest(lakehouse_client)
+
 # Initialize MessagingClient with settings
 messaging_client = MessagingClient(
     redis_url=settings.redis_url,
@@ -30,6 +30,12 @@ class Settings(BaseSettings):
     
     # Lakehouse configuration
     default_format: str = "parquet"  # Options: parquet, delta, json
+    lakehouse_local_path: str = Field(default="", description="Store the lakehouse in this local directory instead of Azure")
+    upload_block_size: int = Field(default=8 * 1024 * 1024, description="Block size in bytes for streamed lakehouse uploads")
+    lakehouse_max_workers: int = Field(default=8, description="Threads for concurrent lakehouse reads")
+    read_cache_dir: str = Field(default="", description="Local directory caching archived Parquet files for retrieval (empty disables)")
+    read_cache_max_bytes: int = Field(default=2 * 1024 ** 3, description="Maximum size of the local read cache in bytes")
+    read_cache_memory_bytes: int = Field(default=0, description="Maximum size of decoded tables kept in memory (0 disables)")
     
     # CORS configuration
     cors_origins: list[str] = ["*"]
@@ -40,6 +46,7 @@ class Settings(BaseSettings):
     # Archival configuration
     max_concurrent_archival_tasks: int = 5
     chunk_batch_size: int = 10  # Number of chunks to process in a single batch
+    archive_batch_rows: int = Field(default=50000, description="Rows fetched per cursor batch and written per Parquet row group")
     auto_archival_enabled: bool = True  # Enable automatic archival operations
     
     # Monitoring and metrics
@@ -9,9 +9,12 @@ import io
 import json
 import logging
 import uuid
-from typing import Dict, List, Any, Optional, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterable, AsyncIterator, Dict, List, Any, Optional, Tuple, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 try:
     from azure.storage.filedatalake import DataLakeServiceClient
@@ -25,10 +28,102 @@ except ImportError:
         def from_connection_string(conn_str): pass
     class AzureError(Exception): pass
 
+from .local_storage import LocalDataLakeServiceClient
+from .manifest import column_stats, merge_column_stats, schema_of
+from .read_cache import ArchiveReadCache
 from .telemetry import trace_method, add_span_attributes, traced_span, inject_trace_context, extract_trace_context
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL type (pg_type.typname) -> Arrow type of the archived column.
+# Other types (numeric, uuid, arrays, ...) are inferred from the first batch.
+PG_ARROW_TYPES = {
+    "bool": pa.bool_(),
+    "int2": pa.int16(),
+    "int4": pa.int32(),
+    "int8": pa.int64(),
+    "float4": pa.float32(),
+    "float8": pa.float64(),
+    "text": pa.string(),
+    "varchar": pa.string(),
+    "bpchar": pa.string(),
+    "name": pa.string(),
+    "json": pa.string(),
+    "jsonb": pa.string(),
+    "bytea": pa.binary(),
+    "date": pa.date32(),
+    "timestamp": pa.timestamp("us"),
+    "timestamptz": pa.timestamp("us", tz="UTC"),
+}
+
+
+def source_arrow_schema(columns: List[Tuple[str, str]]) -> pa.Schema:
+    """Arrow schema for the (column name, PostgreSQL type) pairs of known types."""
+    return pa.schema([
+        (name, PG_ARROW_TYPES[pg_type]) for name, pg_type in columns
+        if pg_type in PG_ARROW_TYPES
+    ])
+
+
+class _AppendUploadStream(io.RawIOBase):
+    """Write-only stream that uploads to a Data Lake file in appended blocks.
+
+    At most ``block_size`` bytes are held in memory; every full block is
+    appended to the (uncommitted) file and the whole file is committed by
+    ``commit``.
+    """
+
+    def __init__(self, file_client, block_size: int):
+        self._file_client = file_client
+        self._block_size = block_size
+        self._buffer = bytearray()
+        self._offset = 0
+        self.blocks_uploaded = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._offset + len(self._buffer)
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self._block_size:
+            self._upload_block()
+        return len(data)
+
+    def _upload_block(self) -> None:
+        if not self._buffer:
+            return
+        block = bytes(self._buffer)
+        self._buffer.clear()
+        self._file_client.append_data(block, offset=self._offset, length=len(block))
+        self._offset += len(block)
+        self.blocks_uploaded += 1
+
+    def commit(self) -> int:
+        """Upload the remaining bytes, commit the file and return its size."""
+        self._upload_block()
+        self._file_client.flush_data(self._offset)
+        return self._offset
+
+
+def _complete_schema(schema: Optional[pa.Schema], df: pd.DataFrame) -> pa.Schema:
+    """Arrow schema for df: types from schema where given, else inferred from df.
+
+    A column that is all NULL in df is inferred as type null, which later
+    batches with values could not be written as, so callers should supply
+    the types they know up front.
+    """
+    inferred = pa.Schema.from_pandas(df, preserve_index=False)
+    if schema is None:
+        return inferred
+    return pa.schema([
+        schema.field(name) if name in schema.names else inferred.field(name)
+        for name in inferred.names
+    ])
+
+
 class LakehouseClient:
     """Client for interacting with Azure Data Lake Storage Gen2."""
     
@@ -36,7 +131,11 @@ class LakehouseClient:
         self,
         storage_account: str,
         container_name: str,
-        connection_string: str
+        connection_string: str,
+        local_root: Optional[str] = None,
+        upload_block_size: int = 8 * 1024 * 1024,
+        read_cache: Optional[ArchiveReadCache] = None,
+        max_workers: int = 8
     ):
         """Initialize the lakehouse client.
         
@@ -44,11 +143,21 @@ class LakehouseClient:
             storage_account: Azure Storage account name
             container_name: Container name for data lake storage
             connection_string: Azure Storage connection string
+            local_root: Store data under this local directory instead of Azure
+            upload_block_size: Size of the blocks streamed writes upload at once
+            read_cache: Optional local cache parquet reads are served from
+            max_workers: Size of the thread pool reads run on
         """
         self.storage_account = storage_account
         self.container_name = container_name
         self.connection_string = connection_string
+        self.local_root = local_root
+        self.upload_block_size = upload_block_size
+        self.read_cache = read_cache
+        self.max_workers = max_workers
         self._service_client = None
+        self._file_system_client = None
+        self._executor: Optional[ThreadPoolExecutor] = None
         
     @trace_method(name="LakehouseClient._get_service_client", kind="CLIENT")
     async def _get_service_client(self):
@@ -69,6 +178,10 @@ class LakehouseClient:
             # Create the service client
             # Note: Azure SDK doesn't have async support for Data Lake Storage,
             # so we'll run this in a thread pool
+            if self.local_root:
+                self._service_client = LocalDataLakeServiceClient(self.local_root)
+                return self._service_client
+
             loop = asyncio.get_event_loop()
             self._service_client = await loop.run_in_executor(
                 None,
@@ -178,13 +291,8 @@ class LakehouseClient:
             else:
                 df = data
             
-            # Get the file system client
-            service_client = await self._get_service_client()
+            file_system_client = await self._get_file_system_client()
             loop = asyncio.get_event_loop()
-            file_system_client = await loop.run_in_executor(
-                None,
-                lambda: service_client.get_file_system_client(self.container_name)
-            )
             
             # Create directory structure if needed
             directory_path = "/".join(path.split("/")[:-1])
@@ -227,13 +335,306 @@ class LakehouseClient:
             logger.error(f"Error writing data to {path}: {e}", exc_info=True)
             return False
     
+    @trace_method(name="LakehouseClient.write_batches", kind="CLIENT")
+    async def write_batches(
+        self,
+        path: str,
+        batches: AsyncIterable[Union[List[Dict[str, Any]], pd.DataFrame]],
+        format: str = "parquet",
+        schema: Optional[pa.Schema] = None,
+        correlation_id: Optional[str] = None
+    ) -> Optional[Dict[str, int]]:
+        """Stream batches of rows into one file in the data lake.
+        
+        Each batch becomes one Parquet row group (or a run of JSON lines) and
+        the encoded bytes are uploaded in blocks of upload_block_size as they
+        are produced, so memory use is bounded by one batch plus one block
+        regardless of the total size. The file only becomes visible once
+        all batches have been written.
+        
+        Args:
+            path: Path in the data lake where data will be stored
+            batches: Async iterable of batches, as lists of dictionaries or DataFrames
+            format: Format to store data in ('parquet', 'json')
+            schema: Optional Arrow schema for the Parquet file, e.g. built from the
+                source column types; columns it does not cover take the type
+                inferred from the first batch
+            correlation_id: Optional correlation ID for distributed tracing
+            
+        Returns:
+            Dictionary with rows, row_groups and bytes written, the column
+            min/max statistics and the schema of the data (no file is created
+            if there were no rows), or None if the write failed
+        """
+        operation_id = str(uuid.uuid4())
+        correlation_id = correlation_id or str(uuid.uuid4())
+        
+        add_span_attributes({
+            "storage.system": "azure_datalake",
+            "storage.operation": "write_batches",
+            "storage.account": self.storage_account,
+            "storage.container": self.container_name,
+            "storage.path": path,
+            "storage.format": format,
+            "storage.operation_id": operation_id,
+            "correlation_id": correlation_id
+        })
+        if format not in ("parquet", "json"):
+            logger.error(f"Error writing data to {path}: Unsupported format: {format}")
+            return None
+        
+        file_name = f"{path}.{format}"
+        stats = {"rows": 0, "row_groups": 0, "bytes": 0, "columns": {}, "schema": {}}
+        stream = None
+        writer = None
+        loop = asyncio.get_event_loop()
+        try:
+            async for batch in batches:
+                df = pd.DataFrame(batch) if isinstance(batch, list) else batch
+                if df.empty:
+                    continue
+                
+                if stream is None:
+                    # Open the file lazily so empty inputs leave nothing behind
+                    file_client = await self._create_file_client(file_name)
+                    await loop.run_in_executor(None, file_client.create_file)
+                    stream = _AppendUploadStream(file_client, self.upload_block_size)
+                
+                if format == "parquet":
+                    if writer is None:
+                        schema = _complete_schema(schema, df)
+                    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+                    if writer is None:
+                        schema = table.schema
+                        writer = pq.ParquetWriter(stream, schema)
+                    await loop.run_in_executor(
+                        None, lambda: writer.write_table(table, row_group_size=len(table))
+                    )
+                else:
+                    lines = df.to_json(orient="records", lines=True)
+                    if not lines.endswith("\n"):
+                        lines += "\n"
+                    await loop.run_in_executor(None, stream.write, lines.encode("utf-8"))
+                
+                stats["rows"] += len(df)
+                stats["row_groups"] += 1
+                stats["columns"] = merge_column_stats(stats["columns"], column_stats(df))
+                if not stats["schema"]:
+                    stats["schema"] = schema_of(df)
+            
+            if stream is None:
+                logger.info(f"No rows to write to {file_name}")
+                return stats
+            
+            if writer is not None:
+                await loop.run_in_executor(None, writer.close)
+                writer = None
+            stats["bytes"] = await loop.run_in_executor(None, stream.commit)
+            
+            add_span_attributes({
+                "data.size_rows": stats["rows"],
+                "data.size_bytes": stats["bytes"],
+                "storage.blocks_uploaded": stream.blocks_uploaded
+            })
+            logger.info(
+                f"Successfully wrote {stats['rows']} rows in {stats['row_groups']} batches "
+                f"({stats['bytes']} bytes) to {file_name}"
+            )
+            return stats
+            
+        except Exception as e:
+            logger.error(f"Error writing data to {path}: {e}", exc_info=True)
+            return None
+        finally:
+            if writer is not None:
+                try:
+                    writer.close()
+                except Exception:
+                    pass
+    
+    async def _create_file_client(self, file_name: str):
+        """Get a file client for file_name, creating its directory."""
+        file_system_client = await self._get_file_system_client()
+        loop = asyncio.get_event_loop()
+        
+        directory_path = "/".join(file_name.split("/")[:-1])
+        if directory_path:
+            await loop.run_in_executor(
+                None,
+                lambda: file_system_client.create_directory(directory_path, exist_ok=True)
+            )
+        
+        return await loop.run_in_executor(
+            None,
+            lambda: file_system_client.get_file_client(file_name)
+        )
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Bounded thread pool for blocking storage calls of reads."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="lakehouse"
+            )
+        return self._executor
+    
+    async def _get_file_system_client(self):
+        """Get (and keep) the file system client of the container."""
+        if self._file_system_client is None:
+            service_client = await self._get_service_client()
+            loop = asyncio.get_event_loop()
+            self._file_system_client = await loop.run_in_executor(
+                None,
+                lambda: service_client.get_file_system_client(self.container_name)
+            )
+        return self._file_system_client
+    
+    def _read_file(
+        self,
+        file_system_client,
+        file_name: str,
+        format: str,
+        columns: Optional[List[str]],
+        filters: Optional[List[tuple]],
+        as_arrow: bool = False
+    ) -> Union[pd.DataFrame, pa.Table]:
+        """Download and parse one file (blocking)."""
+        file_client = file_system_client.get_file_client(file_name)
+        
+        if format == "parquet":
+            if self.read_cache is not None:
+                # Serve from the local copy, downloading it on a miss
+                def download_to(local_path: str):
+                    with open(local_path, "wb") as f:
+                        file_client.download_file().readinto(f)
+                
+                table = self.read_cache.read(file_name, download_to, columns=columns, filters=filters)
+            else:
+                buffer = io.BytesIO()
+                file_client.download_file().readinto(buffer)
+                buffer.seek(0)
+                # Use column filtering if provided to reduce data transfer and compute costs
+                table = pq.read_table(buffer, columns=columns or None, filters=filters or None)
+            return table if as_arrow else table.to_pandas()
+        
+        if format == "json":
+            buffer = io.BytesIO()
+            file_client.download_file().readinto(buffer)
+            buffer.seek(0)
+            df = pd.read_json(buffer, lines=True)
+            # Apply column filtering after reading for JSON
+            if columns:
+                df = df[columns]
+            return pa.Table.from_pandas(df, preserve_index=False) if as_arrow else df
+        
+        raise ValueError(f"Unsupported format: {format}")
+    
+    async def read_many(
+        self,
+        paths: List[str],
+        format: str = "parquet",
+        columns: Optional[List[str]] = None,
+        filters: Optional[Union[List[tuple], Dict[str, List[tuple]]]] = None,
+        concurrency: Optional[int] = None,
+        ordered: bool = True,
+        correlation_id: Optional[str] = None
+    ) -> AsyncIterator[Tuple[str, pa.RecordBatch]]:
+        """Read many files concurrently, streaming their record batches.
+        
+        Up to `concurrency` files are downloaded and decoded at once on the
+        lakehouse thread pool. Record batches are yielded as soon as their
+        file is complete; with `ordered` they are yielded in the order of
+        `paths`, holding back at most `concurrency` completed files. Files
+        that cannot be read are logged and skipped. Breaking out of the
+        iteration stops scheduling further files.
+        
+        Args:
+            paths: Paths in the data lake (without extension)
+            format: Format of the stored data ('parquet', 'json')
+            columns: Optional list of columns to read
+            filters: Optional row filters for every file, or a dict of filters per path
+            concurrency: Files in flight at once (defaults to max_workers)
+            ordered: Yield files in the order of paths instead of completion order
+            correlation_id: Optional correlation ID for distributed tracing
+            
+        Yields:
+            Tuples of (path, record batch)
+        """
+        correlation_id = correlation_id or str(uuid.uuid4())
+        concurrency = max(1, concurrency or self.max_workers)
+        add_span_attributes({
+            "storage.system": "azure_datalake",
+            "storage.operation": "read_many",
+            "storage.container": self.container_name,
+            "storage.format": format,
+            "storage.file_count": len(paths),
+            "storage.concurrency": concurrency,
+            "correlation_id": correlation_id,
+            "columns.requested": ",".join(columns) if columns else "all"
+        })
+        
+        file_system_client = await self._get_file_system_client()
+        loop = asyncio.get_event_loop()
+        executor = self._get_executor()
+        
+        def submit(index: int) -> asyncio.Future:
+            path = paths[index]
+            path_filters = filters.get(path) if isinstance(filters, dict) else filters
+            future = loop.run_in_executor(
+                executor,
+                lambda: self._read_file(
+                    file_system_client, f"{path}.{format}", format, columns, path_filters, as_arrow=True
+                )
+            )
+            indexes[future] = index
+            return future
+        
+        indexes: Dict[asyncio.Future, int] = {}
+        pending = set()
+        completed: Dict[int, Optional[pa.Table]] = {}
+        next_submit = 0
+        next_yield = 0
+        try:
+            while next_yield < len(paths):
+                # Keep the window full; ordered reads count held-back files too
+                while next_submit < len(paths) and len(pending) + (len(completed) if ordered else 0) < concurrency:
+                    pending.add(submit(next_submit))
+                    next_submit += 1
+                
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    index = indexes.pop(future)
+                    try:
+                        completed[index] = future.result()
+                    except Exception as e:
+                        logger.error(f"Error reading data from {paths[index]}: {e}")
+                        completed[index] = None
+                
+                ready = sorted(completed) if not ordered else []
+                while ordered and next_yield in completed:
+                    ready.append(next_yield)
+                    next_yield += 1
+                if not ordered:
+                    next_yield += len(ready)
+                
+                for index in ready:
+                    table = completed.pop(index)
+                    if table is None:
+                        continue
+                    for batch in table.to_batches():
+                        yield paths[index], batch
+        finally:
+            for future in pending:
+                future.cancel()
+    
     @trace_method(name="LakehouseClient.read_data", kind="CLIENT")
     async def read_data(
         self,
         path: str,
         format: str = "parquet",
         columns: Optional[List[str]] = None,
-        correlation_id: Optional[str] = None
+        correlation_id: Optional[str] = None,
+        filters: Optional[List[tuple]] = None
     ) -> Optional[pd.DataFrame]:
         """Read data from the data lake.
         
@@ -242,6 +643,8 @@ class LakehouseClient:
             format: Format of the stored data ('parquet', 'delta', 'json')
             columns: Optional list of columns to read (for parquet only)
             correlation_id: Optional correlation ID for distributed tracing
+            filters: Optional row filters as (column, op, value) tuples (for
+                parquet only); row groups outside them are skipped
             
         Returns:
             DataFrame with the data, or None if read failed
@@ -263,55 +666,74 @@ class LakehouseClient:
             "columns.requested": ",".join(columns) if columns else "all"
         })
         try:
-            # Get the file system client
-            service_client = await self._get_service_client()
-            loop = asyncio.get_event_loop()
-            file_system_client = await loop.run_in_executor(
-                None,
-                lambda: service_client.get_file_system_client(self.container_name)
-            )
-            
-            # Create file client
+            file_system_client = await self._get_file_system_client()
             file_name = f"{path}.{format}"
-            file_client = await loop.run_in_executor(
-                None,
-                lambda: file_system_client.get_file_client(file_name)
-            )
             
-            # Download data
-            download = await loop.run_in_executor(
-                None,
-                lambda: file_client.download_file()
+            # Download and parse in a single hop on the lakehouse pool
+            loop = asyncio.get_event_loop()
+            return await loop.run_in_executor(
+                self._get_executor(),
+                lambda: self._read_file(file_system_client, file_name, format, columns, filters)
             )
+                
+        except Exception as e:
+            logger.error(f"Error reading data from {path}: {e}", exc_info=True)
+            return None
+    
+    @trace_method(name="LakehouseClient.upload_bytes", kind="CLIENT")
+    async def upload_bytes(self, file_name: str, data: bytes) -> bool:
+        """Write a small file, replacing it if it exists.
+        
+        Args:
+            file_name: File name in the data lake, including the extension
+            data: File contents
             
-            # Read the content
-            buffer = io.BytesIO()
+        Returns:
+            True if write was successful, False otherwise
+        """
+        add_span_attributes({
+            "storage.system": "azure_datalake",
+            "storage.operation": "upload_bytes",
+            "storage.container": self.container_name,
+            "storage.path": file_name,
+            "data.size_bytes": len(data)
+        })
+        try:
+            file_client = await self._create_file_client(file_name)
+            loop = asyncio.get_event_loop()
             await loop.run_in_executor(
                 None,
-                lambda: download.readinto(buffer)
+                lambda: file_client.upload_data(data, overwrite=True)
             )
+            return True
+        except Exception as e:
+            logger.error(f"Error writing {file_name}: {e}", exc_info=True)
+            return False
+    
+    @trace_method(name="LakehouseClient.download_bytes", kind="CLIENT")
+    async def download_bytes(self, file_name: str) -> Optional[bytes]:
+        """Read a small file.
+        
+        Args:
+            file_name: File name in the data lake, including the extension
             
-            # Reset buffer position
-            buffer.seek(0)
-            
-            # Parse data based on format
-            if format == "parquet":
-                # Use column filtering if provided to reduce data transfer and compute costs
-                if columns:
-                    return pd.read_parquet(buffer, columns=columns)
-                else:
-                    return pd.read_parquet(buffer)
-            elif format == "json":
-                df = pd.read_json(buffer, lines=True)
-                # Apply column filtering after reading for JSON
-                if columns:
-                    return df[columns]
-                return df
-            else:
-                raise ValueError(f"Unsupported format: {format}")
-                
+        Returns:
+            File contents, or None if the file does not exist or cannot be read
+        """
+        add_span_attributes({
+            "storage.system": "azure_datalake",
+            "storage.operation": "download_bytes",
+            "storage.container": self.container_name,
+            "storage.path": file_name
+        })
+        try:
+            file_system_client = await self._get_file_system_client()
+            loop = asyncio.get_event_loop()
+            file_client = file_system_client.get_file_client(file_name)
+            download = await loop.run_in_executor(None, file_client.download_file)
+            return await loop.run_in_executor(None, download.readall)
         except Exception as e:
-            logger.error(f"Error reading data from {path}: {e}", exc_info=True)
+            logger.debug(f"Could not read {file_name}: {e}")
             return None
     
     @trace_method(name="LakehouseClient.path_exists", kind="CLIENT")
@@ -340,13 +762,8 @@ class LakehouseClient:
             "correlation_id": correlation_id
         })
         try:
-            # Get the file system client
-            service_client = await self._get_service_client()
+            file_system_client = await self._get_file_system_client()
             loop = asyncio.get_event_loop()
-            file_system_client = await loop.run_in_executor(
-                None,
-                lambda: service_client.get_file_system_client(self.container_name)
-            )
             
             # Check if path exists by trying to list it
             # This is more efficient than downloading the file
@@ -387,13 +804,7 @@ class LakehouseClient:
             "correlation_id": correlation_id
         })
         try:
-            # Get the file system client
-            service_client = await self._get_service_client()
-            loop = asyncio.get_event_loop()
-            file_system_client = await loop.run_in_executor(
-                None,
-                lambda: service_client.get_file_system_client(self.container_name)
-            )
+            file_system_client = await self._get_file_system_client()
             
             # List paths
             paths = []
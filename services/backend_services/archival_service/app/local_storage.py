@@ -0,0 +1,137 @@
+"""
+Local filesystem backend for the lakehouse client.
+
+Implements the subset of the Azure Data Lake Storage Gen2 client API used by
+LakehouseClient on top of a local directory, so the archival pipeline can run
+against a plain filesystem in development, tests and benchmarks.
+
+Appended data is staged in a ``.part`` file and only becomes visible under
+its final name on flush, matching the append/flush commit semantics of ADLS.
+"""
+import io
+import os
+import shutil
+from typing import Iterator, Optional, Union
+
+
+class LocalPathProperties:
+    """Entry returned by LocalFileSystemClient.get_paths."""
+
+    def __init__(self, name: str, is_directory: bool, content_length: int = 0):
+        self.name = name
+        self.is_directory = is_directory
+        self.content_length = content_length
+
+
+class LocalDownload:
+    """Downloaded file, mirroring StorageStreamDownloader."""
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def readall(self) -> bytes:
+        with open(self._path, "rb") as f:
+            return f.read()
+
+    def readinto(self, stream) -> int:
+        with open(self._path, "rb") as f:
+            shutil.copyfileobj(f, stream)
+            return f.tell()
+
+
+class LocalFileClient:
+    """File in a local file system, mirroring DataLakeFileClient."""
+
+    def __init__(self, root: str, path: str):
+        self.path_name = path
+        self._path = os.path.join(root, path)
+        self._staging = f"{self._path}.part"
+
+    def upload_data(self, data: Union[bytes, io.IOBase], overwrite: bool = False, **kwargs) -> None:
+        if not overwrite and os.path.exists(self._path):
+            raise FileExistsError(self._path)
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        with open(self._staging, "wb") as f:
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                f.write(data)
+            else:
+                shutil.copyfileobj(data, f)
+        os.replace(self._staging, self._path)
+
+    def create_file(self, **kwargs) -> None:
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        open(self._staging, "wb").close()
+
+    def append_data(self, data: bytes, offset: int, length: Optional[int] = None, **kwargs) -> None:
+        with open(self._staging, "r+b") as f:
+            f.seek(offset)
+            f.write(data[:length] if length is not None else data)
+
+    def flush_data(self, offset: int, **kwargs) -> None:
+        with open(self._staging, "r+b") as f:
+            f.truncate(offset)
+        os.replace(self._staging, self._path)
+
+    def download_file(self, **kwargs) -> LocalDownload:
+        if not os.path.isfile(self._path):
+            raise FileNotFoundError(self._path)
+        return LocalDownload(self._path)
+
+    def delete_file(self, **kwargs) -> None:
+        os.remove(self._path)
+
+
+class LocalFileSystemClient:
+    """Container in a local directory, mirroring FileSystemClient."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def create_directory(self, directory: str, **kwargs) -> None:
+        os.makedirs(os.path.join(self.root, directory), exist_ok=True)
+
+    def get_file_client(self, file_path: str) -> LocalFileClient:
+        return LocalFileClient(self.root, file_path)
+
+    def get_paths(
+        self,
+        path: Optional[str] = None,
+        recursive: bool = True,
+        max_results: Optional[int] = None,
+        **kwargs
+    ) -> Iterator[LocalPathProperties]:
+        base = os.path.join(self.root, path or "")
+        if os.path.isfile(base):
+            yield LocalPathProperties(path, False, os.path.getsize(base))
+            return
+        if not os.path.isdir(base):
+            raise FileNotFoundError(base)
+
+        count = 0
+        for dirpath, dirnames, filenames in os.walk(base):
+            dirnames.sort()
+            entries = [(name, True) for name in dirnames] + [
+                (name, False) for name in sorted(filenames) if not name.endswith(".part")
+            ]
+            for name, is_directory in entries:
+                full_path = os.path.join(dirpath, name)
+                relative = os.path.relpath(full_path, self.root).replace(os.sep, "/")
+                size = 0 if is_directory else os.path.getsize(full_path)
+                yield LocalPathProperties(relative, is_directory, size)
+                count += 1
+                if max_results is not None and count >= max_results:
+                    return
+            if not recursive:
+                return
+
+
+class LocalDataLakeServiceClient:
+    """Service client serving containers from subdirectories of root."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def get_file_system_client(self, file_system: str) -> LocalFileSystemClient:
+        path = os.path.join(self.root, file_system)
+        os.makedirs(path, exist_ok=True)
+        return LocalFileSystemClient(path)
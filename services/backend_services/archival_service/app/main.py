@@ -12,6 +12,7 @@ import time
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+import pandas as pd
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -38,6 +39,7 @@ from app.metrics import metrics, update_system_metrics, export_metrics_to_observ
 from app.telemetry import initialize_telemetry, instrument_fastapi, extract_correlation_id, add_span_attributes, trace_method, traced_span
 from app.messaging_client import MessagingClient
 from app.lakehouse_client import LakehouseClient
+from app.manifest import column_stats, schema_of
 from . import state
 
 # Import API endpoints
@@ -584,13 +586,29 @@ async def process_archival(event_id: str):
             chunk_data = await extract_chunk_data(table_name, chunk)
             
             # Write to lakehouse in Delta or Parquet format
-            from app.clients import lakehouse_client
+            from app.clients import lakehouse_client, archive_manifest
             chunk_name = chunk.get("chunk_name", f"chunk_{uuid.uuid4()}")
-            await lakehouse_client.write_data(
+            df = pd.DataFrame(chunk_data)
+            written = await lakehouse_client.write_data(
                 path=f"{lakehouse_path}/{chunk_name}",
-                data=chunk_data,
+                data=df,
                 format="parquet"
             )
+            
+            # Index the file so retrieval can prune by time range and statistics
+            if written and not df.empty:
+                time_column = chunk.get("time_column") or ("timestamp" if "timestamp" in df.columns else None)
+                await archive_manifest.record(
+                    table_name=table_name,
+                    path=f"{lakehouse_path}/{chunk_name}.parquet",
+                    row_count=len(df),
+                    columns=column_stats(df),
+                    schema=schema_of(df),
+                    time_column=time_column,
+                    start_time=chunk.get("range_start"),
+                    end_time=chunk.get("range_end"),
+                    schema_name=chunk.get("schema_name", "public")
+                )
         
         # Update tracking
         tracking["status"] = "completed"
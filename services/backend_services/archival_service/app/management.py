@@ -6,6 +6,7 @@ including retention status monitoring, archival metrics, and management operatio
 """
 
 import asyncio
+import contextlib
 import json
 import logging
 import os
@@ -17,6 +18,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 import httpx
 from pydantic import BaseModel, Field, ConfigDict
 
+from .manifest import ArchiveManifest
 from .models import ArchivalStatus
 from .telemetry import trace_method, add_span_attributes, traced_span
 from .api.monitoring_endpoints import get_monitor
@@ -378,7 +380,8 @@ class ArchivalManager:
         limit: int = 100,  # Reduced default limit to minimize compute costs
         offset: int = 0,
         columns: Optional[List[str]] = None,
-        optimize_cost: bool = True
+        optimize_cost: bool = True,
+        schema_name: str = "public"
     ) -> Dict[str, Any]:
         """Retrieve archived data for a specific table within a time frame.
         
@@ -390,6 +393,7 @@ class ArchivalManager:
             offset: Offset for pagination
             columns: Optional list of columns to include (reduces data transfer)
             optimize_cost: If True, optimizes for compute cost over performance
+            schema_name: Schema of the table
             
         Returns:
             Dict: Retrieved data with metadata
@@ -418,11 +422,11 @@ class ArchivalManager:
                 raise ValueError(f"Time range too large. Maximum allowed is 366 days")
                 
             # Import lakehouse client to avoid circular imports
-            from app.clients import lakehouse_client, messaging_client as redis_client
+            from app.clients import lakehouse_client, archive_manifest, messaging_client as redis_client
             from app.config import settings
             
             # Use Redis cache to minimize repeated expensive operations if optimize_cost is True
-            cache_key = f"archived_data:{table_name}:{start_time}:{end_time}:{limit}:{offset}"
+            cache_key = f"archived_data:{schema_name}.{table_name}:{start_time}:{end_time}:{limit}:{offset}"
             cached_metadata = None
             if optimize_cost:
                 cached_metadata = await redis_client.get(cache_key + ":metadata")
@@ -447,32 +451,22 @@ class ArchivalManager:
                         }
                     }
             
-            # Construct path pattern for efficient directory traversal
-            # This avoids listing all directories when we can narrow down by date components
-            base_path = f"timescaledb_archive/{table_name}"
-            
-            # Generate only the needed year/month/day paths based on date range
-            # This is much more efficient than listing all paths
-            date_paths = []
-            current_date = start_dt.date()
-            end_date = end_dt.date()
-            
-            while current_date <= end_date:
-                year, month, day = current_date.year, current_date.month, current_date.day
-                date_paths.append(f"{base_path}/{year}/{month:02d}/{day:02d}")
-                current_date += timedelta(days=1)
+            # Prefer the table's archive manifest: one read, then files are
+            # pruned by their recorded time range and row groups by pushdown
+            file_filters: Dict[str, Any] = {}
+            manifest = None
+            try:
+                manifest = await archive_manifest.load(table_name, schema_name)
+            except Exception as e:
+                logger.debug(f"No manifest available for {schema_name}.{table_name}: {e}")
             
-            # Check which paths actually exist to avoid unnecessary operations
-            matching_files = []
-            for path in date_paths:
-                try:
-                    # Only check if directory exists first before listing files
-                    if await lakehouse_client.path_exists(path):
-                        chunk_files = await lakehouse_client.list_files(path)
-                        matching_files.extend([f"{path}/{chunk}" for chunk in chunk_files])
-                except Exception as e:
-                    logger.debug(f"Path {path} does not exist or cannot be accessed: {e}")
-                    continue
+            if manifest is not None:
+                matching_files = []
+                for entry in ArchiveManifest.prune(manifest, start_dt, end_dt):
+                    matching_files.append(entry["path"])
+                    file_filters[entry["path"]] = ArchiveManifest.time_filters(manifest, entry, start_dt, end_dt)
+            else:
+                matching_files = await self._scan_archive_directories(lakehouse_client, table_name, start_dt, end_dt)
             
             # Cache the metadata for future requests if optimize_cost is True
             metadata = {
@@ -510,51 +504,32 @@ class ArchivalManager:
             all_data = []
             records_needed = limit
             
-            for file_path in paginated_files:
-                if records_needed <= 0:
-                    break
-                    
-                # Check if we have this file's data cached (only if optimize_cost is True)
-                file_cache_key = f"archived_file:{file_path}"
-                cached_data = None
-                if optimize_cost:
-                    cached_data = await redis_client.get(file_cache_key)
-                
-                if cached_data:
-                    # Use cached data
-                    file_records = json.loads(cached_data)
-                    all_data.extend(file_records[:records_needed])
-                    records_needed -= len(file_records[:records_needed])
-                else:
-                    # Read from storage - only if needed
-                    try:
-                        # Remove file extension for reading
-                        clean_path = file_path.rsplit('.', 1)[0] if '.' in file_path else file_path
-                        
-                        # Use column filtering if available to reduce data transfer
-                        df = await lakehouse_client.read_data(
-                            clean_path,
-                            columns=columns  # Pass column filtering to reduce data transfer
-                        )
-                        
-                        if df is not None:
-                            # Convert DataFrame to records
-                            file_records = df.to_dict(orient='records')
-                            
-                            # Cache the file data for future requests if optimize_cost is True
-                            if optimize_cost:
-                                await redis_client.set(
-                                    file_cache_key,
-                                    json.dumps(file_records),
-                                    ex=settings.CACHE_TTL_SECONDS
-                                )
-                            
-                            # Add to result set
-                            all_data.extend(file_records[:records_needed])
-                            records_needed -= len(file_records[:records_needed])
-                    except Exception as e:
-                        logger.warning(f"Error reading file {clean_path}: {e}")
-                        continue
+            # Remove file extensions for reading
+            clean_paths = [
+                file_path.rsplit('.', 1)[0] if '.' in file_path else file_path
+                for file_path in paginated_files
+            ]
+            path_filters = {
+                clean_path: file_filters.get(file_path)
+                for clean_path, file_path in zip(clean_paths, paginated_files)
+            }
+            
+            # Files are fetched concurrently and consumed in order; reading
+            # stops once enough records have been collected. Repeated reads
+            # are served by the lakehouse client's local read cache when configured
+            if records_needed > 0 and clean_paths:
+                async with contextlib.aclosing(lakehouse_client.read_many(
+                    clean_paths,
+                    columns=columns,  # Pass column filtering to reduce data transfer
+                    filters=path_filters  # Skip row groups outside the time range
+                )) as batches:
+                    async for _, batch in batches:
+                        # Convert only the records still needed
+                        file_records = batch.slice(0, records_needed).to_pandas().to_dict(orient='records')
+                        all_data.extend(file_records)
+                        records_needed -= len(file_records)
+                        if records_needed <= 0:
+                            break
             
             return {
                 "table_name": table_name,
@@ -567,7 +542,8 @@ class ArchivalManager:
                 "metadata": {
                     "limit": limit,
                     "offset": offset,
-                    "has_more": len(matching_files) > (offset + limit)
+                    "has_more": len(matching_files) > (offset + limit),
+                    "index": "manifest" if manifest is not None else "directory_scan"
                 }
             }
             
@@ -579,6 +555,44 @@ class ArchivalManager:
             raise ValueError(f"Error retrieving archived data: {str(e)}")
             
     
+    async def _scan_archive_directories(
+        self,
+        lakehouse_client,
+        table_name: str,
+        start_dt: datetime,
+        end_dt: datetime
+    ) -> List[str]:
+        """Find archived files by probing one directory per day.
+        
+        Used for tables archived before manifests were maintained.
+        """
+        # Construct path pattern for efficient directory traversal
+        # This avoids listing all directories when we can narrow down by date components
+        base_path = f"timescaledb_archive/{table_name}"
+        
+        # Generate only the needed year/month/day paths based on date range
+        date_paths = []
+        current_date = start_dt.date()
+        end_date = end_dt.date()
+        
+        while current_date <= end_date:
+            year, month, day = current_date.year, current_date.month, current_date.day
+            date_paths.append(f"{base_path}/{year}/{month:02d}/{day:02d}")
+            current_date += timedelta(days=1)
+        
+        # Check which paths actually exist to avoid unnecessary operations
+        matching_files = []
+        for path in date_paths:
+            try:
+                # Only check if directory exists first before listing files
+                if await lakehouse_client.path_exists(path):
+                    chunk_files = await lakehouse_client.list_files(path)
+                    matching_files.extend([f"{path}/{chunk}" for chunk in chunk_files])
+            except Exception as e:
+                logger.debug(f"Path {path} does not exist or cannot be accessed: {e}")
+                continue
+        return matching_files
+    
     @trace_method(name="ArchivalManager.calculate_archival_stats", kind="INTERNAL")
     async def calculate_archival_stats(self) -> ArchivalStats:
         """Calculate statistics about the archival process.
@@ -0,0 +1,259 @@
+"""
+Archive manifest for the Archival Service.
+
+Each archived table (per schema) has one manifest document in the lakehouse listing every
+archived file with its time range, row count, per-column min/max statistics
+and schema version. Retrieval reads the manifest once and prunes files by
+their statistics instead of probing and listing one directory per day.
+
+Manifests are rewritten as a whole on every archival; updates are serialized
+per table by the service's shared ArchiveManifest (app.clients), so a table's
+archival should be driven by a single archival service instance.
+"""
+
+import asyncio
+import json
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .telemetry import trace_method, add_span_attributes
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_ROOT = "timescaledb_archive"
+MANIFEST_FILE = "_manifest.json"
+
+
+def manifest_path(table_name: str, schema_name: str = "public") -> str:
+    """Lakehouse file name of a table's manifest."""
+    return f"{MANIFEST_ROOT}/{schema_name}/{table_name}/{MANIFEST_FILE}"
+
+
+def _json_value(value: Any) -> Any:
+    """Convert a statistic to a JSON value, or None if it cannot be stored."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, (pd.Timestamp, datetime, date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return None
+
+
+def column_stats(df: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+    """Min/max of every column of a DataFrame whose values are comparable."""
+    stats = {}
+    for column in df.columns:
+        series = df[column].dropna()
+        if series.empty:
+            continue
+        try:
+            low, high = _json_value(series.min()), _json_value(series.max())
+        except (TypeError, ValueError):
+            continue  # Mixed or unorderable values
+        if low is not None and high is not None:
+            stats[str(column)] = {"min": low, "max": high}
+    return stats
+
+
+def merge_column_stats(
+    stats: Dict[str, Dict[str, Any]],
+    other: Dict[str, Dict[str, Any]]
+) -> Dict[str, Dict[str, Any]]:
+    """Combine the statistics of two sets of rows."""
+    merged = dict(stats)
+    for column, bounds in other.items():
+        current = merged.get(column)
+        if current is None:
+            merged[column] = dict(bounds)
+            continue
+        try:
+            merged[column] = {
+                "min": min(current["min"], bounds["min"]),
+                "max": max(current["max"], bounds["max"])
+            }
+        except TypeError:
+            merged.pop(column)  # Types changed between batches
+    return merged
+
+
+def schema_of(df: pd.DataFrame) -> Dict[str, str]:
+    """Column name -> dtype of a DataFrame."""
+    return {str(column): str(dtype) for column, dtype in df.dtypes.items()}
+
+
+def to_utc(value: Any) -> pd.Timestamp:
+    """Timestamp in UTC; naive values are taken to be UTC."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class ArchiveManifest:
+    """Reads and maintains the per-table archive manifests."""
+
+    def __init__(self, lakehouse_client):
+        """Initialize the manifest store.
+
+        Args:
+            lakehouse_client: LakehouseClient the manifests are stored in
+        """
+        self.lakehouse_client = lakehouse_client
+        self._locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @trace_method(name="ArchiveManifest.load", kind="CLIENT")
+    async def load(self, table_name: str, schema_name: str = "public") -> Optional[Dict[str, Any]]:
+        """Load a table's manifest.
+
+        Args:
+            table_name: Name of the archived table
+            schema_name: Schema of the archived table
+
+        Returns:
+            The manifest, or None if the table has none (yet)
+        """
+        data = await self.lakehouse_client.download_bytes(manifest_path(table_name, schema_name))
+        if not isinstance(data, (bytes, bytearray)):
+            return None
+        try:
+            manifest = json.loads(data)
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable manifest for {schema_name}.{table_name}: {e}")
+            return None
+        return manifest if isinstance(manifest, dict) and "files" in manifest else None
+
+    @trace_method(name="ArchiveManifest.record", kind="CLIENT")
+    async def record(
+        self,
+        table_name: str,
+        path: str,
+        row_count: int,
+        columns: Dict[str, Dict[str, Any]],
+        schema: Dict[str, str],
+        time_column: Optional[str] = None,
+        start_time: Any = None,
+        end_time: Any = None,
+        row_groups: int = 1,
+        schema_name: str = "public"
+    ) -> bool:
+        """Add an archived file to its table's manifest.
+
+        The file's time range is taken from the statistics of time_column and
+        falls back to start_time/end_time (the chunk's range).
+
+        Args:
+            table_name: Name of the archived table
+            path: Lakehouse file name, including the extension
+            row_count: Number of rows in the file
+            columns: Column min/max statistics (see column_stats)
+            schema: Column name -> type (see schema_of)
+            time_column: Name of the table's time column, if known
+            start_time: Start of the archived range
+            end_time: End of the archived range
+            row_groups: Number of row groups in the file
+            schema_name: Schema of the archived table
+
+        Returns:
+            True if the manifest was updated
+        """
+        add_span_attributes({
+            "archival.operation": "record_manifest",
+            "table_name": table_name,
+            "schema_name": schema_name,
+            "storage.path": path,
+            "row_count": row_count
+        })
+
+        bounds = columns.get(time_column) if time_column else None
+        if bounds:
+            start_time, end_time = bounds["min"], bounds["max"]
+
+        lock = self._locks.setdefault((schema_name, table_name), asyncio.Lock())
+        async with lock:
+            manifest = await self.load(table_name, schema_name) or {
+                "schema_name": schema_name,
+                "table_name": table_name,
+                "schemas": [],
+                "files": []
+            }
+
+            # Schema versions are indexes into the list of distinct schemas
+            if schema in manifest["schemas"]:
+                schema_version = manifest["schemas"].index(schema)
+            else:
+                manifest["schemas"].append(schema)
+                schema_version = len(manifest["schemas"]) - 1
+
+            manifest["files"] = [entry for entry in manifest["files"] if entry["path"] != path]
+            manifest["files"].append({
+                "path": path,
+                "start_time": _json_value(start_time),
+                "end_time": _json_value(end_time),
+                "time_column": time_column,
+                "row_count": row_count,
+                "row_groups": row_groups,
+                "columns": columns,
+                "schema_version": schema_version,
+                "archived_at": datetime.utcnow().isoformat()
+            })
+            manifest["files"].sort(key=lambda entry: entry["start_time"] or "")
+            manifest["updated_at"] = datetime.utcnow().isoformat()
+
+            return await self.lakehouse_client.upload_bytes(
+                manifest_path(table_name, schema_name),
+                json.dumps(manifest).encode("utf-8")
+            )
+
+    @staticmethod
+    def prune(
+        manifest: Dict[str, Any],
+        start_time: datetime,
+        end_time: datetime
+    ) -> List[Dict[str, Any]]:
+        """Files of a manifest that may hold rows in [start_time, end_time].
+
+        Files without a recorded time range are always kept.
+        """
+        start, end = to_utc(start_time), to_utc(end_time)
+        selected = []
+        for entry in manifest.get("files", []):
+            try:
+                if entry.get("start_time") and to_utc(entry["start_time"]) > end:
+                    continue
+                if entry.get("end_time") and to_utc(entry["end_time"]) < start:
+                    continue
+            except (TypeError, ValueError):
+                pass  # Time range is not a timestamp; cannot prune
+            selected.append(entry)
+        return selected
+
+    @staticmethod
+    def time_filters(
+        manifest: Dict[str, Any],
+        entry: Dict[str, Any],
+        start_time: datetime,
+        end_time: datetime
+    ) -> Optional[List[Tuple[str, str, Any]]]:
+        """Parquet filters restricting a file to the requested time range.
+
+        The filters are pushed down to the reader, which skips row groups
+        whose footer statistics fall outside the range. Only timestamp
+        columns are filtered.
+        """
+        time_column = entry.get("time_column")
+        try:
+            dtype = manifest["schemas"][entry["schema_version"]].get(time_column, "")
+        except (KeyError, IndexError, TypeError):
+            return None
+        if not time_column or not dtype.startswith("datetime64"):
+            return None
+
+        start, end = to_utc(start_time), to_utc(end_time)
+        if "," not in dtype:  # Naive column, e.g. datetime64[ns]
+            start, end = start.tz_localize(None), end.tz_localize(None)
+        return [(time_column, ">=", start), (time_column, "<=", end)]
@@ -7,16 +7,28 @@ between microservices.
 import asyncio
 import json
 import logging
+import sys
 import uuid
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, Callable, Optional, List
 
 import redis.asyncio as redis
 
+# Add backend services to path
+backend_services_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_services_path))
+
+from messaging_service.app.codecs import CodecRegistry
+
 from .telemetry import trace_method, add_span_attributes, traced_span, inject_trace_context, extract_trace_context
 
 logger = logging.getLogger(__name__)
 
+# Decodes envelopes exactly as the messaging service writes them
+_codecs = CodecRegistry(compression=None)
+
+
 class MessagingClient:
     """Client for interacting with Redis pub/sub messaging."""
     
@@ -37,6 +49,8 @@ class MessagingClient:
         self.service_name = service_name
         self.pool_size = pool_size
         self._redis = None
+        # Pub/sub reads raw bytes so compressed and binary envelopes survive
+        self._pubsub_redis = None
         self._pubsub = None
         self._running = False
         self._subscription_tasks = {}
@@ -62,7 +76,8 @@ class MessagingClient:
                 decode_responses=True,
                 max_connections=self.pool_size
             )
-            self._pubsub = self._redis.pubsub()
+            self._pubsub_redis = redis.Redis.from_url(self.redis_url, decode_responses=False)
+            self._pubsub = self._pubsub_redis.pubsub()
             
             # Test connection
             await self._redis.ping()
@@ -101,8 +116,12 @@ class MessagingClient:
         if self._pubsub:
             await self._pubsub.close()
         
+        if self._pubsub_redis:
+            await self._pubsub_redis.close()
+
         await self._redis.close()
         self._redis = None
+        self._pubsub_redis = None
         self._pubsub = None
         logger.info("Disconnected from Redis")
     
@@ -332,7 +351,7 @@ class MessagingClient:
                 if message is not None and message["type"] == "message":
                     # Parse the message
                     try:
-                        data = json.loads(message["data"])
+                        data = _codecs.decode(message["data"])
                         
                         # Extract correlation ID and trace context
                         correlation_id = data.get("correlation_id", "unknown")
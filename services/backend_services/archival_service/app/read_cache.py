@@ -0,0 +1,263 @@
+"""
+Local read cache for archived Parquet files.
+
+Archived files are immutable once written, so repeated retrievals can be
+served from a local copy instead of downloading them again:
+
+- Files are kept on local disk in their original Parquet form, evicted
+  least-recently-used once the cache exceeds max_bytes
+- Every cached file carries a SHA-256 checksum which is verified the first
+  time it is used after being written or after a restart; corrupt copies are
+  dropped and downloaded again
+- Reads memory-map the file, so column projection and row-group filters only
+  touch the pages they need
+- Optionally, decoded Arrow tables of recently read files are kept in memory
+  (bounded by memory_max_bytes) and filtered in place
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+
+class _CachedFile:
+    __slots__ = ("path", "size", "sha256", "verified")
+
+    def __init__(self, path: str, size: int, sha256: str, verified: bool):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.verified = verified
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArchiveReadCache:
+    """Bounded on-disk cache of lakehouse Parquet files.
+
+    Usage:
+        cache = ArchiveReadCache("/var/cache/archival", max_bytes=2 * 1024 ** 3)
+        table = cache.read(file_name, download, columns=["time", "value"])
+    """
+
+    def __init__(self, directory: str, max_bytes: int, memory_max_bytes: int = 0):
+        """Initialize the cache, adopting files cached by earlier runs.
+
+        Args:
+            directory: Local directory holding the cached files
+            max_bytes: Maximum total size of the cached files
+            memory_max_bytes: Maximum size of decoded tables kept in memory (0 disables)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self._files: "OrderedDict[str, _CachedFile]" = OrderedDict()
+        self._tables: "OrderedDict[str, pa.Table]" = OrderedDict()
+        self._size = 0
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "memory_hits": 0, "misses": 0, "evictions": 0, "corrupt": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _key(self, file_name: str) -> str:
+        return hashlib.sha256(file_name.encode("utf-8")).hexdigest()
+
+    def _load_index(self) -> None:
+        """Adopt files from a previous run, oldest use first."""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            sidecar = os.path.join(self.directory, name)
+            try:
+                with open(sidecar) as f:
+                    meta = json.load(f)
+                path = sidecar[:-len(".json")] + ".parquet"
+                entries.append((os.path.getmtime(path), meta["file_name"], path, meta["size"], meta["sha256"]))
+            except (OSError, ValueError, KeyError):
+                self._remove_files(sidecar[:-len(".json")])
+
+        for _, file_name, path, size, sha256 in sorted(entries):
+            self._files[file_name] = _CachedFile(path, size, sha256, verified=False)
+            self._size += size
+        self._evict()
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the cached files."""
+        return self._size
+
+    def __contains__(self, file_name: str) -> bool:
+        return file_name in self._files
+
+    def read(
+        self,
+        file_name: str,
+        download: Callable[[str], None],
+        columns: Optional[List[str]] = None,
+        filters: Optional[List[Tuple]] = None
+    ) -> pa.Table:
+        """Read a cached file, downloading it first on a miss.
+
+        Args:
+            file_name: Lakehouse file name
+            download: Writes the file's contents to the given local path
+            columns: Optional columns to read
+            filters: Optional row filters as (column, op, value) tuples
+
+        Returns:
+            The selected columns and rows of the file
+        """
+        table = self._memory_get(file_name)
+        if table is not None:
+            self.stats["memory_hits"] += 1
+            return self._select(table, columns, filters)
+
+        path = self._get_path(file_name)
+        if path is None:
+            self.stats["misses"] += 1
+            path = self._put(file_name, download)
+        else:
+            self.stats["hits"] += 1
+
+        if self.memory_max_bytes:
+            table = pq.read_table(path, memory_map=True)
+            self._memory_put(file_name, table)
+            return self._select(table, columns, filters)
+        return pq.read_table(path, columns=columns, filters=filters or None, memory_map=True)
+
+    def invalidate(self, file_name: str) -> None:
+        """Drop a file from the cache."""
+        with self._lock:
+            entry = self._files.pop(file_name, None)
+            if entry is not None:
+                self._size -= entry.size
+                self._remove_files(entry.path[:-len(".parquet")])
+            table = self._tables.pop(file_name, None)
+            if table is not None:
+                self._memory_size -= table.nbytes
+
+    def _get_path(self, file_name: str) -> Optional[str]:
+        with self._lock:
+            entry = self._files.get(file_name)
+            if entry is None:
+                return None
+            self._files.move_to_end(file_name)
+
+        if not entry.verified:
+            try:
+                valid = _sha256(entry.path) == entry.sha256
+            except OSError:
+                valid = False
+            if not valid:
+                logger.warning(f"Cached copy of {file_name} failed checksum validation, refetching")
+                self.stats["corrupt"] += 1
+                self.invalidate(file_name)
+                return None
+            entry.verified = True
+
+        # Touch for LRU order across restarts
+        try:
+            os.utime(entry.path)
+        except OSError:
+            pass
+        return entry.path
+
+    def _put(self, file_name: str, download: Callable[[str], None]) -> str:
+        base = os.path.join(self.directory, self._key(file_name))
+        staging = f"{base}.{uuid.uuid4().hex}.tmp"
+        try:
+            download(staging)
+            size = os.path.getsize(staging)
+            sha256 = _sha256(staging)
+            os.replace(staging, f"{base}.parquet")
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+
+        with open(f"{base}.json", "w") as f:
+            json.dump({"file_name": file_name, "size": size, "sha256": sha256}, f)
+
+        with self._lock:
+            previous = self._files.pop(file_name, None)
+            if previous is not None:
+                self._size -= previous.size
+            self._files[file_name] = _CachedFile(f"{base}.parquet", size, sha256, verified=True)
+            self._size += size
+            self._evict(keep=file_name)
+        return f"{base}.parquet"
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        while self._size > self.max_bytes and self._files:
+            file_name, entry = next(iter(self._files.items()))
+            if file_name == keep:
+                break
+            del self._files[file_name]
+            self._size -= entry.size
+            self._remove_files(entry.path[:-len(".parquet")])
+            self.stats["evictions"] += 1
+
+    @staticmethod
+    def _remove_files(base: str) -> None:
+        for suffix in (".parquet", ".json"):
+            try:
+                os.remove(base + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _memory_get(self, file_name: str) -> Optional[pa.Table]:
+        if not self.memory_max_bytes:
+            return None
+        with self._lock:
+            table = self._tables.get(file_name)
+            if table is not None:
+                self._tables.move_to_end(file_name)
+            return table
+
+    def _memory_put(self, file_name: str, table: pa.Table) -> None:
+        if table.nbytes > self.memory_max_bytes:
+            return
+        with self._lock:
+            previous = self._tables.pop(file_name, None)
+            if previous is not None:
+                self._memory_size -= previous.nbytes
+            self._tables[file_name] = table
+            self._memory_size += table.nbytes
+            while self._memory_size > self.memory_max_bytes:
+                _, evicted = self._tables.popitem(last=False)
+                self._memory_size -= evicted.nbytes
+
+    @staticmethod
+    def _select(table: pa.Table, columns: Optional[List[str]], filters: Optional[List[Tuple]]) -> pa.Table:
+        if filters:
+            table = table.filter(pq.filters_to_expression(filters))
+        if columns:
+            table = table.select(columns)
+        return table
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache counters and sizes."""
+        return {
+            **self.stats,
+            "files": len(self._files),
+            "bytes": self._size,
+            "memory_tables": len(self._tables),
+            "memory_bytes": self._memory_size
+        }
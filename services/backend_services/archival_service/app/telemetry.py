@@ -312,6 +312,36 @@ def trace_method(name: Optional[str] = None, kind: Optional[str] = None) -> Call
                     span.record_exception(e)
                     raise
         
+        @functools.wraps(func)
+        async def async_gen_wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _tracer:
+                async for item in func(*args, **kwargs):
+                    yield item
+                return
+            
+            # The span covers the whole iteration but is only current while
+            # the generator body runs, not while the consumer handles an item
+            span = _tracer.start_span(span_name, kind=span_kind)
+            generator = func(*args, **kwargs)
+            try:
+                while True:
+                    with trace.use_span(span, record_exception=False, set_status_on_exception=False):
+                        try:
+                            item = await generator.__anext__()
+                        except StopAsyncIteration:
+                            break
+                    yield item
+                span.set_status(Status(StatusCode.OK))
+            except Exception as e:
+                span.set_status(Status(StatusCode.ERROR, str(e)))
+                span.record_exception(e)
+                raise
+            finally:
+                await generator.aclose()
+                span.end()
+        
+        if inspect.isasyncgenfunction(func):
+            return cast(F, async_gen_wrapper)
         if inspect.iscoroutinefunction(func):
             return cast(F, async_wrapper)
         return cast(F, sync_wrapper)
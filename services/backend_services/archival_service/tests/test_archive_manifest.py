@@ -0,0 +1,122 @@
+"""
+Tests for manifest-based retrieval of archived data.
+"""
+
+import os
+import sys
+import types
+from unittest.mock import AsyncMock
+
+import pandas as pd
+import pytest
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lakehouse_client import LakehouseClient
+from app.manifest import ArchiveManifest
+
+
+async def _day_batches(day: str, rows: int, batches: int):
+    start = pd.Timestamp(day, tz="UTC")
+    for b in range(batches):
+        times = start + pd.to_timedelta(range(b * rows, (b + 1) * rows), unit="min")
+        yield pd.DataFrame({"time": times, "value": range(rows)})
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    """A local lakehouse wired into app.clients."""
+    lakehouse = LakehouseClient("local", "archive", "", local_root=str(tmp_path))
+    messaging = AsyncMock()
+    messaging.get.return_value = None
+    monkeypatch.setitem(sys.modules, "app.clients", types.SimpleNamespace(
+        lakehouse_client=lakehouse,
+        messaging_client=messaging,
+        archive_manifest=ArchiveManifest(lakehouse)
+    ))
+    return lakehouse
+
+
+@pytest.mark.asyncio
+async def test_retrieval_reads_manifest_and_prunes(archive, monkeypatch):
+    """One manifest read replaces per-day probing; files and row groups are pruned."""
+    manifest = sys.modules["app.clients"].archive_manifest
+    for day in ("2025-03-01", "2025-03-10", "2025-03-20"):
+        path = f"public/sensor_data/{day}/chunk"
+        written = await archive.write_batches(path, _day_batches(day, 60, 24))
+        assert await manifest.record(
+            table_name="sensor_data",
+            path=f"{path}.parquet",
+            row_count=written["rows"],
+            columns=written["columns"],
+            schema=written["schema"],
+            time_column="time",
+            row_groups=written["row_groups"]
+        )
+
+    stored = await manifest.load("sensor_data")
+    assert [entry["row_count"] for entry in stored["files"]] == [1440] * 3
+    assert stored["files"][1]["start_time"].startswith("2025-03-10T00:00:00")
+    assert len(stored["schemas"]) == 1
+
+    monkeypatch.setattr(archive, "path_exists", AsyncMock(side_effect=AssertionError("probed")))
+    from app.management import ArchivalManager
+    manager = ArchivalManager()
+    try:
+        result = await manager.retrieve_archived_data(
+            table_name="sensor_data",
+            start_time="2025-03-10T05:00:00",
+            end_time="2025-03-10T05:30:00",
+            limit=1000
+        )
+    finally:
+        await manager.close()
+
+    assert result["total_files_found"] == 1
+    assert result["metadata"]["index"] == "manifest"
+    # Only the 31 rows of the requested half hour are read back
+    assert result["record_count"] == 31
+    assert all(
+        pd.Timestamp("2025-03-10T05:00:00Z") <= record["time"] <= pd.Timestamp("2025-03-10T05:30:00Z")
+        for record in result["data"]
+    )
+
+
+def test_prune_keeps_files_without_time_range():
+    """Files recorded without statistics cannot be pruned and are kept."""
+    manifest = {"schemas": [{}], "files": [
+        {"path": "a.parquet", "start_time": "2025-01-01T00:00:00", "end_time": "2025-01-01T23:59:59"},
+        {"path": "b.parquet", "start_time": None, "end_time": None},
+        {"path": "c.parquet", "start_time": "2025-02-01T00:00:00", "end_time": "2025-02-01T23:59:59"}
+    ]}
+    selected = ArchiveManifest.prune(
+        manifest,
+        pd.Timestamp("2025-02-01T12:00:00").to_pydatetime(),
+        pd.Timestamp("2025-02-02T00:00:00").to_pydatetime()
+    )
+    assert [entry["path"] for entry in selected] == ["b.parquet", "c.parquet"]
+
+
+@pytest.mark.asyncio
+async def test_manifests_are_kept_per_schema(archive):
+    """Tables with the same name in different schemas get separate manifests."""
+    manifest = sys.modules["app.clients"].archive_manifest
+    for schema_name in ("public", "staging"):
+        written = await archive.write_batches(
+            f"{schema_name}/sensor_data/chunk", _day_batches("2025-03-01", 60, 2)
+        )
+        assert await manifest.record(
+            table_name="sensor_data",
+            path=f"{schema_name}/sensor_data/chunk.parquet",
+            row_count=written["rows"],
+            columns=written["columns"],
+            schema=written["schema"],
+            time_column="time",
+            schema_name=schema_name
+        )
+
+    for schema_name in ("public", "staging"):
+        stored = await manifest.load("sensor_data", schema_name)
+        assert stored["schema_name"] == schema_name
+        assert [entry["path"] for entry in stored["files"]] == [f"{schema_name}/sensor_data/chunk.parquet"]
@@ -0,0 +1,102 @@
+"""
+Tests for the local archive read cache.
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lakehouse_client import LakehouseClient
+from app.read_cache import ArchiveReadCache
+
+
+def _source(tmp_path, name, rows=1000):
+    path = tmp_path / f"{name}.parquet"
+    pq.write_table(pa.table({"id": list(range(rows)), "value": [i * 0.5 for i in range(rows)]}), path, row_group_size=100)
+    return path
+
+
+def _downloader(path, calls):
+    def download(local_path):
+        calls.append(local_path)
+        with open(path, "rb") as src, open(local_path, "wb") as dst:
+            dst.write(src.read())
+    return download
+
+
+def test_miss_then_hit_with_projection_and_filters(tmp_path):
+    """Files are downloaded once and later reads are served locally."""
+    source = _source(tmp_path, "a")
+    cache = ArchiveReadCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024)
+    calls = []
+
+    table = cache.read("t/a.parquet", _downloader(source, calls), columns=["id"], filters=[("id", "<", 10)])
+    assert table.column_names == ["id"]
+    assert table.num_rows == 10
+
+    table = cache.read("t/a.parquet", _downloader(source, calls))
+    assert table.num_rows == 1000
+    assert len(calls) == 1
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_evicts_least_recently_used_by_bytes(tmp_path):
+    """The total size stays within max_bytes, dropping the oldest file."""
+    sources = {name: _source(tmp_path, name) for name in "abc"}
+    size = os.path.getsize(sources["a"])
+    cache = ArchiveReadCache(str(tmp_path / "cache"), max_bytes=int(size * 2.5))
+    calls = []
+
+    cache.read("a", _downloader(sources["a"], calls))
+    cache.read("b", _downloader(sources["b"], calls))
+    cache.read("a", _downloader(sources["a"], calls))
+    cache.read("c", _downloader(sources["c"], calls))
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.size <= cache.max_bytes
+    assert len(os.listdir(tmp_path / "cache")) == 4  # Two files plus sidecars
+
+
+def test_corrupt_copy_is_refetched_after_restart(tmp_path):
+    """Files adopted from a previous run are checksum-validated before use."""
+    source = _source(tmp_path, "a")
+    directory = str(tmp_path / "cache")
+    calls = []
+    ArchiveReadCache(directory, max_bytes=10 * 1024 * 1024).read("a", _downloader(source, calls))
+
+    cached = [name for name in os.listdir(directory) if name.endswith(".parquet")][0]
+    with open(os.path.join(directory, cached), "r+b") as f:
+        f.seek(20)
+        f.write(b"garbage")
+
+    cache = ArchiveReadCache(directory, max_bytes=10 * 1024 * 1024)
+    assert "a" in cache
+    assert cache.read("a", _downloader(source, calls)).num_rows == 1000
+    assert len(calls) == 2
+    assert cache.get_stats()["corrupt"] == 1
+
+
+@pytest.mark.asyncio
+async def test_lakehouse_reads_through_cache_and_memory_tables(tmp_path):
+    """read_data downloads once; decoded tables are reused from memory."""
+    lakehouse = LakehouseClient(
+        "local", "archive", "",
+        local_root=str(tmp_path / "lake"),
+        read_cache=ArchiveReadCache(str(tmp_path / "cache"), max_bytes=10 * 1024 * 1024, memory_max_bytes=1024 * 1024)
+    )
+    df = pd.DataFrame({"id": range(500), "value": range(500)})
+    assert await lakehouse.write_data("t/chunk", df)
+
+    first = await lakehouse.read_data("t/chunk", columns=["value"], filters=[("id", ">=", 490)])
+    second = await lakehouse.read_data("t/chunk", columns=["value"], filters=[("id", ">=", 490)])
+
+    assert first["value"].tolist() == second["value"].tolist() == list(range(490, 500))
+    stats = lakehouse.read_cache.get_stats()
+    assert (stats["misses"], stats["memory_hits"]) == (1, 1)
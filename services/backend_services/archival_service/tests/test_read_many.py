@@ -0,0 +1,84 @@
+"""
+Tests for concurrent multi-file reads from the lakehouse.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+import pytest_asyncio
+
+# Add parent directory to path to import app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import local_storage
+from app.lakehouse_client import LakehouseClient
+
+
+@pytest_asyncio.fixture
+async def lakehouse(tmp_path):
+    client = LakehouseClient("local", "archive", "", local_root=str(tmp_path), max_workers=4)
+    for i in range(12):
+        df = pd.DataFrame({"file": [i] * 50, "row": range(50), "value": [i * 1.5] * 50})
+        assert await client.write_data(f"t/chunk_{i:02d}", df)
+    return client
+
+
+@pytest.fixture
+def slow_downloads(monkeypatch):
+    """Random download latency; records the peak number of concurrent downloads."""
+    state = {"active": 0, "peak": 0}
+    lock = threading.Lock()
+    original = local_storage.LocalFileClient.download_file
+
+    def download_file(self, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(random.uniform(0.005, 0.03))
+        with lock:
+            state["active"] -= 1
+        return original(self, **kwargs)
+
+    monkeypatch.setattr(local_storage.LocalFileClient, "download_file", download_file)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_read_many_is_concurrent_and_ordered(lakehouse, slow_downloads):
+    """Files download in parallel but batches come back in path order."""
+    paths = [f"t/chunk_{i:02d}" for i in range(12)]
+
+    seen = []
+    async for path, batch in lakehouse.read_many(paths, columns=["file", "row"], concurrency=4):
+        assert batch.schema.names == ["file", "row"]
+        seen.append(path)
+
+    assert seen == paths
+    assert 1 < slow_downloads["peak"] <= 4
+
+
+@pytest.mark.asyncio
+async def test_read_many_unordered_filters_and_missing_files(lakehouse, slow_downloads):
+    """Completion order, per-path filters and unreadable files are handled."""
+    paths = ["t/chunk_00", "t/missing", "t/chunk_05"]
+    filters = {"t/chunk_05": [("row", "<", 5)]}
+
+    rows = {}
+    async for path, batch in lakehouse.read_many(paths, filters=filters, ordered=False):
+        rows[path] = rows.get(path, 0) + batch.num_rows
+
+    assert rows == {"t/chunk_00": 50, "t/chunk_05": 5}
+
+
+@pytest.mark.asyncio
+async def test_read_many_stops_early(lakehouse):
+    """Breaking out of the iteration stops scheduling further files."""
+    paths = [f"t/chunk_{i:02d}" for i in range(12)]
+    async for path, _ in lakehouse.read_many(paths, concurrency=2):
+        break
+    assert path == "t/chunk_00"
@@ -0,0 +1,78 @@
+import sys
+import os
+import asyncio
+import argparse
+import logging
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.lakehouse_client import LakehouseClient
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def make_batch(start: int, rows: int) -> pd.DataFrame:
+    """A batch of synthetic hypertable rows."""
+    ids = np.arange(start, start + rows)
+    return pd.DataFrame({
+        "time": pd.Timestamp("2025-01-01") + pd.to_timedelta(ids, unit="s"),
+        "sensor_id": ids % 500,
+        "value": np.sin(ids / 100.0),
+        "status": np.where(ids % 3 == 0, "ok", "degraded")
+    })
+
+
+async def run_full(client: LakehouseClient, rows: int, batch_rows: int) -> None:
+    """Previous pipeline: fetch every row, build one DataFrame, upload one buffer."""
+    records = []
+    for start in range(0, rows, batch_rows):
+        records.extend(make_batch(start, min(batch_rows, rows - start)).itertuples(index=False))
+    df = pd.DataFrame(records, columns=["time", "sensor_id", "value", "status"])
+    await client.write_data("bench/full", df, format="parquet")
+
+
+async def run_streamed(client: LakehouseClient, rows: int, batch_rows: int) -> None:
+    """Streaming pipeline: one batch and one upload block in memory at a time."""
+    async def batches():
+        for start in range(0, rows, batch_rows):
+            yield make_batch(start, min(batch_rows, rows - start))
+
+    await client.write_batches("bench/streamed", batches(), format="parquet")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare whole-chunk and streamed archival writes on a local lakehouse")
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--batch-rows", type=int, default=50_000)
+    parser.add_argument("--block-size", type=int, default=8 * 1024 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        client = LakehouseClient(
+            storage_account="local",
+            container_name="archive",
+            connection_string="",
+            local_root=root,
+            upload_block_size=args.block_size
+        )
+        for name, run in (("full", run_full), ("streamed", run_streamed)):
+            tracemalloc.start()
+            start = time.perf_counter()
+            await run(client, args.rows, args.batch_rows)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{name:9s} {args.rows / elapsed:10.0f} rows/s  peak {peak / 1024 / 1024:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
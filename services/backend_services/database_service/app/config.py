@@ -26,6 +26,12 @@ class DatabaseServiceSettings(BaseSettings):
     redis_pool_size: int = Field(default=10, description="Redis connection pool size")
     redis_channel_prefix: str = Field(default="database", description="Redis channel prefix")
     
+    # Request/Reply Transport Configuration
+    request_reply_transports: str = Field(default="pubsub,streams", description="Comma-separated request/reply transports to serve (pubsub, streams)")
+    request_stream_group: str = Field(default="database_service.workers", description="Consumer group shared by all database service workers")
+    request_stream_max_pending: int = Field(default=100, description="Max stream requests a worker reads ahead of completing them")
+    request_stream_claim_idle_ms: int = Field(default=30000, description="Reclaim requests left unacknowledged by a dead worker after this idle time")
+    
     # Migration Configuration
     run_migrations_on_startup: bool = Field(default=True, description="Run migrations on startup")
     schema_evolution_enabled: bool = Field(default=True, description="Enable schema evolution")
@@ -63,6 +69,7 @@ class DatabaseServiceSettings(BaseSettings):
     connection_pool_max_overflow: int = Field(default=20, description="Connection pool max overflow")
     connection_pool_timeout: int = Field(default=30, description="Connection pool timeout")
     connection_pool_recycle: int = Field(default=3600, description="Connection pool recycle time")
+    prepared_statement_cache_size: int = Field(default=500, description="Prepared statements cached per connection (asyncpg)")
     
     # Performance Configuration
     query_timeout: int = Field(default=30, description="Default query timeout in seconds")
@@ -25,6 +25,22 @@ from .models import ModelInfo, ValidationIssue
 
 logger = logging.getLogger(__name__)
 
+# Columns of the OTLP trace and metric tables (registered by the observability
+# service) and which of them hold JSON or timestamps
+TELEMETRY_BATCH_COLUMNS = {
+    "trace": [
+        "trace_id", "span_id", "parent_span_id", "name", "service", "kind",
+        "start_time", "end_time", "duration_ms", "status_code", "status_message",
+        "attributes", "events", "links", "resource", "timestamp", "correlation_id"
+    ],
+    "metric": [
+        "name", "description", "service", "value", "unit", "type", "labels",
+        "timestamp", "correlation_id"
+    ]
+}
+TELEMETRY_JSON_COLUMNS = {"attributes", "events", "links", "resource", "labels"}
+TELEMETRY_TIME_COLUMNS = {"start_time", "end_time", "timestamp"}
+
 class MigrationPhase(Enum):
     PRE_VALIDATION = "pre_validation"
     MIGRATION_EXECUTION = "migration_execution"
@@ -64,19 +80,26 @@ class DatabaseManager:
         self.timescale_manager = None
         self.query_metrics = {}
         self.command_metrics = {}
+        self.prepared_statement_metrics = {}
         self.cache_stats = {"hits": 0, "misses": 0}
     
     @trace_method(name="database_manager_initialize", kind="INTERNAL")
     async def initialize(self):
         """Initialize database connections."""
         try:
-            # Create async engine
+            # Create async engine. The asyncpg dialect keeps an LRU of
+            # server-side prepared statements per connection keyed by SQL text,
+            # which execute_prepared relies on for plan reuse.
+            connect_args = {}
+            if "+asyncpg" in self.settings.database_url:
+                connect_args["prepared_statement_cache_size"] = self.settings.prepared_statement_cache_size
             self.async_engine = create_async_engine(
                 self.settings.database_url,
                 pool_size=self.settings.connection_pool_size,
                 max_overflow=self.settings.connection_pool_max_overflow,
                 pool_timeout=self.settings.connection_pool_timeout,
-                pool_recycle=self.settings.connection_pool_recycle
+                pool_recycle=self.settings.connection_pool_recycle,
+                connect_args=connect_args
             )
             
             # Create sync engine for migrations
@@ -326,6 +349,48 @@ class DatabaseManager:
             logger.error(f"Query execution failed: {str(e)}")
             raise
     
+    @trace_method(name="database_manager.execute_prepared", kind="INTERNAL")
+    async def execute_prepared(self, statement_key: str, query: str,
+                               parameters: Optional[Dict[str, Any]] = None,
+                               parameter_types: Optional[Dict[str, str]] = None,
+                               service_name: str = "unknown", timeout: int = 30,
+                               correlation_id: Optional[str] = None):
+        """Execute a bind-parameterized read query as a prepared statement.
+        
+        The query text is expected to be identical across calls for the same
+        statement_key, so the asyncpg statement cache reuses the server-side
+        prepared statement (and eventually its generic plan). Parameters that
+        arrive as ISO strings are restored using parameter_types.
+        """
+        parameters = self._restore_parameter_types(parameters or {}, parameter_types or {})
+        
+        self.prepared_statement_metrics[statement_key] = self.prepared_statement_metrics.get(statement_key, 0) + 1
+        add_span_attributes({"db.statement_key": statement_key})
+        
+        return await self.execute_query(
+            query,
+            parameters,
+            service_name=service_name,
+            timeout=timeout,
+            correlation_id=correlation_id
+        )
+    
+    @staticmethod
+    def _restore_parameter_types(parameters: Dict[str, Any], parameter_types: Dict[str, str]) -> Dict[str, Any]:
+        """Convert JSON-transported parameter values back to their bind types."""
+        restored = dict(parameters)
+        for name, type_name in parameter_types.items():
+            value = restored.get(name)
+            if not isinstance(value, str):
+                continue
+            if type_name == "timestamp":
+                restored[name] = datetime.fromisoformat(value)
+            elif type_name == "date":
+                restored[name] = datetime.fromisoformat(value).date()
+            else:
+                raise ValueError(f"Unsupported parameter type for {name}: {type_name}")
+        return restored
+    
     @trace_method(name="database_manager.execute_command", kind="INTERNAL")
     async def execute_command(self, command: str, parameters: Optional[Dict[str, Any]] = None,
                             service_name: str = "unknown", transaction_id: Optional[str] = None,
@@ -697,7 +762,7 @@ class DatabaseManager:
     # Helper methods
     def _generate_cache_key(self, query: str, parameters: Optional[Dict[str, Any]], service_name: str) -> str:
         import hashlib
-        key_data = f"{service_name}:{query}:{json.dumps(parameters or {}, sort_keys=True)}"
+        key_data = f"{service_name}:{query}:{json.dumps(parameters or {}, sort_keys=True, default=str)}"
         return f"query_cache:{hashlib.md5(key_data.encode()).hexdigest()}"
     
     async def _get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
@@ -843,6 +908,75 @@ class DatabaseManager:
         """Store trace telemetry data."""
         # Placeholder for actual implementation
         logger.debug(f"Storing trace data: {data}")
+
+    async def store_trace_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """Store a batch of OTLP spans in the trace table."""
+        return await self._store_telemetry_batch("trace", rows)
+
+    async def store_metric_batch(self, rows: List[Dict[str, Any]]) -> int:
+        """Store a batch of OTLP metric points in the metric table."""
+        return await self._store_telemetry_batch("metric", rows)
+
+    @trace_method(name="database_manager.store_telemetry_batch", kind="INTERNAL")
+    async def _store_telemetry_batch(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """Bulk insert telemetry rows.
+
+        With asyncpg the rows are streamed with a single COPY; other drivers
+        fall back to one executemany INSERT.
+
+        Args:
+            table_name: Telemetry table ("trace" or "metric")
+            rows: Rows keyed by column name; missing columns are stored as NULL
+
+        Returns:
+            Number of rows stored
+        """
+        if not rows:
+            return 0
+        if not self.async_engine:
+            raise RuntimeError("Database not initialized")
+
+        columns = TELEMETRY_BATCH_COLUMNS[table_name]
+        records = [self._telemetry_record(columns, row) for row in rows]
+        add_span_attributes({
+            "db.operation": "bulk_insert",
+            "db.table": table_name,
+            "db.rows": len(records)
+        })
+
+        if "+asyncpg" in self.settings.database_url:
+            async with self.async_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_records_to_table(
+                    table_name, records=records, columns=columns
+                )
+        else:
+            values = ", ".join(
+                f"CAST(:{column} AS JSONB)" if column in TELEMETRY_JSON_COLUMNS else f":{column}"
+                for column in columns
+            )
+            quoted = ", ".join(f'"{column}"' for column in columns)
+            statement = text(f'INSERT INTO "{table_name}" ({quoted}) VALUES ({values})')
+            async with self.session_factory() as session:
+                async with session.begin():
+                    await session.execute(statement, [dict(zip(columns, record)) for record in records])
+
+        logger.debug(f"Stored batch of {len(records)} rows in {table_name}")
+        return len(records)
+
+    @staticmethod
+    def _telemetry_record(columns: List[str], row: Dict[str, Any]) -> tuple:
+        """Convert a JSON-transported row to a record of column values."""
+        record = []
+        for column in columns:
+            value = row.get(column)
+            if value is not None:
+                if column in TELEMETRY_JSON_COLUMNS:
+                    value = json.dumps(value)
+                elif column in TELEMETRY_TIME_COLUMNS and isinstance(value, str):
+                    value = datetime.fromisoformat(value)
+            record.append(value)
+        return tuple(record)
         
     async def query_dependency_data(self, query: Dict[str, Any], limit: int = 100, 
                                   offset: int = 0, order_by: str = "timestamp", 
@@ -173,7 +173,11 @@ async def lifespan(app: FastAPI):
         # Initialize and start query request handler (for pub/sub database access)
         query_request_handler = QueryRequestHandler(
             database_manager=database_manager,
-            redis_url=settings.redis_url
+            redis_url=settings.redis_url,
+            transports=[t.strip() for t in settings.request_reply_transports.split(",") if t.strip()],
+            stream_group=settings.request_stream_group,
+            stream_max_pending=settings.request_stream_max_pending,
+            stream_claim_idle_ms=settings.request_stream_claim_idle_ms
         )
         await query_request_handler.start()
         logger.info("Query request handler started (pub/sub database access)")
@@ -7,15 +7,27 @@ between microservices.
 import asyncio
 import json
 import logging
+import sys
 import uuid
 from datetime import datetime
+from pathlib import Path
 from typing import Dict, Any, Callable, Optional, List
 
 import redis.asyncio as redis
 from redis.exceptions import BusyLoadingError
 
+# Add backend services to path
+backend_services_path = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(backend_services_path))
+
+from messaging_service.app.codecs import CodecRegistry
+
 logger = logging.getLogger(__name__)
 
+# Decodes envelopes exactly as the messaging service writes them
+_codecs = CodecRegistry(compression=None)
+
+
 class MessagingClient:
     """Client for interacting with Redis pub/sub messaging."""
 
@@ -36,6 +48,8 @@ class MessagingClient:
         self.service_name = service_name
         self.pool_size = pool_size
         self._redis = None
+        # Pub/sub reads raw bytes so compressed and binary envelopes survive
+        self._pubsub_redis = None
         self._pubsub = None
         self._running = False
         self._callbacks: Dict[str, Callable] = {}
@@ -56,7 +70,8 @@ class MessagingClient:
                     decode_responses=True,
                     max_connections=self.pool_size
                 )
-                self._pubsub = self._redis.pubsub()
+                self._pubsub_redis = redis.Redis.from_url(self.redis_url, decode_responses=False)
+                self._pubsub = self._pubsub_redis.pubsub()
 
                 await self._redis.ping()
                 self._running = True
@@ -96,10 +111,14 @@ class MessagingClient:
         if self._pubsub:
             await self._pubsub.close()
         
+        if self._pubsub_redis:
+            await self._pubsub_redis.close()
+
         if self._redis:
             await self._redis.close()
         
         self._redis = None
+        self._pubsub_redis = None
         self._pubsub = None
         logger.info("Disconnected from Redis")
 
@@ -132,6 +151,42 @@ class MessagingClient:
             logger.error(f"Failed to publish event to {topic}: {e}", exc_info=True)
             return False
 
+    async def publish_events(
+        self,
+        events: List[Dict[str, Any]],
+        service_name: Optional[str] = None
+    ) -> bool:
+        """Publish several events in one pipelined round trip.
+
+        Args:
+            events: Dicts with "topic", "event_type" and "payload" keys
+            service_name: Optional override for the publishing service name
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if not events:
+            return True
+        if not self.is_connected():
+            await self.connect()
+
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for event in events:
+                message = {
+                    "event_id": str(uuid.uuid4()),
+                    "event_type": event["event_type"],
+                    "service_name": service_name or self.service_name,
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "payload": event["payload"]
+                }
+                pipe.publish(event["topic"], json.dumps(message))
+            await pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to publish batch of {len(events)} events: {e}", exc_info=True)
+            return False
+
     async def publish_message(
         self,
         channel: str,
@@ -204,14 +259,16 @@ class MessagingClient:
 
                 if message["type"] == "message":
                     topic = message["channel"]
+                    if isinstance(topic, bytes):
+                        topic = topic.decode('utf-8')
                     if topic in self._callbacks:
                         try:
-                            data = json.loads(message["data"])
+                            data = _codecs.decode(message["data"])
                             payload = data.get("payload", data)
                             # Schedule callback to run concurrently
                             asyncio.create_task(self._callbacks[topic](payload))
-                        except json.JSONDecodeError:
-                            logger.warning(f"Received invalid JSON on topic {topic}")
+                        except (ValueError, OSError):
+                            logger.warning(f"Received undecodable message on topic {topic}")
                         except Exception as e:
                             logger.error(f"Error processing message on topic {topic}: {e}", exc_info=True)
         except asyncio.CancelledError:
@@ -1,5 +1,6 @@
 
 from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
 import re
 
 class QueryBuilder:
@@ -101,10 +102,10 @@ class QueryBuilder:
 
             if start:
                 where_conditions.append(f"{time_col} >= :time_start")
-                params['time_start'] = start
+                params['time_start'] = self._timestamp_param(start)
             if end:
                 where_conditions.append(f"{time_col} <= :time_end")
-                params['time_end'] = end
+                params['time_end'] = self._timestamp_param(end)
 
         if where_conditions:
             sql.append("WHERE " + " AND ".join(where_conditions))
@@ -133,3 +134,23 @@ class QueryBuilder:
         params['offset'] = offset
 
         return " ".join(sql), params
+
+    @staticmethod
+    def _timestamp_param(value: Any) -> datetime:
+        """
+        Converts a time range bound to a bind value for a timestamp column.
+
+        Ad-hoc requests carry ISO strings, which asyncpg rejects for timestamp
+        parameters. Timezone-aware values are converted to naive UTC, which
+        asyncpg accepts for both TIMESTAMP and TIMESTAMPTZ columns.
+        """
+        if isinstance(value, str):
+            try:
+                value = datetime.fromisoformat(value)
+            except ValueError:
+                raise ValueError(f"Invalid time range value: {value}")
+        if not isinstance(value, datetime):
+            raise ValueError(f"Invalid time range value: {value!r}")
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
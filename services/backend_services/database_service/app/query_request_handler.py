@@ -6,10 +6,10 @@ enabling event-driven database access for other services.
 """
 
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 
 from .database_manager import DatabaseManager
-from .request_reply import RequestReplyServer
+from .request_reply import RequestReplyServer, StreamRequestReplyServer
 
 logger = logging.getLogger(__name__)
 
@@ -29,33 +29,74 @@ class QueryRequestHandler:
     def __init__(
         self,
         database_manager: DatabaseManager,
-        redis_url: str
+        redis_url: str,
+        transports: Optional[List[str]] = None,
+        stream_group: Optional[str] = None,
+        stream_max_pending: int = 100,
+        stream_claim_idle_ms: int = 30000
     ):
+        """
+        Initialize the handler.
+        
+        Args:
+            database_manager: Database manager executing the requests
+            redis_url: Redis connection URL
+            transports: Transports to serve: "pubsub" and/or "streams"
+                (default: pubsub only). Serving both lets clients migrate
+                one at a time.
+            stream_group: Consumer group shared by all workers (streams)
+            stream_max_pending: Requests a worker reads ahead (streams)
+            stream_claim_idle_ms: Idle time before reclaiming another
+                worker's unacknowledged requests (streams)
+        """
         self.database_manager = database_manager
-        self.server = RequestReplyServer(
-            redis_url=redis_url,
-            service_name="database_service"
-        )
+        self.servers: List[RequestReplyServer] = []
+        
+        for transport in transports or ["pubsub"]:
+            if transport == "pubsub":
+                self.servers.append(RequestReplyServer(
+                    redis_url=redis_url,
+                    service_name="database_service"
+                ))
+            elif transport == "streams":
+                self.servers.append(StreamRequestReplyServer(
+                    redis_url=redis_url,
+                    service_name="database_service",
+                    group_name=stream_group,
+                    max_pending=stream_max_pending,
+                    claim_idle_ms=stream_claim_idle_ms
+                ))
+            else:
+                raise ValueError(f"Unknown request/reply transport: {transport}")
+    
+    @property
+    def server(self) -> RequestReplyServer:
+        """Primary (first configured) server."""
+        return self.servers[0]
     
     async def start(self) -> None:
         """Start handling query requests."""
-        await self.server.connect()
+        for server in self.servers:
+            await server.connect()
+            
+            # Register handlers
+            await server.register_handler(
+                CHANNEL_DATABASE_QUERY,
+                self._handle_query_request
+            )
+            await server.register_handler(
+                CHANNEL_DATABASE_COMMAND,
+                self._handle_command_request
+            )
         
-        # Register handlers
-        await self.server.register_handler(
-            CHANNEL_DATABASE_QUERY,
-            self._handle_query_request
-        )
-        await self.server.register_handler(
-            CHANNEL_DATABASE_COMMAND,
-            self._handle_command_request
+        logger.info(
+            f"QueryRequestHandler started ({', '.join(type(s).__name__ for s in self.servers)})"
         )
-        
-        logger.info("QueryRequestHandler started")
     
     async def stop(self) -> None:
         """Stop handling query requests."""
-        await self.server.disconnect()
+        for server in self.servers:
+            await server.disconnect()
         logger.info("QueryRequestHandler stopped")
     
     async def _handle_query_request(
@@ -68,12 +109,16 @@ class QueryRequestHandler:
         
         Request types:
         - execute_query: Execute a read query
+        - execute_prepared: Execute a bind-parameterized read query as a
+          prepared statement
         - get_entity: Get entity by ID
         - list_entities: List entities with filters
         """
         try:
             if request_type == "execute_query":
                 return await self._execute_query(payload)
+            elif request_type == "execute_prepared":
+                return await self._execute_prepared(payload)
             elif request_type == "get_entity":
                 return await self._get_entity(payload)
             elif request_type == "list_entities":
@@ -126,6 +171,22 @@ class QueryRequestHandler:
         result = await self.database_manager.execute_query(query, parameters)
         return {"rows": result, "row_count": len(result) if result else 0}
     
+    async def _execute_prepared(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a bind-parameterized read query as a prepared statement."""
+        statement_key = payload.get("statement_key")
+        query = payload.get("query")
+        parameters = payload.get("parameters", {})
+        parameter_types = payload.get("parameter_types", {})
+        
+        if not statement_key or not query:
+            raise ValueError("statement_key and query are required")
+        
+        result = await self.database_manager.execute_prepared(
+            statement_key, query, parameters, parameter_types
+        )
+        rows = result.get("rows", [])
+        return {"rows": rows, "row_count": len(rows)}
+    
     async def _get_entity(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Get entity by ID."""
         table_name = payload.get("table_name")
@@ -8,14 +8,24 @@ Pattern:
 1. Requester publishes to request channel with a unique correlation_id and reply_to channel
 2. Responder subscribes to request channel, processes, publishes response to reply_to channel
 3. Requester subscribes to reply_to channel, waits for response with matching correlation_id
+
+Two transports are provided:
+- RequestReplyClient / RequestReplyServer: Redis pub/sub (fire-and-forget;
+  a reply published while the listener is reconnecting is lost)
+- StreamRequestReplyClient / StreamRequestReplyServer: Redis Streams. Requests
+  are appended to "<channel>.stream" and consumed by a consumer group, so any
+  number of server workers share the load and unacknowledged requests from a
+  crashed worker are reclaimed. Replies go to a per-client stream and are read
+  from the last seen ID, so nothing is lost across reconnects.
 """
 
 import asyncio
 import json
 import logging
+import time
 import uuid
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Set
 
 import redis.asyncio as redis
 
@@ -137,7 +147,7 @@ class RequestReplyClient:
             }
             
             # Publish request
-            await self._redis.publish(channel, json.dumps(message))
+            await self._send_request(channel, message, timeout)
             
             # Wait for response
             response = await asyncio.wait_for(future, timeout=timeout)
@@ -154,6 +164,22 @@ class RequestReplyClient:
         finally:
             self._pending_requests.pop(correlation_id, None)
     
+    async def _send_request(
+        self,
+        channel: str,
+        message: Dict[str, Any],
+        timeout: float
+    ) -> None:
+        """Hand a request to the transport."""
+        await self._redis.publish(channel, json.dumps(message))
+    
+    def _resolve_reply(self, data: Dict[str, Any]) -> None:
+        """Complete the pending request a reply belongs to."""
+        correlation_id = data.get("correlation_id")
+        future = self._pending_requests.get(correlation_id) if correlation_id else None
+        if future is not None and not future.done():
+            future.set_result(data)
+    
     async def _listen_for_replies(self) -> None:
         """Listen for reply messages."""
         try:
@@ -165,13 +191,7 @@ class RequestReplyClient:
                 
                 if message and message["type"] == "message":
                     try:
-                        data = json.loads(message["data"])
-                        correlation_id = data.get("correlation_id")
-                        
-                        if correlation_id and correlation_id in self._pending_requests:
-                            future = self._pending_requests[correlation_id]
-                            if not future.done():
-                                future.set_result(data)
+                        self._resolve_reply(json.loads(message["data"]))
                     except json.JSONDecodeError:
                         logger.warning("Invalid JSON in reply message")
                     except Exception as e:
@@ -296,6 +316,12 @@ class RequestReplyServer:
                 logger.warning(f"Invalid request on {channel}: missing correlation_id or reply_to")
                 return
             
+            deadline = request.get("deadline")
+            if deadline and time.time() > deadline:
+                # Requester already gave up; don't spend a DB round trip on it
+                logger.debug(f"Dropping expired request {correlation_id} on {channel}")
+                return
+            
             handler = self._handlers.get(channel)
             if not handler:
                 await self._send_error(reply_to, correlation_id, f"No handler for {channel}")
@@ -333,7 +359,7 @@ class RequestReplyServer:
             "timestamp": datetime.utcnow().isoformat(),
             "payload": payload
         }
-        await self._redis.publish(reply_to, json.dumps(response))
+        await self._deliver_reply(reply_to, response)
     
     async def _send_error(
         self,
@@ -348,4 +374,345 @@ class RequestReplyServer:
             "timestamp": datetime.utcnow().isoformat(),
             "error": error
         }
+        await self._deliver_reply(reply_to, response)
+    
+    async def _deliver_reply(self, reply_to: str, response: Dict[str, Any]) -> None:
+        """Hand a reply to the transport."""
         await self._redis.publish(reply_to, json.dumps(response))
+
+
+def request_stream_key(channel: str) -> str:
+    """Stream that carries requests for a channel."""
+    return f"{channel}.stream"
+
+
+class StreamRequestReplyClient(RequestReplyClient):
+    """
+    Request/reply client over Redis Streams.
+    
+    Requests are XADDed to the channel's request stream (trimmed to
+    max_stream_length, which sheds the oldest requests under sustained
+    overload). Replies arrive on a stream owned by this client, read with a
+    blocking XREAD from the last seen ID.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str,
+        service_name: str,
+        default_timeout: float = 30.0,
+        max_stream_length: int = 10000,
+        block_ms: int = 5000
+    ):
+        super().__init__(redis_url, service_name, default_timeout)
+        self.max_stream_length = max_stream_length
+        self.block_ms = block_ms
+        self._last_reply_id = "0-0"
+    
+    async def connect(self) -> None:
+        """Connect to Redis and start the reply stream reader."""
+        if self._running:
+            return
+        
+        self._redis = redis.Redis.from_url(
+            self.redis_url,
+            decode_responses=True,
+            max_connections=10
+        )
+        await self._redis.ping()
+        
+        self._running = True
+        self._listener_task = asyncio.create_task(self._listen_for_replies())
+        
+        logger.info(f"StreamRequestReplyClient connected, reply stream: {self._reply_channel}")
+    
+    async def disconnect(self) -> None:
+        """Stop the reader, drop the reply stream and disconnect."""
+        self._running = False
+        
+        if self._listener_task:
+            self._listener_task.cancel()
+            try:
+                await self._listener_task
+            except asyncio.CancelledError:
+                pass
+        
+        if self._redis:
+            try:
+                await self._redis.delete(self._reply_channel)
+            except Exception as e:
+                logger.warning(f"Failed to delete reply stream {self._reply_channel}: {e}")
+            await self._redis.close()
+        
+        for future in self._pending_requests.values():
+            if not future.done():
+                future.set_exception(asyncio.CancelledError("Client disconnected"))
+        self._pending_requests.clear()
+        
+        logger.info("StreamRequestReplyClient disconnected")
+    
+    async def _send_request(
+        self,
+        channel: str,
+        message: Dict[str, Any],
+        timeout: float
+    ) -> None:
+        """Append the request to the channel's request stream."""
+        message["deadline"] = time.time() + timeout
+        await self._redis.xadd(
+            request_stream_key(channel),
+            {"data": json.dumps(message)},
+            maxlen=self.max_stream_length,
+            approximate=True
+        )
+    
+    async def _listen_for_replies(self) -> None:
+        """Block on the reply stream; resume from the last ID after errors."""
+        while self._running:
+            try:
+                entries = await self._redis.xread(
+                    {self._reply_channel: self._last_reply_id},
+                    count=100,
+                    block=self.block_ms
+                )
+                if not entries:
+                    continue
+                
+                ids = []
+                for _, messages in entries:
+                    for entry_id, fields in messages:
+                        ids.append(entry_id)
+                        self._last_reply_id = entry_id
+                        try:
+                            self._resolve_reply(json.loads(fields.get("data", "{}")))
+                        except json.JSONDecodeError:
+                            logger.warning("Invalid JSON in reply stream entry")
+                
+                await self._redis.xdel(self._reply_channel, *ids)
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._running:
+                    logger.error(f"Reply stream reader error: {e}")
+                    await asyncio.sleep(0.5)
+
+
+class StreamRequestReplyServer(RequestReplyServer):
+    """
+    Request/reply server over Redis Streams with consumer groups.
+    
+    Every worker started with the same group shares each request stream, so
+    the service scales horizontally by running more workers. A worker reads
+    at most max_pending requests ahead of what it has finished; beyond that
+    it stops reading and leaves entries for other workers. Entries a crashed
+    worker never acknowledged are reclaimed after claim_idle_ms.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str,
+        service_name: str,
+        group_name: Optional[str] = None,
+        consumer_name: Optional[str] = None,
+        max_pending: int = 100,
+        claim_idle_ms: int = 30000,
+        block_ms: int = 5000,
+        reply_ttl_seconds: int = 300
+    ):
+        super().__init__(redis_url, service_name)
+        self.group_name = group_name or f"{service_name}.workers"
+        self.consumer_name = consumer_name or f"{service_name}.{uuid.uuid4().hex[:8]}"
+        self.max_pending = max_pending
+        self.claim_idle_ms = claim_idle_ms
+        self.block_ms = block_ms
+        self.reply_ttl_seconds = reply_ttl_seconds
+        self._inflight = 0
+        self._inflight_ids: Set[str] = set()
+        # Request stream -> XAUTOCLAIM cursor, so each scan continues the last
+        self._claim_cursors: Dict[str, str] = {}
+        self._capacity = asyncio.Condition()
+        self._request_tasks: Set[asyncio.Task] = set()
+        self._stats = {
+            "requests_processed": 0,
+            "requests_reclaimed": 0,
+            "backpressure_waits": 0
+        }
+    
+    async def connect(self) -> None:
+        """Connect to Redis."""
+        if self._running:
+            return
+        
+        self._redis = redis.Redis.from_url(
+            self.redis_url,
+            decode_responses=True,
+            max_connections=10
+        )
+        await self._redis.ping()
+        self._running = True
+        
+        logger.info(
+            f"StreamRequestReplyServer connected for {self.service_name} "
+            f"(group {self.group_name}, consumer {self.consumer_name})"
+        )
+    
+    async def disconnect(self) -> None:
+        """Stop readers, let in-flight requests finish and disconnect."""
+        self._running = False
+        
+        for task in self._listener_tasks.values():
+            task.cancel()
+        if self._listener_tasks:
+            await asyncio.gather(*self._listener_tasks.values(), return_exceptions=True)
+        
+        if self._request_tasks:
+            await asyncio.gather(*self._request_tasks, return_exceptions=True)
+        
+        if self._redis:
+            await self._redis.close()
+        
+        logger.info(f"StreamRequestReplyServer disconnected for {self.service_name}")
+    
+    async def register_handler(
+        self,
+        channel: str,
+        handler: Callable[[str, Dict[str, Any]], Any]
+    ) -> None:
+        """
+        Register a handler for a request channel.
+        
+        Args:
+            channel: Request channel to handle
+            handler: Async function(request_type, payload) -> response_payload
+        """
+        stream = request_stream_key(channel)
+        try:
+            await self._redis.xgroup_create(stream, self.group_name, id="$", mkstream=True)
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        
+        self._handlers[channel] = handler
+        task = asyncio.create_task(self._handle_requests(channel))
+        self._listener_tasks[channel] = task
+        
+        logger.info(f"Registered stream handler for channel: {channel} ({stream})")
+    
+    async def _handle_requests(self, channel: str) -> None:
+        """Read requests for a channel from the consumer group."""
+        stream = request_stream_key(channel)
+        next_claim = 0.0
+        
+        while self._running:
+            try:
+                slots = await self._wait_for_capacity()
+                
+                if time.monotonic() >= next_claim:
+                    next_claim = time.monotonic() + self.claim_idle_ms / 1000
+                    claimed = await self._claim_stale(stream, slots)
+                    reclaimed = self._dispatch(channel, stream, claimed)
+                    if reclaimed:
+                        self._stats["requests_reclaimed"] += reclaimed
+                        continue
+                
+                entries = await self._redis.xreadgroup(
+                    self.group_name,
+                    self.consumer_name,
+                    {stream: ">"},
+                    count=slots,
+                    block=self.block_ms
+                )
+                for _, messages in entries or []:
+                    self._dispatch(channel, stream, messages)
+                    
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if self._running:
+                    logger.error(f"Stream request reader error for {channel}: {e}")
+                    await asyncio.sleep(0.5)
+    
+    async def _wait_for_capacity(self) -> int:
+        """Block while max_pending requests are in flight; return free slots."""
+        async with self._capacity:
+            if self._inflight >= self.max_pending:
+                self._stats["backpressure_waits"] += 1
+                await self._capacity.wait_for(lambda: self._inflight < self.max_pending)
+            return self.max_pending - self._inflight
+    
+    async def _claim_stale(self, stream: str, count: int) -> List:
+        """
+        Take over entries another worker read but never acknowledged.
+        
+        Scans the pending list in pages of count entries, resuming from the
+        cursor XAUTOCLAIM returned last time ("0-0" once a scan completes).
+        """
+        result = await self._redis.xautoclaim(
+            stream,
+            self.group_name,
+            self.consumer_name,
+            min_idle_time=self.claim_idle_ms,
+            start_id=self._claim_cursors.get(stream, "0-0"),
+            count=count
+        )
+        if not result:
+            return []
+        self._claim_cursors[stream] = result[0] or "0-0"
+        return result[1] if len(result) > 1 else []
+    
+    def _dispatch(self, channel: str, stream: str, messages: List) -> int:
+        """Start processing entries; returns how many were started."""
+        started = 0
+        for entry_id, fields in messages:
+            if not fields or entry_id in self._inflight_ids:
+                # Trimmed before we got to it, or our own entry still running
+                continue
+            started += 1
+            self._inflight += 1
+            self._inflight_ids.add(entry_id)
+            task = asyncio.create_task(
+                self._process_entry(channel, stream, entry_id, fields.get("data", ""))
+            )
+            self._request_tasks.add(task)
+            task.add_done_callback(self._request_tasks.discard)
+        return started
+    
+    async def _process_entry(
+        self,
+        channel: str,
+        stream: str,
+        entry_id: str,
+        data: str
+    ) -> None:
+        """Process one request entry, then acknowledge it."""
+        try:
+            await self._process_request(channel, data)
+            await self._redis.xack(stream, self.group_name, entry_id)
+            self._stats["requests_processed"] += 1
+        except Exception as e:
+            # Left pending; another worker reclaims it after claim_idle_ms
+            logger.error(f"Failed to acknowledge {entry_id} on {stream}: {e}")
+        finally:
+            async with self._capacity:
+                self._inflight -= 1
+                self._inflight_ids.discard(entry_id)
+                self._capacity.notify_all()
+    
+    async def _deliver_reply(self, reply_to: str, response: Dict[str, Any]) -> None:
+        """Append the reply to the requester's reply stream."""
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.xadd(reply_to, {"data": json.dumps(response)})
+            # Reply streams of clients that went away expire on their own
+            pipe.expire(reply_to, self.reply_ttl_seconds)
+            await pipe.execute()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker counters."""
+        return {
+            **self._stats,
+            "inflight": self._inflight,
+            "max_pending": self.max_pending,
+            "consumer": self.consumer_name,
+            "group": self.group_name
+        }
@@ -42,6 +42,7 @@ class TelemetryEventConsumer:
             await self._consume_metric_events()
             await self._consume_health_events()
             await self._consume_trace_events()
+            await self._consume_telemetry_batches()
             await self._consume_query_requests()
             await self._consume_data_requests()
             await self._consume_command_requests()
@@ -103,6 +104,18 @@ class TelemetryEventConsumer:
             callback=self._handle_trace_ingestion
         )
     
+    @trace_method(name="telemetry_consumer.consume_telemetry_batches")
+    async def _consume_telemetry_batches(self):
+        """Subscribe to batched OTLP trace and metric ingestion events."""
+        await self.messaging_client.subscribe(
+            topic="telemetry.trace.batch_ingested",
+            callback=self._handle_trace_batch_ingestion
+        )
+        await self.messaging_client.subscribe(
+            topic="telemetry.metric.batch_ingested",
+            callback=self._handle_metric_batch_ingestion
+        )
+    
     @trace_method(name="telemetry_consumer.consume_query_requests")
     async def _consume_query_requests(self):
         """Subscribe to query request events."""
@@ -244,6 +257,42 @@ class TelemetryEventConsumer:
             logger.error(f"Failed to handle trace ingestion: {e}")
             raise
     
+    @trace_method(name="telemetry_consumer.handle_trace_batch_ingestion")
+    async def _handle_trace_batch_ingestion(self, event_data: Dict[str, Any]):
+        """Handle a batch of OTLP spans."""
+        try:
+            rows = event_data.get("rows", [])
+            add_span_attributes({
+                "event_type": "telemetry.trace.batch_ingested",
+                "batch.rows": len(rows),
+                "correlation_id": event_data.get("correlation_id")
+            })
+            
+            stored = await self.database_manager.store_trace_batch(rows)
+            logger.info(f"Processed trace batch of {stored} spans")
+            
+        except Exception as e:
+            logger.error(f"Failed to handle trace batch ingestion: {e}")
+            raise
+    
+    @trace_method(name="telemetry_consumer.handle_metric_batch_ingestion")
+    async def _handle_metric_batch_ingestion(self, event_data: Dict[str, Any]):
+        """Handle a batch of OTLP metric points."""
+        try:
+            rows = event_data.get("rows", [])
+            add_span_attributes({
+                "event_type": "telemetry.metric.batch_ingested",
+                "batch.rows": len(rows),
+                "correlation_id": event_data.get("correlation_id")
+            })
+            
+            stored = await self.database_manager.store_metric_batch(rows)
+            logger.info(f"Processed metric batch of {stored} points")
+            
+        except Exception as e:
+            logger.error(f"Failed to handle metric batch ingestion: {e}")
+            raise
+    
     @trace_method(name="telemetry_consumer.handle_query_request")
     async def _handle_query_request(self, event_data: Dict[str, Any]):
         """Handle query request events from observability service."""
@@ -45,3 +45,22 @@ async def test_telemetry_consumer_dependency_ingestion(mock_db_manager, mock_mes
     await consumer._handle_dependency_ingestion(event_data)
     
     mock_db_manager.store_dependency_data.assert_called_once_with(event_data["dependency"])
+
+@pytest.mark.asyncio
+async def test_telemetry_consumer_trace_batch_ingestion(mock_db_manager, mock_messaging_client):
+    consumer = TelemetryEventConsumer(mock_db_manager, mock_messaging_client)
+    rows = [{"trace_id": "ab", "span_id": f"{i:02x}", "name": "GET /", "service": "api"} for i in range(3)]
+    
+    mock_db_manager.store_trace_batch = AsyncMock(return_value=len(rows))
+    
+    await consumer._handle_trace_batch_ingestion({"rows": rows, "correlation_id": "test-correlation-id"})
+    
+    mock_db_manager.store_trace_batch.assert_called_once_with(rows)
+
+def test_telemetry_record_conversion():
+    record = DatabaseManager._telemetry_record(
+        ["name", "value", "labels", "timestamp", "unit"],
+        {"name": "requests", "value": 2.0, "labels": {"route": "/"}, "timestamp": "2024-01-01T00:00:00"}
+    )
+    
+    assert record == ("requests", 2.0, '{"route": "/"}', datetime(2024, 1, 1), None)
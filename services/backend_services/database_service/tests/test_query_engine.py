@@ -104,6 +104,60 @@ def test_query_builder_schema_qualified_table(query_builder):
     )
     assert "SELECT id, value FROM analytics_data.metrics" in sql
 
+def test_query_builder_time_range_binds_datetimes(query_builder):
+    """Test that ISO-string time bounds are bound as naive UTC datetimes."""
+    sql, params = query_builder.build_select(
+        table_name="traces",
+        time_range={"column": "timestamp", "start": "2024-01-01T00:00:00", "end": "2024-01-02T01:00:00+01:00"}
+    )
+
+    assert "timestamp >= :time_start AND timestamp <= :time_end" in sql
+    assert params['time_start'] == datetime(2024, 1, 1)
+    assert params['time_end'] == datetime(2024, 1, 2)
+
+    with pytest.raises(ValueError):
+        query_builder.build_select(table_name="traces", time_range={"start": "yesterday"})
+
+@pytest.fixture(scope="module")
+def postgres_url(tmp_path_factory):
+    """URL of a real PostgreSQL server: TEST_DATABASE_URL, or a throwaway pgserver instance."""
+    url = os.environ.get("TEST_DATABASE_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver")
+    server = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="stop")
+    yield server.get_uri().replace("postgresql://", "postgresql+asyncpg://", 1)
+    server.cleanup()
+
+@pytest.mark.asyncio
+async def test_adhoc_time_range_binds_against_postgres(query_builder, postgres_url):
+    """Test that an ad-hoc time range query binds through asyncpg against TIMESTAMP columns."""
+    from sqlalchemy import text
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(postgres_url)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                "CREATE TEMPORARY TABLE adhoc_traces (service_name TEXT, timestamp TIMESTAMP)"
+            ))
+            await conn.execute(text(
+                "INSERT INTO adhoc_traces VALUES "
+                "('auth', '2024-01-01 12:00'), ('auth', '2024-01-03 12:00'), ('billing', '2024-01-01 13:00')"
+            ))
+            sql, params = query_builder.build_select(
+                table_name="adhoc_traces",
+                filters=[{"field": "service_name", "op": "eq", "value": "auth"}],
+                time_range={"column": "timestamp", "start": "2024-01-01T00:00:00", "end": "2024-01-02T00:00:00+00:00"},
+                order_by="timestamp"
+            )
+            rows = (await conn.execute(text(sql), params)).fetchall()
+    finally:
+        await engine.dispose()
+
+    assert [(row[0], row[1]) for row in rows] == [("auth", datetime(2024, 1, 1, 12))]
+
 @pytest.mark.asyncio
 async def test_database_manager_caching(mock_db_manager):
     query = "SELECT * FROM users"
@@ -181,6 +235,29 @@ async def test_integration_builder_and_manager(query_builder, mock_db_manager):
     assert result['row_count'] == 1
     assert result['rows'][0]['service'] == 'auth'
 
+@pytest.mark.asyncio
+async def test_execute_prepared_restores_parameter_types(mock_db_manager):
+    """Test that ISO-string parameters are bound as datetimes for prepared statements."""
+    mock_db_manager.redis_client.get.return_value = None
+    sql = "SELECT COUNT(*) AS result FROM customers WHERE active_date <= :PeriodStart"
+
+    for period_start in ("2024-01-01T00:00:00", "2024-02-01T00:00:00"):
+        await mock_db_manager.execute_prepared(
+            "churn_rate_abc",
+            sql,
+            {"PeriodStart": period_start},
+            {"PeriodStart": "timestamp"},
+            service_name="test"
+        )
+
+    session_mock = mock_db_manager.session_factory.return_value.__aenter__.return_value
+    executed_sql, bound_params = session_mock.execute.call_args[0]
+
+    # Same statement text for every period window, values bound separately
+    assert str(executed_sql) == sql
+    assert bound_params["PeriodStart"] == datetime(2024, 2, 1)
+    assert mock_db_manager.prepared_statement_metrics["churn_rate_abc"] == 2
+
 # --- API Endpoint Tests ---
 
 from fastapi.testclient import TestClient
@@ -0,0 +1,315 @@
+import pytest
+import asyncio
+import json
+import time
+from unittest.mock import patch
+
+import sys
+import os
+
+# Add service root to path so 'app' module can be found
+service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+if service_root not in sys.path:
+    sys.path.insert(0, service_root)
+
+from app import request_reply
+from app.request_reply import (
+    StreamRequestReplyClient,
+    StreamRequestReplyServer,
+    request_stream_key,
+)
+
+
+def _seq(entry_id):
+    return int(entry_id.split("-")[0])
+
+
+class FakeStreamRedis:
+    """In-memory subset of the Redis Streams API shared by all clients."""
+
+    def __init__(self):
+        self.streams = {}
+        self.groups = {}
+        self.seq = 0
+        self.autoclaim_starts = []
+
+    async def ping(self):
+        return True
+
+    async def close(self):
+        pass
+
+    async def _wait(self, predicate, block):
+        deadline = time.monotonic() + (block or 0) / 1000
+        while not predicate() and time.monotonic() < deadline:
+            await asyncio.sleep(0.002)
+
+    async def xadd(self, name, fields, maxlen=None, approximate=True):
+        self.seq += 1
+        entry_id = f"{self.seq}-0"
+        self.streams.setdefault(name, []).append((entry_id, dict(fields)))
+        return entry_id
+
+    async def xgroup_create(self, name, groupname, id="$", mkstream=False):
+        groups = self.groups.setdefault(name, {})
+        if groupname in groups:
+            raise request_reply.redis.ResponseError("BUSYGROUP Consumer Group name already exists")
+        self.streams.setdefault(name, [])
+        groups[groupname] = {"last": self.seq, "pending": {}}
+
+    async def xreadgroup(self, groupname, consumername, streams, count=None, block=None):
+        (name, _), = streams.items()
+        group = self.groups[name][groupname]
+
+        def undelivered():
+            return [e for e in self.streams[name] if _seq(e[0]) > group["last"]]
+
+        await self._wait(lambda: bool(undelivered()), block)
+        entries = undelivered()[:count]
+        for entry_id, _ in entries:
+            group["last"] = _seq(entry_id)
+            group["pending"][entry_id] = (consumername, time.monotonic())
+        return [[name, entries]] if entries else []
+
+    async def xack(self, name, groupname, *ids):
+        pending = self.groups[name][groupname]["pending"]
+        for entry_id in ids:
+            pending.pop(entry_id, None)
+        return len(ids)
+
+    async def xautoclaim(self, name, groupname, consumername, min_idle_time, start_id="0-0", count=None):
+        self.autoclaim_starts.append(start_id)
+        pending = self.groups[name][groupname]["pending"]
+        now = time.monotonic()
+        scan = sorted((e for e in pending if _seq(e) >= _seq(start_id)), key=_seq)
+        page, rest = scan[:count], scan[count:]
+        claimed = []
+        for entry_id in page:
+            if (now - pending[entry_id][1]) * 1000 >= min_idle_time:
+                pending[entry_id] = (consumername, now)
+                fields = next((f for i, f in self.streams[name] if i == entry_id), None)
+                claimed.append((entry_id, fields))
+        return [rest[0] if rest else "0-0", claimed, []]
+
+    async def xread(self, streams, count=None, block=None):
+        (name, last_id), = streams.items()
+
+        def newer():
+            return [e for e in self.streams.get(name, []) if _seq(e[0]) > _seq(last_id)]
+
+        await self._wait(lambda: bool(newer()), block)
+        entries = newer()[:count]
+        return [[name, entries]] if entries else []
+
+    async def xdel(self, name, *ids):
+        self.streams[name] = [e for e in self.streams.get(name, []) if e[0] not in ids]
+
+    async def expire(self, name, seconds):
+        return True
+
+    async def delete(self, name):
+        self.streams.pop(name, None)
+
+    def pipeline(self, transaction=False):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def xadd(self, *args, **kwargs):
+        self.calls.append(self.redis.xadd(*args, **kwargs))
+
+    def expire(self, *args, **kwargs):
+        self.calls.append(self.redis.expire(*args, **kwargs))
+
+    async def execute(self):
+        return [await call for call in self.calls]
+
+
+@pytest.fixture
+def fake_redis():
+    fake = FakeStreamRedis()
+    with patch.object(request_reply.redis.Redis, "from_url", return_value=fake):
+        yield fake
+
+
+async def _echo(request_type, payload):
+    return {"request_type": request_type, **payload}
+
+
+@pytest.mark.asyncio
+async def test_stream_round_trip_across_workers(fake_redis):
+    """Two workers in one group share requests; every reply comes back."""
+    workers = [
+        StreamRequestReplyServer("redis://fake", "database_service", block_ms=50)
+        for _ in range(2)
+    ]
+    for worker in workers:
+        await worker.connect()
+        await worker.register_handler("database.query", _echo)
+
+    client = StreamRequestReplyClient("redis://fake", "calc", block_ms=50)
+    await client.connect()
+
+    replies = await asyncio.gather(*(
+        client.request("database.query", "execute_query", {"i": i}, timeout=2)
+        for i in range(20)
+    ))
+
+    assert [r["i"] for r in replies] == list(range(20))
+    assert sum(w.get_stats()["requests_processed"] for w in workers) == 20
+    # Both workers are in the same consumer group
+    assert len(fake_redis.groups[request_stream_key("database.query")]) == 1
+
+    await client.disconnect()
+    for worker in workers:
+        await worker.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_reply_survives_listener_restart(fake_redis):
+    """A reply written while the client is not reading is delivered later."""
+    server = StreamRequestReplyServer("redis://fake", "database_service", block_ms=50)
+    await server.connect()
+    await server.register_handler("database.query", _echo)
+
+    client = StreamRequestReplyClient("redis://fake", "calc", block_ms=50)
+    await client.connect()
+
+    # Simulate the reply reader being down (e.g. reconnecting)
+    client._listener_task.cancel()
+    await asyncio.gather(client._listener_task, return_exceptions=True)
+
+    pending = asyncio.create_task(
+        client.request("database.query", "execute_query", {"i": 1}, timeout=2)
+    )
+    for _ in range(100):
+        if fake_redis.streams.get(client._reply_channel):
+            break
+        await asyncio.sleep(0.01)
+    assert fake_redis.streams.get(client._reply_channel)
+
+    client._listener_task = asyncio.create_task(client._listen_for_replies())
+    assert (await pending)["i"] == 1
+
+    await client.disconnect()
+    await server.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_pending_limit_applies_backpressure(fake_redis):
+    """A worker never has more than max_pending requests in flight."""
+    in_flight = 0
+    peak = 0
+
+    async def slow(request_type, payload):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.02)
+        in_flight -= 1
+        return payload
+
+    server = StreamRequestReplyServer(
+        "redis://fake", "database_service", max_pending=2, block_ms=50
+    )
+    await server.connect()
+    await server.register_handler("database.query", slow)
+
+    client = StreamRequestReplyClient("redis://fake", "calc", block_ms=50)
+    await client.connect()
+
+    await asyncio.gather(*(
+        client.request("database.query", "execute_query", {"i": i}, timeout=2)
+        for i in range(8)
+    ))
+
+    assert peak <= 2
+    assert server.get_stats()["backpressure_waits"] > 0
+
+    await client.disconnect()
+    await server.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_expired_requests_are_skipped(fake_redis):
+    """Requests whose requester already timed out are acked without running."""
+    calls = []
+
+    async def handler(request_type, payload):
+        calls.append(payload)
+        return payload
+
+    server = StreamRequestReplyServer("redis://fake", "database_service", block_ms=50)
+    await server.connect()
+    await server.register_handler("database.query", handler)
+
+    stream = request_stream_key("database.query")
+    await fake_redis.xadd(stream, {"data": json.dumps({
+        "correlation_id": "c1",
+        "reply_to": "reply.test",
+        "request_type": "execute_query",
+        "deadline": time.time() - 1,
+        "payload": {}
+    })})
+    await asyncio.sleep(0.1)
+
+    assert calls == []
+    assert fake_redis.groups[stream][server.group_name]["pending"] == {}
+    await server.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_requests_are_reclaimed(fake_redis):
+    """Entries read by a dead worker are processed by a live one."""
+    stream = request_stream_key("database.query")
+    server = StreamRequestReplyServer(
+        "redis://fake", "database_service", claim_idle_ms=0, block_ms=50
+    )
+    await server.connect()
+    await fake_redis.xgroup_create(stream, server.group_name)
+
+    # A worker that crashed right after reading
+    await fake_redis.xadd(stream, {"data": json.dumps({
+        "correlation_id": "c1",
+        "reply_to": "reply.test",
+        "request_type": "execute_query",
+        "payload": {"i": 7}
+    })})
+    await fake_redis.xreadgroup(server.group_name, "dead-worker", {stream: ">"}, count=10)
+
+    await server.register_handler("database.query", _echo)
+    await asyncio.sleep(0.1)
+
+    reply = json.loads(fake_redis.streams["reply.test"][0][1]["data"])
+    assert reply["correlation_id"] == "c1"
+    assert reply["payload"]["i"] == 7
+    assert server.get_stats()["requests_reclaimed"] == 1
+    await server.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_reclaim_scan_resumes_from_cursor(fake_redis):
+    """Each XAUTOCLAIM continues where the previous page stopped."""
+    stream = request_stream_key("database.query")
+    server = StreamRequestReplyServer("redis://fake", "database_service", claim_idle_ms=0)
+    await server.connect()
+    await fake_redis.xgroup_create(stream, server.group_name)
+    for i in range(5):
+        await fake_redis.xadd(stream, {"data": json.dumps({"i": i})})
+    await fake_redis.xreadgroup(server.group_name, "dead-worker", {stream: ">"}, count=10)
+
+    pages = [[entry_id for entry_id, _ in await server._claim_stale(stream, 2)] for _ in range(4)]
+
+    assert pages == [["1-0", "2-0"], ["3-0", "4-0"], ["5-0"], ["1-0", "2-0"]]
+    assert fake_redis.autoclaim_starts == ["0-0", "3-0", "5-0", "0-0"]
+    await server.disconnect()
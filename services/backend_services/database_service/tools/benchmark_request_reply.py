@@ -0,0 +1,81 @@
+import sys
+import os
+import asyncio
+import argparse
+import logging
+import statistics
+import time
+from typing import List
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.request_reply import (
+    RequestReplyClient,
+    RequestReplyServer,
+    StreamRequestReplyClient,
+    StreamRequestReplyServer,
+)
+
+# Configure logging
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CHANNEL = "benchmark.request_reply"
+
+
+async def _echo(request_type, payload):
+    return payload
+
+
+async def run_transport(name: str, redis_url: str, requests: int, concurrency: int) -> List[float]:
+    """Round-trip `requests` echo requests and return per-request latencies in ms."""
+    if name == "streams":
+        server = StreamRequestReplyServer(redis_url, "benchmark", block_ms=1000)
+        client = StreamRequestReplyClient(redis_url, "benchmark_client", block_ms=1000)
+    else:
+        server = RequestReplyServer(redis_url, "benchmark")
+        client = RequestReplyClient(redis_url, "benchmark_client")
+
+    await server.connect()
+    await server.register_handler(CHANNEL, _echo)
+    await client.connect()
+
+    latencies: List[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await client.request(CHANNEL, "echo", {"i": i}, timeout=30)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    finally:
+        await client.disconnect()
+        await server.disconnect()
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare pub/sub and Streams request/reply latency")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    for name in ("pubsub", "streams"):
+        start = time.perf_counter()
+        latencies = await run_transport(name, args.redis_url, args.requests, args.concurrency)
+        elapsed = time.perf_counter() - start
+        latencies.sort()
+        print(
+            f"{name:8s} {args.requests / elapsed:8.0f} req/s  "
+            f"p50 {statistics.median(latencies):6.2f} ms  "
+            f"p99 {latencies[int(len(latencies) * 0.99) - 1]:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,185 @@
+"""
+Channel Router - Maps incoming channels to the subscriptions that match them.
+
+Channels are dot-separated (``events.kpi.updated``). Patterns keep the
+semantics SubscriptionManager has always used: a pattern without ``*`` only
+matches itself, a pattern with ``*`` is an fnmatch-style glob where ``*``
+may span dots.
+
+Lookups do not scan every pattern:
+
+- Exact patterns are a dict lookup
+- Wildcard patterns are indexed in a trie by their literal leading
+  segments (``events.kpi.*`` is stored under ``events`` -> ``kpi``); only
+  patterns on the channel's own trie path are tested, and the common
+  trailing ``*`` needs no regex at all
+- Results are cached per channel until the set of patterns changes
+"""
+
+import fnmatch
+import re
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+GLOB_CHARS = ('*', '?', '[')
+
+
+def is_wildcard(pattern: str) -> bool:
+    """True if the pattern is routed as a glob (contains '*')."""
+    return '*' in pattern
+
+
+class _TrieNode:
+    __slots__ = ("children", "patterns")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        # (pattern, matcher for the rest of the channel or None for "match anything")
+        self.patterns: List[Tuple[str, Optional[Callable[[str], object]]]] = []
+
+
+class ChannelRouter(MutableMapping):
+    """
+    Mapping of channel pattern -> subscription ids with indexed matching.
+
+    Behaves like the plain dict it replaces (``router[pattern] = set()``,
+    ``router.get(pattern)``), and the id sets are stored by reference, so
+    adding an id to ``router[pattern]`` takes effect immediately.
+
+    Usage:
+        router = ChannelRouter()
+        router.setdefault("events.*", set()).add(subscription_id)
+        router.match("events.kpi.updated")  # {subscription_id}
+    """
+
+    def __init__(self, cache_size: int = 10000):
+        self._patterns: Dict[str, Set[str]] = {}
+        self._root = _TrieNode()
+        self._wildcard_count = 0
+        self._cache: "OrderedDict[str, Tuple[str, ...]]" = OrderedDict()
+        self.cache_size = cache_size
+
+    # Mapping protocol
+
+    def __getitem__(self, pattern: str) -> Set[str]:
+        return self._patterns[pattern]
+
+    def __setitem__(self, pattern: str, subscription_ids: Set[str]) -> None:
+        if pattern not in self._patterns and is_wildcard(pattern):
+            self._index(pattern)
+        self._patterns[pattern] = subscription_ids
+        self._cache.clear()
+
+    def __delitem__(self, pattern: str) -> None:
+        del self._patterns[pattern]
+        if is_wildcard(pattern):
+            self._unindex(pattern)
+        self._cache.clear()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._patterns)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def __contains__(self, pattern: object) -> bool:
+        return pattern in self._patterns
+
+    # Routing
+
+    def match(self, channel: str) -> Set[str]:
+        """Subscription ids of every pattern matching the channel."""
+        matching: Set[str] = set()
+        for pattern in self.matching_patterns(channel):
+            matching.update(self._patterns[pattern])
+        return matching
+
+    def matching_patterns(self, channel: str) -> Tuple[str, ...]:
+        """Patterns matching the channel (cached until patterns change)."""
+        cached = self._cache.get(channel)
+        if cached is not None:
+            self._cache.move_to_end(channel)
+            return cached
+
+        patterns: List[str] = []
+        if channel in self._patterns:
+            patterns.append(channel)
+        if self._wildcard_count:
+            self._collect(channel, patterns)
+
+        result = tuple(patterns)
+        self._cache[channel] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index counters."""
+        return {
+            "patterns": len(self._patterns),
+            "wildcard_patterns": self._wildcard_count,
+            "cached_channels": len(self._cache)
+        }
+
+    def _collect(self, channel: str, patterns: List[str]) -> None:
+        node = self._root
+        start = 0
+        while True:
+            # Patterns stored here match on the channel from `start` onwards
+            if node.patterns:
+                rest = channel[start:]
+                for pattern, matcher in node.patterns:
+                    if pattern != channel and (matcher is None or matcher(rest)):
+                        patterns.append(pattern)
+
+            dot = channel.find('.', start)
+            if dot < 0:
+                return
+            node = node.children.get(channel[start:dot])
+            if node is None:
+                return
+            start = dot + 1
+
+    # Index maintenance
+
+    @staticmethod
+    def _split(pattern: str) -> Tuple[List[str], str]:
+        """Split a wildcard pattern into literal leading segments and the glob rest."""
+        segments = pattern.split('.')
+        prefix: List[str] = []
+        for segment in segments[:-1]:
+            if any(char in segment for char in GLOB_CHARS):
+                break
+            prefix.append(segment)
+        return prefix, '.'.join(segments[len(prefix):])
+
+    def _index(self, pattern: str) -> None:
+        prefix, rest = self._split(pattern)
+        node = self._root
+        for segment in prefix:
+            node = node.children.setdefault(segment, _TrieNode())
+
+        matcher = None if rest == '*' else re.compile(fnmatch.translate(rest)).match
+        node.patterns.append((pattern, matcher))
+        self._wildcard_count += 1
+
+    def _unindex(self, pattern: str) -> None:
+        prefix, _ = self._split(pattern)
+        path = [self._root]
+        for segment in prefix:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+
+        node = path[-1]
+        node.patterns = [entry for entry in node.patterns if entry[0] != pattern]
+        self._wildcard_count -= 1
+
+        # Prune branches left empty
+        for parent, segment in zip(reversed(path[:-1]), reversed(prefix)):
+            child = parent.children[segment]
+            if child.patterns or child.children:
+                break
+            del parent.children[segment]
@@ -0,0 +1,336 @@
+"""
+Message Codecs - Serialization formats and compression for message envelopes.
+
+Envelopes are {"metadata": {...}, "payload": ...}. They are encoded by a
+codec selected via metadata.content_type and optionally wrapped in a
+compression frame selected via metadata.content_encoding:
+
+- Codecs: application/json (always), application/msgpack (if msgpack is installed)
+- Compression: gzip (always), zstd (if zstandard is installed), lz4 (if lz4 is installed)
+
+Frames are self-describing, so decoding needs no out-of-band information:
+compression is recognized by its magic bytes and a msgpack envelope starts
+with a 2-element map marker, which can never start a JSON document.
+Decompressed envelopes are capped at MAX_DECOMPRESSED_SIZE bytes.
+
+Other services decode envelopes with CodecRegistry too rather than keeping
+their own copy of these rules.
+
+The payload is encoded exactly once; only the small metadata map is
+re-encoded when compression changes its content_encoding field.
+"""
+
+import gzip
+import json
+import logging
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = "application/json"
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+IDENTITY_ENCODING = "identity"
+
+# Largest envelope a compressed frame may expand to
+MAX_DECOMPRESSED_SIZE = 64 * 1024 * 1024
+
+
+class Codec:
+    """Serialization format for envelopes."""
+
+    content_type: str = ""
+    aliases: Tuple[str, ...] = ()
+
+    def encode(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+    def envelope(self, metadata: bytes, payload: bytes) -> bytes:
+        """Assemble an envelope from separately encoded metadata and payload."""
+        raise NotImplementedError
+
+    def matches(self, data: bytes) -> bool:
+        """True if data looks like an envelope in this format."""
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    content_type = JSON_CONTENT_TYPE
+    aliases = ("text/json",)
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, default=str, ensure_ascii=False).encode('utf-8')
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+    def envelope(self, metadata: bytes, payload: bytes) -> bytes:
+        return b'{"metadata": ' + metadata + b', "payload": ' + payload + b'}'
+
+    def matches(self, data: bytes) -> bool:
+        return True  # Fallback format
+
+
+class MsgpackCodec(Codec):
+    content_type = MSGPACK_CONTENT_TYPE
+    aliases = ("application/x-msgpack",)
+
+    def __init__(self):
+        self._metadata_key = msgpack.packb("metadata")
+        self._payload_key = msgpack.packb("payload")
+
+    def encode(self, value: Any) -> bytes:
+        return msgpack.packb(value, default=str, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        try:
+            return msgpack.unpackb(data, raw=False)
+        except msgpack.exceptions.UnpackException as e:
+            # Most unpack errors are ValueErrors already; OutOfData and BufferFull are not
+            raise ValueError(f"Invalid msgpack envelope: {e}") from e
+
+    def envelope(self, metadata: bytes, payload: bytes) -> bytes:
+        # fixmap with 2 entries
+        return b'\x82' + self._metadata_key + metadata + self._payload_key + payload
+
+    def matches(self, data: bytes) -> bool:
+        return data[:1] == b'\x82'
+
+
+def _gzip_decompress(data: bytes) -> bytes:
+    """gzip.decompress, refusing output beyond MAX_DECOMPRESSED_SIZE."""
+    decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    result = decompressor.decompress(data, MAX_DECOMPRESSED_SIZE)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Decompressed message exceeds {MAX_DECOMPRESSED_SIZE} bytes")
+    return result
+
+
+def _lz4_decompress(data: bytes) -> bytes:
+    """lz4.frame.decompress, refusing output beyond MAX_DECOMPRESSED_SIZE."""
+    decompressor = lz4.frame.LZ4FrameDecompressor()
+    result = decompressor.decompress(data, max_length=MAX_DECOMPRESSED_SIZE)
+    if not decompressor.eof:
+        if not decompressor.needs_input:
+            raise ValueError(f"Decompressed message exceeds {MAX_DECOMPRESSED_SIZE} bytes")
+        raise ValueError("Truncated lz4 frame")
+    return result
+
+
+class Compressor:
+    """Compression frame recognized by magic bytes."""
+
+    def __init__(
+        self,
+        name: str,
+        magic: bytes,
+        compress: Callable[[bytes], bytes],
+        decompress: Callable[[bytes], bytes]
+    ):
+        self.name = name
+        self.magic = magic
+        self.compress = compress
+        self.decompress = decompress
+
+
+class CodecRegistry:
+    """
+    Encodes and decodes message envelopes.
+
+    Compression is adaptive: only envelopes of at least compression_threshold
+    bytes are compressed, the result is kept only if it saves at least
+    min_savings, and while recent messages keep failing that test only
+    every probe_interval-th message is tried so incompressible traffic does
+    not pay for compression attempts.
+    """
+
+    def __init__(
+        self,
+        default_content_type: str = JSON_CONTENT_TYPE,
+        compression: Optional[str] = "auto",
+        compression_threshold: int = 1024,
+        min_savings: float = 0.1,
+        probe_interval: int = 16
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            default_content_type: Codec for messages that don't request one
+            compression: Compressor name, "auto" (best available) or None to disable
+            compression_threshold: Minimum envelope size in bytes to compress
+            min_savings: Fraction of bytes compression must save to be kept
+            probe_interval: Attempt every n-th message while compression is not paying off
+        """
+        self._codecs: Dict[str, Codec] = {}
+        self._compressors: Dict[str, Compressor] = {}
+        self.compression_threshold = compression_threshold
+        self.min_savings = min_savings
+        self.probe_interval = probe_interval
+
+        self.register_codec(JSONCodec())
+        if MSGPACK_AVAILABLE:
+            self.register_codec(MsgpackCodec())
+
+        self.register_compressor(Compressor("gzip", b'\x1f\x8b', gzip.compress, _gzip_decompress))
+        if ZSTD_AVAILABLE:
+            zstd_compressor = zstandard.ZstdCompressor(level=3)
+            zstd_decompressor = zstandard.ZstdDecompressor()
+            self.register_compressor(Compressor(
+                "zstd", b'\x28\xb5\x2f\xfd',
+                zstd_compressor.compress,
+                lambda data: zstd_decompressor.decompress(data, max_output_size=MAX_DECOMPRESSED_SIZE)
+            ))
+        if LZ4_AVAILABLE:
+            self.register_compressor(Compressor(
+                "lz4", b'\x04\x22\x4d\x18', lz4.frame.compress, _lz4_decompress
+            ))
+
+        self.default_codec = self.get_codec(default_content_type)
+        if compression == "auto":
+            compression = next(name for name in ("zstd", "lz4", "gzip") if name in self._compressors)
+        self.default_compressor = self.get_compressor(compression) if compression else None
+
+        # Adaptive state
+        self._unprofitable_streak = 0
+        self._skipped = 0
+        self.stats = {"compressed": 0, "uncompressed": 0, "compression_skipped": 0}
+
+    def register_codec(self, codec: Codec) -> None:
+        for name in (codec.content_type,) + codec.aliases:
+            self._codecs[name] = codec
+
+    def register_compressor(self, compressor: Compressor) -> None:
+        self._compressors[compressor.name] = compressor
+
+    def get_codec(self, content_type: Optional[str]) -> Codec:
+        """Codec for a content type (None -> default). Raises ValueError if unavailable."""
+        if not content_type:
+            return self.default_codec
+        codec = self._codecs.get(content_type.split(';')[0].strip().lower())
+        if codec is None:
+            raise ValueError(f"No codec available for content type {content_type}")
+        return codec
+
+    def get_compressor(self, name: str) -> Compressor:
+        """Compressor by content encoding name. Raises ValueError if unavailable."""
+        compressor = self._compressors.get(name)
+        if compressor is None:
+            raise ValueError(f"Content encoding {name} is not available")
+        return compressor
+
+    @property
+    def content_types(self) -> List[str]:
+        return sorted({codec.content_type for codec in self._codecs.values()})
+
+    @property
+    def content_encodings(self) -> List[str]:
+        return sorted(self._compressors)
+
+    def encode(self, metadata: Dict[str, Any], payload: Any) -> bytes:
+        """
+        Encode an envelope.
+
+        metadata["content_type"] selects the codec and metadata["content_encoding"]
+        forces a compressor ("identity" disables compression; None means adaptive).
+        metadata["content_encoding"] is updated to what was actually applied.
+        """
+        # Content types that name no codec (e.g. text/plain) describe the
+        # payload only; the envelope then uses the default codec
+        content_type = (metadata.get("content_type") or "").split(';')[0].strip().lower()
+        codec = self._codecs.get(content_type, self.default_codec)
+
+        requested = metadata.get("content_encoding")
+        if not requested:
+            compressor, forced = self.default_compressor, False
+        elif requested in self._compressors:
+            compressor, forced = self._compressors[requested], True
+        else:
+            # "identity" or an encoding that is not a compression frame
+            compressor, forced = None, False
+
+        payload_bytes = codec.encode(payload)
+        metadata["content_encoding"] = None if requested == IDENTITY_ENCODING else requested
+        plain = codec.envelope(codec.encode(metadata), payload_bytes)
+
+        if compressor is None or not (forced or self._should_try(len(plain))):
+            self.stats["uncompressed"] += 1
+            return plain
+
+        # Re-encode only the metadata to record the encoding inside the frame
+        metadata["content_encoding"] = compressor.name
+        compressed = compressor.compress(codec.envelope(codec.encode(metadata), payload_bytes))
+
+        if forced or len(compressed) <= len(plain) * (1 - self.min_savings):
+            self._unprofitable_streak = 0
+            self.stats["compressed"] += 1
+            return compressed
+
+        self._unprofitable_streak += 1
+        metadata["content_encoding"] = None
+        self.stats["uncompressed"] += 1
+        return plain
+
+    def _should_try(self, size: int) -> bool:
+        if size < self.compression_threshold:
+            return False
+        if self._unprofitable_streak < 3:
+            return True
+        # Compression has not been paying off: only probe occasionally
+        self._skipped += 1
+        if self._skipped >= self.probe_interval:
+            self._skipped = 0
+            return True
+        self.stats["compression_skipped"] += 1
+        return False
+
+    def decode(self, data: bytes) -> Any:
+        """
+        Decode an envelope in any registered format and compression.
+
+        Raises:
+            ValueError: If the data is compressed with an unavailable encoding
+                or is not a valid document in the detected format
+        """
+        if isinstance(data, str):
+            return json.loads(data)
+
+        for compressor in self._compressors.values():
+            if data.startswith(compressor.magic):
+                try:
+                    data = compressor.decompress(data)
+                except ValueError:
+                    raise
+                except Exception as e:
+                    # zlib.error, zstd.ZstdError and lz4's RuntimeError on corrupt frames
+                    raise ValueError(f"Invalid {compressor.name} frame: {e}") from e
+                break
+        else:
+            if data[:4] in (b'\x28\xb5\x2f\xfd', b'\x04\x22\x4d\x18'):
+                raise ValueError("Message compressed with an unavailable encoding")
+
+        for codec in self._codecs.values():
+            if codec is not self._codecs[JSON_CONTENT_TYPE] and codec.matches(data):
+                return codec.decode(data)
+        return json.loads(data)
@@ -91,6 +91,21 @@ class Settings(BaseSettings):
         validation_alias="ENABLE_MESSAGE_COMPRESSION",
         description="Enable message compression"
     )
+    message_content_type: str = Field(
+        default="application/json",
+        validation_alias="MESSAGE_CONTENT_TYPE",
+        description="Default envelope codec (application/json or application/msgpack)"
+    )
+    message_compression: str = Field(
+        default="gzip",
+        validation_alias="MESSAGE_COMPRESSION",
+        description="Envelope compression: gzip, zstd, lz4 or auto (best installed)"
+    )
+    compression_threshold: int = Field(
+        default=1024,
+        validation_alias="COMPRESSION_THRESHOLD",
+        description="Minimum envelope size in bytes before compression is attempted"
+    )
     
     # Channel Configuration
     default_channel_prefix: str = Field(
@@ -121,7 +136,39 @@ class Settings(BaseSettings):
         description="Maximum subscriptions per service"
     )
     
+    # Webhook Delivery Configuration
+    webhook_max_connections: int = Field(
+        default=100,
+        validation_alias="WEBHOOK_MAX_CONNECTIONS",
+        description="Maximum open webhook connections in total"
+    )
+    webhook_connections_per_host: int = Field(
+        default=10,
+        validation_alias="WEBHOOK_CONNECTIONS_PER_HOST",
+        description="Maximum open webhook connections per callback host"
+    )
+    webhook_keepalive_timeout: float = Field(
+        default=30.0,
+        validation_alias="WEBHOOK_KEEPALIVE_TIMEOUT",
+        description="Seconds an idle webhook connection is kept alive"
+    )
+    ack_timer_tick_seconds: float = Field(
+        default=0.5,
+        validation_alias="ACK_TIMER_TICK_SECONDS",
+        description="Resolution of message acknowledgment timeouts in seconds"
+    )
+    
     # Event Processing Configuration
+    event_routing: str = Field(
+        default="fanout",
+        validation_alias="EVENT_ROUTING",
+        description="Event channel routing: 'fanout' publishes to every event channel, 'canonical' publishes once and routes server-side"
+    )
+    max_channel_messages: int = Field(
+        default=10000,
+        validation_alias="MAX_CHANNEL_MESSAGES",
+        description="Maximum stored message ids kept per channel"
+    )
     enable_event_persistence: bool = Field(
         default=True,
         validation_alias="ENABLE_EVENT_PERSISTENCE",
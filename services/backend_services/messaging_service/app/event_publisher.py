@@ -1,9 +1,18 @@
 """
 Event Publisher - Consolidated Redis event publishing functionality.
+
+Persistent publishes send PUBLISH and the message store writes as a single
+MULTI/EXEC round trip. The body is stored once under message:{message_id};
+its id is kept in per-channel lists capped with LTRIM.
+
+Events fan out to several channels. In "fanout" routing every channel gets
+its own PUBLISH (all in one round trip). In "canonical" routing the event
+is published once to events.{service}.{type} and carries the other channel
+names in metadata["channels"], so the messaging service's SubscriptionManager
+routes it to their subscribers server-side.
 """
 
 import asyncio
-import json
 import logging
 import time
 import uuid
@@ -15,6 +24,7 @@ from redis.exceptions import BusyLoadingError
 from redis.asyncio.retry import Retry
 from redis.backoff import ExponentialBackoff
 
+from .codecs import CodecRegistry, JSON_CONTENT_TYPE
 from .models import MessageMetadata, MessagePriority
 from .telemetry import trace_method, add_span_attributes, inject_trace_context, traced_span
 from .metrics import track_service_publish
@@ -33,7 +43,12 @@ class EventPublisher:
         socket_keepalive: bool = True,
         default_ttl: int = 3600,
         enable_compression: bool = True,
-        max_message_size: int = 1048576  # 1MB
+        max_message_size: int = 1048576,  # 1MB
+        max_channel_messages: int = 10000,
+        event_routing: str = "fanout",
+        default_content_type: str = JSON_CONTENT_TYPE,
+        compression: str = "gzip",
+        compression_threshold: int = 1024
     ):
         self.redis_url = redis_url
         self.max_connections = max_connections
@@ -42,6 +57,17 @@ class EventPublisher:
         self.default_ttl = default_ttl
         self.enable_compression = enable_compression
         self.max_message_size = max_message_size
+        self.max_channel_messages = max_channel_messages
+        if event_routing not in ("fanout", "canonical"):
+            raise ValueError(f"Unknown event routing mode: {event_routing}")
+        self.event_routing = event_routing
+        
+        # Envelope codecs (content_type) and compression (content_encoding)
+        self.codecs = CodecRegistry(
+            default_content_type=default_content_type,
+            compression=compression if enable_compression else None,
+            compression_threshold=compression_threshold
+        )
         
         # Connection pool
         self.redis_pool: Optional[redis.ConnectionPool] = None
@@ -140,12 +166,11 @@ class EventPublisher:
             if message_size > self.max_message_size:
                 raise ValueError(f"Message size ({message_size}) exceeds maximum ({self.max_message_size})")
             
-            # Publish to channel
-            subscriber_count = await self.redis_client.publish(channel, message)
-            
-            # Store for persistence if enabled
+            # Publish to channel (and store, in the same round trip)
             if persistent:
-                await self._store_message(channel, message_id, message, metadata)
+                subscriber_count = (await self._publish_and_store([channel], message_id, message, metadata))[0]
+            else:
+                subscriber_count = await self.redis_client.publish(channel, message)
             
             # Update metrics
             self.published_count += 1
@@ -192,31 +217,53 @@ class EventPublisher:
             headers=headers or {},
             **(metadata or {})
         )
-
-        # Publish to all relevant channels
+        
+        if self.event_routing == "canonical":
+            # One PUBLISH; subscribers of the other channels are routed server-side
+            canonical = f"events.{source_service}.{event_type}"
+            publish_channels = [canonical]
+            routed_channels = [channel for channel in channels if channel != canonical]
+        else:
+            publish_channels = channels
+            routed_channels = None
+        
+        add_span_attributes({
+            "messaging.system": "redis_pubsub",
+            "messaging.destination": publish_channels[0],
+            "messaging.destination_kind": "channel",
+            "messaging.message_id": publish_metadata.message_id,
+            "messaging.fanout_channels": len(channels),
+            "correlation_id": correlation_id or "not_provided"
+        })
+        
         published_channels = []
-        for channel in channels:
-            try:
-                # Publish the message with tracing context
-                await self.publish_message(
-                    channel=channel,
-                    payload=event_payload,
-                    metadata=publish_metadata,
-                    persistent=True,
-                    correlation_id=correlation_id,
-                    headers=headers
-                )
-                published_channels.append(channel)
-                
-                # Track service-to-service traffic for lineage visualization
+        try:
+            if not self.redis_client:
+                raise RuntimeError("Event publisher not initialized")
+            message = await self._prepare_message(event_payload, publish_metadata, routed_channels)
+            message_size = len(message)
+            if message_size > self.max_message_size:
+                raise ValueError(f"Message size ({message_size}) exceeds maximum ({self.max_message_size})")
+            
+            # Publish to all channels and persist in one round trip
+            await self._publish_and_store(publish_channels, publish_metadata.message_id, message, publish_metadata)
+            published_channels = channels
+            
+            self.published_count += len(publish_channels)
+            self.total_bytes_sent += message_size * len(publish_channels)
+            self.active_channels.update(publish_channels)
+            
+            # Track service-to-service traffic for lineage visualization
+            for channel in channels:
                 track_service_publish(
                     source_service=source_service,
                     event_type=event_type,
                     channel=channel,
-                    message_size=len(str(event_payload))
+                    message_size=message_size
                 )
-            except Exception as e:
-                logger.error(f"Failed to publish event to channel {channel}: {e}")
+        except Exception as e:
+            self.failed_count += 1
+            logger.error(f"Failed to publish event {event_type} to channels {publish_channels}: {e}")
         
         return {
             "event_id": event_payload["event_id"],
@@ -316,7 +363,12 @@ class EventPublisher:
         }
     
     @trace_method(name="prepare_message", kind="INTERNAL")
-    async def _prepare_message(self, payload: Union[Dict[str, Any], str, bytes], metadata: MessageMetadata) -> bytes:
+    async def _prepare_message(
+        self,
+        payload: Union[Dict[str, Any], str, bytes],
+        metadata: MessageMetadata,
+        routed_channels: Optional[List[str]] = None
+    ) -> bytes:
         """Prepare message for publishing."""
         # Create message envelope
         envelope = {
@@ -333,35 +385,64 @@ class EventPublisher:
             },
             "payload": payload
         }
+        if routed_channels:
+            # Extra channels whose subscribers should also receive this message
+            envelope["metadata"]["channels"] = routed_channels
         
-        # Serialize to JSON
-        message_str = json.dumps(envelope, default=str, ensure_ascii=False)
+        # Encode once with the negotiated codec, compressing adaptively
+        return self.codecs.encode(envelope["metadata"], envelope["payload"])
+    
+    async def _publish_and_store(
+        self,
+        channels: List[str],
+        message_id: str,
+        message: bytes,
+        metadata: Optional[MessageMetadata]
+    ) -> List[int]:
+        """
+        PUBLISH to channels and persist the message in one MULTI/EXEC round trip.
         
-        # Encode to bytes
-        message_bytes = message_str.encode('utf-8')
+        Returns:
+            Subscriber count per channel
         
-        # Apply compression if enabled and beneficial
-        if self.enable_compression and len(message_bytes) > 1024:  # Only compress larger messages
-            try:
-                import gzip
-                
-                # Prepare envelope with gzip encoding metadata to see if it compresses well
-                envelope_gzip = envelope.copy()
-                envelope_gzip["metadata"] = envelope["metadata"].copy()
-                envelope_gzip["metadata"]["content_encoding"] = "gzip"
-                
-                message_str_gzip = json.dumps(envelope_gzip, default=str, ensure_ascii=False)
-                message_bytes_gzip = message_str_gzip.encode('utf-8')
-                
-                compressed = gzip.compress(message_bytes_gzip)
-                
-                if len(compressed) < len(message_bytes):
-                    # Use compressed version
-                    return compressed
-            except ImportError:
-                logger.warning("gzip not available for compression")
+        Raises:
+            Exception: If a PUBLISH failed (persistence errors are only logged)
+        """
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            for channel in channels:
+                pipe.publish(channel, message)
+            self._queue_store(pipe, channels, message_id, message, metadata)
+            results = await pipe.execute(raise_on_error=False)
         
-        return message_bytes
+        for result in results[:len(channels)]:
+            if isinstance(result, Exception):
+                raise result
+        for result in results[len(channels):]:
+            if isinstance(result, Exception):
+                logger.error(f"Failed to store message {message_id}: {result}")
+                break
+        return results[:len(channels)]
+    
+    def _queue_store(
+        self,
+        pipe: Any,
+        channels: List[str],
+        message_id: str,
+        message: bytes,
+        metadata: Optional[MessageMetadata]
+    ) -> None:
+        """Add the persistence commands for a message to a pipeline."""
+        # Store in Redis with TTL (the body once, keyed by id alone so it does
+        # not depend on which channels it was published to)
+        ttl = (metadata.ttl if metadata and metadata.ttl is not None else self.default_ttl)
+        pipe.setex(f"message:{message_id}", ttl, message)
+        
+        # Add to each channel's message list, capped at max_channel_messages
+        for channel in channels:
+            list_key = f"channel:{channel}:messages"
+            pipe.lpush(list_key, message_id)
+            pipe.ltrim(list_key, 0, self.max_channel_messages - 1)
+            pipe.expire(list_key, ttl)
     
     @trace_method(name="store_message", kind="INTERNAL")
     async def _store_message(self, channel: str, message_id: str, message: bytes, metadata: Optional[MessageMetadata]) -> None:
@@ -370,16 +451,9 @@ class EventPublisher:
             return
         
         try:
-            # Store in Redis with TTL
-            ttl = (metadata.ttl if metadata and metadata.ttl is not None else self.default_ttl)
-            key = f"message:{channel}:{message_id}"
-            
-            await self.redis_client.setex(key, ttl, message)
-            
-            # Add to channel message list
-            list_key = f"channel:{channel}:messages"
-            await self.redis_client.lpush(list_key, message_id)
-            await self.redis_client.expire(list_key, ttl)
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                self._queue_store(pipe, [channel], message_id, message, metadata)
+                await pipe.execute()
             
         except Exception as e:
             logger.error(f"Failed to store message {message_id}: {e}")
@@ -440,7 +514,8 @@ class EventPublisher:
             "uptime_seconds": uptime,
             "messages_per_second": self.published_count / uptime if uptime > 0 else 0,
             "error_rate": (self.failed_count / (self.published_count + self.failed_count)) * 100 if (self.published_count + self.failed_count) > 0 else 0,
-            "avg_message_size": self.total_bytes_sent / self.published_count if self.published_count > 0 else 0
+            "avg_message_size": self.total_bytes_sent / self.published_count if self.published_count > 0 else 0,
+            "encoding": self.codecs.stats
         }
     
     @trace_method(name="health_check", kind="INTERNAL")
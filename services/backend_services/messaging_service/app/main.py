@@ -122,7 +122,12 @@ async def lifespan(app: FastAPI):
             socket_keepalive=settings.redis_socket_keepalive,
             default_ttl=settings.default_message_ttl,
             enable_compression=settings.enable_message_compression,
-            max_message_size=settings.max_message_size
+            max_message_size=settings.max_message_size,
+            max_channel_messages=settings.max_channel_messages,
+            event_routing=settings.event_routing,
+            default_content_type=settings.message_content_type,
+            compression=settings.message_compression,
+            compression_threshold=settings.compression_threshold
         )
         # Wrap Redis operations with metrics tracking
         if hasattr(event_publisher, 'publish') and settings.enable_prometheus_metrics:
@@ -145,7 +150,12 @@ async def lifespan(app: FastAPI):
             max_connections=settings.redis_max_connections,
             heartbeat_interval=settings.subscription_heartbeat_interval,
             subscription_timeout=settings.subscription_timeout,
-            max_subscriptions_per_service=settings.max_subscriptions_per_service
+            max_subscriptions_per_service=settings.max_subscriptions_per_service,
+            webhook_max_connections=settings.webhook_max_connections,
+            webhook_connections_per_host=settings.webhook_connections_per_host,
+            webhook_keepalive_timeout=settings.webhook_keepalive_timeout,
+            ack_timer_tick_seconds=settings.ack_timer_tick_seconds,
+            event_routing=settings.event_routing
         )
         
         # Wrap subscription operations with metrics tracking
@@ -986,7 +996,9 @@ async def create_subscription(
             filter_criteria=request.filter_criteria,
             headers=headers,
             max_retries=request.max_retries,
-            retry_delay=request.retry_delay
+            retry_delay=request.retry_delay,
+            batch_size=request.batch_size,
+            batch_linger_ms=request.batch_linger_ms
         )
 
         # Note: The subscription manager returns a tuple (subscription_id, created_at, status)
@@ -100,6 +100,8 @@ class SubscriptionRequest(BaseModel):
     headers: Optional[Dict[str, str]] = Field(default_factory=dict, description="Headers to be sent with webhook calls.")
     max_retries: int = Field(default=3, ge=0, description="Maximum number of retry attempts for message delivery.")
     retry_delay: int = Field(default=5, ge=1, description="Delay in seconds between retry attempts.")
+    batch_size: int = Field(default=1, ge=1, le=1000, description="Maximum messages per webhook request.")
+    batch_linger_ms: int = Field(default=50, ge=0, le=10000, description="How long a partial batch waits for more messages, in milliseconds.")
 
     @model_validator(mode='before')
     @classmethod
@@ -144,6 +146,7 @@ class SubscriptionInfo(BaseModel):
     max_delivery_attempts: int = Field(..., description="Maximum delivery attempts")
     ack_timeout: int = Field(..., description="Acknowledgment timeout")
     batch_size: int = Field(..., description="Message batch size")
+    batch_linger_ms: int = Field(default=50, description="Partial batch linger time in milliseconds")
     auto_ack: bool = Field(..., description="Auto acknowledgment enabled")
     created_at: datetime = Field(..., description="Creation timestamp")
     last_activity: Optional[datetime] = Field(None, description="Last activity timestamp")
@@ -1,5 +1,10 @@
 """
 Subscription Manager - Handles Redis pub/sub subscriptions and message delivery.
+
+With canonical event routing, events are published once to
+events.{service}.{type}; the manager also listens on CANONICAL_EVENT_PATTERN
+and routes those events to the subscribers of the channels listed in
+metadata["channels"].
 """
 
 import asyncio
@@ -17,12 +22,18 @@ from redis.backoff import ExponentialBackoff
 from opentelemetry import trace
 from opentelemetry.trace.status import Status, StatusCode
 
+from .channel_router import ChannelRouter
+from .codecs import CodecRegistry
+from .timer_wheel import TimerWheel
 from .models import SubscriptionStatus, MessageDelivery, MessageMetadata, MessagePriority
 from .telemetry import trace_method, add_span_attributes, extract_trace_context, inject_trace_context, traced_span
 from .metrics import track_service_consume
 
 logger = logging.getLogger(__name__)
 
+# Every canonically published event channel (events.{service}.{type})
+CANONICAL_EVENT_PATTERN = "events.*.*"
+
 
 class Subscription:
     """Individual subscription information."""
@@ -37,7 +48,8 @@ class Subscription:
         max_delivery_attempts: int = 3,
         ack_timeout: int = 30,
         batch_size: int = 1,
-        auto_ack: bool = False
+        auto_ack: bool = False,
+        batch_linger_ms: int = 50
     ):
         self.subscription_id = subscription_id
         self.channel_pattern = channel_pattern
@@ -48,6 +60,8 @@ class Subscription:
         self.ack_timeout = ack_timeout
         self.batch_size = batch_size
         self.auto_ack = auto_ack
+        # How long a partial batch waits for more messages before it is sent
+        self.batch_linger_ms = batch_linger_ms
         
         # Status tracking
         self.status = SubscriptionStatus.ACTIVE
@@ -74,13 +88,22 @@ class SubscriptionManager:
         max_connections: int = 20,
         heartbeat_interval: int = 30,
         subscription_timeout: int = 300,
-        max_subscriptions_per_service: int = 50
+        max_subscriptions_per_service: int = 50,
+        webhook_max_connections: int = 100,
+        webhook_connections_per_host: int = 10,
+        webhook_keepalive_timeout: float = 30.0,
+        ack_timer_tick_seconds: float = 0.5,
+        event_routing: str = "fanout"
     ):
         self.redis_url = redis_url
         self.max_connections = max_connections
         self.heartbeat_interval = heartbeat_interval
         self.subscription_timeout = subscription_timeout
         self.max_subscriptions_per_service = max_subscriptions_per_service
+        self.webhook_max_connections = webhook_max_connections
+        self.webhook_connections_per_host = webhook_connections_per_host
+        self.webhook_keepalive_timeout = webhook_keepalive_timeout
+        self.event_routing = event_routing
         
         # Redis connections
         self.redis_pool: Optional[redis.ConnectionPool] = None
@@ -91,7 +114,8 @@ class SubscriptionManager:
         # Subscriptions
         self.subscriptions: Dict[str, Subscription] = {}
         self.service_subscriptions: Dict[str, Set[str]] = {}
-        self.channel_subscriptions: Dict[str, Set[str]] = {}
+        # Channel pattern -> subscription ids, indexed for routing
+        self.channel_subscriptions: ChannelRouter = ChannelRouter()
         
         # HTTP session for webhooks
         self.http_session: Optional[aiohttp.ClientSession] = None
@@ -100,10 +124,17 @@ class SubscriptionManager:
         self.message_listener_task: Optional[asyncio.Task] = None
         self.cleanup_task: Optional[asyncio.Task] = None
         
+        # Decodes JSON/msgpack envelopes, compressed or not
+        self.codecs = CodecRegistry()
+        
+        # Ack timeouts of all in-flight messages, keyed by (subscription_id, message_id)
+        self.ack_timers = TimerWheel(tick_seconds=ack_timer_tick_seconds)
+        
         # Metrics
         self.total_messages_received = 0
         self.total_messages_delivered = 0
         self.total_messages_failed = 0
+        self.total_webhook_requests = 0
         self.start_time = time.time()
     
     @trace_method(name="subscription_manager_initialize", kind="INTERNAL")
@@ -127,17 +158,28 @@ class SubscriptionManager:
             # Create pub/sub instance
             self.pubsub = self.pubsub_client.pubsub()
             
-            # Create HTTP session for webhooks
+            # Create HTTP session for webhooks; connections are kept alive and
+            # capped per callback host so one slow consumer cannot take them all
             self.http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.webhook_max_connections,
+                    limit_per_host=self.webhook_connections_per_host,
+                    keepalive_timeout=self.webhook_keepalive_timeout
+                ),
                 timeout=aiohttp.ClientTimeout(total=30)
             )
             
             # Test connection
             await self.redis_client.ping()
             
+            # Canonical events only reach routed subscribers through this pattern
+            if self.event_routing == "canonical":
+                await self.pubsub.psubscribe(CANONICAL_EVENT_PATTERN)
+            
             # Start background tasks
             self.message_listener_task = asyncio.create_task(self._message_listener())
             self.cleanup_task = asyncio.create_task(self._cleanup_expired_subscriptions())
+            self.ack_timers.start()
             
             logger.info("Subscription manager initialized successfully")
             
@@ -252,7 +294,8 @@ class SubscriptionManager:
                 max_delivery_attempts=max_retries,
                 ack_timeout=kwargs.get('ack_timeout', 30),
                 batch_size=kwargs.get('batch_size', 1),
-                auto_ack=kwargs.get('auto_ack', False)
+                auto_ack=kwargs.get('auto_ack', False),
+                batch_linger_ms=kwargs.get('batch_linger_ms', 50)
             )
             
             # Store subscription
@@ -339,6 +382,9 @@ class SubscriptionManager:
                     tasks_span.set_attribute("task.heartbeat_active", not subscription.heartbeat_task.done())
                     subscription.heartbeat_task.cancel()
             
+            # Drop ack timers of messages still in flight
+            self.ack_timers.cancel_where(lambda key: key[0] == subscription_id)
+            
             # Update tracking with tracing
             with traced_span("update_subscription_tracking", attributes={
                 "correlation_id": correlation_id or str(uuid.uuid4()),
@@ -354,6 +400,8 @@ class SubscriptionManager:
                 # Remove from channel tracking
                 channel_subs = self.channel_subscriptions.get(subscription.channel_pattern, set())
                 channel_subs.discard(subscription_id)
+                if not channel_subs:
+                    self.channel_subscriptions.pop(subscription.channel_pattern, None)
                 tracking_span.set_attribute("channel.remaining_subscriptions", len(channel_subs))
             
             # Unsubscribe from Redis if no more subscriptions
@@ -506,6 +554,9 @@ class SubscriptionManager:
                     tasks_span.set_attribute("task.heartbeat_active", not subscription.heartbeat_task.done())
                     subscription.heartbeat_task.cancel()
         
+        # Drop ack timers of messages still in flight
+        self.ack_timers.cancel_where(lambda key: key[0] == subscription_id)
+        
         # Update tracking with tracing
         with traced_span("update_subscription_tracking", attributes={
             "correlation_id": correlation_id or str(uuid.uuid4()),
@@ -521,6 +572,8 @@ class SubscriptionManager:
                 # Remove from channel tracking
                 channel_subs = self.channel_subscriptions.get(subscription.channel_pattern, set())
                 channel_subs.discard(subscription_id)
+                if not channel_subs:
+                    self.channel_subscriptions.pop(subscription.channel_pattern, None)
                 tracking_span.set_attribute("channel.remaining_subscriptions", len(channel_subs))
         
         # Unsubscribe from Redis if no more subscriptions
@@ -615,6 +668,7 @@ class SubscriptionManager:
                     "max_delivery_attempts": subscription.max_delivery_attempts,
                     "ack_timeout": subscription.ack_timeout,
                     "batch_size": subscription.batch_size,
+                    "batch_linger_ms": subscription.batch_linger_ms,
                     "auto_ack": subscription.auto_ack,
                     "created_at": subscription.created_at.isoformat(),
                     "last_activity": subscription.last_activity.isoformat() if subscription.last_activity else None,
@@ -719,6 +773,7 @@ class SubscriptionManager:
                 if message_exists:
                     # Remove from pending messages
                     del subscription.pending_messages[message_id]
+                    self.ack_timers.cancel((subscription_id, message_id))
                     
                     # Update metrics
                     if success:
@@ -1084,6 +1139,9 @@ class SubscriptionManager:
         """Unsubscribe from a Redis channel pattern."""
         if not self.pubsub:
             return
+        if self.event_routing == "canonical" and channel_pattern == CANONICAL_EVENT_PATTERN:
+            # Still needed for routing canonical events
+            return
         
         try:
             if '*' in channel_pattern or '?' in channel_pattern or '[' in channel_pattern:
@@ -1128,22 +1186,20 @@ class SubscriptionManager:
                 "messaging.operation": "receive"
             })
             
-            # Decode message data
+            # Decode the envelope once, straight from the raw bytes
             try:
-                message_bytes = data
-                message_dict = json.loads(message_bytes.decode())
-                data = data.decode('utf-8')
-            except Exception as e:
-                logger.error(f"Failed to decode message data: {e}")
-                return
-            
-            # Parse message
-            try:
-                message_envelope = json.loads(data)
+                message_envelope = self.codecs.decode(data)
+                if not isinstance(message_envelope, dict):
+                    raise ValueError("Envelope is not an object")
                 metadata = message_envelope.get('metadata', {})
                 payload = message_envelope.get('payload')
-            except json.JSONDecodeError:
-                # Handle plain text messages
+            except ValueError:
+                # Handle plain text messages (not JSON, msgpack or a known encoding)
+                try:
+                    data = data.decode('utf-8') if isinstance(data, bytes) else data
+                except UnicodeDecodeError as e:
+                    logger.error(f"Failed to decode message data: {e}")
+                    return
                 message_envelope = {
                     'metadata': {
                         'message_id': str(uuid.uuid4()),
@@ -1155,8 +1211,25 @@ class SubscriptionManager:
                 metadata = message_envelope['metadata']
                 payload = data
             
-            # Find matching subscriptions
-            matching_subscriptions = self._find_matching_subscriptions(channel)
+            # Redis delivers a publish once per subscribed channel or pattern
+            # that matches it, so each delivery only serves the subscriptions
+            # registered under the pattern it arrived on
+            identifier = redis_message.get("pattern")
+            if identifier is None and redis_message.get("type") == "message":
+                identifier = redis_message["channel"]
+            if identifier is None:
+                matching_subscriptions = self._find_matching_subscriptions(channel)
+            else:
+                identifier = identifier.decode() if isinstance(identifier, bytes) else identifier
+                matching_subscriptions = set(self.channel_subscriptions.get(identifier, ()))
+            
+            # Canonically published events name the channels they stand in for;
+            # subscribers matching the canonical channel itself get their own delivery
+            routed_channels = metadata.get('channels') if isinstance(metadata, dict) else None
+            if routed_channels and identifier in (None, CANONICAL_EVENT_PATTERN):
+                direct_subscriptions = self._find_matching_subscriptions(channel)
+                for routed_channel in routed_channels:
+                    matching_subscriptions |= self._find_matching_subscriptions(routed_channel) - direct_subscriptions
             
             # Deliver to each subscription
             for subscription_id in matching_subscriptions:
@@ -1171,25 +1244,7 @@ class SubscriptionManager:
     
     def _find_matching_subscriptions(self, channel: str) -> Set[str]:
         """Find subscriptions that match the channel."""
-        matching = set()
-        
-        for pattern, subscription_ids in self.channel_subscriptions.items():
-            if self._channel_matches_pattern(channel, pattern):
-                matching.update(subscription_ids)
-        
-        return matching
-    
-    def _channel_matches_pattern(self, channel: str, pattern: str) -> bool:
-        """Check if channel matches pattern."""
-        if pattern == channel:
-            return True
-        
-        # Simple pattern matching (extend as needed)
-        if '*' in pattern:
-            import fnmatch
-            return fnmatch.fnmatch(channel, pattern)
-        
-        return False
+        return self.channel_subscriptions.match(channel)
     
     @trace_method(name="deliver_message_to_subscription", kind="INTERNAL")
     async def _deliver_message_to_subscription(self, subscription: Subscription, channel: str, payload: Any, metadata: Dict[str, Any]) -> None:
@@ -1227,8 +1282,9 @@ class SubscriptionManager:
                         timeout=1.0
                     )
                     
-                    # Process message
-                    await self._process_message(subscription, message)
+                    # Fill a batch and process it
+                    batch = await self._collect_batch(subscription, message)
+                    await self._process_batch(subscription, batch)
                     
                 except asyncio.TimeoutError:
                     continue
@@ -1240,29 +1296,145 @@ class SubscriptionManager:
         except Exception as e:
             logger.error(f"Message processor error for subscription {subscription.subscription_id}: {e}")
     
+    async def _collect_batch(self, subscription: Subscription, first: MessageDelivery) -> List[MessageDelivery]:
+        """Take up to batch_size messages, waiting at most batch_linger_ms for stragglers."""
+        batch = [first]
+        if subscription.batch_size <= 1:
+            return batch
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + subscription.batch_linger_ms / 1000
+        while len(batch) < subscription.batch_size:
+            try:
+                batch.append(subscription.message_queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(subscription.message_queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        
+        return batch
+    
     @trace_method(name="process_message", kind="INTERNAL")
     async def _process_message(self, subscription: Subscription, message: MessageDelivery) -> None:
         """Process a single message."""
+        await self._process_batch(subscription, [message])
+    
+    @trace_method(name="process_batch", kind="INTERNAL")
+    async def _process_batch(self, subscription: Subscription, messages: List[MessageDelivery]) -> None:
+        """Deliver a batch of messages in one webhook request."""
         try:
             # Add to pending messages
-            subscription.pending_messages[message.message_id] = {
-                "timestamp": datetime.now(timezone.utc),
-                "attempts": message.delivery_attempt
-            }
+            now = datetime.now(timezone.utc)
+            for message in messages:
+                subscription.pending_messages[message.message_id] = {
+                    "timestamp": now,
+                    "attempts": message.delivery_attempt
+                }
             
             # Deliver via webhook if configured
             if subscription.callback_url:
-                success = await self._deliver_via_webhook(subscription, message)
+                if len(messages) == 1:
+                    success = await self._deliver_via_webhook(subscription, messages[0])
+                else:
+                    success = await self._deliver_batch_via_webhook(subscription, messages)
                 
-                # Auto-acknowledge if configured
-                if subscription.auto_ack:
-                    await self.acknowledge_message(subscription.subscription_id, message.message_id, success)
+                for message in messages:
+                    # Auto-acknowledge if configured
+                    if subscription.auto_ack:
+                        await self.acknowledge_message(subscription.subscription_id, message.message_id, success)
+                    else:
+                        self._schedule_ack_timeout(subscription, message)
+        except Exception as e:
+            logger.error(f"Failed to process batch of {len(messages)} messages for subscription {subscription.subscription_id}: {e}")
+            for message in messages:
+                await self.acknowledge_message(subscription.subscription_id, message.message_id, False, str(e))
+    
+    def _schedule_ack_timeout(self, subscription: Subscription, message: MessageDelivery) -> None:
+        """Arm the ack timer for a delivered message (replaces any earlier timer)."""
+        self.ack_timers.schedule(
+            (subscription.subscription_id, message.message_id),
+            subscription.ack_timeout,
+            lambda: self._handle_ack_timeout(subscription, message)
+        )
+    
+    def _webhook_message_body(self, subscription: Subscription, message: MessageDelivery) -> Dict[str, Any]:
+        """Serialize one message for a webhook request."""
+        # Handle Pydantic model serialization compatibility (V1 vs V2)
+        metadata_dict = message.metadata
+        if hasattr(message.metadata, 'model_dump'):
+            metadata_dict = message.metadata.model_dump(mode='json')
+        elif hasattr(message.metadata, 'dict'):
+            metadata_dict = json.loads(message.metadata.json())
+        
+        return {
+            "subscription_id": subscription.subscription_id,
+            "message_id": message.message_id,
+            "channel": message.channel,
+            "payload": message.payload,
+            "metadata": metadata_dict,
+            "delivery_attempt": message.delivery_attempt,
+            "delivered_at": message.delivered_at.isoformat()
+        }
+    
+    @trace_method(name="deliver_batch_via_webhook", kind="CLIENT")
+    async def _deliver_batch_via_webhook(self, subscription: Subscription, messages: List[MessageDelivery]) -> bool:
+        """
+        Deliver several messages in one HTTP webhook request.
+        
+        The body is {"subscription_id", "batch_size", "messages": [...]}, each
+        item shaped like a single-message webhook body. The batch succeeds or
+        fails as a whole.
+        """
+        if not self.http_session or not subscription.callback_url:
+            return False
+        
+        try:
+            headers = dict(subscription.webhook_headers or {})
+            headers["Content-Type"] = "application/json"
+            headers["X-Subscription-ID"] = subscription.subscription_id
+            headers["X-Batch-Size"] = str(len(messages))
+            
+            add_span_attributes({
+                "messaging.system": "webhook",
+                "messaging.destination": subscription.callback_url,
+                "messaging.destination_kind": "webhook",
+                "messaging.subscription_id": subscription.subscription_id,
+                "messaging.batch.message_count": len(messages),
+                "http.url": subscription.callback_url,
+                "http.method": "POST"
+            })
+            
+            # Inject trace context into outgoing request headers
+            headers = inject_trace_context(headers)
+            
+            webhook_payload = {
+                "subscription_id": subscription.subscription_id,
+                "batch_size": len(messages),
+                "messages": [self._webhook_message_body(subscription, message) for message in messages]
+            }
+            
+            self.total_webhook_requests += 1
+            async with self.http_session.post(
+                subscription.callback_url,
+                json=webhook_payload,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    return True
                 else:
-                    # Set up timeout handler
-                    asyncio.create_task(self._handle_ack_timeout(subscription, message))
+                    logger.warning(f"Webhook returned status {response.status} for batch of {len(messages)} messages")
+                    return False
+                    
         except Exception as e:
-            logger.error(f"Failed to process message {message.message_id}: {e}")
-            await self.acknowledge_message(subscription.subscription_id, message.message_id, False, str(e))
+            logger.error(f"Webhook delivery failed for batch of {len(messages)} messages: {e}")
+            return False
     
     @trace_method(name="deliver_via_webhook", kind="CLIENT")
     async def _deliver_via_webhook(self, subscription: Subscription, message: MessageDelivery) -> bool:
@@ -1306,24 +1478,10 @@ class SubscriptionManager:
             headers = inject_trace_context(headers)
             
             # Prepare webhook payload
-            # Handle Pydantic model serialization compatibility (V1 vs V2)
-            metadata_dict = message.metadata
-            if hasattr(message.metadata, 'model_dump'):
-                metadata_dict = message.metadata.model_dump(mode='json')
-            elif hasattr(message.metadata, 'dict'):
-                metadata_dict = json.loads(message.metadata.json())
-                
-            webhook_payload = {
-                "subscription_id": subscription.subscription_id,
-                "message_id": message.message_id,
-                "channel": message.channel,
-                "payload": message.payload,
-                "metadata": metadata_dict,
-                "delivery_attempt": message.delivery_attempt,
-                "delivered_at": message.delivered_at.isoformat()
-            }
+            webhook_payload = self._webhook_message_body(subscription, message)
             
             # Send webhook
+            self.total_webhook_requests += 1
             async with self.http_session.post(
                     subscription.callback_url,
                 json=webhook_payload,
@@ -1341,8 +1499,9 @@ class SubscriptionManager:
     
     @trace_method(name="handle_ack_timeout", kind="INTERNAL")
     async def _handle_ack_timeout(self, subscription: Subscription, message: MessageDelivery) -> None:
-        """Handle acknowledgment timeout."""
-        await asyncio.sleep(subscription.ack_timeout)
+        """Handle acknowledgment timeout (fired by the ack timer wheel)."""
+        if subscription.status != SubscriptionStatus.ACTIVE:
+            return
         
         # Check if message is still pending
         if message.message_id in subscription.pending_messages:
@@ -1422,6 +1581,8 @@ class SubscriptionManager:
             "total_messages_received": self.total_messages_received,
             "total_messages_delivered": self.total_messages_delivered,
             "total_messages_failed": self.total_messages_failed,
+            "total_webhook_requests": self.total_webhook_requests,
+            "pending_ack_timers": len(self.ack_timers),
             "uptime_seconds": uptime,
             "messages_per_second": self.total_messages_received / uptime if uptime > 0 else 0,
             "delivery_rate": (self.total_messages_delivered / self.total_messages_received) * 100 if self.total_messages_received > 0 else 0
@@ -1460,6 +1621,7 @@ class SubscriptionManager:
             self.message_listener_task.cancel()
         if self.cleanup_task:
             self.cleanup_task.cancel()
+        await self.ack_timers.stop()
         
         # Cancel all subscription tasks
         for subscription in self.subscriptions.values():
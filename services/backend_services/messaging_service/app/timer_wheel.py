@@ -0,0 +1,125 @@
+"""
+Timer Wheel - Many cheap timeouts driven by one task.
+
+Used for message acknowledgment timeouts: scheduling and cancelling a timer
+is O(1) and no asyncio task or event-loop timer exists per message, so tens
+of thousands of in-flight messages cost one dict entry each.
+
+Timers fire with tick granularity (never early, at most one tick late).
+"""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TimerCallback = Callable[[], Awaitable[Any]]
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel.
+
+    Usage:
+        wheel = TimerWheel(tick_seconds=0.5)
+        wheel.start()
+        wheel.schedule(("sub-1", "msg-1"), 30, lambda: on_timeout(...))
+        wheel.cancel(("sub-1", "msg-1"))
+        await wheel.stop()
+    """
+
+    def __init__(self, tick_seconds: float = 0.5, slots: int = 512):
+        """
+        Initialize the wheel.
+
+        Args:
+            tick_seconds: Timer resolution
+            slots: Wheel size; delays longer than slots * tick_seconds wrap
+                around and wait additional rounds
+        """
+        self.tick_seconds = tick_seconds
+        self._slots: List[Dict[Hashable, List[Any]]] = [{} for _ in range(slots)]
+        # key -> slot index, for O(1) cancel
+        self._positions: Dict[Hashable, int] = {}
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._positions
+
+    def schedule(self, key: Hashable, delay: float, callback: TimerCallback) -> None:
+        """Schedule (or reschedule) the timer for key to fire after delay seconds."""
+        self.cancel(key)
+        ticks = max(1, math.ceil(delay / self.tick_seconds))
+        slot = (self._cursor + ticks) % len(self._slots)
+        rounds = (ticks - 1) // len(self._slots)
+        self._slots[slot][key] = [rounds, callback]
+        self._positions[key] = slot
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer. Returns False if it was not scheduled."""
+        slot = self._positions.pop(key, None)
+        if slot is None:
+            return False
+        del self._slots[slot][key]
+        return True
+
+    def cancel_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Cancel every timer whose key matches predicate."""
+        keys = [key for key in self._positions if predicate(key)]
+        for key in keys:
+            self.cancel(key)
+        return len(keys)
+
+    def advance(self) -> List[Tuple[Hashable, TimerCallback]]:
+        """Move one tick forward and return the timers that expired."""
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        bucket = self._slots[self._cursor]
+        expired = []
+        for key, entry in list(bucket.items()):
+            if entry[0] > 0:
+                entry[0] -= 1
+                continue
+            del bucket[key]
+            del self._positions[key]
+            expired.append((key, entry[1]))
+        return expired
+
+    def start(self) -> None:
+        """Start the ticking task."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop ticking. Pending timers are kept but no longer fire."""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        next_tick = time.monotonic() + self.tick_seconds
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+            next_tick += self.tick_seconds
+
+            # Catch up on ticks missed while callbacks ran long
+            while True:
+                for key, callback in self.advance():
+                    self.fired += 1
+                    try:
+                        await callback()
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as e:
+                        logger.error(f"Timer callback for {key} failed: {e}")
+                if time.monotonic() < next_tick:
+                    break
+                next_tick += self.tick_seconds
@@ -0,0 +1,104 @@
+import pytest
+import fnmatch
+import json
+import random
+import sys
+import os
+from unittest.mock import AsyncMock, patch
+
+# Add service root to path
+service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+if service_root not in sys.path:
+    sys.path.insert(0, service_root)
+
+from app.channel_router import ChannelRouter
+
+
+def reference_match(router, channel):
+    """The linear scan the router replaces."""
+    matching = set()
+    for pattern, ids in router.items():
+        if pattern == channel or ('*' in pattern and fnmatch.fnmatchcase(channel, pattern)):
+            matching.update(ids)
+    return matching
+
+
+def test_router_matches_like_fnmatch_scan():
+    """Indexed routing returns exactly what the per-pattern scan returned."""
+    rng = random.Random(7)
+    words = ["events", "kpi", "user", "created", "updated", "a", ""]
+    router = ChannelRouter()
+
+    patterns = [
+        "events.*", "*", "*.updated", "events.kpi.*", "events.*.created",
+        "events.kpi", "events.k?i.*", "events.[ku]*", "events.", "a*b",
+        "events.kpi.updated", "events.*.*", "?vents.kpi.created"
+    ]
+    for i, pattern in enumerate(patterns):
+        router[pattern] = {f"sub-{i}"}
+
+    channels = ["events", "events.kpi", "events.", "ab", "a.b"] + [
+        ".".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+        for _ in range(500)
+    ]
+    for channel in channels:
+        assert router.match(channel) == reference_match(router, channel), channel
+
+
+def test_router_tracks_pattern_changes():
+    """Adding ids, removing patterns and the result cache stay consistent."""
+    router = ChannelRouter()
+    router.setdefault("events.kpi.*", set()).add("sub-1")
+    assert router.match("events.kpi.updated") == {"sub-1"}
+
+    # Ids are live: no re-index needed
+    router["events.kpi.*"].add("sub-2")
+    assert router.match("events.kpi.updated") == {"sub-1", "sub-2"}
+
+    router["events.*"] = {"sub-3"}
+    assert router.match("events.kpi.updated") == {"sub-1", "sub-2", "sub-3"}
+
+    del router["events.kpi.*"]
+    assert router.match("events.kpi.updated") == {"sub-3"}
+    assert "kpi" not in router._root.children["events"].children
+
+    router.pop("events.*")
+    assert router.match("events.kpi.updated") == set()
+    assert router.get_stats()["wildcard_patterns"] == 0
+    assert router._root.children == {}
+
+
+@pytest.mark.asyncio
+async def test_handle_message_decodes_envelope_once():
+    """The envelope is parsed once and non-JSON data is delivered as text."""
+    from app.subscription_manager import SubscriptionManager, Subscription
+
+    manager = SubscriptionManager(redis_url="redis://localhost:6379/0")
+    manager.subscriptions["sub-1"] = Subscription("sub-1", "events.*", "svc")
+    manager.channel_subscriptions["events.*"] = {"sub-1"}
+
+    with patch.object(manager, "_deliver_message_to_subscription", new_callable=AsyncMock) as deliver, \
+         patch("app.subscription_manager.json.loads", wraps=json.loads) as loads:
+        await manager._handle_message({
+            "type": "pmessage",
+            "channel": b"events.kpi.updated",
+            "data": json.dumps({"payload": {"v": 1}, "metadata": {"message_id": "m1"}}).encode()
+        })
+        assert loads.call_count == 1
+        assert deliver.call_args[0][2] == {"v": 1}
+
+        await manager._handle_message({
+            "type": "pmessage",
+            "channel": b"events.log",
+            "data": b"plain text"
+        })
+        assert deliver.call_args[0][2] == "plain text"
+        assert deliver.call_args[0][3]["content_type"] == "text/plain"
+
+        # Starts like an lz4 frame but is not one: still delivered as text
+        await manager._handle_message({
+            "type": "pmessage",
+            "channel": b"events.log",
+            "data": b"\x04\x22\x4d\x18 not a frame"
+        })
+        assert deliver.call_args[0][2] == "\x04\x22\x4d\x18 not a frame"
@@ -0,0 +1,114 @@
+import pytest
+import gzip
+import json
+import os
+import sys
+
+# Add service root to path
+service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+if service_root not in sys.path:
+    sys.path.insert(0, service_root)
+
+from app import codecs
+from app.codecs import CodecRegistry
+
+
+def _metadata(**overrides):
+    metadata = {"message_id": "m1", "content_type": "application/json", "content_encoding": None}
+    metadata.update(overrides)
+    return metadata
+
+
+KPI_PAYLOAD = {
+    "kpi_code": "CHURN_RATE",
+    "rows": [{"period": f"2025-{i % 12 + 1:02d}", "value": 1.5, "unit": "percent"} for i in range(200)]
+}
+
+
+def test_json_envelope_matches_plain_json():
+    """Small JSON envelopes are plain JSON documents."""
+    registry = CodecRegistry(compression="gzip")
+    data = registry.encode(_metadata(), {"v": 1})
+
+    assert json.loads(data) == {"metadata": _metadata(), "payload": {"v": 1}}
+    assert registry.decode(data)["payload"] == {"v": 1}
+
+
+def test_adaptive_compression_records_encoding_in_frame():
+    """Large payloads are compressed once and say so in their metadata."""
+    registry = CodecRegistry(compression="gzip")
+    metadata = _metadata()
+    data = registry.encode(metadata, KPI_PAYLOAD)
+
+    assert data.startswith(b'\x1f\x8b')
+    assert metadata["content_encoding"] == "gzip"
+    inner = json.loads(gzip.decompress(data))
+    assert inner["metadata"]["content_encoding"] == "gzip"
+    assert registry.decode(data)["payload"] == KPI_PAYLOAD
+
+
+def test_identity_and_incompressible_payloads_stay_plain():
+    """identity disables compression; poor ratios back off to occasional probes."""
+    registry = CodecRegistry(compression="gzip", min_savings=0.9, probe_interval=4)
+    assert not registry.encode(_metadata(content_encoding="identity"), KPI_PAYLOAD).startswith(b'\x1f\x8b')
+
+    noise = os.urandom(3000).hex()
+    for _ in range(3):
+        assert not registry.encode(_metadata(), noise).startswith(b'\x1f\x8b')
+    for _ in range(6):
+        registry.encode(_metadata(), noise)
+    assert registry.stats["compression_skipped"] > 0
+
+
+@pytest.mark.skipif(not codecs.MSGPACK_AVAILABLE, reason="msgpack not installed")
+def test_msgpack_round_trip():
+    """msgpack envelopes are selected by content_type and detected on decode."""
+    registry = CodecRegistry()
+    data = registry.encode(_metadata(content_type="application/msgpack"), KPI_PAYLOAD)
+
+    assert data[:1] == b'\x82'
+    assert registry.decode(data)["payload"] == KPI_PAYLOAD
+
+
+@pytest.mark.parametrize("name, available", [
+    ("zstd", codecs.ZSTD_AVAILABLE),
+    ("lz4", codecs.LZ4_AVAILABLE),
+])
+def test_optional_compressors(name, available):
+    """Optional frames round trip when installed and are rejected clearly otherwise."""
+    registry = CodecRegistry()
+    if not available:
+        assert name not in registry.content_encodings
+        with pytest.raises(ValueError):
+            CodecRegistry(compression=name)
+        return
+
+    data = registry.encode(_metadata(content_encoding=name), KPI_PAYLOAD)
+    assert registry.decode(data)["payload"] == KPI_PAYLOAD
+
+
+def test_gzip_decompression_is_capped(monkeypatch):
+    """gzip frames may not expand past the same limit as zstd."""
+    monkeypatch.setattr(codecs, "MAX_DECOMPRESSED_SIZE", 1024)
+    registry = CodecRegistry(compression="gzip")
+    data = registry.encode(_metadata(), KPI_PAYLOAD)
+    assert data.startswith(b'\x1f\x8b')
+
+    with pytest.raises(ValueError):
+        registry.decode(data)
+    assert registry.decode(gzip.compress(b'{"v": 1}')) == {"v": 1}
+
+
+@pytest.mark.skipif(not codecs.LZ4_AVAILABLE, reason="lz4 not installed")
+def test_lz4_decompression_is_capped(monkeypatch):
+    """lz4 frames may not expand past the limit either."""
+    monkeypatch.setattr(codecs, "MAX_DECOMPRESSED_SIZE", 1024)
+    registry = CodecRegistry(compression="lz4")
+    data = registry.encode(_metadata(), KPI_PAYLOAD)
+    assert data.startswith(b'\x04\x22\x4d\x18')
+
+    with pytest.raises(ValueError):
+        registry.decode(data)
+    with pytest.raises(ValueError):
+        registry.decode(codecs.lz4.frame.compress(b'{"v": 1}')[:-4])
+    assert registry.decode(codecs.lz4.frame.compress(b'{"v": 1}')) == {"v": 1}
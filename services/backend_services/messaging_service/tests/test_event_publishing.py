@@ -212,3 +212,57 @@ async def test_publish_bulk_partial_failure(publisher):
     # Pipeline should have only 1 publish call
     assert mock_pipeline.publish.call_count == 1
     mock_pipeline.execute.assert_called_once()
+
+def _mock_transaction(publisher, subscriber_counts):
+    """Pipeline mock whose execute() returns PUBLISH counts followed by OKs."""
+    pipe = MagicMock()
+    pipe.__aenter__.return_value = pipe
+    pipe.__aexit__.return_value = None
+    pipe.execute = AsyncMock(side_effect=lambda raise_on_error=True: subscriber_counts + [True] * len(pipe.method_calls))
+    publisher.redis_client.pipeline = MagicMock(return_value=pipe)
+    return pipe
+
+@pytest.mark.asyncio
+async def test_persistent_publish_is_one_round_trip(publisher):
+    """PUBLISH and the capped message store go out in one MULTI/EXEC."""
+    publisher.max_channel_messages = 500
+    pipe = _mock_transaction(publisher, [3])
+
+    msg_id = await publisher.publish_message("kpi.calculated", {"v": 1}, persistent=True)
+
+    publisher.redis_client.pipeline.assert_called_once_with(transaction=True)
+    pipe.execute.assert_awaited_once()
+    publisher.redis_client.publish.assert_not_called()
+    pipe.publish.assert_called_once()
+    pipe.setex.assert_called_once()
+    assert pipe.setex.call_args[0][0] == f"message:{msg_id}"
+    pipe.ltrim.assert_called_once_with("channel:kpi.calculated:messages", 0, 499)
+
+@pytest.mark.asyncio
+async def test_publish_event_fanout_single_round_trip(publisher):
+    """All four event channels are published in one pipeline, body stored once."""
+    pipe = _mock_transaction(publisher, [1, 1, 1, 1])
+
+    result = await publisher.publish_event("kpi_calculated", "calc", {"value": 1})
+
+    pipe.execute.assert_awaited_once()
+    assert pipe.publish.call_count == 4
+    assert pipe.setex.call_count == 1
+    assert pipe.lpush.call_count == 4
+    assert len(result["published_channels"]) == 4
+
+@pytest.mark.asyncio
+async def test_publish_event_canonical_routing(publisher):
+    """Canonical mode publishes once and lists the other channels for routing."""
+    publisher.event_routing = "canonical"
+    pipe = _mock_transaction(publisher, [1])
+
+    result = await publisher.publish_event("kpi_calculated", "calc", {"value": 1})
+
+    pipe.publish.assert_called_once()
+    channel, body = pipe.publish.call_args[0]
+    assert channel == "events.calc.kpi_calculated"
+    assert json.loads(body)["metadata"]["channels"] == [
+        "events.kpi_calculated", "events.calc.*", "events.*"
+    ]
+    assert len(result["published_channels"]) == 4
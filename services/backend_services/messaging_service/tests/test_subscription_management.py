@@ -6,6 +6,7 @@ import os
 import json
 import uuid
 import asyncio
+import fnmatch
 from datetime import datetime, timezone
 
 # Mock app.telemetry before importing app.subscription_manager
@@ -108,7 +109,8 @@ async def test_handle_message_routing(manager):
         }).encode('utf-8')
         
         redis_message = {
-            "type": "message",
+            "type": "pmessage",
+            "pattern": b"events.*",
             "channel": channel.encode('utf-8'),
             "data": message_data
         }
@@ -275,3 +277,207 @@ async def test_dlq_logic_max_attempts(manager):
         
         # Should be acknowledged as failed
         mock_ack.assert_awaited_once_with("sub-1", "msg-1", False, "Max delivery attempts exceeded")
+
+def _make_delivery(message_id, channel="kpi.calculated"):
+    return MessageDelivery(
+        message_id=message_id,
+        subscription_id="sub-1",
+        channel=channel,
+        payload={"id": message_id},
+        metadata=MessageMetadata(message_id=message_id),
+        delivery_attempt=1,
+        max_attempts=3,
+        delivered_at=datetime.now(timezone.utc)
+    )
+
+@pytest.mark.asyncio
+async def test_batched_webhook_delivery(manager):
+    """Queued messages go out in batch_size groups, one POST per batch."""
+    sub = Subscription(
+        subscription_id="sub-1",
+        channel_pattern="kpi.*",
+        service_name="test-service",
+        callback_url="http://webhook",
+        batch_size=4,
+        batch_linger_ms=10
+    )
+    manager.subscriptions["sub-1"] = sub
+    for i in range(6):
+        sub.message_queue.put_nowait(_make_delivery(f"msg-{i}"))
+
+    mock_response = AsyncMock()
+    mock_response.status = 200
+    mock_response.__aenter__.return_value = mock_response
+    mock_response.__aexit__.return_value = None
+    manager.http_session.post = MagicMock(return_value=mock_response)
+
+    # First batch is full, second is flushed by the linger deadline
+    for _ in range(2):
+        first = await sub.message_queue.get()
+        await manager._process_batch(sub, await manager._collect_batch(sub, first))
+
+    assert manager.http_session.post.call_count == 2
+    bodies = [call[1]["json"] for call in manager.http_session.post.call_args_list]
+    assert [b["batch_size"] for b in bodies] == [4, 2]
+    assert bodies[0]["messages"][0]["message_id"] == "msg-0"
+
+    # Manual ack: one timer per message in the shared wheel, removed on ack
+    assert len(manager.ack_timers) == 6
+    await manager.acknowledge_message("sub-1", "msg-0")
+    assert ("sub-1", "msg-0") not in manager.ack_timers
+    assert len(manager.ack_timers) == 5
+
+@pytest.mark.asyncio
+async def test_ack_timeout_fires_from_timer_wheel(manager):
+    """An unacknowledged message is re-queued when its wheel timer expires."""
+    sub = Subscription(
+        subscription_id="sub-1",
+        channel_pattern="test",
+        service_name="test-service",
+        ack_timeout=1
+    )
+    manager.subscriptions["sub-1"] = sub
+    msg = _make_delivery("msg-1")
+    sub.pending_messages["msg-1"] = {"timestamp": datetime.now(timezone.utc), "attempts": 1}
+
+    manager._schedule_ack_timeout(sub, msg)
+    ticks = int(1 / manager.ack_timers.tick_seconds)
+    for _ in range(ticks - 1):
+        assert manager.ack_timers.advance() == []
+
+    for _, callback in manager.ack_timers.advance():
+        await callback()
+
+    assert sub.message_queue.get_nowait().delivery_attempt == 2
+
+@pytest.mark.asyncio
+async def test_canonical_event_routed_to_listed_channels(manager):
+    """A canonically published event reaches subscribers of the channels it lists, once each."""
+    for sub_id, pattern in [("exact", "events.kpi_calculated"), ("global", "events.*")]:
+        manager.subscriptions[sub_id] = Subscription(sub_id, pattern, "test-service")
+        manager.channel_subscriptions[pattern] = {sub_id}
+
+    data = json.dumps({
+        "payload": {"value": 1},
+        "metadata": {
+            "message_id": "evt-1",
+            "channels": ["events.kpi_calculated", "events.calc.*", "events.*"]
+        }
+    }).encode()
+    
+    with patch.object(manager, '_deliver_message_to_subscription', new_callable=AsyncMock) as mock_deliver:
+        # Redis delivers the publish once per matching pattern
+        for pattern in (b"events.*.*", b"events.*"):
+            await manager._handle_message({
+                "type": "pmessage",
+                "pattern": pattern,
+                "channel": b"events.calc.kpi_calculated",
+                "data": data
+            })
+
+    delivered = sorted(call[0][0].subscription_id for call in mock_deliver.call_args_list)
+    assert delivered == ["exact", "global"]
+
+@pytest.mark.asyncio
+async def test_compressed_envelope_is_decoded(manager):
+    """gzip-compressed envelopes from the publisher are delivered like plain ones."""
+    from app.codecs import CodecRegistry
+
+    manager.subscriptions["sub-1"] = Subscription("sub-1", "events.*", "test-service")
+    manager.channel_subscriptions["events.*"] = {"sub-1"}
+    payload = {"rows": [{"value": i} for i in range(500)]}
+    data = CodecRegistry(compression="gzip").encode({"message_id": "m1", "content_encoding": None}, payload)
+    assert data.startswith(b'\x1f\x8b')
+
+    with patch.object(manager, '_deliver_message_to_subscription', new_callable=AsyncMock) as mock_deliver:
+        await manager._handle_message({"type": "pmessage", "pattern": b"events.*", "channel": b"events.kpi", "data": data})
+
+    assert mock_deliver.call_args[0][2] == payload
+    assert mock_deliver.call_args[0][3]["content_encoding"] == "gzip"
+
+class FakePubSubBroker:
+    """In-process stand-in for Redis PUBLISH/PSUBSCRIBE with Redis' delivery rules."""
+    
+    def __init__(self):
+        self.channels = set()
+        self.patterns = set()
+        self.queue = asyncio.Queue()
+        self.stored = {}
+    
+    # Subscriber side (redis.asyncio PubSub)
+    
+    async def subscribe(self, channel):
+        self.channels.add(channel)
+    
+    async def psubscribe(self, pattern):
+        self.patterns.add(pattern)
+    
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+    
+    # Publisher side (redis.asyncio Redis pipeline)
+    
+    def pipeline(self, transaction=True):
+        return self
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        pass
+    
+    def publish(self, channel, message):
+        # One delivery per matching exact channel and per matching pattern
+        if channel in self.channels:
+            self.queue.put_nowait({"type": "message", "pattern": None, "channel": channel.encode(), "data": message})
+        for pattern in sorted(self.patterns):
+            if fnmatch.fnmatchcase(channel, pattern):
+                self.queue.put_nowait({"type": "pmessage", "pattern": pattern.encode(), "channel": channel.encode(), "data": message})
+    
+    def setex(self, key, ttl, value):
+        self.stored[key] = value
+    
+    def lpush(self, key, value):
+        pass
+    
+    def ltrim(self, key, start, end):
+        pass
+    
+    def expire(self, key, ttl):
+        pass
+    
+    async def execute(self, raise_on_error=True):
+        return [1]
+
+@pytest.mark.asyncio
+async def test_canonical_event_publish_reaches_subscribers(manager):
+    """Canonical events go publish -> Redis -> listener -> every matching subscriber once."""
+    from app.event_publisher import EventPublisher
+    
+    broker = FakePubSubBroker()
+    manager.event_routing = "canonical"
+    manager.pubsub = broker
+    await broker.psubscribe("events.*.*")
+    
+    for sub_id, pattern in [("by-type", "events.kpi_calculated"), ("by-service", "events.calc.*"), ("global", "events.*")]:
+        manager.subscriptions[sub_id] = Subscription(sub_id, pattern, "test-service")
+        manager.channel_subscriptions[pattern] = {sub_id}
+        await manager._subscribe_to_channel(pattern)
+    
+    publisher = EventPublisher(redis_url="redis://localhost:6379/0", event_routing="canonical")
+    publisher.redis_client = broker
+    
+    with patch.object(manager, '_deliver_message_to_subscription', new_callable=AsyncMock) as mock_deliver:
+        listener = asyncio.create_task(manager._message_listener())
+        result = await publisher.publish_event("kpi_calculated", "calc", {"value": 1})
+        while not broker.queue.empty():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)
+        listener.cancel()
+        await asyncio.gather(listener, return_exceptions=True)
+    
+    delivered = sorted(call[0][0].subscription_id for call in mock_deliver.call_args_list)
+    assert delivered == ["by-service", "by-type", "global"]
+    assert mock_deliver.call_args[0][2]["event_data"] == {"value": 1}
+    assert list(broker.stored) == [f"message:{result['event_id']}"]
@@ -0,0 +1,66 @@
+import pytest
+import asyncio
+import sys
+import os
+
+# Add service root to path
+service_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '../'))
+if service_root not in sys.path:
+    sys.path.insert(0, service_root)
+
+from app.timer_wheel import TimerWheel
+
+
+def test_timers_fire_after_their_delay():
+    """Timers fire on the tick their delay falls on, including across wheel rounds."""
+    wheel = TimerWheel(tick_seconds=1.0, slots=8)
+    for delay in (1, 3, 8, 9, 20):
+        wheel.schedule(delay, delay, None)
+
+    fired = {}
+    for tick in range(1, 25):
+        for key, _ in wheel.advance():
+            fired[key] = tick
+
+    assert fired == {1: 1, 3: 3, 8: 8, 9: 9, 20: 20}
+    assert len(wheel) == 0
+
+
+def test_cancel_and_reschedule():
+    """Cancelled timers never fire; rescheduling replaces the old deadline."""
+    wheel = TimerWheel(tick_seconds=1.0, slots=8)
+    wheel.schedule("a", 2, None)
+    wheel.schedule("b", 2, None)
+    assert wheel.cancel("a") is True
+    assert wheel.cancel("a") is False
+
+    wheel.schedule("b", 5, None)
+    assert [key for _ in range(4) for key, _ in wheel.advance()] == []
+    assert [key for key, _ in wheel.advance()] == ["b"]
+
+    wheel.schedule(("s1", "m1"), 1, None)
+    wheel.schedule(("s2", "m1"), 1, None)
+    assert wheel.cancel_where(lambda key: key[0] == "s1") == 1
+    assert [key for key, _ in wheel.advance()] == [("s2", "m1")]
+
+
+@pytest.mark.asyncio
+async def test_running_wheel_awaits_callbacks():
+    """The ticking task runs callbacks and survives callback errors."""
+    wheel = TimerWheel(tick_seconds=0.01)
+    calls = []
+
+    async def ok():
+        calls.append("ok")
+
+    async def broken():
+        raise RuntimeError("boom")
+
+    wheel.schedule("broken", 0.01, broken)
+    wheel.schedule("ok", 0.02, ok)
+    wheel.start()
+    await asyncio.sleep(0.1)
+    await wheel.stop()
+
+    assert calls == ["ok"]
+    assert wheel.fired == 2
@@ -0,0 +1,100 @@
+import sys
+import os
+import argparse
+import fnmatch
+import json
+import random
+import time
+
+# Add parent directory to path to allow importing app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.channel_router import ChannelRouter
+
+SERVICES = [f"service{i}" for i in range(50)]
+ENTITIES = [f"entity{i}" for i in range(40)]
+ACTIONS = ["created", "updated", "deleted", "calculated", "archived"]
+
+
+def build_patterns(count: int, rng: random.Random):
+    """Mix of exact channels, trailing wildcards and mid-channel wildcards."""
+    patterns = set()
+    while len(patterns) < count:
+        service, entity, action = rng.choice(SERVICES), rng.choice(ENTITIES), rng.choice(ACTIONS)
+        kind = rng.random()
+        if kind < 0.5:
+            patterns.add(f"{service}.{entity}.{action}.{rng.randint(0, 99)}")
+        elif kind < 0.8:
+            patterns.add(f"{service}.{entity}.{action}.*")
+        elif kind < 0.95:
+            patterns.add(f"{service}.*.{action}.{rng.randint(0, 99)}")
+        else:
+            patterns.add(f"{service}.{entity}.*")
+    return sorted(patterns)
+
+
+def linear_match(patterns, channel):
+    """Per-message cost before the router: fnmatch over every pattern."""
+    return {
+        pattern for pattern in patterns
+        if pattern == channel or ('*' in pattern and fnmatch.fnmatch(channel, pattern))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SubscriptionManager channel routing")
+    parser.add_argument("--patterns", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--distinct-channels", type=int, default=20000)
+    parser.add_argument("--linear-sample", type=int, default=500,
+                        help="messages to time with the linear scan (it is slow)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    patterns = build_patterns(args.patterns, rng)
+    router = ChannelRouter()
+    for i, pattern in enumerate(patterns):
+        router[pattern] = {f"sub-{i}"}
+
+    channels = [
+        f"{rng.choice(SERVICES)}.{rng.choice(ENTITIES)}.{rng.choice(ACTIONS)}.{rng.randint(0, 99)}"
+        for _ in range(args.distinct_channels)
+    ]
+    stream = [rng.choice(channels) for _ in range(args.messages)]
+    body = json.dumps({"metadata": {"message_id": "m"}, "payload": {"value": 1.0}}).encode()
+
+    start = time.perf_counter()
+    for channel in stream[:args.linear_sample]:
+        json.loads(body.decode())
+        json.loads(body.decode('utf-8'))
+        linear_match(patterns, channel)
+    linear_rate = args.linear_sample / (time.perf_counter() - start)
+
+    router._cache.clear()
+    start = time.perf_counter()
+    for channel in stream:
+        json.loads(body)
+        router.match(channel)
+    router_rate = args.messages / (time.perf_counter() - start)
+
+    # Uncached routing (every channel new)
+    router.cache_size = 0
+    router._cache.clear()
+    start = time.perf_counter()
+    for channel in stream:
+        router.match(channel)
+    uncached_rate = args.messages / (time.perf_counter() - start)
+
+    for channel in stream[:args.linear_sample]:
+        assert router.match(channel) == {
+            sub for p in linear_match(patterns, channel) for sub in router[p]
+        }
+
+    print(f"{len(patterns)} patterns ({router.get_stats()['wildcard_patterns']} wildcard), {args.messages} messages")
+    print(f"linear scan + double decode: {linear_rate:10.0f} msg/s")
+    print(f"router + single decode:      {router_rate:10.0f} msg/s")
+    print(f"router, no cache:            {uncached_rate:10.0f} msg/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -190,10 +190,9 @@ async def transition_agent_state(
     Validates against forbidden transitions defined in the state machine.
     """
     store = request.app.state.blackboard_store
-    blackboard = await store.get_or_create_blackboard(session_id)
     
     # Get current state (default to idle)
-    current_state = blackboard.agent_states.get(agent_role, "idle")
+    current_state = await store.get_agent_state(session_id, agent_role)
     to_state = transition_request.to_state.lower()
     
     # Check for forbidden transition
@@ -207,9 +206,16 @@ async def transition_agent_state(
             message=f"Forbidden transition: {current_state} → {to_state}. This transition violates state machine rules."
         )
     
-    # Update state
-    blackboard.agent_states[agent_role] = to_state
-    await store.save_blackboard(blackboard)
+    # Update state, unless another transition got there first
+    if not await store.set_agent_state(session_id, agent_role, to_state, expected_state=current_state):
+        return StateTransitionResponse(
+            success=False,
+            agent_role=agent_role,
+            session_id=session_id,
+            from_state=current_state,
+            to_state=to_state,
+            message=f"Agent {agent_role} left state {current_state} during the transition. Retry from its current state."
+        )
     
     return StateTransitionResponse(
         success=True,
@@ -5,7 +5,7 @@
 # =============================================================================
 """API routes for blackboard operations."""
 
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -18,7 +18,6 @@ from ..blackboard.models import (
     TaskStatus,
     ArtifactType,
 )
-from ..blackboard.operations import BlackboardOperations
 
 router = APIRouter()
 
@@ -86,9 +85,6 @@ async def create_task(
 ) -> Dict[str, Any]:
     """Create a new task on the blackboard."""
     store = request.app.state.blackboard_store
-    blackboard = await store.get_or_create_blackboard(session_id)
-    
-    ops = BlackboardOperations(blackboard)
     task = BlackboardTask(
         title=task_request.title,
         description=task_request.description,
@@ -99,8 +95,7 @@ async def create_task(
         created_by=creator_role
     )
     
-    await ops.create_task(creator_role, task)
-    await store.save_blackboard(blackboard)
+    await store.add_task(session_id, creator_role, task)
     
     return task.model_dump(mode="json")
 
@@ -114,17 +109,10 @@ async def list_tasks(
 ) -> List[Dict[str, Any]]:
     """List tasks on the blackboard."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    tasks = list(blackboard.tasks.values())
-    
-    if status:
-        tasks = [t for t in tasks if t.status.value == status]
-    if agent_role:
-        tasks = [t for t in tasks if t.assigned_to == agent_role]
+    tasks = await store.list_tasks(session_id, status=status, assigned_to=agent_role)
     
     return [t.model_dump(mode="json") for t in tasks]
 
@@ -138,16 +126,11 @@ async def claim_task(
 ) -> Dict[str, Any]:
     """Claim a task for an agent."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    ops = BlackboardOperations(blackboard)
-    
     try:
-        task = await ops.claim_task(claim_request.agent_role, task_id)
-        await store.save_blackboard(blackboard)
+        task = await store.claim_task(session_id, claim_request.agent_role, task_id)
         return task.model_dump(mode="json")
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -164,13 +147,9 @@ async def submit_artifact(
 ) -> Dict[str, Any]:
     """Submit an artifact for a task."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    ops = BlackboardOperations(blackboard)
-    
     artifact = BlackboardArtifact(
         artifact_type=ArtifactType(artifact_request.artifact_type),
         task_id=task_id,
@@ -179,8 +158,7 @@ async def submit_artifact(
     )
     
     try:
-        result = await ops.submit_artifact(artifact_request.agent_role, artifact)
-        await store.save_blackboard(blackboard)
+        result = await store.submit_artifact(session_id, artifact_request.agent_role, artifact)
         return result.model_dump(mode="json")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -194,19 +172,10 @@ async def get_review_queue(
 ) -> List[Dict[str, Any]]:
     """Get artifacts awaiting review."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    if reviewer_role:
-        artifacts = blackboard.get_review_queue_for_reviewer(reviewer_role)
-    else:
-        artifacts = [
-            blackboard.artifacts[aid] 
-            for aid in blackboard.review_queue 
-            if aid in blackboard.artifacts
-        ]
+    artifacts = await store.get_review_queue(session_id, reviewer_role)
     
     return [a.model_dump(mode="json") for a in artifacts]
 
@@ -220,21 +189,17 @@ async def review_artifact(
 ) -> Dict[str, Any]:
     """Review an artifact (approve or reject)."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    ops = BlackboardOperations(blackboard)
-    
     try:
-        artifact = await ops.review_artifact(
+        artifact = await store.review_artifact(
+            session_id,
             review_request.reviewer_role,
             artifact_id,
             review_request.approved,
             review_request.notes
         )
-        await store.save_blackboard(blackboard)
         return artifact.model_dump(mode="json")
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -248,10 +213,6 @@ async def submit_struggle_signal(
 ) -> Dict[str, Any]:
     """Submit a struggle signal."""
     store = request.app.state.blackboard_store
-    blackboard = await store.get_or_create_blackboard(session_id)
-    
-    ops = BlackboardOperations(blackboard)
-    
     signal = StruggleSignalEntry(
         agent=signal_request.agent_role,
         signal_type=signal_request.signal_type,
@@ -261,8 +222,7 @@ async def submit_struggle_signal(
         what_would_help=signal_request.what_would_help
     )
     
-    result = await ops.signal_struggle(signal_request.agent_role, signal)
-    await store.save_blackboard(blackboard)
+    result = await store.add_struggle_signal(session_id, signal_request.agent_role, signal)
     
     return result.model_dump(mode="json")
 
@@ -275,15 +235,10 @@ async def get_struggle_signals(
 ) -> List[Dict[str, Any]]:
     """Get struggle signals for a session."""
     store = request.app.state.blackboard_store
-    blackboard = await store.load_blackboard(session_id)
-    
-    if not blackboard:
+    if not await store.session_exists(session_id):
         raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
     
-    if unresolved_only:
-        signals = blackboard.get_unresolved_struggle_signals()
-    else:
-        signals = list(blackboard.struggle_signals.values())
+    signals = await store.list_struggle_signals(session_id, unresolved_only)
     
     return [s.model_dump(mode="json") for s in signals]
 
@@ -291,9 +246,19 @@ async def get_struggle_signals(
 @router.get("/{session_id}/audit-log")
 async def get_audit_log(
     request: Request,
+    response: Response,
     session_id: str,
-    limit: int = 100
+    limit: int = 100,
+    before: Optional[str] = None
 ) -> List[Dict[str, Any]]:
-    """Get the audit log for a session."""
+    """
+    Get a page of the audit log for a session, oldest entry first.
+    
+    The X-Audit-Cursor response header holds the cursor of the previous
+    (older) page; pass it back as `before`.
+    """
     store = request.app.state.blackboard_store
-    return await store.get_audit_log(session_id, limit)
+    entries = await store.get_audit_log(session_id, limit, before)
+    if len(entries) == limit:
+        response.headers["X-Audit-Cursor"] = entries[0]["stream_id"]
+    return entries
@@ -5,8 +5,9 @@
 # =============================================================================
 """Audit logging for full traceability of all agent actions."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+import asyncio
 import logging
 
 from .models import AuditLogEntry
@@ -14,6 +15,52 @@ from .models import AuditLogEntry
 logger = logging.getLogger(__name__)
 
 
+def diff_states(
+    previous_state: Optional[Dict[str, Any]],
+    new_state: Dict[str, Any]
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Reduce a before/after pair of entity states to the fields that changed.
+
+    Creations (no previous state) keep the full new state.
+
+    Returns:
+        The previous and new values of the changed fields
+    """
+    if previous_state is None:
+        return None, new_state
+    changed = sorted(
+        name for name in previous_state.keys() | new_state.keys()
+        if previous_state.get(name) != new_state.get(name)
+    )
+    return (
+        {name: previous_state.get(name) for name in changed},
+        {name: new_state.get(name) for name in changed}
+    )
+
+
+async def run_audit_compaction(store, interval_seconds: float, keep: int) -> None:
+    """
+    Periodically move all but the newest `keep` audit entries of every
+    session into the session's compressed audit archive.
+
+    Args:
+        store: Blackboard store
+        interval_seconds: Seconds between compaction runs
+        keep: Number of recent entries left in each session's audit log
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            archived = 0
+            for session_id in await store.list_sessions():
+                archived += await store.compact_audit_log(session_id, keep)
+            if archived:
+                logger.info(f"Archived {archived} audit entries")
+        except Exception as e:
+            logger.warning(f"Audit compaction failed: {e}")
+
+
 class AuditLogger:
     """
     Centralized audit logging for all blackboard operations.
@@ -38,13 +85,14 @@ class AuditLogger:
         violations: Optional[List[str]] = None
     ) -> AuditLogEntry:
         """Log an operation to the audit trail."""
+        previous_state, new_state = diff_states(previous_state, new_state or {})
         entry = AuditLogEntry(
             agent=agent,
             action=action,
             entity_type=entity_type,
             entity_id=entity_id,
             previous_state=previous_state,
-            new_state=new_state or {},
+            new_state=new_state,
             contract_rules_checked=rules_checked or [],
             violations_detected=violations or [],
             session_id=session_id
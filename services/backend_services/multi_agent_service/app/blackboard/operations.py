@@ -18,6 +18,7 @@ from .models import (
     AuditLogEntry,
     AgentBlackboard,
 )
+from .audit import diff_states
 from ..contracts.violations import ContractViolation
 from ..contracts.tier_rules import RuleTier
 
@@ -374,9 +375,14 @@ class BlackboardOperations:
         self.blackboard.last_modified = datetime.utcnow()
         return task
     
+    @classmethod
+    def reviewer_for_role(cls, creator_role: str) -> str:
+        """Map creators to their adversarial reviewers."""
+        return cls.REVIEWER_MAP.get(creator_role, "coordinator")
+
     def _get_reviewer_for_role(self, creator_role: str) -> str:
         """Map creators to their adversarial reviewers."""
-        return self.REVIEWER_MAP.get(creator_role, "coordinator")
+        return self.reviewer_for_role(creator_role)
     
     def _log_operation(
         self,
@@ -387,7 +393,8 @@ class BlackboardOperations:
         previous_state: Optional[Dict[str, Any]],
         new_state: Dict[str, Any]
     ) -> None:
-        """Log an operation to the audit trail."""
+        """Log an operation to the audit trail, recording only the fields that changed."""
+        previous_state, new_state = diff_states(previous_state, new_state)
         entry = AuditLogEntry(
             agent=agent,
             action=action,
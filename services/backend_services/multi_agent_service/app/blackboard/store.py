@@ -3,30 +3,270 @@
 # Based on: Tangi Vass - "Adversarial Vibe Coding" / LIZA System
 # Reference: https://github.com/liza-mas/liza
 # =============================================================================
-"""Redis-backed persistence for the blackboard."""
+"""Redis-backed persistence for the blackboard.
 
-from typing import Optional
+Each session is decomposed into one hash per entity so an operation only
+reads and writes the entities it touches:
+
+    <prefix>:<session>:meta                     session fields
+    <prefix>:<session>:task:<id>                one hash per task
+    <prefix>:<session>:artifact:<id>            one hash per artifact
+    <prefix>:<session>:gate:<id>                one hash per approval gate
+    <prefix>:<session>:signal:<id>              one hash per struggle signal
+    <prefix>:<session>:tasks                    set of task ids
+    <prefix>:<session>:tasks:status:<status>    task ids by status
+    <prefix>:<session>:tasks:assignee:<role>    task ids by assignee
+    <prefix>:<session>:artifacts|gates|signals  sets of ids
+    <prefix>:<session>:signals:unresolved       unresolved signal ids
+    <prefix>:<session>:review_queue             list of artifact ids
+    <prefix>:<session>:audit_stream             audit log (stream of recent entries)
+    <prefix>:<session>:audit_archive            compressed chunks of older audit entries
+
+Hash fields hold the JSON encoding of each model field. Claiming a task,
+submitting an artifact, reviewing one and changing an agent's state run as
+Lua scripts that check the contract rules and apply the change atomically,
+so two agents cannot both claim the same task. save_blackboard rewrites
+every key of a session and is only meant for bulk import.
+
+Audit entries record only the fields an operation changed. Appending never
+trims the audit stream; compact_audit_log moves older entries into the
+archive and only then deletes them from the stream.
+"""
+
+from typing import Any, Dict, List, Optional, Type, TypeVar
+from datetime import datetime
+import base64
 import json
 import logging
+import zlib
 import redis.asyncio as redis
+from pydantic import BaseModel
 
-from .models import AgentBlackboard
+from .models import (
+    TaskStatus,
+    BlackboardTask,
+    BlackboardArtifact,
+    ApprovalGate,
+    StruggleSignalEntry,
+    AuditLogEntry,
+    AgentBlackboard,
+)
+from .operations import BlackboardOperations
+from .audit import diff_states
+from ..contracts.violations import ContractViolation
+from ..contracts.tier_rules import RuleTier
 
 logger = logging.getLogger(__name__)
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+META_FIELDS = ("session_id", "agent_states", "session_context", "created_at", "last_modified")
+
+
+# KEYS: task, meta
+# ARGV: task_id, agent_role, reviewer, claimed_at, last_modified, session key base
+CLAIM_TASK_SCRIPT = """
+local task, meta = KEYS[1], KEYS[2]
+local task_id, agent, base = ARGV[1], ARGV[2], ARGV[6]
+if redis.call('EXISTS', task) == 0 then return {'not_found'} end
+
+local status = cjson.decode(redis.call('HGET', task, 'status'))
+if status ~= 'unclaimed' then return {'not_unclaimed', status} end
+
+for _, role in ipairs(cjson.decode(redis.call('HGET', task, 'failed_by'))) do
+    if role == agent then return {'failed_before'} end
+end
+
+for _, dep in ipairs(cjson.decode(redis.call('HGET', task, 'dependencies'))) do
+    local dep_status = redis.call('HGET', base .. 'task:' .. dep, 'status')
+    if dep_status then
+        dep_status = cjson.decode(dep_status)
+        if dep_status ~= 'merged' then return {'dependency', dep, dep_status} end
+    end
+end
+
+local previous = redis.call('HGETALL', task)
+redis.call('HSET', task,
+    'status', cjson.encode('claimed'),
+    'assigned_to', cjson.encode(agent),
+    'reviewer', cjson.encode(ARGV[3]),
+    'claimed_at', ARGV[4])
+redis.call('SMOVE', base .. 'tasks:status:' .. status, base .. 'tasks:status:claimed', task_id)
+redis.call('SADD', base .. 'tasks:assignee:' .. agent, task_id)
+redis.call('HSET', meta, 'last_modified', ARGV[5])
+return {'ok', unpack(previous)}
+"""
+
+# KEYS: task, artifact, meta
+# ARGV: task_id, artifact_id, agent_role, last_modified, session key base, artifact field/value pairs...
+SUBMIT_ARTIFACT_SCRIPT = """
+local task, artifact, meta = KEYS[1], KEYS[2], KEYS[3]
+local task_id, artifact_id, agent, base = ARGV[1], ARGV[2], ARGV[3], ARGV[5]
+if redis.call('EXISTS', task) == 0 then return {'not_found'} end
+
+local assigned_to = redis.call('HGET', task, 'assigned_to')
+if cjson.decode(assigned_to) ~= agent then return {'not_assigned', assigned_to} end
+
+local fields = {}
+for i = 6, #ARGV do fields[#fields + 1] = ARGV[i] end
+redis.call('HSET', artifact, unpack(fields))
+redis.call('SADD', base .. 'artifacts', artifact_id)
+redis.call('RPUSH', base .. 'review_queue', artifact_id)
+
+local status = cjson.decode(redis.call('HGET', task, 'status'))
+redis.call('HSET', task, 'status', cjson.encode('ready_for_review'))
+redis.call('SMOVE', base .. 'tasks:status:' .. status, base .. 'tasks:status:ready_for_review', task_id)
+redis.call('HSET', meta, 'last_modified', ARGV[4])
+return {'ok'}
+"""
+
+# KEYS: artifact, meta
+# ARGV: artifact_id, reviewer_role, approved (1/0), notes, reviewed_at, last_modified, session key base
+REVIEW_ARTIFACT_SCRIPT = """
+local artifact, meta = KEYS[1], KEYS[2]
+local artifact_id, reviewer, approved, notes, base = ARGV[1], ARGV[2], ARGV[3] == '1', ARGV[4], ARGV[7]
+if redis.call('EXISTS', artifact) == 0 then return {'not_found'} end
+
+if cjson.decode(redis.call('HGET', artifact, 'created_by')) == reviewer then return {'own_work'} end
+
+local task_id = cjson.decode(redis.call('HGET', artifact, 'task_id'))
+local task = base .. 'task:' .. task_id
+local has_task = redis.call('EXISTS', task) == 1
+if has_task then
+    local assigned_reviewer = redis.call('HGET', task, 'reviewer')
+    if cjson.decode(assigned_reviewer) ~= reviewer then return {'wrong_reviewer', assigned_reviewer} end
+end
+
+local previous = redis.call('HGETALL', artifact)
+redis.call('HSET', artifact,
+    'reviewed_by', cjson.encode(reviewer),
+    'review_status', cjson.encode(approved and 'approved' or 'rejected'),
+    'review_notes', cjson.encode(notes),
+    'reviewed_at', ARGV[5])
+
+if has_task then
+    local status = cjson.decode(redis.call('HGET', task, 'status'))
+    local new_status = approved and 'approved' or 'rejected'
+    redis.call('HSET', task, 'status', cjson.encode(new_status))
+    redis.call('SMOVE', base .. 'tasks:status:' .. status, base .. 'tasks:status:' .. new_status, task_id)
+    if not approved then
+        local failure_count = cjson.decode(redis.call('HGET', task, 'failure_count'))
+        redis.call('HSET', task, 'failure_count', cjson.encode(failure_count + 1))
+
+        local assigned_to = cjson.decode(redis.call('HGET', task, 'assigned_to'))
+        local failed_by = cjson.decode(redis.call('HGET', task, 'failed_by'))
+        if type(assigned_to) == 'string' then
+            local seen = false
+            for _, role in ipairs(failed_by) do
+                if role == assigned_to then seen = true end
+            end
+            if not seen then
+                table.insert(failed_by, assigned_to)
+                redis.call('HSET', task, 'failed_by', cjson.encode(failed_by))
+            end
+        end
+
+        local reasons = cjson.decode(redis.call('HGET', task, 'failure_reasons'))
+        table.insert(reasons, notes)
+        redis.call('HSET', task, 'failure_reasons', cjson.encode(reasons))
+    end
+end
+
+redis.call('LREM', base .. 'review_queue', 0, artifact_id)
+redis.call('HSET', meta, 'last_modified', ARGV[6])
+return {'ok', unpack(previous)}
+"""
+
+# KEYS: meta
+# ARGV: agent_role, expected state ('' to skip the check), new state, last_modified
+SET_AGENT_STATE_SCRIPT = """
+local meta = KEYS[1]
+local agent, expected = ARGV[1], ARGV[2]
+local states = cjson.decode(redis.call('HGET', meta, 'agent_states') or '{}')
+local current = states[agent] or 'idle'
+if expected ~= '' and current ~= expected then return {'changed', current} end
+
+states[agent] = ARGV[3]
+redis.call('HSET', meta, 'agent_states', cjson.encode(states), 'last_modified', ARGV[4])
+return {'ok', current}
+"""
+
+
+def _encode(model: BaseModel) -> Dict[str, str]:
+    """Hash fields of a model: the JSON encoding of each field."""
+    return {name: json.dumps(value) for name, value in model.model_dump(mode="json").items()}
+
+
+def _decode(model_class: Type[ModelT], fields: Dict[str, str]) -> ModelT:
+    """Rebuild a model from its hash fields."""
+    return model_class.model_validate({name: json.loads(value) for name, value in fields.items()})
+
+
+def _pairs(flat: List[str]) -> Dict[str, str]:
+    """HGETALL reply as returned by a script (flat field/value list) to a dict."""
+    return dict(zip(flat[0::2], flat[1::2]))
+
+
+def _pack_audit_chunk(entries: List[dict]) -> str:
+    """Compress audit entries into one archive chunk."""
+    lines = "\n".join(json.dumps(entry) for entry in entries)
+    return json.dumps({
+        "first_id": entries[0].get("stream_id"),
+        "last_id": entries[-1].get("stream_id"),
+        "count": len(entries),
+        "data": base64.b64encode(zlib.compress(lines.encode("utf-8"))).decode("ascii")
+    })
+
+
+def _unpack_audit_chunk(chunk: str) -> List[dict]:
+    """Audit entries of an archive chunk."""
+    data = json.loads(chunk)["data"]
+    lines = zlib.decompress(base64.b64decode(data)).decode("utf-8")
+    return [json.loads(line) for line in lines.splitlines()]
+
+
+def _audit_entry(
+    session_id: str,
+    agent: str,
+    action: str,
+    entity_type: str,
+    entity_id: str,
+    previous_state: Optional[Dict[str, Any]],
+    new_state: Dict[str, Any]
+) -> dict:
+    """Audit log entry for a blackboard operation, ready to append."""
+    previous_state, new_state = diff_states(previous_state, new_state)
+    return AuditLogEntry(
+        agent=agent,
+        action=action,
+        entity_type=entity_type,
+        entity_id=entity_id,
+        previous_state=previous_state,
+        new_state=new_state,
+        session_id=session_id
+    ).model_dump(mode="json")
+
 
 class RedisBlackboardStore:
     """
     Redis-backed persistence for the blackboard.
-    
+
     Provides atomic state operations and replaces pub/sub
     with centralized state management.
     """
-    
-    def __init__(self, redis_client: redis.Redis, key_prefix: str = "blackboard"):
+
+    def __init__(
+        self,
+        redis_client: redis.Redis,
+        key_prefix: str = "blackboard"
+    ):
         self.redis = redis_client
         self.key_prefix = key_prefix
-    
+        self._claim_task = redis_client.register_script(CLAIM_TASK_SCRIPT)
+        self._submit_artifact = redis_client.register_script(SUBMIT_ARTIFACT_SCRIPT)
+        self._review_artifact = redis_client.register_script(REVIEW_ARTIFACT_SCRIPT)
+        self._set_agent_state = redis_client.register_script(SET_AGENT_STATE_SCRIPT)
+
     @classmethod
     async def create(
         cls,
@@ -50,73 +290,575 @@ class RedisBlackboardStore:
         except Exception as e:
             logger.warning(f"Could not connect to Redis: {e}. Using in-memory fallback.")
             return InMemoryBlackboardStore()
-        
+
         return cls(redis_client)
-    
+
+    # -------------------------------------------------------------------------
+    # Keys
+    # -------------------------------------------------------------------------
+
+    def _base(self, session_id: str) -> str:
+        """Prefix of all keys of a session's blackboard."""
+        return f"{self.key_prefix}:{session_id}:"
+
     def _get_key(self, session_id: str) -> str:
-        """Get the Redis key for a session's blackboard."""
-        return f"{self.key_prefix}:{session_id}:state"
-    
+        """Get the Redis key of a session's blackboard fields."""
+        return f"{self._base(session_id)}meta"
+
+    def _get_legacy_key(self, session_id: str) -> str:
+        """Key of a blackboard saved as a single JSON document by earlier versions."""
+        return f"{self._base(session_id)}state"
+
     def _get_audit_key(self, session_id: str) -> str:
-        """Get the Redis key for a session's audit log."""
-        return f"{self.key_prefix}:{session_id}:audit"
-    
+        """Get the Redis key for a session's audit stream."""
+        return f"{self._base(session_id)}audit_stream"
+
+    def _get_legacy_audit_key(self, session_id: str) -> str:
+        """Key of the unbounded audit list written by earlier versions."""
+        return f"{self._base(session_id)}audit"
+
+    def _get_audit_archive_key(self, session_id: str) -> str:
+        """Get the Redis key of a session's compressed audit archive."""
+        return f"{self._base(session_id)}audit_archive"
+
+    def _entity_key(self, session_id: str, kind: str, entity_id: str) -> str:
+        return f"{self._base(session_id)}{kind}:{entity_id}"
+
+    # -------------------------------------------------------------------------
+    # Whole blackboard
+    # -------------------------------------------------------------------------
+
     async def save_blackboard(self, blackboard: AgentBlackboard) -> None:
-        """Atomically save the entire blackboard state."""
-        key = self._get_key(blackboard.session_id)
-        await self.redis.set(key, blackboard.model_dump_json())
-        logger.debug(f"Saved blackboard for session {blackboard.session_id}")
-    
+        """
+        Atomically replace the entire blackboard state.
+
+        Every key of the session is rewritten, undoing any change made since
+        the blackboard was loaded. Use it for bulk import only; agents change
+        the blackboard through the incremental operations.
+        """
+        session_id = blackboard.session_id
+        base = self._base(session_id)
+        audit_prefix = self._get_legacy_audit_key(session_id)
+        stale = [
+            key async for key in self.redis.scan_iter(match=f"{base}*")
+            if not key.startswith(audit_prefix)
+        ]
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if stale:
+                pipe.delete(*stale)
+            pipe.hset(self._get_key(session_id), mapping=self._meta_fields(blackboard))
+            for task in blackboard.tasks.values():
+                self._queue_task(pipe, session_id, task)
+            for artifact in blackboard.artifacts.values():
+                pipe.hset(self._entity_key(session_id, "artifact", artifact.artifact_id), mapping=_encode(artifact))
+                pipe.sadd(f"{base}artifacts", artifact.artifact_id)
+            for gate in blackboard.approval_gates.values():
+                pipe.hset(self._entity_key(session_id, "gate", gate.gate_id), mapping=_encode(gate))
+                pipe.sadd(f"{base}gates", gate.gate_id)
+            for signal in blackboard.struggle_signals.values():
+                self._queue_signal(pipe, session_id, signal)
+            if blackboard.review_queue:
+                pipe.rpush(f"{base}review_queue", *blackboard.review_queue)
+            await pipe.execute()
+        logger.debug(f"Saved blackboard for session {session_id}")
+
     async def load_blackboard(self, session_id: str) -> Optional[AgentBlackboard]:
-        """Load a blackboard for a session."""
-        key = self._get_key(session_id)
-        data = await self.redis.get(key)
-        
-        if data:
-            return AgentBlackboard.model_validate_json(data)
-        return None
-    
+        """Load the entire blackboard for a session."""
+        base = self._base(session_id)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.hgetall(self._get_key(session_id))
+            pipe.smembers(f"{base}tasks")
+            pipe.smembers(f"{base}artifacts")
+            pipe.smembers(f"{base}gates")
+            pipe.smembers(f"{base}signals")
+            pipe.lrange(f"{base}review_queue", 0, -1)
+            meta, task_ids, artifact_ids, gate_ids, signal_ids, review_queue = await pipe.execute()
+
+        if not meta:
+            return await self._migrate_legacy(session_id)
+
+        tasks = await self._load_many(session_id, "task", BlackboardTask, task_ids)
+        artifacts = await self._load_many(session_id, "artifact", BlackboardArtifact, artifact_ids)
+        gates = await self._load_many(session_id, "gate", ApprovalGate, gate_ids)
+        signals = await self._load_many(session_id, "signal", StruggleSignalEntry, signal_ids)
+
+        fields = {name: json.loads(value) for name, value in meta.items()}
+        return AgentBlackboard(
+            **fields,
+            tasks={task.task_id: task for task in tasks},
+            artifacts={artifact.artifact_id: artifact for artifact in artifacts},
+            approval_gates={gate.gate_id: gate for gate in gates},
+            struggle_signals={signal.signal_id: signal for signal in signals},
+            review_queue=review_queue
+        )
+
+    async def _migrate_legacy(self, session_id: str) -> Optional[AgentBlackboard]:
+        """Convert a blackboard stored as one JSON document to the decomposed layout."""
+        data = await self.redis.get(self._get_legacy_key(session_id))
+        if not data:
+            return None
+        blackboard = AgentBlackboard.model_validate_json(data)
+        await self.save_blackboard(blackboard)
+        logger.info(f"Migrated blackboard for session {session_id} to per-entity layout")
+        return blackboard
+
     async def create_blackboard(self, session_id: str) -> AgentBlackboard:
         """Create a new blackboard for a session."""
         blackboard = AgentBlackboard(session_id=session_id)
         await self.save_blackboard(blackboard)
         return blackboard
-    
+
     async def get_or_create_blackboard(self, session_id: str) -> AgentBlackboard:
         """Get existing or create new blackboard for a session."""
         blackboard = await self.load_blackboard(session_id)
         if not blackboard:
             blackboard = await self.create_blackboard(session_id)
         return blackboard
-    
+
     async def delete_blackboard(self, session_id: str) -> bool:
         """Delete a blackboard for a session."""
-        key = self._get_key(session_id)
-        result = await self.redis.delete(key)
+        keys = [key async for key in self.redis.scan_iter(match=f"{self._base(session_id)}*")]
+        if not keys:
+            return False
+        result = await self.redis.delete(*keys)
         return result > 0
-    
+
+    # -------------------------------------------------------------------------
+    # Incremental access
+    # -------------------------------------------------------------------------
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Whether a blackboard exists for a session."""
+        if await self.redis.exists(self._get_key(session_id)):
+            return True
+        return await self._migrate_legacy(session_id) is not None
+
+    async def ensure_session(self, session_id: str) -> None:
+        """Create an empty blackboard for a session unless one exists."""
+        if not await self.session_exists(session_id):
+            blackboard = AgentBlackboard(session_id=session_id)
+            key = self._get_key(session_id)
+            for name, value in self._meta_fields(blackboard).items():
+                await self.redis.hsetnx(key, name, value)
+
+    async def get_task(self, session_id: str, task_id: str) -> Optional[BlackboardTask]:
+        """Load a single task."""
+        fields = await self.redis.hgetall(self._entity_key(session_id, "task", task_id))
+        return _decode(BlackboardTask, fields) if fields else None
+
+    async def get_agent_state(self, session_id: str, agent_role: str) -> str:
+        """Current state of an agent, idle if it has none."""
+        states = await self.redis.hget(self._get_key(session_id), "agent_states")
+        return json.loads(states).get(agent_role, "idle") if states else "idle"
+
+    async def list_tasks(
+        self,
+        session_id: str,
+        status: Optional[str] = None,
+        assigned_to: Optional[str] = None
+    ) -> List[BlackboardTask]:
+        """Load the tasks matching the filters, using the status and assignee indexes."""
+        base = self._base(session_id)
+        index_keys = []
+        if status:
+            index_keys.append(f"{base}tasks:status:{status}")
+        if assigned_to:
+            index_keys.append(f"{base}tasks:assignee:{assigned_to}")
+
+        if not index_keys:
+            task_ids = await self.redis.smembers(f"{base}tasks")
+        elif len(index_keys) == 1:
+            task_ids = await self.redis.smembers(index_keys[0])
+        else:
+            task_ids = await self.redis.sinter(index_keys)
+        return await self._load_many(session_id, "task", BlackboardTask, task_ids)
+
+    async def get_artifact(self, session_id: str, artifact_id: str) -> Optional[BlackboardArtifact]:
+        """Load a single artifact."""
+        fields = await self.redis.hgetall(self._entity_key(session_id, "artifact", artifact_id))
+        return _decode(BlackboardArtifact, fields) if fields else None
+
+    async def get_review_queue(
+        self,
+        session_id: str,
+        reviewer_role: Optional[str] = None
+    ) -> List[BlackboardArtifact]:
+        """Load the artifacts awaiting review, optionally only those for one reviewer."""
+        artifact_ids = await self.redis.lrange(f"{self._base(session_id)}review_queue", 0, -1)
+        artifacts = await self._load_many(session_id, "artifact", BlackboardArtifact, artifact_ids)
+        if not reviewer_role:
+            return artifacts
+
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for artifact in artifacts:
+                pipe.hget(self._entity_key(session_id, "task", artifact.task_id), "reviewer")
+            reviewers = await pipe.execute()
+        return [
+            artifact for artifact, reviewer in zip(artifacts, reviewers)
+            if reviewer is not None and json.loads(reviewer) == reviewer_role
+        ]
+
+    async def list_struggle_signals(
+        self,
+        session_id: str,
+        unresolved_only: bool = True
+    ) -> List[StruggleSignalEntry]:
+        """Load struggle signals."""
+        index = "signals:unresolved" if unresolved_only else "signals"
+        signal_ids = await self.redis.smembers(f"{self._base(session_id)}{index}")
+        return await self._load_many(session_id, "signal", StruggleSignalEntry, signal_ids)
+
+    async def add_task(self, session_id: str, creator_role: str, task: BlackboardTask) -> BlackboardTask:
+        """Create a new task on a session's blackboard."""
+        task.created_by = creator_role
+        await self.ensure_session(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._queue_task(pipe, session_id, task)
+            self._queue_touch(pipe, session_id)
+            await pipe.execute()
+        await self.append_audit_entry(session_id, _audit_entry(
+            session_id, creator_role, "create_task", "task", task.task_id, None, task.model_dump(mode="json")
+        ))
+        return task
+
+    async def add_struggle_signal(
+        self,
+        session_id: str,
+        agent_role: str,
+        signal: StruggleSignalEntry
+    ) -> StruggleSignalEntry:
+        """Post a struggle signal on a session's blackboard."""
+        signal.agent = agent_role
+        await self.ensure_session(session_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._queue_signal(pipe, session_id, signal)
+            self._queue_touch(pipe, session_id)
+            await pipe.execute()
+        await self.append_audit_entry(session_id, _audit_entry(
+            session_id, agent_role, "signal_struggle", "struggle_signal", signal.signal_id,
+            None, signal.model_dump(mode="json")
+        ))
+        logger.info(f"Struggle signal from {agent_role}: {signal.signal_type}")
+        return signal
+
+    # -------------------------------------------------------------------------
+    # Atomic operations
+    # -------------------------------------------------------------------------
+
+    async def claim_task(self, session_id: str, agent_role: str, task_id: str) -> BlackboardTask:
+        """
+        Atomically claim an unclaimed task.
+
+        Enforces the same contract rules as BlackboardOperations.claim_task.
+        """
+        reviewer = BlackboardOperations.reviewer_for_role(agent_role)
+        now = datetime.utcnow()
+        result = await self._claim_task(
+            keys=[self._entity_key(session_id, "task", task_id), self._get_key(session_id)],
+            args=[task_id, agent_role, reviewer, json.dumps(now.isoformat()),
+                  json.dumps(now.isoformat()), self._base(session_id)]
+        )
+        code, details = result[0], result[1:]
+        if code == "not_found":
+            raise ValueError(f"Task {task_id} not found")
+        if code == "not_unclaimed":
+            raise ContractViolation(
+                rule="Cannot claim already-claimed task",
+                tier=RuleTier.TIER_1,
+                context=f"Task {task_id} is {details[0]}",
+                agent_role=agent_role,
+                session_id=session_id
+            )
+        if code == "failed_before":
+            raise ContractViolation(
+                rule="Cannot claim task previously failed by this agent",
+                tier=RuleTier.TIER_1,
+                context=f"Agent {agent_role} already failed task {task_id}",
+                agent_role=agent_role,
+                session_id=session_id
+            )
+        if code == "dependency":
+            raise ContractViolation(
+                rule="Cannot claim task with unsatisfied dependencies",
+                tier=RuleTier.TIER_1,
+                context=f"Dependency {details[0]} is {details[1]}",
+                agent_role=agent_role,
+                session_id=session_id
+            )
+
+        previous = _decode(BlackboardTask, _pairs(details))
+        task = previous.model_copy(update={
+            "status": TaskStatus.CLAIMED,
+            "assigned_to": agent_role,
+            "reviewer": reviewer,
+            "claimed_at": now
+        })
+        await self.append_audit_entry(session_id, _audit_entry(
+            session_id, agent_role, "claim_task", "task", task_id,
+            previous.model_dump(mode="json"), task.model_dump(mode="json")
+        ))
+        return task
+
+    async def submit_artifact(
+        self,
+        session_id: str,
+        agent_role: str,
+        artifact: BlackboardArtifact
+    ) -> BlackboardArtifact:
+        """
+        Atomically store an artifact, queue it for review and mark its task ready for review.
+
+        Enforces the same contract rules as BlackboardOperations.submit_artifact.
+        """
+        fields = []
+        for name, value in _encode(artifact).items():
+            fields.extend((name, value))
+        result = await self._submit_artifact(
+            keys=[
+                self._entity_key(session_id, "task", artifact.task_id),
+                self._entity_key(session_id, "artifact", artifact.artifact_id),
+                self._get_key(session_id)
+            ],
+            args=[artifact.task_id, artifact.artifact_id, agent_role,
+                  json.dumps(datetime.utcnow().isoformat()), self._base(session_id), *fields]
+        )
+        code = result[0]
+        if code == "not_found":
+            raise ValueError(f"Task {artifact.task_id} not found")
+        if code == "not_assigned":
+            raise ContractViolation(
+                rule="Can only submit artifacts for assigned tasks",
+                tier=RuleTier.TIER_1,
+                context=f"Task assigned to {json.loads(result[1])}, not {agent_role}",
+                agent_role=agent_role,
+                session_id=session_id
+            )
+
+        await self.append_audit_entry(session_id, _audit_entry(
+            session_id, agent_role, "submit_artifact", "artifact", artifact.artifact_id,
+            None, artifact.model_dump(mode="json")
+        ))
+        return artifact
+
+    async def review_artifact(
+        self,
+        session_id: str,
+        reviewer_role: str,
+        artifact_id: str,
+        approved: bool,
+        notes: str
+    ) -> BlackboardArtifact:
+        """
+        Atomically approve or reject an artifact and update its task.
+
+        Enforces the same contract rules as BlackboardOperations.review_artifact.
+        """
+        now = datetime.utcnow()
+        result = await self._review_artifact(
+            keys=[self._entity_key(session_id, "artifact", artifact_id), self._get_key(session_id)],
+            args=[artifact_id, reviewer_role, "1" if approved else "0", notes,
+                  json.dumps(now.isoformat()), json.dumps(now.isoformat()), self._base(session_id)]
+        )
+        code, details = result[0], result[1:]
+        if code == "not_found":
+            raise ValueError(f"Artifact {artifact_id} not found")
+        if code == "own_work":
+            raise ContractViolation(
+                rule="Agents cannot review their own work",
+                tier=RuleTier.TIER_0,
+                context=f"Agent {reviewer_role} created artifact {artifact_id}",
+                agent_role=reviewer_role,
+                session_id=session_id
+            )
+        if code == "wrong_reviewer":
+            raise ContractViolation(
+                rule="Only assigned reviewer can review",
+                tier=RuleTier.TIER_1,
+                context=f"Assigned reviewer is {json.loads(details[0])}, not {reviewer_role}",
+                agent_role=reviewer_role,
+                session_id=session_id
+            )
+
+        previous = _decode(BlackboardArtifact, _pairs(details))
+        artifact = previous.model_copy(update={
+            "reviewed_by": reviewer_role,
+            "review_status": "approved" if approved else "rejected",
+            "review_notes": notes,
+            "reviewed_at": now
+        })
+        await self.append_audit_entry(session_id, _audit_entry(
+            session_id, reviewer_role, "review_artifact", "artifact", artifact_id,
+            previous.model_dump(mode="json"), artifact.model_dump(mode="json")
+        ))
+        return artifact
+
+    async def set_agent_state(
+        self,
+        session_id: str,
+        agent_role: str,
+        state: str,
+        expected_state: Optional[str] = None
+    ) -> bool:
+        """
+        Atomically change an agent's state in the session fields.
+
+        Args:
+            session_id: Session ID
+            agent_role: Agent whose state changes
+            state: New state
+            expected_state: Only change the state if it is still this one
+
+        Returns:
+            False if the agent's state was no longer expected_state
+        """
+        await self.ensure_session(session_id)
+        result = await self._set_agent_state(
+            keys=[self._get_key(session_id)],
+            args=[agent_role, expected_state or "", state, json.dumps(datetime.utcnow().isoformat())]
+        )
+        return result[0] == "ok"
+
+    # -------------------------------------------------------------------------
+    # Helpers
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _meta_fields(blackboard: AgentBlackboard) -> Dict[str, str]:
+        data = blackboard.model_dump(mode="json", include=set(META_FIELDS))
+        return {name: json.dumps(value) for name, value in data.items()}
+
+    def _queue_task(self, pipe, session_id: str, task: BlackboardTask) -> None:
+        base = self._base(session_id)
+        pipe.hset(self._entity_key(session_id, "task", task.task_id), mapping=_encode(task))
+        pipe.sadd(f"{base}tasks", task.task_id)
+        pipe.sadd(f"{base}tasks:status:{task.status.value}", task.task_id)
+        if task.assigned_to:
+            pipe.sadd(f"{base}tasks:assignee:{task.assigned_to}", task.task_id)
+
+    def _queue_signal(self, pipe, session_id: str, signal: StruggleSignalEntry) -> None:
+        base = self._base(session_id)
+        pipe.hset(self._entity_key(session_id, "signal", signal.signal_id), mapping=_encode(signal))
+        pipe.sadd(f"{base}signals", signal.signal_id)
+        if signal.resolved:
+            pipe.srem(f"{base}signals:unresolved", signal.signal_id)
+        else:
+            pipe.sadd(f"{base}signals:unresolved", signal.signal_id)
+
+    def _queue_touch(self, pipe, session_id: str) -> None:
+        pipe.hset(self._get_key(session_id), "last_modified", json.dumps(datetime.utcnow().isoformat()))
+
+    async def _load_many(
+        self,
+        session_id: str,
+        kind: str,
+        model_class: Type[ModelT],
+        entity_ids
+    ) -> List[ModelT]:
+        """Load entities of one kind in a single round trip, preserving order."""
+        entity_ids = list(entity_ids)
+        if not entity_ids:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for entity_id in entity_ids:
+                pipe.hgetall(self._entity_key(session_id, kind, entity_id))
+            results = await pipe.execute()
+        return [_decode(model_class, fields) for fields in results if fields]
+
+    # -------------------------------------------------------------------------
+    # Audit log and sessions
+    # -------------------------------------------------------------------------
+
     async def append_audit_entry(self, session_id: str, entry: dict) -> None:
-        """Append an audit log entry."""
-        key = self._get_audit_key(session_id)
-        await self.redis.rpush(key, json.dumps(entry))
-    
-    async def get_audit_log(self, session_id: str, limit: int = 100) -> list:
-        """Get audit log entries for a session."""
+        """Append an audit log entry. The stream is only shortened by compact_audit_log."""
+        await self.redis.xadd(self._get_audit_key(session_id), {"entry": json.dumps(entry)})
+
+    async def get_audit_log(
+        self,
+        session_id: str,
+        limit: int = 100,
+        before: Optional[str] = None
+    ) -> list:
+        """
+        Get a page of audit log entries for a session.
+
+        Args:
+            session_id: Session ID
+            limit: Maximum number of entries
+            before: Cursor; only entries older than this stream ID are returned
+
+        Returns:
+            The newest `limit` matching entries, oldest first. Each entry carries
+            its `stream_id`; the first entry's ID is the cursor of the previous page.
+        """
+        rows = await self.redis.xrevrange(
+            self._get_audit_key(session_id),
+            max=f"({before}" if before else "+",
+            min="-",
+            count=limit
+        )
+        entries = []
+        for stream_id, fields in reversed(rows):
+            entry = json.loads(fields["entry"])
+            entry["stream_id"] = stream_id
+            entries.append(entry)
+        return entries
+
+    async def compact_audit_log(self, session_id: str, keep: int) -> int:
+        """
+        Move all but the newest `keep` audit entries into the compressed archive.
+
+        Audit lists written by earlier versions are archived and removed as well.
+
+        Returns:
+            Number of entries archived
+        """
         key = self._get_audit_key(session_id)
-        entries = await self.redis.lrange(key, -limit, -1)
-        return [json.loads(e) for e in entries]
-    
+        archive_key = self._get_audit_archive_key(session_id)
+        legacy_key = self._get_legacy_audit_key(session_id)
+        archived = 0
+
+        if await self.redis.type(legacy_key) == "list":
+            legacy = [json.loads(e) for e in await self.redis.lrange(legacy_key, 0, -1)]
+            async with self.redis.pipeline(transaction=True) as pipe:
+                if legacy:
+                    pipe.rpush(archive_key, _pack_audit_chunk(legacy))
+                pipe.delete(legacy_key)
+                await pipe.execute()
+            archived += len(legacy)
+
+        excess = await self.redis.xlen(key) - keep
+        if excess > 0:
+            rows = await self.redis.xrange(key, min="-", max="+", count=excess)
+            entries = []
+            for stream_id, fields in rows:
+                entry = json.loads(fields["entry"])
+                entry["stream_id"] = stream_id
+                entries.append(entry)
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(archive_key, _pack_audit_chunk(entries))
+                pipe.xdel(key, *[stream_id for stream_id, _ in rows])
+                await pipe.execute()
+            archived += len(entries)
+
+        return archived
+
+    async def get_archived_audit_log(self, session_id: str) -> list:
+        """Get all archived audit entries of a session, oldest first."""
+        chunks = await self.redis.lrange(self._get_audit_archive_key(session_id), 0, -1)
+        return [entry for chunk in chunks for entry in _unpack_audit_chunk(chunk)]
+
     async def list_sessions(self) -> list:
         """List all session IDs with blackboards."""
-        pattern = f"{self.key_prefix}:*:state"
-        keys = []
-        async for key in self.redis.scan_iter(match=pattern):
-            # Extract session_id from key
-            parts = key.split(":")
-            if len(parts) >= 2:
-                keys.append(parts[1])
-        return keys
-    
+        sessions = set()
+        for suffix in ("meta", "state"):
+            async for key in self.redis.scan_iter(match=f"{self.key_prefix}:*:{suffix}"):
+                # Extract session_id from key
+                parts = key.split(":")
+                if len(parts) >= 2:
+                    sessions.add(parts[1])
+        return list(sessions)
+
     async def close(self) -> None:
         """Close the Redis connection."""
         await self.redis.close()
@@ -125,56 +867,211 @@ class RedisBlackboardStore:
 class InMemoryBlackboardStore:
     """
     In-memory fallback store when Redis is not available.
-    
+
     Useful for development and testing.
     """
-    
+
     def __init__(self):
         self._blackboards: dict[str, AgentBlackboard] = {}
         self._audit_logs: dict[str, list] = {}
-    
+        self._audit_archives: dict[str, list] = {}
+        self._audit_sequence = 0
+
     async def save_blackboard(self, blackboard: AgentBlackboard) -> None:
         """Save the blackboard to memory."""
         self._blackboards[blackboard.session_id] = blackboard
-    
+
     async def load_blackboard(self, session_id: str) -> Optional[AgentBlackboard]:
         """Load a blackboard from memory."""
         return self._blackboards.get(session_id)
-    
+
     async def create_blackboard(self, session_id: str) -> AgentBlackboard:
         """Create a new blackboard."""
         blackboard = AgentBlackboard(session_id=session_id)
         self._blackboards[session_id] = blackboard
         return blackboard
-    
+
     async def get_or_create_blackboard(self, session_id: str) -> AgentBlackboard:
         """Get existing or create new blackboard."""
         if session_id not in self._blackboards:
             return await self.create_blackboard(session_id)
         return self._blackboards[session_id]
-    
+
     async def delete_blackboard(self, session_id: str) -> bool:
         """Delete a blackboard."""
         if session_id in self._blackboards:
             del self._blackboards[session_id]
             return True
         return False
-    
+
+    async def session_exists(self, session_id: str) -> bool:
+        """Whether a blackboard exists for a session."""
+        return session_id in self._blackboards
+
+    async def ensure_session(self, session_id: str) -> None:
+        """Create an empty blackboard for a session unless one exists."""
+        await self.get_or_create_blackboard(session_id)
+
+    async def get_task(self, session_id: str, task_id: str) -> Optional[BlackboardTask]:
+        """Get a single task."""
+        blackboard = self._blackboards.get(session_id)
+        return blackboard.tasks.get(task_id) if blackboard else None
+
+    async def get_agent_state(self, session_id: str, agent_role: str) -> str:
+        """Current state of an agent, idle if it has none."""
+        blackboard = self._blackboards.get(session_id)
+        return blackboard.agent_states.get(agent_role, "idle") if blackboard else "idle"
+
+    async def list_tasks(
+        self,
+        session_id: str,
+        status: Optional[str] = None,
+        assigned_to: Optional[str] = None
+    ) -> List[BlackboardTask]:
+        """Get the tasks matching the filters."""
+        blackboard = self._blackboards.get(session_id)
+        tasks = list(blackboard.tasks.values()) if blackboard else []
+        if status:
+            tasks = [t for t in tasks if t.status.value == status]
+        if assigned_to:
+            tasks = [t for t in tasks if t.assigned_to == assigned_to]
+        return tasks
+
+    async def get_artifact(self, session_id: str, artifact_id: str) -> Optional[BlackboardArtifact]:
+        """Get a single artifact."""
+        blackboard = self._blackboards.get(session_id)
+        return blackboard.artifacts.get(artifact_id) if blackboard else None
+
+    async def get_review_queue(
+        self,
+        session_id: str,
+        reviewer_role: Optional[str] = None
+    ) -> List[BlackboardArtifact]:
+        """Get the artifacts awaiting review, optionally only those for one reviewer."""
+        blackboard = self._blackboards.get(session_id)
+        if not blackboard:
+            return []
+        if reviewer_role:
+            return blackboard.get_review_queue_for_reviewer(reviewer_role)
+        return [blackboard.artifacts[aid] for aid in blackboard.review_queue if aid in blackboard.artifacts]
+
+    async def list_struggle_signals(
+        self,
+        session_id: str,
+        unresolved_only: bool = True
+    ) -> List[StruggleSignalEntry]:
+        """Get struggle signals."""
+        blackboard = self._blackboards.get(session_id)
+        if not blackboard:
+            return []
+        if unresolved_only:
+            return blackboard.get_unresolved_struggle_signals()
+        return list(blackboard.struggle_signals.values())
+
+    async def _apply(self, session_id: str, operation: str, *args) -> Any:
+        """Run a BlackboardOperations method on a session and keep its audit entries."""
+        blackboard = self._blackboards.get(session_id)
+        if not blackboard:
+            raise ValueError(f"Session {session_id} not found")
+        ops = BlackboardOperations(blackboard)
+        try:
+            return await getattr(ops, operation)(*args)
+        finally:
+            for entry in ops.get_audit_log():
+                await self.append_audit_entry(session_id, entry.model_dump(mode="json"))
+
+    async def add_task(self, session_id: str, creator_role: str, task: BlackboardTask) -> BlackboardTask:
+        """Create a new task on a session's blackboard."""
+        await self.ensure_session(session_id)
+        return await self._apply(session_id, "create_task", creator_role, task)
+
+    async def add_struggle_signal(
+        self,
+        session_id: str,
+        agent_role: str,
+        signal: StruggleSignalEntry
+    ) -> StruggleSignalEntry:
+        """Post a struggle signal on a session's blackboard."""
+        await self.ensure_session(session_id)
+        return await self._apply(session_id, "signal_struggle", agent_role, signal)
+
+    async def claim_task(self, session_id: str, agent_role: str, task_id: str) -> BlackboardTask:
+        """Claim an unclaimed task."""
+        return await self._apply(session_id, "claim_task", agent_role, task_id)
+
+    async def submit_artifact(
+        self,
+        session_id: str,
+        agent_role: str,
+        artifact: BlackboardArtifact
+    ) -> BlackboardArtifact:
+        """Submit an artifact for review."""
+        return await self._apply(session_id, "submit_artifact", agent_role, artifact)
+
+    async def review_artifact(
+        self,
+        session_id: str,
+        reviewer_role: str,
+        artifact_id: str,
+        approved: bool,
+        notes: str
+    ) -> BlackboardArtifact:
+        """Approve or reject an artifact."""
+        return await self._apply(session_id, "review_artifact", reviewer_role, artifact_id, approved, notes)
+
+    async def set_agent_state(
+        self,
+        session_id: str,
+        agent_role: str,
+        state: str,
+        expected_state: Optional[str] = None
+    ) -> bool:
+        """Change an agent's state unless it is no longer expected_state."""
+        blackboard = await self.get_or_create_blackboard(session_id)
+        if expected_state and blackboard.agent_states.get(agent_role, "idle") != expected_state:
+            return False
+        blackboard.agent_states[agent_role] = state
+        blackboard.last_modified = datetime.utcnow()
+        return True
+
     async def append_audit_entry(self, session_id: str, entry: dict) -> None:
         """Append an audit log entry."""
-        if session_id not in self._audit_logs:
-            self._audit_logs[session_id] = []
-        self._audit_logs[session_id].append(entry)
-    
-    async def get_audit_log(self, session_id: str, limit: int = 100) -> list:
-        """Get audit log entries."""
+        self._audit_sequence += 1
+        entries = self._audit_logs.setdefault(session_id, [])
+        entries.append({**entry, "stream_id": f"{self._audit_sequence}-0"})
+
+    async def get_audit_log(
+        self,
+        session_id: str,
+        limit: int = 100,
+        before: Optional[str] = None
+    ) -> list:
+        """Get a page of audit log entries, oldest first, older than the `before` cursor."""
         entries = self._audit_logs.get(session_id, [])
+        if before:
+            cutoff = int(before.split("-")[0])
+            entries = [e for e in entries if int(e["stream_id"].split("-")[0]) < cutoff]
         return entries[-limit:]
-    
+
+    async def compact_audit_log(self, session_id: str, keep: int) -> int:
+        """Move all but the newest `keep` audit entries into the compressed archive."""
+        entries = self._audit_logs.get(session_id, [])
+        excess = len(entries) - keep
+        if excess <= 0:
+            return 0
+        self._audit_archives.setdefault(session_id, []).append(_pack_audit_chunk(entries[:excess]))
+        del entries[:excess]
+        return excess
+
+    async def get_archived_audit_log(self, session_id: str) -> list:
+        """Get all archived audit entries of a session, oldest first."""
+        chunks = self._audit_archives.get(session_id, [])
+        return [entry for chunk in chunks for entry in _unpack_audit_chunk(chunk)]
+
     async def list_sessions(self) -> list:
         """List all session IDs."""
         return list(self._blackboards.keys())
-    
+
     async def close(self) -> None:
         """No-op for in-memory store."""
         pass
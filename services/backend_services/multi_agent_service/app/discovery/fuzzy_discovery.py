@@ -10,11 +10,17 @@ Provides:
 - Fuzzy matching for agent search
 - Capability-based agent discovery
 - Forgiving search that handles typos and partial matches
+
+Registered agents' terms are indexed once: a sorted term list serves prefix
+lookups and a character bigram inverted index narrows substring and typo
+matches to candidate terms, so a search does not scan every agent.
 """
 
+from bisect import bisect_left, insort
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from difflib import SequenceMatcher
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
 import logging
 import re
 
@@ -272,12 +278,21 @@ class FuzzyAgentDiscovery:
     def __init__(
         self,
         min_score: float = 0.3,
-        max_results: int = 10
+        max_results: int = 10,
+        cache_size: int = 256
     ):
         self._agents: Dict[str, AgentCapability] = {}
         self._min_score = min_score
         self._max_results = max_results
+        self._cache_size = cache_size
+        
+        # Search index, maintained by register_agent
+        self._agent_terms: Dict[str, FrozenSet[str]] = {}
+        self._agent_order: Dict[str, int] = {}
         self._term_index: Dict[str, Set[str]] = {}
+        self._sorted_terms: List[str] = []
+        self._gram_index: Dict[str, Set[str]] = {}
+        self._result_cache: "OrderedDict[Tuple[Tuple[str, ...], int], List[SearchResult]]" = OrderedDict()
         
         self._initialize_default_agents()
     
@@ -287,16 +302,49 @@ class FuzzyAgentDiscovery:
             self.register_agent(agent)
     
     def register_agent(self, agent: AgentCapability) -> None:
-        """Register an agent for discovery."""
+        """Register an agent for discovery, replacing any agent with the same role."""
+        if agent.role in self._agents:
+            self._unindex_agent(agent.role)
+        
         self._agents[agent.role] = agent
+        self._agent_order.setdefault(agent.role, len(self._agent_order))
+        terms = frozenset(agent.get_searchable_terms())
+        self._agent_terms[agent.role] = terms
         
-        for term in agent.get_searchable_terms():
-            if term not in self._term_index:
-                self._term_index[term] = set()
-            self._term_index[term].add(agent.role)
+        for term in terms:
+            roles = self._term_index.get(term)
+            if roles is None:
+                roles = self._term_index[term] = set()
+                insort(self._sorted_terms, term)
+                for gram in self._grams(term):
+                    self._gram_index.setdefault(gram, set()).add(term)
+            roles.add(agent.role)
         
+        self._result_cache.clear()
         logger.debug(f"Registered agent for discovery: {agent.role}")
     
+    def _unindex_agent(self, role: str) -> None:
+        """Remove an agent's terms from the search index."""
+        for term in self._agent_terms.pop(role, frozenset()):
+            roles = self._term_index[term]
+            roles.discard(role)
+            if roles:
+                continue
+            del self._term_index[term]
+            del self._sorted_terms[bisect_left(self._sorted_terms, term)]
+            for gram in self._grams(term):
+                grams = self._gram_index[gram]
+                grams.discard(term)
+                if not grams:
+                    del self._gram_index[gram]
+    
+    @staticmethod
+    def _grams(term: str, padded: bool = True) -> Set[str]:
+        """Character bigrams of a term, padded with spaces to mark its ends."""
+        if padded:
+            term = f" {term} "
+        return {term[i:i + 2] for i in range(len(term) - 1)}
+    
     def search(
         self,
         query: str,
@@ -305,6 +353,9 @@ class FuzzyAgentDiscovery:
         """
         Search for agents matching the query.
         
+        Only agents sharing a candidate term with the query are scored;
+        results are cached per query until the next registration.
+        
         Args:
             query: Search query (can be multiple words)
             limit: Maximum number of results
@@ -318,18 +369,18 @@ class FuzzyAgentDiscovery:
         limit = limit or self._max_results
         query_terms = self._tokenize(query)
         
-        scores: Dict[str, Tuple[float, List[str], str]] = {}
+        cache_key = (tuple(query_terms), limit)
+        cached = self._result_cache.get(cache_key)
+        if cached is not None:
+            self._result_cache.move_to_end(cache_key)
+            return list(cached)
         
-        for agent_role, agent in self._agents.items():
-            score, matched, match_type = self._calculate_score(query_terms, agent)
-            if score >= self._min_score:
-                scores[agent_role] = (score, matched, match_type)
+        scores = self._calculate_scores(query_terms)
         
         results = []
         for role, (score, matched, match_type) in sorted(
             scores.items(),
-            key=lambda x: x[1][0],
-            reverse=True
+            key=lambda x: (-x[1][0], self._agent_order[x[0]])
         )[:limit]:
             agent = self._agents[role]
             results.append(SearchResult(
@@ -340,7 +391,10 @@ class FuzzyAgentDiscovery:
                 match_type=match_type
             ))
         
-        return results
+        self._result_cache[cache_key] = results
+        if len(self._result_cache) > self._cache_size:
+            self._result_cache.popitem(last=False)
+        return list(results)
     
     def _tokenize(self, query: str) -> List[str]:
         """Tokenize query into search terms."""
@@ -349,78 +403,96 @@ class FuzzyAgentDiscovery:
         terms = [t for t in query.split() if len(t) >= 2]
         return terms
     
-    def _calculate_score(
+    def _calculate_scores(
         self,
-        query_terms: List[str],
-        agent: AgentCapability
-    ) -> Tuple[float, List[str], str]:
-        """Calculate match score for an agent."""
+        query_terms: List[str]
+    ) -> Dict[str, Tuple[float, List[str], str]]:
+        """Calculate match scores of the agents matching any query term, above min_score."""
         if not query_terms:
-            return 0.0, [], "none"
+            return {}
         
-        agent_terms = agent.get_searchable_terms()
-        matched_terms = []
-        total_score = 0.0
-        best_match_type = "fuzzy"
+        totals: Dict[str, float] = {}
+        matched: Dict[str, Set[str]] = {}
+        match_types: Dict[str, str] = {}
         
         for query_term in query_terms:
-            term_score, matched, match_type = self._match_term(
-                query_term, agent_terms
-            )
-            if term_score > 0:
-                total_score += term_score
-                matched_terms.extend(matched)
+            for role, (term_score, term, match_type) in self._match_term(query_term).items():
+                totals[role] = totals.get(role, 0.0) + term_score
+                matched.setdefault(role, set()).add(term)
                 if match_type == "exact":
-                    best_match_type = "exact"
-                elif match_type == "prefix" and best_match_type != "exact":
-                    best_match_type = "prefix"
+                    match_types[role] = "exact"
+                elif match_type == "prefix" and match_types.get(role) != "exact":
+                    match_types[role] = "prefix"
         
-        if query_terms:
-            final_score = total_score / len(query_terms)
-        else:
-            final_score = 0.0
-        
-        return final_score, list(set(matched_terms)), best_match_type
+        scores = {}
+        for role, total in totals.items():
+            final_score = total / len(query_terms)
+            if final_score >= self._min_score:
+                scores[role] = (final_score, sorted(matched[role]), match_types.get(role, "fuzzy"))
+        return scores
     
-    def _match_term(
-        self,
-        query_term: str,
-        agent_terms: Set[str]
-    ) -> Tuple[float, List[str], str]:
-        """Match a single query term against agent terms."""
-        best_score = 0.0
-        best_matched = []
-        best_type = "none"
-        
-        for agent_term in agent_terms:
-            if query_term == agent_term:
-                return 1.0, [agent_term], "exact"
-            
-            if agent_term.startswith(query_term):
-                score = len(query_term) / len(agent_term)
-                if score > best_score:
-                    best_score = max(score, 0.7)
-                    best_matched = [agent_term]
-                    best_type = "prefix"
-            
-            if query_term in agent_term:
-                score = len(query_term) / len(agent_term)
-                if score > best_score:
-                    best_score = max(score, 0.5)
-                    best_matched = [agent_term]
-                    best_type = "contains"
-        
-        if best_score < self._min_score:
-            for agent_term in agent_terms:
-                similarity = SequenceMatcher(
-                    None, query_term, agent_term
-                ).ratio()
-                if similarity > best_score and similarity >= 0.6:
-                    best_score = similarity * 0.8
-                    best_matched = [agent_term]
-                    best_type = "fuzzy"
-        
-        return best_score, best_matched, best_type
+    def _match_term(self, query_term: str) -> Dict[str, Tuple[float, str, str]]:
+        """
+        Match a single query term against the indexed terms.
+        
+        Returns:
+            Best (score, matched term, match type) per agent role
+        """
+        best: Dict[str, Tuple[float, str, str]] = {}
+        
+        def offer(term: str, score: float, match_type: str) -> None:
+            for role in self._term_index[term]:
+                current = best.get(role)
+                # Ties go to the lexically smallest term, so results do not depend on set order
+                if current is None or (score, current[1]) > (current[0], term):
+                    best[role] = (score, term, match_type)
+        
+        exact_roles = self._term_index.get(query_term, set())
+        
+        # Prefix matches: a contiguous range of the sorted terms
+        start = bisect_left(self._sorted_terms, query_term)
+        end = bisect_left(self._sorted_terms, query_term + "\uffff", start)
+        for term in self._sorted_terms[start:end]:
+            offer(term, max(len(query_term) / len(term), 0.7), "prefix")
+        
+        # Substring matches: terms containing every bigram of the query
+        postings = sorted(
+            (self._gram_index.get(gram, set()) for gram in self._grams(query_term, padded=False)),
+            key=len
+        )
+        candidates = set.intersection(*postings) if postings[0] else set()
+        for term in candidates:
+            if query_term in term and not term.startswith(query_term):
+                offer(term, max(len(query_term) / len(term), 0.5), "contains")
+        
+        for role in exact_roles:
+            best[role] = (1.0, query_term, "exact")
+        
+        # Fuzzy matches for agents without a good enough literal match,
+        # among terms sharing at least one bigram with the query
+        candidates = set()
+        for gram in self._grams(query_term):
+            candidates.update(self._gram_index.get(gram, ()))
+        matcher = SequenceMatcher(None, b=query_term)
+        fuzzy: Dict[str, Tuple[float, str]] = {}
+        for term in candidates:
+            matcher.set_seq1(term)
+            if matcher.real_quick_ratio() < 0.6 or matcher.quick_ratio() < 0.6:
+                continue
+            similarity = matcher.ratio()
+            if similarity < 0.6:
+                continue
+            for role in self._term_index[term]:
+                current = fuzzy.get(role)
+                if current is None or (similarity, current[1]) > (current[0], term):
+                    fuzzy[role] = (similarity, term)
+        
+        for role, (similarity, term) in fuzzy.items():
+            current = best.get(role, (0.0,))[0]
+            if current < self._min_score and similarity > current:
+                best[role] = (similarity * 0.8, term, "fuzzy")
+        
+        return best
     
     def find_by_capability(self, capability: str) -> List[str]:
         """Find agents that have a specific capability."""
@@ -37,6 +37,14 @@ async def lifespan(app: FastAPI):
     )
     logger.info("Blackboard store initialized")
     
+    # Archive old audit entries in the background
+    from .blackboard.audit import run_audit_compaction
+    app.state.audit_compaction_task = asyncio.create_task(run_audit_compaction(
+        app.state.blackboard_store,
+        settings.AUDIT_COMPACTION_INTERVAL_SECONDS,
+        settings.AUDIT_COMPACTION_KEEP
+    ))
+    
     # Start Redis command consumer for L2 communication
     from .messaging import get_command_consumer
     consumer = get_command_consumer()
@@ -66,6 +74,13 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'command_consumer'):
         await app.state.command_consumer.stop()
     
+    if hasattr(app.state, 'audit_compaction_task'):
+        app.state.audit_compaction_task.cancel()
+        try:
+            await app.state.audit_compaction_task
+        except asyncio.CancelledError:
+            pass
+    
     if hasattr(app.state, 'blackboard_store'):
         await app.state.blackboard_store.close()
 
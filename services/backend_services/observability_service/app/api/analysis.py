@@ -3,7 +3,7 @@ from typing import Dict, List
 import os
 
 from ..code_traceability import tracer
-from ..models import UnusedFilesResponse, ErrorResponse
+from ..models import CodeUsageData, UnusedFilesResponse, ErrorResponse
 
 router = APIRouter()
 
@@ -35,3 +35,23 @@ async def get_unused_files(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to analyze unused files: {str(e)}"
         )
+
+
+@router.get(
+    "/code-usage",
+    response_model=List[CodeUsageData],
+    responses={
+        500: {"model": ErrorResponse, "description": "Internal Server Error"}
+    }
+)
+async def get_code_usage():
+    """
+    Get aggregated call counts of traced code, most used first.
+    """
+    try:
+        return tracer.get_usage_snapshot()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get code usage: {str(e)}"
+        )
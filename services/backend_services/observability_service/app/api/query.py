@@ -4,16 +4,20 @@ Query API Router
 This module provides API endpoints for advanced querying across telemetry data types.
 """
 
+import asyncio
+import json
 import logging
 import time
-from typing import Dict, List, Any, Optional, Union
+import uuid
+from typing import AsyncIterator, Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Path, Body, status, Response
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from ..config import get_settings
-from ..messaging_client import MessagingClient
+from ..database_client import DatabaseClient
+from ..dependencies import get_database_client, get_messaging_client, MessagingClient
 from ..models import (
     QueryData,
     QueryDataBatch,
@@ -30,11 +34,176 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+# Data type -> (results key, table, QueryQuery field -> column)
+DATA_TYPE_QUERIES = {
+    "trace": ("traces", "trace", {
+        "trace_id": "trace_id",
+        "span_id": "span_id",
+        "parent_span_id": "parent_span_id"
+    }),
+    "metric": ("metrics", "metric", {
+        "metric_name": "name",
+        "metric_type": "type"
+    }),
+    "event": ("events", "event", {
+        "event_type": "event_type",
+        "severity": "severity"
+    }),
+    "health": ("health", "health", {
+        "health_status": "status"
+    }),
+    "dependency": ("dependencies", "dependency", {
+        "dependency_name": "dependency",
+        "dependency_type": "type",
+        "dependency_status": "status"
+    })
+}
+
+
+async def query_data_type(
+    data_type: str,
+    filters: Dict[str, Any],
+    query: QueryQuery,
+    database_client: DatabaseClient
+) -> List[Dict[str, Any]]:
+    """
+    Query one telemetry data type's table through the database service.
+    
+    Args:
+        data_type: Telemetry data type (trace, metric, event, health, dependency)
+        filters: Filters for the data type
+        query: Advanced query parameters
+        database_client: Database client
+        
+    Returns:
+        List[Dict[str, Any]]: Results for the data type
+    """
+    _, table_name, _ = DATA_TYPE_QUERIES[data_type]
+    filters = dict(filters)
+    timestamp = filters.pop("timestamp")
+    return await database_client.query_table(
+        table_name=table_name,
+        filters=filters,
+        time_range={"column": "timestamp", "start": timestamp["gte"], "end": timestamp["lte"]},
+        order_by=query.order_by or "timestamp",
+        order_direction=query.order_direction or "desc",
+        limit=query.limit,
+        offset=query.offset,
+        correlation_id=get_correlation_id()
+    )
+
+
+def _build_filters(query: QueryQuery) -> Dict[str, Dict[str, Any]]:
+    """Filters of every requested data type, keyed by data type."""
+    # Set default time range if not provided
+    if not query.end_time:
+        query.end_time = datetime.utcnow()
+    if not query.start_time:
+        query.start_time = query.end_time - timedelta(hours=24)
+    
+    base_params = {
+        "timestamp": {
+            "gte": query.start_time.isoformat(),
+            "lte": query.end_time.isoformat()
+        }
+    }
+    if query.service:
+        base_params["service"] = query.service
+    if query.correlation_id:
+        base_params["correlation_id"] = query.correlation_id
+    
+    filters = {}
+    for data_type in query.data_types:
+        if data_type not in DATA_TYPE_QUERIES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown data type: {data_type}"
+            )
+        params = base_params.copy()
+        for field, name in DATA_TYPE_QUERIES[data_type][2].items():
+            value = getattr(query, field)
+            if value:
+                params[name] = value
+        filters[data_type] = params
+    return filters
+
+
+async def _run_data_type(
+    data_type: str,
+    filters: Dict[str, Any],
+    query: QueryQuery,
+    database_client: DatabaseClient
+) -> Tuple[str, Optional[List[Dict[str, Any]]], Optional[str], float]:
+    """
+    Run one data type's query under its timeout.
+    
+    Returns:
+        Tuple of data type, results (None on failure), error and elapsed seconds
+    """
+    settings = get_settings()
+    timeout = settings.query_type_timeouts.get(data_type, settings.query_timeout_seconds)
+    start_time = time.time()
+    try:
+        async with asyncio.timeout(timeout):
+            results = await query_data_type(data_type, filters, query, database_client)
+        return data_type, results, None, time.time() - start_time
+    except TimeoutError:
+        logger.warning(f"Advanced query for {data_type} timed out after {timeout}s")
+        return data_type, None, f"Timed out after {timeout}s", time.time() - start_time
+    except Exception as e:
+        logger.error(f"Advanced query for {data_type} failed: {str(e)}")
+        return data_type, None, str(e), time.time() - start_time
+
+
+async def _stream_results(
+    query: QueryQuery,
+    filters: Dict[str, Dict[str, Any]],
+    database_client: DatabaseClient,
+    query_id: str,
+    start_time: float
+) -> AsyncIterator[bytes]:
+    """Emit one NDJSON line per data type as it completes, then a summary line."""
+    tasks = [
+        asyncio.create_task(_run_data_type(data_type, params, query, database_client))
+        for data_type, params in filters.items()
+    ]
+    errors = {}
+    try:
+        for completed in asyncio.as_completed(tasks):
+            data_type, results, error, elapsed = await completed
+            line = {
+                "query_id": query_id,
+                "data_type": DATA_TYPE_QUERIES[data_type][0],
+                "execution_time_ms": elapsed * 1000
+            }
+            if error is None:
+                line["results"] = results
+            else:
+                line["error"] = errors[line["data_type"]] = error
+            yield (json.dumps(line, default=str) + "\n").encode("utf-8")
+    finally:
+        # Client disconnected before all data types completed
+        for task in tasks:
+            task.cancel()
+    
+    execution_time = time.time() - start_time
+    track_query_execution("advanced", execution_time, len(filters))
+    yield (json.dumps({
+        "query_id": query_id,
+        "status": "partial" if errors else "completed",
+        "errors": errors,
+        "execution_time_ms": execution_time * 1000
+    }) + "\n").encode("utf-8")
+
 
 @router.post(
     "/advanced",
     response_model=QueryResponse,
     responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One JSON object per data type when stream=true"},
         400: {"model": ErrorResponse, "description": "Bad Request"},
         500: {"model": ErrorResponse, "description": "Internal Server Error"}
     }
@@ -42,163 +211,77 @@ router = APIRouter()
 @trace_method(name="api.query.execute_advanced_query", kind="SERVER")
 async def execute_advanced_query(
     query: QueryQuery = Body(...),
-    messaging_client: MessagingClient = Depends(lambda: MessagingClient(
-        base_url=get_settings().messaging_service_url,
-        service_name=get_settings().service_name
-    ))
+    stream: bool = Query(False, description="Stream each data type's results as NDJSON as they arrive"),
+    database_client: DatabaseClient = Depends(get_database_client)
 ):
     """
     Execute an advanced query across multiple telemetry data types.
     
+    The data types are queried concurrently, each under its own timeout; a
+    data type that fails or times out is reported in errors without failing
+    the others.
+    
     Args:
         query: Advanced query parameters
-        db_client: Database client
+        stream: Stream results as NDJSON instead of a single response
+        database_client: Database client
         
     Returns:
-        QueryResult: Query results
+        QueryResponse or NDJSON stream: Query results
     """
     start_time = time.time()
     correlation_id = get_correlation_id()
+    query_id = str(uuid.uuid4())
     
     try:
+        filters = _build_filters(query)
+        
         # Add span attributes for telemetry
         add_span_attributes({
             "query.data_types": query.data_types,
             "query.service": query.service,
-            "query.start_time": query.start_time.isoformat() if query.start_time else None,
-            "query.end_time": query.end_time.isoformat() if query.end_time else None,
+            "query.start_time": query.start_time.isoformat(),
+            "query.end_time": query.end_time.isoformat(),
             "query.limit": query.limit,
+            "query.stream": stream,
             "correlation_id": correlation_id
         })
         
-        # Set default time range if not provided
-        if not query.end_time:
-            query.end_time = datetime.utcnow()
-        
-        if not query.start_time:
-            query.start_time = query.end_time - timedelta(hours=24)
-        
-        # Build base query parameters
-        base_params = {}
-        
-        if query.service:
-            base_params["service"] = query.service
-        
-        if query.start_time and query.end_time:
-            base_params["timestamp"] = {
-                "gte": query.start_time.isoformat(),
-                "lte": query.end_time.isoformat()
-            }
-        
-        # Initialize results
-        results = {
-            "traces": [],
-            "metrics": [],
-            "events": [],
-            "health": [],
-            "dependencies": []
-        }
+        if stream:
+            return StreamingResponse(
+                _stream_results(query, filters, database_client, query_id, start_time),
+                media_type=NDJSON_MEDIA_TYPE
+            )
         
-        # Query each data type
-        for data_type in query.data_types:
-            if data_type == "trace":
-                # Apply trace-specific filters
-                trace_params = base_params.copy()
-                if query.trace_id:
-                    trace_params["trace_id"] = query.trace_id
-                if query.span_id:
-                    trace_params["span_id"] = query.span_id
-                if query.parent_span_id:
-                    trace_params["parent_span_id"] = query.parent_span_id
-                
-                traces = await db_client.query_trace_data(
-                    trace_params,
-                    limit=query.limit,
-                    offset=query.offset,
-                    order_by=query.order_by or "timestamp",
-                    order_direction=query.order_direction or "desc"
-                )
-                results["traces"] = traces
-            
-            elif data_type == "metric":
-                # Apply metric-specific filters
-                metric_params = base_params.copy()
-                if query.metric_name:
-                    metric_params["name"] = query.metric_name
-                if query.metric_type:
-                    metric_params["type"] = query.metric_type
-                
-                metrics = await db_client.query_metric_data(
-                    metric_params,
-                    limit=query.limit,
-                    offset=query.offset,
-                    order_by=query.order_by or "timestamp",
-                    order_direction=query.order_direction or "desc"
-                )
-                results["metrics"] = metrics
-            
-            elif data_type == "event":
-                # Apply event-specific filters
-                event_params = base_params.copy()
-                if query.event_type:
-                    event_params["event_type"] = query.event_type
-                if query.severity:
-                    event_params["severity"] = query.severity
-                
-                events = await db_client.query_event_data(
-                    event_params,
-                    limit=query.limit,
-                    offset=query.offset,
-                    order_by=query.order_by or "timestamp",
-                    order_direction=query.order_direction or "desc"
-                )
-                results["events"] = events
-            
-            elif data_type == "health":
-                # Apply health-specific filters
-                health_params = base_params.copy()
-                if query.health_status:
-                    health_params["status"] = query.health_status
-                
-                health = await db_client.query_health_data(
-                    health_params,
-                    limit=query.limit,
-                    offset=query.offset,
-                    order_by=query.order_by or "timestamp",
-                    order_direction=query.order_direction or "desc"
-                )
-                results["health"] = health
-            
-            elif data_type == "dependency":
-                # Apply dependency-specific filters
-                dependency_params = base_params.copy()
-                if query.dependency_name:
-                    dependency_params["name"] = query.dependency_name
-                if query.dependency_type:
-                    dependency_params["type"] = query.dependency_type
-                if query.dependency_status:
-                    dependency_params["status"] = query.dependency_status
-                
-                dependencies = await db_client.query_dependency_data(
-                    dependency_params,
-                    limit=query.limit,
-                    offset=query.offset,
-                    order_by=query.order_by or "timestamp",
-                    order_direction=query.order_direction or "desc"
-                )
-                results["dependencies"] = dependencies
+        outcomes = await asyncio.gather(*(
+            _run_data_type(data_type, params, query, database_client)
+            for data_type, params in filters.items()
+        ))
+        
+        results = {key: [] for key, _, _ in DATA_TYPE_QUERIES.values()}
+        errors = {}
+        for data_type, data, error, _ in outcomes:
+            key = DATA_TYPE_QUERIES[data_type][0]
+            if error is None:
+                results[key] = data
+            else:
+                errors[key] = error
         
         # Track query execution time
         execution_time = time.time() - start_time
         track_query_execution("advanced", execution_time, len(query.data_types))
         
-        # Return query results
-        return QueryResult(
-            query=query.model_dump(),
+        return QueryResponse(
+            query_id=query_id,
+            status="partial" if errors else "completed",
+            message=f"Queried {len(filters) - len(errors)} of {len(filters)} data types",
             results=results,
-            execution_time=execution_time
+            errors=errors,
+            execution_time_ms=execution_time * 1000
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to execute advanced query: {str(e)}")
         raise HTTPException(
@@ -220,10 +303,7 @@ async def get_correlated_telemetry(
     correlation_id: str = Path(..., description="Correlation ID"),
     start_time: Optional[datetime] = Query(None, description="Start time"),
     end_time: Optional[datetime] = Query(None, description="End time"),
-    messaging_client: MessagingClient = Depends(lambda: MessagingClient(
-        base_url=get_settings().messaging_service_url,
-        service_name=get_settings().service_name
-    ))
+    messaging_client: MessagingClient = Depends(get_messaging_client)
 ):
     """
     Get all telemetry data correlated by a correlation ID.
@@ -317,10 +397,7 @@ async def get_correlated_telemetry(
 async def get_service_topology(
     start_time: Optional[datetime] = Query(None, description="Start time"),
     end_time: Optional[datetime] = Query(None, description="End time"),
-    messaging_client: MessagingClient = Depends(lambda: MessagingClient(
-        base_url=get_settings().messaging_service_url,
-        service_name=get_settings().service_name
-    ))
+    messaging_client: MessagingClient = Depends(get_messaging_client)
 ):
     """
     Get service topology based on trace data.
@@ -433,10 +510,7 @@ async def get_service_dependencies(
     service: str = Path(..., description="Service name"),
     start_time: Optional[datetime] = Query(None, description="Start time"),
     end_time: Optional[datetime] = Query(None, description="End time"),
-    messaging_client: MessagingClient = Depends(lambda: MessagingClient(
-        base_url=get_settings().messaging_service_url,
-        service_name=get_settings().service_name
-    ))
+    messaging_client: MessagingClient = Depends(get_messaging_client)
 ):
     """
     Get dependencies for a specific service.
@@ -1,53 +1,185 @@
 import os
 import time
 import logging
-import inspect
+import itertools
 import functools
 import asyncio
 from datetime import datetime
-from typing import Dict, List, Set, Optional, Any
+from typing import Dict, List, Set, Optional, Any, Tuple
 
+from .config import get_settings
 from .models import CodeUsageData, UnusedFilesResponse
 
 logger = logging.getLogger(__name__)
 
+
+class _CodeSite:
+    """
+    Usage counters of one traced function.
+
+    The normalized path and qualified name are resolved once, when the
+    function is decorated. Calls only bump a counter; the wall clock is read
+    for the first call and then for one call in every `sample_every`.
+    """
+    __slots__ = ("file_path", "class_name", "method_name", "full_name", "counter", "calls", "last_used")
+
+    def __init__(self, file_path: str, class_name: Optional[str], method_name: str):
+        self.file_path = file_path
+        self.class_name = class_name
+        self.method_name = method_name
+        self.full_name = f"{class_name}.{method_name}" if class_name else method_name
+        # next() on itertools.count is atomic under the GIL, so no lock is needed
+        self.counter = itertools.count(1)
+        self.calls = 0
+        self.last_used = 0.0
+
+
 class CodeTracer:
     """
     Tracks usage of code files, classes, and methods.
+
+    Per-call work is limited to a counter increment; usage is aggregated into
+    file_usage/method_usage and logged as a single snapshot line when flushed.
+    Once started, a background task flushes every flush_interval seconds;
+    sampled calls and reads flush as well. A flush dates the calls it counts
+    to the flush time, so last use is at most flush_interval late.
     """
-    def __init__(self):
+    def __init__(self, sample_rate: float = 1.0, flush_interval: float = 60.0):
+        """
+        Initialize the tracer.
+
+        Args:
+            sample_rate: Fraction of calls that record a usage timestamp (the first call always does)
+            flush_interval: Seconds between usage snapshots
+        """
         # file_path -> last_usage_timestamp (float)
         self.file_usage: Dict[str, float] = {}
         # file_path -> Set[method_name]
         self.method_usage: Dict[str, Set[str]] = {}
+        self._sites: Dict[Tuple[str, str], _CodeSite] = {}
+        self._flushed_calls: Dict[Tuple[str, str], int] = {}
+        self._last_flush = time.time()
+        self._flush_task: Optional[asyncio.Task] = None
+        self.configure(sample_rate, flush_interval)
+
+    def configure(self, sample_rate: float, flush_interval: float) -> None:
+        """Change the sampling rate and flush interval."""
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+        self.sample_every = max(1, round(1 / self.sample_rate)) if self.sample_rate > 0 else 0
+        self.flush_interval = flush_interval
+
+    def start(self) -> None:
+        """Start flushing every flush_interval seconds in the background."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        """Stop the background flush and fold in the calls counted since the last one."""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        self.flush()
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"Code usage flush failed: {e}")
+
+    def site(self, file_path: str, class_name: Optional[str], method_name: str) -> _CodeSite:
+        """Get or create the usage counters of a code element."""
+        abs_path = os.path.abspath(file_path)
+        full_name = f"{class_name}.{method_name}" if class_name else method_name
+        key = (abs_path, full_name)
+        site = self._sites.get(key)
+        if site is None:
+            site = self._sites.setdefault(key, _CodeSite(abs_path, class_name, method_name))
+        return site
+
+    def record(self, site: _CodeSite) -> None:
+        """Count a call of a traced code element."""
+        calls = next(site.counter)
+        site.calls = calls
+        sample_every = self.sample_every
+        if calls == 1 or (sample_every and calls % sample_every == 0):
+            now = time.time()
+            site.last_used = now
+            if now - self._last_flush >= self.flush_interval:
+                self.flush()
 
     def track_usage(self, file_path: str, class_name: Optional[str], method_name: str):
         """Log usage of a code element."""
+        self.record(self.site(file_path, class_name, method_name))
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Fold the counters into file_usage/method_usage and log a usage snapshot.
+
+        Returns:
+            Dict[str, Any]: Calls, methods and files seen since the previous flush
+        """
         now = time.time()
-        # Normalize file path
-        abs_path = os.path.abspath(file_path)
-        self.file_usage[abs_path] = now
-        
-        if abs_path not in self.method_usage:
-            self.method_usage[abs_path] = set()
-        
-        full_name = f"{class_name}.{method_name}" if class_name else method_name
-        self.method_usage[abs_path].add(full_name)
-        
-        # Log it (as per requirement "Implement logging...")
-        # Using debug level to avoid spamming production logs, but requirement says "Implement logging"
-        logger.info(f"Code Usage: File={abs_path}, Method={full_name}")
+        self._last_flush = now
+        calls = 0
+        methods = 0
+        files = set()
+        for key, site in list(self._sites.items()):
+            new_calls = site.calls - self._flushed_calls.get(key, 0)
+            if new_calls <= 0:
+                continue
+            self._flushed_calls[key] = site.calls
+            calls += new_calls
+            methods += 1
+            files.add(site.file_path)
+            # last_used is only sampled; calls since the previous flush mean
+            # the site was in use up to now
+            site.last_used = max(site.last_used, now)
+            if site.last_used > self.file_usage.get(site.file_path, 0):
+                self.file_usage[site.file_path] = site.last_used
+            self.method_usage.setdefault(site.file_path, set()).add(site.full_name)
+
+        snapshot = {"calls": calls, "methods": methods, "files": len(files), "timestamp": now}
+        if calls:
+            logger.info(f"Code usage snapshot: {calls} calls to {methods} methods in {len(files)} files")
+        return snapshot
+
+    def get_usage_snapshot(self) -> List[CodeUsageData]:
+        """
+        Get aggregated usage of every traced code element that has been called.
+
+        Returns:
+            List[CodeUsageData]: Call counts and last sampled usage, most used first
+        """
+        self.flush()
+        return [
+            CodeUsageData(
+                file_path=site.file_path,
+                class_name=site.class_name,
+                method_name=site.method_name,
+                timestamp=datetime.fromtimestamp(site.last_used),
+                calls=site.calls
+            )
+            for site in sorted(self._sites.values(), key=lambda s: s.calls, reverse=True)
+            if site.calls
+        ]
 
     def get_unused_files(self, root_dir: str, period_seconds: int) -> UnusedFilesResponse:
         """
         Identify files not utilized in the given period.
-        
+
         Args:
             root_dir: Root directory to scan for python files.
             period_seconds: Period in seconds. Files not used within (now - period) are considered unused.
         """
+        self.flush()
         cutoff_time = time.time() - period_seconds
-        
+
         all_py_files = []
         # Walk directory to find all .py files
         if os.path.isdir(root_dir):
@@ -58,15 +190,15 @@ class CodeTracer:
                         all_py_files.append(full_path)
         else:
             logger.warning(f"Root directory for unused files scan not found: {root_dir}")
-        
+
         unused_files = []
         for file_path in all_py_files:
             last_used = self.file_usage.get(file_path, 0)
-            
+
             # If never used (0) or used before cutoff
             if last_used < cutoff_time:
                 unused_files.append(file_path)
-                
+
         return UnusedFilesResponse(
             total_files=len(all_py_files),
             unused_files_count=len(unused_files),
@@ -76,36 +208,41 @@ class CodeTracer:
         )
 
 # Global tracer instance
-tracer = CodeTracer()
+_settings = get_settings()
+tracer = CodeTracer(
+    sample_rate=_settings.code_trace_sample_rate,
+    flush_interval=_settings.code_trace_flush_interval_seconds
+)
 
 def trace_execution(func):
     """
     Decorator to trace execution of functions/methods.
     """
-    def _record_usage(f):
-        try:
-            file_path = inspect.getfile(f)
-            method_name = f.__name__
-            # Try to get class name
-            class_name = None
-            if hasattr(f, '__qualname__'):
-                parts = f.__qualname__.split('.')
-                if len(parts) > 1:
-                    class_name = parts[-2]
-            
-            tracer.track_usage(file_path, class_name, method_name)
-        except Exception as e:
-            # Don't fail execution if tracing fails
-            logger.debug(f"Failed to trace execution: {e}")
+    site = None
+    try:
+        # Try to get class name
+        class_name = None
+        parts = func.__qualname__.split('.')
+        if len(parts) > 1:
+            class_name = parts[-2]
+        site = tracer.site(func.__code__.co_filename, class_name, func.__name__)
+    except Exception as e:
+        # Don't fail decoration if tracing is not possible
+        logger.debug(f"Failed to trace execution of {func!r}: {e}")
+
+    if site is None:
+        return func
+
+    record = tracer.record
 
     @functools.wraps(func)
     async def async_wrapper(*args, **kwargs):
-        _record_usage(func)
+        record(site)
         return await func(*args, **kwargs)
 
     @functools.wraps(func)
     def sync_wrapper(*args, **kwargs):
-        _record_usage(func)
+        record(site)
         return func(*args, **kwargs)
 
     if asyncio.iscoroutinefunction(func):
@@ -7,7 +7,7 @@ using Pydantic v2 for validation.
 
 from pydantic import Field, ConfigDict, field_validator
 from pydantic_settings import BaseSettings
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 import json
 from functools import lru_cache
 
@@ -47,6 +47,12 @@ class Settings(BaseSettings):
     otlp_endpoint: str = Field("0.0.0.0:4317", description="OpenTelemetry collector endpoint")
     opentelemetry_endpoint: str = Field("0.0.0.0:4317", description="OpenTelemetry collector endpoint (alias)")
     otlp_insecure: bool = Field(True, description="Whether to use insecure connection to OTLP endpoint")
+
+    # OTLP ingestion pipeline configuration
+    otlp_queue_max_rows: int = Field(100000, description="Spans and metric points queued before OTLP exports are rejected")
+    otlp_batch_size: int = Field(1000, description="Maximum rows stored per ingestion batch")
+    otlp_flush_interval_seconds: float = Field(0.5, description="Maximum seconds a row waits for its ingestion batch to fill")
+    otlp_pipeline_workers: int = Field(2, description="Number of concurrent ingestion batch workers")
     
     # Prometheus configuration
     enable_prometheus_metrics: bool = Field(True, description="Enable Prometheus metrics")
@@ -69,6 +75,14 @@ class Settings(BaseSettings):
             return [item.strip() for item in v.split(',')]
         return v
     
+    # Advanced query configuration
+    query_timeout_seconds: float = Field(10.0, description="Timeout for each data type of an advanced query")
+    query_type_timeouts: Dict[str, float] = Field(default_factory=dict, description="Per data type overrides of query_timeout_seconds")
+    
+    # Code traceability configuration
+    code_trace_sample_rate: float = Field(0.01, description="Fraction of traced calls that record a usage timestamp")
+    code_trace_flush_interval_seconds: float = Field(60.0, description="Interval in seconds between code usage snapshots")
+    
     # Data retention configuration
     trace_retention_days: int = Field(30, description="Number of days to retain trace data")
     metrics_retention_days: int = Field(90, description="Number of days to retain metrics data")
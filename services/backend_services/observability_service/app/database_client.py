@@ -0,0 +1,135 @@
+"""
+Database Client for Observability Service
+
+This module provides a client for the Database Service's structured query API.
+It is used where a request needs the query results in its response; ingestion
+and other fire-and-forget requests go through the Messaging Service.
+"""
+
+import aiohttp
+from .logging import get_logger
+import json
+import time
+from typing import Dict, List, Any, Optional
+
+from .telemetry import trace_method, add_span_attributes
+
+logger = get_logger(__name__)
+
+
+class DatabaseClient:
+    """
+    Client for querying telemetry tables through the Database Service.
+
+    One HTTP session (and its connection pool) is shared by all requests.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        service_name: str,
+        timeout: int = 30
+    ):
+        """
+        Initialize the Database Client.
+
+        Args:
+            base_url: Base URL of the Database Service
+            service_name: Name of the service using this client
+            timeout: Request timeout in seconds
+        """
+        self.base_url = base_url.rstrip('/')
+        self.service_name = service_name
+        self.timeout = timeout
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    "User-Agent": f"{self.service_name}-database-client/1.0",
+                    "Content-Type": "application/json",
+                    "Accept": "application/json"
+                }
+            )
+        return self.session
+
+    async def close(self):
+        """Close the client session."""
+        if self.session and not self.session.closed:
+            await self.session.close()
+            logger.info("Database Client session closed")
+
+    @trace_method(name="database_client.query_table", kind="CLIENT")
+    async def query_table(
+        self,
+        table_name: str,
+        filters: Optional[Dict[str, Any]] = None,
+        time_range: Optional[Dict[str, Any]] = None,
+        order_by: Optional[str] = None,
+        order_direction: str = "DESC",
+        limit: int = 100,
+        offset: int = 0,
+        correlation_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query a table through the Database Service's ad-hoc query API.
+
+        Args:
+            table_name: Table to query
+            filters: Column -> value equality filters
+            time_range: Dict with 'column', 'start' and 'end' keys
+            order_by: Column to order by
+            order_direction: ASC or DESC
+            limit: Row limit
+            offset: Row offset
+            correlation_id: Correlation ID for distributed tracing
+
+        Returns:
+            List[Dict[str, Any]]: Matching rows
+
+        Raises:
+            Exception: If the Database Service rejects the query
+        """
+        url = f"{self.base_url}/database/query/adhoc"
+        payload = {
+            "table_name": table_name,
+            "filters": [
+                {"field": field, "op": "eq", "value": value}
+                for field, value in (filters or {}).items()
+            ],
+            "time_range": time_range,
+            "order_by": order_by,
+            "order_direction": order_direction.upper(),
+            "limit": limit,
+            "offset": offset,
+            "service_name": self.service_name
+        }
+        headers = {"X-Correlation-ID": correlation_id} if correlation_id else {}
+
+        add_span_attributes({
+            "db.table": table_name,
+            "db.url": url,
+            "correlation_id": correlation_id
+        })
+
+        start_time = time.time()
+        async with self._get_session().post(url, json=payload, headers=headers) as response:
+            elapsed_time = time.time() - start_time
+            add_span_attributes({
+                "db.response.status_code": response.status,
+                "db.response.time_ms": elapsed_time * 1000
+            })
+
+            if response.status != 200:
+                error_text = await response.text()
+                try:
+                    error_message = json.loads(error_text).get("detail", error_text)
+                except (ValueError, AttributeError):
+                    error_message = error_text
+                raise Exception(f"Database query on {table_name} failed with status {response.status}: {error_message}")
+
+            result = await response.json()
+
+        return (result.get("data") or {}).get("rows", [])
@@ -3,6 +3,7 @@ from functools import lru_cache
 from typing import Optional
 
 from .config import get_settings
+from .database_client import DatabaseClient
 from .messaging_client import MessagingClient
 
 logger = logging.getLogger(__name__)
@@ -26,3 +27,23 @@ def get_messaging_client() -> MessagingClient:
         base_url=settings.messaging_service_url,
         service_name=settings.service_name
     )
+
+
+@lru_cache()
+def get_database_client() -> DatabaseClient:
+    """
+    Returns a singleton instance of the DatabaseClient.
+
+    Cached like get_messaging_client so that every query shares one HTTP
+    session and its connection pool.
+
+    Returns:
+        DatabaseClient: The singleton database client instance.
+    """
+    logger.info("Initializing DatabaseClient singleton")
+    settings = get_settings()
+    return DatabaseClient(
+        base_url=settings.database_service_url,
+        service_name=settings.service_name,
+        timeout=settings.database_service_timeout
+    )
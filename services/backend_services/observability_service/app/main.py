@@ -31,6 +31,8 @@ from .config import get_settings, Settings
 # Import clients
 
 from .messaging_client import MessagingClient
+from .dependencies import get_database_client
+from .code_traceability import tracer
 
 # Import telemetry and metrics
 from .telemetry import (
@@ -66,8 +68,9 @@ from .models import (
 )
 
 # Import API routers
-from .api import events, traces, logs, analysis
+from .api import events, traces, logs, analysis, query
 from .otlp_grpc_server import serve_otlp_grpc, shutdown_otlp_grpc
+from .telemetry_pipeline import TelemetryIngestionPipeline
 
 # Import Alerting Manager
 from .alerting_manager import AlertingManager, AlertRule
@@ -92,6 +95,7 @@ health_status = {
 # Global clients
 messaging_client: Optional[MessagingClient] = None
 otlp_server: Optional[grpc.aio.Server] = None
+telemetry_pipeline: Optional[TelemetryIngestionPipeline] = None
 alerting_manager: Optional[AlertingManager] = None
 
 
@@ -211,7 +215,7 @@ async def lifespan(app: FastAPI):
     
     This handles startup and shutdown events for the application.
     """
-    global messaging_client, otlp_server_task
+    global messaging_client, otlp_server, telemetry_pipeline
     
     try:
         # Initialize global clients
@@ -227,9 +231,20 @@ async def lifespan(app: FastAPI):
         )
         await messaging_client.initialize()
 
-        # Start OTLP gRPC server
+        # Start OTLP ingestion pipeline and gRPC server
         logger.info("Starting OTLP gRPC server...")
-        otlp_server = await serve_otlp_grpc(trace_handler=store_trace)
+        telemetry_pipeline = TelemetryIngestionPipeline(
+            sink=store_telemetry_batch,
+            max_queued_rows=settings.otlp_queue_max_rows,
+            batch_size=settings.otlp_batch_size,
+            flush_interval=settings.otlp_flush_interval_seconds,
+            workers=settings.otlp_pipeline_workers
+        )
+        telemetry_pipeline.start()
+        otlp_server = await serve_otlp_grpc(telemetry_pipeline)
+        
+        # Flush code usage counters periodically, so quiet files age correctly
+        tracer.start()
         
         # Update Redis health status based on messaging service health
         update_health_status("redis", await check_messaging_health())
@@ -279,6 +294,13 @@ async def lifespan(app: FastAPI):
         # Stop OTLP gRPC server
         if otlp_server:
             await shutdown_otlp_grpc(otlp_server)
+
+        # Flush rows accepted before the server stopped
+        if telemetry_pipeline:
+            await telemetry_pipeline.stop()
+        
+        # Stop the code usage flush
+        await tracer.stop()
         
         # Close health cache
         await health_cache.close()
@@ -286,6 +308,7 @@ async def lifespan(app: FastAPI):
         # Close clients
         if messaging_client:
             await messaging_client.close()
+        await get_database_client().close()
         
         logger.info("Application shutdown complete")
         
@@ -361,6 +384,7 @@ def create_application() -> FastAPI:
     app.include_router(traces.router, prefix=f"{settings.api_prefix}/traces", tags=["traces"])
     app.include_router(logs.router, prefix=f"{settings.api_prefix}/logs", tags=["logs"]) 
     app.include_router(analysis.router, prefix=f"{settings.api_prefix}/analysis", tags=["analysis"])
+    app.include_router(query.router, prefix=f"{settings.api_prefix}/query", tags=["query"])
     
     # Add health and metrics endpoints
     @app.get("/health", response_model=ServiceHealthResponse, tags=["Health"])
@@ -876,6 +900,31 @@ async def store_trace(trace_data: Dict[str, Any]) -> bool:
         return False
 
 
+async def store_telemetry_batch(kind: str, rows: List[Dict[str, Any]]) -> None:
+    """
+    Store a batch of OTLP rows in the database via messaging service.
+
+    The whole batch is published as one event, which the database service
+    writes with a single bulk insert.
+
+    Args:
+        kind: Telemetry kind ("trace" or "metric")
+        rows: Rows of the trace or metric table
+
+    Raises:
+        RuntimeError: If the messaging client is not initialized
+    """
+    if not messaging_client:
+        raise RuntimeError("Messaging client not initialized, cannot store telemetry batch")
+
+    await messaging_client.publish_event(
+        event_type=f"telemetry.{kind}.batch_ingested",
+        event_data={"rows": rows},
+        channel="database",
+        correlation_id=str(uuid.uuid4())
+    )
+
+
 # This function is deprecated in favor of direct event publishing in the endpoint
 # Keeping as a reference for backward compatibility
 async def store_metric(metric_data: Dict[str, Any]) -> bool:
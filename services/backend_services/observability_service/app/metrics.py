@@ -82,6 +82,18 @@ if PROMETHEUS_AVAILABLE:
         buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, float('inf'))
     )
     
+    # OTLP ingestion pipeline metrics
+    TELEMETRY_PIPELINE_ROWS = Counter(
+        'observability_otlp_pipeline_rows_total',
+        'Telemetry rows passing through the OTLP ingestion pipeline',
+        ['type', 'outcome']
+    )
+    
+    TELEMETRY_PIPELINE_QUEUE_DEPTH = Gauge(
+        'observability_otlp_pipeline_queued_rows',
+        'Telemetry rows waiting in the OTLP ingestion queue'
+    )
+    
     # Service health metrics
     SERVICE_INFO = Info(
         'observability_service_info',
@@ -344,6 +356,49 @@ def track_telemetry_processing(
         logger.debug(f"Failed to track telemetry processing metrics: {str(e)}")
 
 
+def track_pipeline_rows(
+    telemetry_type: str,
+    outcome: str,
+    count: int = 1
+) -> None:
+    """
+    Track rows handled by the OTLP ingestion pipeline.
+    
+    Args:
+        telemetry_type: Type of telemetry (trace, metric)
+        outcome: queued, dropped, exported or failed
+        count: Number of rows
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return
+    
+    try:
+        TELEMETRY_PIPELINE_ROWS.labels(
+            type=telemetry_type,
+            outcome=outcome
+        ).inc(count)
+        
+    except Exception as e:
+        logger.debug(f"Failed to track pipeline metrics: {str(e)}")
+
+
+def update_pipeline_queue_depth(rows: int) -> None:
+    """
+    Update the number of rows waiting in the OTLP ingestion queue.
+    
+    Args:
+        rows: Queued rows
+    """
+    if not PROMETHEUS_AVAILABLE:
+        return
+    
+    try:
+        TELEMETRY_PIPELINE_QUEUE_DEPTH.set(rows)
+        
+    except Exception as e:
+        logger.debug(f"Failed to update pipeline queue depth: {str(e)}")
+
+
 def update_health_status(component: str, healthy: bool) -> None:
     """
     Update service health status.
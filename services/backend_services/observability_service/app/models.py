@@ -521,7 +521,13 @@ class QueryQuery(BaseModel):
     span_id: Optional[str] = Field(None, description="Filter by span ID")
     parent_span_id: Optional[str] = Field(None, description="Filter by parent span ID")
     metric_name: Optional[str] = Field(None, description="Filter by metric name")
+    metric_type: Optional[str] = Field(None, description="Filter by metric type")
     event_type: Optional[str] = Field(None, description="Filter by event type")
+    severity: Optional[str] = Field(None, description="Filter by event severity")
+    health_status: Optional[str] = Field(None, description="Filter by health status")
+    dependency_name: Optional[str] = Field(None, description="Filter by dependency name")
+    dependency_type: Optional[str] = Field(None, description="Filter by dependency type")
+    dependency_status: Optional[str] = Field(None, description="Filter by dependency status")
     limit: int = Field(100, description="Maximum number of results")
     offset: int = Field(0, description="Offset for pagination")
     order_by: Optional[str] = Field(None, description="Field to order by")
@@ -534,6 +540,7 @@ class QueryResponse(BaseModel):
     status: str = Field(..., description="Query status")
     message: str = Field(..., description="Response message")
     results: Dict[str, List[Dict[str, Any]]] = Field(..., description="Query results by data type")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Errors by data type that failed or timed out")
     execution_time_ms: float = Field(..., description="Query execution time in milliseconds")
 
 
@@ -602,6 +609,7 @@ class CodeUsageData(BaseModel):
     class_name: Optional[str] = Field(None, description="Name of the class used")
     method_name: str = Field(..., description="Name of the method/function used")
     timestamp: datetime = Field(..., description="Timestamp of usage")
+    calls: int = Field(0, description="Number of calls since the service started")
 
 class UnusedFilesResponse(BaseModel):
     """Response model for unused files analysis."""
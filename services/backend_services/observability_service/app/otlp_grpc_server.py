@@ -2,64 +2,211 @@
 OTLP gRPC Server for Observability Service
 
 This module implements a gRPC server to receive OTLP traces and metrics.
+
+Export requests are mapped to rows of the trace and metric tables and offered
+to the TelemetryIngestionPipeline; the handlers never wait for storage. If
+the pipeline is full the request is rejected with UNAVAILABLE, which OTLP
+exporters treat as retryable.
 """
 
-import asyncio
 import logging
 from concurrent import futures
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
 
 import grpc
 from opentelemetry.proto.collector.trace.v1 import trace_service_pb2_grpc, trace_service_pb2
 from opentelemetry.proto.collector.metrics.v1 import metrics_service_pb2_grpc, metrics_service_pb2
-from typing import Callable, Awaitable, Dict, Any
+
+from .telemetry_pipeline import TelemetryIngestionPipeline
 
 logger = logging.getLogger(__name__)
 
+# Span.SpanKind and Status.StatusCode enum values
+SPAN_KINDS = {0: "UNSPECIFIED", 1: "INTERNAL", 2: "SERVER", 3: "CLIENT", 4: "PRODUCER", 5: "CONSUMER"}
+STATUS_CODES = {0: "UNSET", 1: "OK", 2: "ERROR"}
+
+
+def _any_value(value) -> Any:
+    """Convert an OTLP AnyValue to a JSON-compatible value."""
+    field = value.WhichOneof("value")
+    if field is None:
+        return None
+    if field == "array_value":
+        return [_any_value(item) for item in value.array_value.values]
+    if field == "kvlist_value":
+        return _attributes(value.kvlist_value.values)
+    if field == "bytes_value":
+        return value.bytes_value.hex()
+    return getattr(value, field)
+
+
+def _attributes(key_values) -> Dict[str, Any]:
+    """Convert repeated OTLP KeyValue to a dict."""
+    return {kv.key: _any_value(kv.value) for kv in key_values}
+
+
+def _timestamp(unix_nano: int) -> Optional[str]:
+    if not unix_nano:
+        return None
+    return datetime.fromtimestamp(unix_nano / 1e9, tz=timezone.utc).replace(tzinfo=None).isoformat()
+
+
+def map_spans(request) -> List[Dict[str, Any]]:
+    """Map an ExportTraceServiceRequest to rows of the trace table."""
+    rows = []
+    for resource_span in request.resource_spans:
+        resource = _attributes(resource_span.resource.attributes)
+        service = resource.get("service.name", "unknown")
+        for scope_span in resource_span.scope_spans:
+            scope = {"name": scope_span.scope.name, "version": scope_span.scope.version}
+            for span in scope_span.spans:
+                start, end = span.start_time_unix_nano, span.end_time_unix_nano
+                attributes = _attributes(span.attributes)
+                rows.append({
+                    "trace_id": span.trace_id.hex(),
+                    "span_id": span.span_id.hex(),
+                    "parent_span_id": span.parent_span_id.hex() if span.parent_span_id else None,
+                    "name": span.name,
+                    "service": service,
+                    "kind": SPAN_KINDS.get(span.kind, str(span.kind)),
+                    "start_time": _timestamp(start),
+                    "end_time": _timestamp(end),
+                    "duration_ms": (end - start) / 1e6 if start and end else None,
+                    "status_code": STATUS_CODES.get(span.status.code, str(span.status.code)),
+                    "status_message": span.status.message or None,
+                    "attributes": attributes,
+                    "events": [
+                        {
+                            "name": event.name,
+                            "timestamp": _timestamp(event.time_unix_nano),
+                            "attributes": _attributes(event.attributes)
+                        }
+                        for event in span.events
+                    ],
+                    "links": [
+                        {
+                            "trace_id": link.trace_id.hex(),
+                            "span_id": link.span_id.hex(),
+                            "attributes": _attributes(link.attributes)
+                        }
+                        for link in span.links
+                    ],
+                    "resource": {**resource, "otel.scope": scope},
+                    "timestamp": _timestamp(start) or datetime.utcnow().isoformat(),
+                    "correlation_id": attributes.get("correlation_id")
+                })
+    return rows
+
+
+def _metric_rows(metric, service: str, resource: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Rows of the metric table for every data point of one metric."""
+    data = metric.WhichOneof("data")
+    base = {
+        "name": metric.name,
+        "description": metric.description or None,
+        "service": service,
+        "unit": metric.unit or None,
+        "type": data
+    }
+    rows = []
+
+    def add(point, value, name=None, **extra_labels):
+        labels = _attributes(point.attributes)
+        labels.update(extra_labels)
+        if resource:
+            labels["resource"] = resource
+        rows.append({
+            **base,
+            "name": name or metric.name,
+            "value": value,
+            "labels": labels,
+            "timestamp": _timestamp(point.time_unix_nano) or datetime.utcnow().isoformat(),
+            "correlation_id": None
+        })
+
+    if data in ("gauge", "sum"):
+        container = getattr(metric, data)
+        extra = {"monotonic": container.is_monotonic} if data == "sum" else {}
+        for point in container.data_points:
+            value = point.as_double if point.WhichOneof("value") == "as_double" else point.as_int
+            add(point, float(value), **extra)
+    elif data in ("histogram", "exponential_histogram"):
+        for point in getattr(metric, data).data_points:
+            add(point, float(point.count), name=f"{metric.name}.count")
+            add(point, point.sum, name=f"{metric.name}.sum")
+            if data == "histogram" and point.explicit_bounds:
+                add(point, float(point.count), name=f"{metric.name}.buckets",
+                    bounds=list(point.explicit_bounds), bucket_counts=list(point.bucket_counts))
+    elif data == "summary":
+        for point in metric.summary.data_points:
+            add(point, float(point.count), name=f"{metric.name}.count")
+            add(point, point.sum, name=f"{metric.name}.sum")
+            for quantile in point.quantile_values:
+                add(point, quantile.value, name=f"{metric.name}.quantile", quantile=quantile.quantile)
+    return rows
+
+
+def map_metrics(request) -> List[Dict[str, Any]]:
+    """Map an ExportMetricsServiceRequest to rows of the metric table."""
+    rows = []
+    for resource_metric in request.resource_metrics:
+        resource = _attributes(resource_metric.resource.attributes)
+        service = resource.get("service.name", "unknown")
+        for scope_metric in resource_metric.scope_metrics:
+            for metric in scope_metric.metrics:
+                rows.extend(_metric_rows(metric, service, resource))
+    return rows
+
+
+def _reject(context, kind: str, rows: int) -> None:
+    logger.warning(f"Ingestion queue full, rejected {rows} {kind} rows")
+    context.set_code(grpc.StatusCode.UNAVAILABLE)
+    context.set_details(f"Telemetry ingestion queue is full; retry later ({rows} {kind} rows rejected)")
+
+
 class TraceService(trace_service_pb2_grpc.TraceServiceServicer):
-    def __init__(self, trace_handler: Callable[[Dict[str, Any]], Awaitable[None]]):
-        self.trace_handler = trace_handler
+    def __init__(self, pipeline: TelemetryIngestionPipeline):
+        self.pipeline = pipeline
 
     async def Export(self, request, context):
-        logger.info(f"Received {len(request.resource_spans)} trace resource spans.")
-        for resource_span in request.resource_spans:
-            for scope_span in resource_span.scope_spans:
-                for span in scope_span.spans:
-                    trace_data = {
-                        "trace_id": span.trace_id.hex(),
-                        "span_id": span.span_id.hex(),
-                        "parent_span_id": span.parent_span_id.hex() if span.parent_span_id else None,
-                        "name": span.name,
-                        # This is a simplification; real mapping is more complex
-                    }
-                    await self.trace_handler(trace_data)
+        rows = map_spans(request)
+        if not self.pipeline.offer("trace", rows):
+            _reject(context, "trace", len(rows))
         return trace_service_pb2.ExportTraceServiceResponse()
 
+
 class MetricsService(metrics_service_pb2_grpc.MetricsServiceServicer):
+    def __init__(self, pipeline: TelemetryIngestionPipeline):
+        self.pipeline = pipeline
+
     async def Export(self, request, context):
-        logger.info(f"Received {len(request.resource_metrics)} metric resource metrics.")
-        # Processing logic for metrics would go here
+        rows = map_metrics(request)
+        if not self.pipeline.offer("metric", rows):
+            _reject(context, "metric", len(rows))
         return metrics_service_pb2.ExportMetricsServiceResponse()
 
-async def serve_otlp_grpc(trace_handler: Callable[[Dict[str, Any]], Awaitable[None]]):
+
+async def serve_otlp_grpc(pipeline: TelemetryIngestionPipeline):
     server = grpc.aio.server(futures.ThreadPoolExecutor(max_workers=10))
-    trace_service_pb2_grpc.add_TraceServiceServicer_to_server(TraceService(trace_handler), server)
-    metrics_service_pb2_grpc.add_MetricsServiceServicer_to_server(MetricsService(), server)
-    
+    trace_service_pb2_grpc.add_TraceServiceServicer_to_server(TraceService(pipeline), server)
+    metrics_service_pb2_grpc.add_MetricsServiceServicer_to_server(MetricsService(pipeline), server)
+
     try:
         with open('/certs/server.key', 'rb') as f:
             private_key = f.read()
         with open('/certs/server.crt', 'rb') as f:
             certificate_chain = f.read()
-        
+
         server_credentials = grpc.ssl_server_credentials(
             private_key_certificate_chain_pairs=[(private_key, certificate_chain)]
         )
-        
+
         server.add_secure_port('[::]:4317', server_credentials)
         logger.info("Starting OTLP gRPC server with TLS on port 4317")
         await server.start()
         return server
-        
+
     except FileNotFoundError:
         logger.error("TLS certificate or key not found. OTLP gRPC server cannot start.")
         raise
@@ -0,0 +1,162 @@
+"""
+Telemetry Ingestion Pipeline for Observability Service
+
+Decouples OTLP receivers from storage. Receivers offer the rows of an export
+request to a bounded queue and return immediately; worker tasks drain the
+queue and hand rows to the sink in batches, so storage sees one write per
+batch instead of one per span.
+
+When the queue is full the whole request is rejected, which the gRPC server
+reports as UNAVAILABLE so OTLP exporters back off and retry.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from .metrics import track_pipeline_rows, update_pipeline_queue_depth
+
+logger = logging.getLogger(__name__)
+
+# sink(kind, rows) stores a batch of rows of one kind ("trace" or "metric")
+TelemetrySink = Callable[[str, List[Dict[str, Any]]], Awaitable[None]]
+
+
+class TelemetryIngestionPipeline:
+    """Bounded queue with batching workers between receivers and storage."""
+
+    def __init__(
+        self,
+        sink: TelemetrySink,
+        max_queued_rows: int = 100000,
+        batch_size: int = 1000,
+        flush_interval: float = 0.5,
+        workers: int = 2
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            sink: Coroutine storing a batch of rows of one kind
+            max_queued_rows: Rows that may wait in the queue before requests are rejected
+            batch_size: Maximum rows handed to the sink at once
+            flush_interval: Maximum seconds a row waits for its batch to fill
+            workers: Number of concurrent batching workers
+        """
+        self.sink = sink
+        self.max_queued_rows = max_queued_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.workers = workers
+
+        self._queue: "asyncio.Queue[Tuple[str, List[Dict[str, Any]]]]" = asyncio.Queue()
+        self._queued_rows = 0
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+        self.stats: Dict[str, int] = defaultdict(int)
+
+    @property
+    def queued_rows(self) -> int:
+        """Rows accepted but not yet handed to the sink."""
+        return self._queued_rows
+
+    def start(self) -> None:
+        """Start the batching workers."""
+        if self._running:
+            return
+        self._running = True
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Telemetry ingestion pipeline started with {self.workers} workers")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush queued rows (up to timeout seconds) and stop the workers."""
+        self._running = False
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Stopping ingestion pipeline with {self._queued_rows} rows unflushed")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def offer(self, kind: str, rows: List[Dict[str, Any]]) -> bool:
+        """
+        Queue the rows of one export request without waiting.
+
+        Args:
+            kind: Telemetry kind ("trace" or "metric")
+            rows: Rows to store
+
+        Returns:
+            True if the rows were queued, False if the queue is full (nothing is queued)
+        """
+        if not rows:
+            return True
+        if not self._running or self._queued_rows + len(rows) > self.max_queued_rows:
+            self.stats[f"{kind}_dropped"] += len(rows)
+            track_pipeline_rows(kind, "dropped", len(rows))
+            return False
+
+        self._queue.put_nowait((kind, rows))
+        self._queued_rows += len(rows)
+        self.stats[f"{kind}_queued"] += len(rows)
+        track_pipeline_rows(kind, "queued", len(rows))
+        update_pipeline_queue_depth(self._queued_rows)
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            kind, rows = await self._queue.get()
+            items = 1
+            batches: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            batches[kind].extend(rows)
+            size = len(rows)
+
+            # Fill the batch until it is full or the oldest row has waited long enough
+            deadline = time.monotonic() + self.flush_interval
+            while size < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        kind, rows = await asyncio.wait_for(self._queue.get(), remaining)
+                    else:
+                        kind, rows = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                items += 1
+                batches[kind].extend(rows)
+                size += len(rows)
+
+            try:
+                for batch_kind, batch_rows in batches.items():
+                    for start in range(0, len(batch_rows), self.batch_size):
+                        await self._flush(batch_kind, batch_rows[start:start + self.batch_size])
+            finally:
+                self._queued_rows -= size
+                update_pipeline_queue_depth(self._queued_rows)
+                for _ in range(items):
+                    self._queue.task_done()
+
+    async def _flush(self, kind: str, rows: List[Dict[str, Any]]) -> None:
+        try:
+            await self.sink(kind, rows)
+            self.stats[f"{kind}_exported"] += len(rows)
+            self.stats["batches"] += 1
+            track_pipeline_rows(kind, "exported", len(rows))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats[f"{kind}_failed"] += len(rows)
+            track_pipeline_rows(kind, "failed", len(rows))
+            logger.error(f"Failed to store batch of {len(rows)} {kind} rows: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pipeline counters."""
+        return {
+            **self.stats,
+            "queued_rows": self._queued_rows,
+            "max_queued_rows": self.max_queued_rows
+        }
@@ -0,0 +1,133 @@
+import asyncio
+import sys
+import os
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, AsyncMock
+
+# Add the service directory to sys.path
+service_dir = os.path.dirname(os.path.abspath(__file__))
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+# Mock telemetry
+sys.modules["app.telemetry"] = MagicMock()
+sys.modules["app.telemetry"].trace_method = lambda name=None, kind=None: lambda func: func
+sys.modules["app.telemetry"].add_span_attributes = MagicMock()
+sys.modules["app.telemetry"].get_correlation_id = lambda: "test-correlation-id"
+
+# Import endpoint handler
+from app.api import query as query_api
+from app.api.query import execute_advanced_query
+from app.config import get_settings
+from app.models import QueryQuery
+
+BACKEND_DELAY = 0.2
+
+
+async def slow_query_data_type(data_type, filters, query, database_client):
+    """Backend answering every data type after BACKEND_DELAY; health never answers."""
+    await asyncio.sleep(60 if data_type == "health" else BACKEND_DELAY)
+    return [{"data_type": data_type, "filters": filters}]
+
+
+async def validate_advanced_query():
+    print("Starting Advanced Query Validation...")
+    original_query_data_type = query_api.query_data_type
+    query_api.query_data_type = slow_query_data_type
+    get_settings().query_type_timeouts = {"health": 0.5}
+    database_client = AsyncMock()
+
+    def make_query():
+        return QueryQuery(
+            data_types=["trace", "metric", "event", "health", "dependency"],
+            service="checkout",
+            start_time=datetime(2024, 1, 1),
+            end_time=datetime(2024, 1, 2),
+            trace_id="abc",
+            dependency_type="database"
+        )
+
+    # 1. Validate concurrent fan-out
+    print("\n1. Validating concurrent fan-out with per-type timeouts...")
+    start = time.time()
+    response = await execute_advanced_query(query=make_query(), stream=False, database_client=database_client)
+    elapsed = time.time() - start
+    print(f"   Response status: {response.status}, errors: {response.errors}, elapsed: {elapsed:.2f}s")
+
+    if elapsed < 4 * BACKEND_DELAY + 0.5:
+        print("   ✅ Data types queried concurrently")
+    else:
+        print(f"   ❌ Data types queried sequentially ({elapsed:.2f}s)")
+
+    if response.status == "partial" and "health" in response.errors and len(response.results["traces"]) == 1:
+        print("   ✅ Timed out data type reported without failing the others")
+    else:
+        print(f"   ❌ Unexpected partial result: {response}")
+
+    filters = response.results["traces"][0]["filters"]
+    if filters.get("trace_id") == "abc" and filters.get("service") == "checkout":
+        print("   ✅ Type-specific filters applied")
+    else:
+        print(f"   ❌ Filter mismatch: {filters}")
+
+    # 2. Validate NDJSON streaming
+    print("\n2. Validating NDJSON streaming...")
+    response = await execute_advanced_query(query=make_query(), stream=True, database_client=database_client)
+    lines = []
+    first_line_at = None
+    start = time.time()
+    async for chunk in response.body_iterator:
+        if first_line_at is None:
+            first_line_at = time.time() - start
+        lines.append(json.loads(chunk))
+
+    print(f"   Received {len(lines)} lines, first after {first_line_at:.2f}s")
+    if response.media_type == "application/x-ndjson" and len(lines) == 6:
+        print("   ✅ One line per data type plus a summary line")
+    else:
+        print(f"   ❌ Unexpected stream: {lines}")
+
+    if first_line_at < 0.5 and lines[-2]["data_type"] == "health" and "error" in lines[-2]:
+        print("   ✅ Results emitted as they arrive, slow data type last")
+    else:
+        print(f"   ❌ Results were not streamed incrementally")
+
+    if lines[-1]["status"] == "partial":
+        print("   ✅ Summary line reports partial result")
+    else:
+        print(f"   ❌ Summary mismatch: {lines[-1]}")
+
+    # 3. Validate the per-type query sent to the database service
+    print("\n3. Validating database query per data type...")
+    query_api.query_data_type = original_query_data_type
+    database_client.query_table = AsyncMock(return_value=[{"trace_id": "abc", "service": "checkout"}])
+    query = make_query()
+    filters = query_api._build_filters(query)
+    rows = await query_api.query_data_type("trace", filters["trace"], query, database_client)
+    call = database_client.query_table.call_args.kwargs
+
+    if rows == [{"trace_id": "abc", "service": "checkout"}]:
+        print("   ✅ Rows returned by the database service are the results")
+    else:
+        print(f"   ❌ Unexpected rows: {rows}")
+
+    expected_range = {"column": "timestamp", "start": "2024-01-01T00:00:00", "end": "2024-01-02T00:00:00"}
+    if (call["table_name"] == "trace"
+            and call["filters"] == {"service": "checkout", "trace_id": "abc"}
+            and call["time_range"] == expected_range):
+        print("   ✅ Table, filters and time range sent to the database service")
+    else:
+        print(f"   ❌ Query mismatch: {call}")
+
+    await query_api.query_data_type("dependency", filters["dependency"], query, database_client)
+    if database_client.query_table.call_args.kwargs["filters"] == {"service": "checkout", "type": "database"}:
+        print("   ✅ Dependency filters use the dependency table's columns")
+    else:
+        print(f"   ❌ Dependency filter mismatch: {database_client.query_table.call_args.kwargs}")
+
+    print("\nValidation Complete!")
+
+if __name__ == "__main__":
+    asyncio.run(validate_advanced_query())
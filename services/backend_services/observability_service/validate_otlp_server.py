@@ -9,106 +9,109 @@ service_dir = os.path.dirname(os.path.abspath(__file__))
 if service_dir not in sys.path:
     sys.path.insert(0, service_dir)
 
-# Mock grpc and protobufs since we might not have them installed or want to run a full server
-sys.modules["grpc"] = MagicMock()
-sys.modules["grpc.aio"] = MagicMock()
-
-# Create mock classes for protobuf objects
-class MockSpan:
-    def __init__(self, trace_id, span_id, parent_span_id, name):
-        self.trace_id = trace_id
-        self.span_id = span_id
-        self.parent_span_id = parent_span_id
-        self.name = name
-
-class MockScopeSpans:
-    def __init__(self, spans):
-        self.spans = spans
-
-class MockResourceSpans:
-    def __init__(self, scope_spans):
-        self.scope_spans = scope_spans
-
-class MockExportTraceServiceRequest:
-    def __init__(self, resource_spans):
-        self.resource_spans = resource_spans
-
-class MockExportMetricsServiceRequest:
-    def __init__(self, resource_metrics):
-        self.resource_metrics = resource_metrics
-
-# Mock the protobuf modules
-trace_service_pb2_grpc = MagicMock()
-trace_service_pb2_grpc.TraceServiceServicer = object
-sys.modules["opentelemetry.proto.collector.trace.v1"] = MagicMock()
-sys.modules["opentelemetry.proto.collector.trace.v1"].trace_service_pb2_grpc = trace_service_pb2_grpc
-sys.modules["opentelemetry.proto.collector.trace.v1"].trace_service_pb2 = MagicMock()
-
-metrics_service_pb2_grpc = MagicMock()
-metrics_service_pb2_grpc.MetricsServiceServicer = object
-sys.modules["opentelemetry.proto.collector.metrics.v1"] = MagicMock()
-sys.modules["opentelemetry.proto.collector.metrics.v1"].metrics_service_pb2_grpc = metrics_service_pb2_grpc
-sys.modules["opentelemetry.proto.collector.metrics.v1"].metrics_service_pb2 = MagicMock()
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import ExportTraceServiceRequest
+from opentelemetry.proto.collector.metrics.v1.metrics_service_pb2 import ExportMetricsServiceRequest
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.metrics.v1.metrics_pb2 import Metric, NumberDataPoint, HistogramDataPoint
+from opentelemetry.proto.trace.v1.trace_pb2 import Span, Status
 
 # Import the server implementation
 from app.otlp_grpc_server import TraceService, MetricsService
+from app.telemetry_pipeline import TelemetryIngestionPipeline
+
+
+def check(condition, message):
+    print(f"   {'✅' if condition else '❌'} {message}")
+    return condition
+
+
+def build_trace_request(spans=1):
+    request = ExportTraceServiceRequest()
+    resource_spans = request.resource_spans.add()
+    resource_spans.resource.attributes.append(KeyValue(key="service.name", value=AnyValue(string_value="checkout")))
+    scope_spans = resource_spans.scope_spans.add()
+    for i in range(spans):
+        scope_spans.spans.append(Span(
+            trace_id=b'\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10',
+            span_id=(i + 1).to_bytes(8, "big"),
+            parent_span_id=b'\x08\x07\x06\x05\x04\x03\x02\x01',
+            name="test-span",
+            kind=Span.SPAN_KIND_SERVER,
+            start_time_unix_nano=1_700_000_000_000_000_000,
+            end_time_unix_nano=1_700_000_000_250_000_000,
+            attributes=[KeyValue(key="http.status_code", value=AnyValue(int_value=200))],
+            status=Status(code=Status.STATUS_CODE_OK)
+        ))
+    return request
+
+
+def build_metrics_request():
+    request = ExportMetricsServiceRequest()
+    resource_metrics = request.resource_metrics.add()
+    resource_metrics.resource.attributes.append(KeyValue(key="service.name", value=AnyValue(string_value="checkout")))
+    scope_metrics = resource_metrics.scope_metrics.add()
+
+    gauge = Metric(name="queue.depth", unit="1")
+    gauge.gauge.data_points.append(NumberDataPoint(time_unix_nano=1_700_000_000_000_000_000, as_int=7))
+    latency = Metric(name="http.duration", unit="ms")
+    latency.histogram.data_points.append(HistogramDataPoint(
+        time_unix_nano=1_700_000_000_000_000_000, count=4, sum=100.0,
+        explicit_bounds=[10.0, 50.0], bucket_counts=[1, 2, 1]
+    ))
+    scope_metrics.metrics.extend([gauge, latency])
+    return request
+
 
 async def validate_otlp_server():
     print("Starting OTLP Server Validation...")
-    
+
+    sink = AsyncMock()
+    pipeline = TelemetryIngestionPipeline(sink, max_queued_rows=10, batch_size=100, flush_interval=0.05, workers=1)
+    pipeline.start()
+    context = MagicMock()
+
     # 1. Validate TraceService Logic
     print("\n1. Validating TraceService Export Logic...")
-    
-    # Mock handler
-    mock_handler = AsyncMock()
-    trace_service = TraceService(trace_handler=mock_handler)
-    
-    # Create mock request data
-    # Use bytes for IDs as protobufs usually use bytes
-    trace_id = b'\x01\x02\x03\x04\x05\x06\x07\x08\t\n\x0b\x0c\r\x0e\x0f\x10'
-    span_id = b'\x01\x02\x03\x04\x05\x06\x07\x08'
-    parent_id = b'\x08\x07\x06\x05\x04\x03\x02\x01'
-    
-    span = MockSpan(trace_id, span_id, parent_id, "test-span")
-    scope_spans = MockScopeSpans([span])
-    resource_spans = MockResourceSpans([scope_spans])
-    request = MockExportTraceServiceRequest([resource_spans])
-    context = MagicMock()
-    
-    # Call Export
-    await trace_service.Export(request, context)
-    
-    # Verify handler call
-    mock_handler.assert_awaited()
-    call_args = mock_handler.call_args[0][0]
-    
-    print(f"   Handler called with: {call_args}")
-    
-    if call_args["trace_id"] == trace_id.hex():
-        print("   ✅ Trace ID mapped correctly")
-    else:
-        print(f"   ❌ Trace ID mismatch: {call_args['trace_id']}")
-        
-    if call_args["span_id"] == span_id.hex():
-        print("   ✅ Span ID mapped correctly")
-    else:
-        print(f"   ❌ Span ID mismatch: {call_args['span_id']}")
-        
-    if call_args["name"] == "test-span":
-        print("   ✅ Span name mapped correctly")
-    else:
-        print(f"   ❌ Span name mismatch: {call_args['name']}")
+    trace_service = TraceService(pipeline)
+    await trace_service.Export(build_trace_request(), context)
+    await pipeline.stop()
+
+    sink.assert_awaited()
+    kind, rows = sink.call_args[0]
+    row = rows[0]
+    print(f"   Sink called with: {kind} {row}")
+    check(kind == "trace", "Spans stored as trace rows")
+    check(row["trace_id"] == "0102030405060708090a0b0c0d0e0f10", "Trace ID mapped correctly")
+    check(row["span_id"] == "0000000000000001", "Span ID mapped correctly")
+    check(row["name"] == "test-span", "Span name mapped correctly")
+    check(row["service"] == "checkout", "Service taken from resource")
+    check(row["kind"] == "SERVER" and row["status_code"] == "OK", "Kind and status mapped correctly")
+    check(row["duration_ms"] == 250.0, "Duration computed from span times")
+    check(row["attributes"] == {"http.status_code": 200}, "Attributes decoded")
 
     # 2. Validate MetricsService Logic
     print("\n2. Validating MetricsService Export Logic...")
-    metrics_service = MetricsService()
-    
-    # Create mock metrics request
-    metrics_request = MockExportMetricsServiceRequest([]) # Empty list for now as implementation is stub
-    
-    # Call Export
-    response = await metrics_service.Export(metrics_request, context)
-    print("   ✅ MetricsService.Export executed without error")
+    sink.reset_mock()
+    pipeline.start()
+    metrics_service = MetricsService(pipeline)
+    await metrics_service.Export(build_metrics_request(), context)
+    await pipeline.stop()
+
+    kind, rows = sink.call_args[0]
+    by_name = {row["name"]: row for row in rows}
+    check(kind == "metric", "Data points stored as metric rows")
+    check(by_name["queue.depth"]["value"] == 7.0, "Gauge value mapped correctly")
+    check(by_name["http.duration.count"]["value"] == 4.0, "Histogram count mapped correctly")
+    check(by_name["http.duration.sum"]["value"] == 100.0, "Histogram sum mapped correctly")
+
+    # 3. Validate back-pressure
+    print("\n3. Validating back-pressure...")
+    context = MagicMock()
+    pipeline.start()
+    await trace_service.Export(build_trace_request(spans=11), context)
+    check(context.set_code.called, "Request larger than the queue rejected with a status code")
+    check(pipeline.get_stats().get("trace_dropped") == 11, "Rejected spans counted as dropped")
+    await pipeline.stop()
 
     print("\nValidation Complete!")
 
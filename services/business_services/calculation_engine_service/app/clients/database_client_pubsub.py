@@ -3,16 +3,24 @@ Database Client using Pub/Sub for Calculation Engine Service.
 
 Provides database access via Redis pub/sub request/reply pattern,
 maintaining the event-driven architecture.
+
+The request/reply transport is the database service's own client:
+RequestReplyClient for transport="pubsub", or StreamRequestReplyClient for
+transport="streams" (requests are consumed by a worker consumer group and
+replies are read from a per-client stream, so they survive listener
+reconnects).
 """
 
-import asyncio
-import json
+import sys
+from pathlib import Path
 import logging
-import uuid
-from datetime import datetime
 from typing import Any, Dict, List, Optional
 
-import redis.asyncio as redis
+# Add backend services to path
+backend_services_path = Path(__file__).parent.parent.parent.parent.parent / "backend_services"
+sys.path.insert(0, str(backend_services_path))
+
+from database_service.app.request_reply import RequestReplyClient, StreamRequestReplyClient
 
 logger = logging.getLogger(__name__)
 
@@ -25,68 +33,56 @@ class DatabaseClientPubSub:
     """
     Database client using pub/sub for event-driven database access.
     
-    Uses request/reply pattern over Redis pub/sub instead of HTTP.
+    Uses request/reply pattern over Redis pub/sub (or Redis Streams) instead
+    of HTTP.
     """
     
     def __init__(
         self,
         redis_url: str,
         service_name: str = "calculation_engine",
-        default_timeout: float = 30.0
+        default_timeout: float = 30.0,
+        transport: str = "pubsub",
+        max_stream_length: int = 10000
     ):
+        """
+        Initialize the client.
+        
+        Args:
+            redis_url: Redis connection URL
+            service_name: Name used for the reply channel/stream
+            default_timeout: Default request timeout in seconds
+            transport: "pubsub" or "streams"
+            max_stream_length: Approximate cap on request stream length
+                (streams transport; oldest requests are shed beyond it)
+        """
+        if transport not in ("pubsub", "streams"):
+            raise ValueError(f"Unknown transport: {transport}")
         self.redis_url = redis_url
         self.service_name = service_name
         self.default_timeout = default_timeout
-        self._redis: Optional[redis.Redis] = None
-        self._pubsub: Optional[redis.client.PubSub] = None
-        self._pending_requests: Dict[str, asyncio.Future] = {}
-        self._reply_channel: str = f"reply.{service_name}.{uuid.uuid4().hex[:8]}"
-        self._listener_task: Optional[asyncio.Task] = None
-        self._running = False
+        self.transport = transport
+        self.max_stream_length = max_stream_length
+        
+        self._client: RequestReplyClient
+        if transport == "streams":
+            self._client = StreamRequestReplyClient(
+                redis_url,
+                service_name,
+                default_timeout=default_timeout,
+                max_stream_length=max_stream_length
+            )
+        else:
+            self._client = RequestReplyClient(redis_url, service_name, default_timeout=default_timeout)
     
     async def connect(self) -> None:
         """Connect to Redis and start reply listener."""
-        if self._running:
-            return
-        
-        self._redis = redis.Redis.from_url(
-            self.redis_url,
-            decode_responses=True,
-            max_connections=10
-        )
-        await self._redis.ping()
-        
-        self._pubsub = self._redis.pubsub()
-        await self._pubsub.subscribe(self._reply_channel)
-        
-        self._running = True
-        self._listener_task = asyncio.create_task(self._listen_for_replies())
-        
-        logger.info(f"DatabaseClientPubSub connected, reply channel: {self._reply_channel}")
+        await self._client.connect()
+        logger.info(f"DatabaseClientPubSub connected ({self.transport})")
     
     async def close(self) -> None:
         """Disconnect from Redis."""
-        self._running = False
-        
-        if self._listener_task:
-            self._listener_task.cancel()
-            try:
-                await self._listener_task
-            except asyncio.CancelledError:
-                pass
-        
-        if self._pubsub:
-            await self._pubsub.unsubscribe(self._reply_channel)
-            await self._pubsub.close()
-        
-        if self._redis:
-            await self._redis.close()
-        
-        for future in self._pending_requests.values():
-            if not future.done():
-                future.set_exception(asyncio.CancelledError("Client disconnected"))
-        self._pending_requests.clear()
-        
+        await self._client.disconnect()
         logger.info("DatabaseClientPubSub disconnected")
     
     async def _request(
@@ -97,70 +93,7 @@ class DatabaseClientPubSub:
         timeout: Optional[float] = None
     ) -> Dict[str, Any]:
         """Send a request and wait for reply."""
-        if not self._running:
-            await self.connect()
-        
-        correlation_id = str(uuid.uuid4())
-        timeout = timeout or self.default_timeout
-        
-        future: asyncio.Future = asyncio.get_event_loop().create_future()
-        self._pending_requests[correlation_id] = future
-        
-        try:
-            message = {
-                "correlation_id": correlation_id,
-                "reply_to": self._reply_channel,
-                "request_type": request_type,
-                "source": self.service_name,
-                "timestamp": datetime.utcnow().isoformat(),
-                "payload": payload
-            }
-            
-            await self._redis.publish(channel, json.dumps(message))
-            response = await asyncio.wait_for(future, timeout=timeout)
-            
-            if response.get("error"):
-                raise Exception(response["error"])
-            
-            return response.get("payload", response)
-            
-        except asyncio.TimeoutError:
-            logger.error(f"Request timeout: {channel}/{request_type}")
-            raise
-        finally:
-            self._pending_requests.pop(correlation_id, None)
-    
-    async def _listen_for_replies(self) -> None:
-        """Listen for reply messages."""
-        try:
-            while self._running:
-                message = await self._pubsub.get_message(
-                    ignore_subscribe_messages=True,
-                    timeout=1.0
-                )
-                
-                if message and message["type"] == "message":
-                    try:
-                        data = json.loads(message["data"])
-                        correlation_id = data.get("correlation_id")
-                        
-                        if correlation_id and correlation_id in self._pending_requests:
-                            future = self._pending_requests[correlation_id]
-                            if not future.done():
-                                future.set_result(data)
-                    except json.JSONDecodeError:
-                        pass
-                    except Exception as e:
-                        logger.error(f"Error processing reply: {e}")
-                
-                if not message:
-                    await asyncio.sleep(0.01)
-                    
-        except asyncio.CancelledError:
-            pass
-        except Exception as e:
-            if self._running:
-                logger.error(f"Reply listener error: {e}")
+        return await self._client.request(channel, request_type, payload, timeout)
     
     async def execute_query(
         self,
@@ -192,6 +125,43 @@ class DatabaseClientPubSub:
             timeout=timeout
         )
     
+    async def execute_prepared(
+        self,
+        statement_key: str,
+        query: str,
+        parameters: Optional[Dict[str, Any]] = None,
+        parameter_types: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a bind-parameterized read query as a prepared statement.
+
+        The query text must be stable across calls (only parameter values
+        change) so the database service can reuse the server-side plan.
+
+        Args:
+            statement_key: Stable identifier for the statement
+            query: Parameterized SQL query
+            parameters: Bind parameter values (datetimes as ISO strings)
+            parameter_types: Type hints for parameters that need restoring
+                (e.g. {"PeriodStart": "timestamp"})
+            timeout: Query timeout
+
+        Returns:
+            Query result with rows and row_count
+        """
+        return await self._request(
+            channel=CHANNEL_DATABASE_QUERY,
+            request_type="execute_prepared",
+            payload={
+                "statement_key": statement_key,
+                "query": query,
+                "parameters": parameters or {},
+                "parameter_types": parameter_types or {}
+            },
+            timeout=timeout
+        )
+
     async def execute_command(
         self,
         command: str,
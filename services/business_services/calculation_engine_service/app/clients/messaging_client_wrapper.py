@@ -7,7 +7,7 @@ Provides standardized interface to Messaging Service.
 import sys
 from pathlib import Path
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 # Add backend services to path
 backend_services_path = Path(__file__).parent.parent.parent.parent.parent / "backend_services"
@@ -75,6 +75,29 @@ class MessagingClientWrapper:
             logger.error(f"Failed to publish event: {e}")
             return False
     
+    async def publish_events(
+        self,
+        events: List[Tuple[str, Dict[str, Any]]]
+    ) -> bool:
+        """
+        Publish several events in a single pipelined round trip.
+        
+        Args:
+            events: (event_type, payload) pairs; each event is published to
+                the channel named after its event type
+            
+        Returns:
+            Success status
+        """
+        if not self.client:
+            logger.error("MessagingClient not connected")
+            return False
+        
+        return await self.client.publish_events([
+            {"topic": event_type, "event_type": event_type, "payload": payload}
+            for event_type, payload in events
+        ])
+    
     async def subscribe(self, channel: str, callback):
         """Subscribe to a channel."""
         if self.client:
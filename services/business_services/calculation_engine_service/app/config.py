@@ -32,6 +32,11 @@ class CalculationEngineSettings(BaseSettings):
         description="Database service URL"
     )
     
+    database_transport: str = Field(
+        default="pubsub",
+        description="Request/reply transport to the database service (pubsub or streams)"
+    )
+    
     # Messaging Service Configuration
     messaging_service_url: str = Field(
         default="http://messaging_service:8000",
@@ -90,6 +95,48 @@ class CalculationEngineSettings(BaseSettings):
         description="Cache TTL in seconds (1 hour)"
     )
     
+    # Orchestration Configuration
+    max_concurrency_per_handler: int = Field(
+        default=10,
+        description="Max calculations running at once per handler"
+    )
+    
+    # Stream Processing Configuration
+    stream_pubsub_shards: int = Field(
+        default=1,
+        description="Shared Redis pub/sub connections used for all stream subscriptions"
+    )
+    stream_batch_window_ms: int = Field(
+        default=250,
+        description="Window for coalescing stream updates per KPI/entity/period (0 disables batching)"
+    )
+    stream_max_concurrent_recalculations: int = Field(
+        default=16,
+        description="Max stream-triggered recalculations running at once per batch"
+    )
+    
+    # Set-Based Calculation Configuration
+    set_based_plan_cache_size: int = Field(
+        default=256,
+        description="Max compiled set-based statements kept per generator (LRU)"
+    )
+    set_based_prepared_statements: bool = Field(
+        default=True,
+        description="Execute set-based KPIs as bind-parameterized prepared statements"
+    )
+    set_based_cache_ttl: int = Field(
+        default=60,
+        description="Default set-based result cache TTL in seconds"
+    )
+    set_based_cache_max_entries: int = Field(
+        default=1000,
+        description="Max cached set-based results"
+    )
+    set_based_cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024,
+        description="Approximate byte budget for cached set-based results"
+    )
+    
     # CORS Configuration
     allowed_origins: str = Field(
         default="*",
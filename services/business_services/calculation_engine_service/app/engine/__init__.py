@@ -5,13 +5,16 @@ Provides the core calculation engine components including:
 - FormulaParser: Parses string-based KPI formulas into ASTs
 - SQLGenerator: Compiles ASTs into optimized TimescaleDB SQL queries
 - DependencyGraph: Manages dependencies between metrics
+- ResultCache: Bounded LRU/TTL cache for calculation results
 - SetBasedSQLGenerator: Generates SQL for set-based calculations
+- SetOperationPlanner: Chooses SQL forms for derived sets
 - Set operation models and definitions
 """
 
 from .parser import FormulaParser
 from .sql_generator import SQLGenerator
-from .dependency_graph import DependencyGraph
+from .dependency_graph import DependencyGraph, CalculationScheduler
+from .result_cache import ResultCache
 from .set_operations import (
     SetOperationType,
     AggregationType,
@@ -24,12 +27,16 @@ from .set_operations import (
     CalculationStep,
     SetBasedKPIDefinition,
     SetBasedSQLGenerator,
+    CompiledSetBasedQuery,
+    CompiledSetBasedBatch,
+    get_parameter_types,
     CHURN_RATE_DEFINITION,
     RETENTION_RATE_DEFINITION,
     SET_BASED_KPI_REGISTRY,
     get_set_based_kpi_definition,
     register_set_based_kpi,
 )
+from .set_planner import SetOperationPlanner, plan_count_only_sets
 from .nlp_to_sets_converter import (
     NLPToSetsConverter,
     ParsedKPIStructure,
@@ -53,6 +60,8 @@ __all__ = [
     "FormulaParser",
     "SQLGenerator",
     "DependencyGraph",
+    "CalculationScheduler",
+    "ResultCache",
     # Set-based components
     "SetOperationType",
     "AggregationType",
@@ -72,6 +81,11 @@ __all__ = [
     "CalculationStep",
     "SetBasedKPIDefinition",
     "SetBasedSQLGenerator",
+    "CompiledSetBasedQuery",
+    "CompiledSetBasedBatch",
+    "SetOperationPlanner",
+    "plan_count_only_sets",
+    "get_parameter_types",
     # Pre-built definitions
     "CHURN_RATE_DEFINITION",
     "RETENTION_RATE_DEFINITION",
@@ -1,4 +1,4 @@
-from typing import Dict, List, Set, Optional
+from typing import Dict, FrozenSet, List, Set, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -6,96 +6,225 @@ logger = logging.getLogger(__name__)
 class DependencyGraph:
     """
     Manages dependencies between metrics to determine calculation order.
+
+    Both edge directions are indexed so topological sorting is O(V + E).
+    Layerings are cached per target set and only the cached entries whose
+    subgraph contains a changed metric are invalidated.
     """
     def __init__(self):
         # Adjacency list: metric -> list of metrics it depends on
         self.dependencies: Dict[str, Set[str]] = {}
-    
+        # Reverse adjacency: metric -> metrics that depend on it
+        self.dependents: Dict[str, Set[str]] = {}
+
+        # Cached layerings: frozenset(targets) -> (relevant nodes, layers)
+        self._order_cache: Dict[FrozenSet[str], Tuple[Set[str], List[List[str]]]] = {}
+        # node -> cache keys whose subgraph includes the node
+        self._cache_index: Dict[str, Set[FrozenSet[str]]] = {}
+
     def add_dependency(self, metric: str, depends_on: str):
         """
         Record that 'metric' depends on 'depends_on'.
         """
         if metric not in self.dependencies:
             self.dependencies[metric] = set()
+            self.dependents.setdefault(metric, set())
+        if depends_on in self.dependencies[metric]:
+            return
         self.dependencies[metric].add(depends_on)
-        
+
         # Ensure the dependency exists as a key too
         if depends_on not in self.dependencies:
             self.dependencies[depends_on] = set()
+        self.dependents.setdefault(depends_on, set()).add(metric)
+
+        # Any cached order that reaches 'metric' now has a different subgraph
+        self._invalidate(metric)
+
+    def depends_on(self, metric: str, other: str) -> bool:
+        """Whether 'metric' depends on 'other', directly or transitively."""
+        return metric != other and other in self._get_relevant_subgraph([metric])
 
     def add_metrics(self, metrics: List[str]):
         """Ensure metrics exist in the graph even if they have no dependencies."""
         for m in metrics:
             if m not in self.dependencies:
                 self.dependencies[m] = set()
+                self.dependents.setdefault(m, set())
+
+    def get_dependents(self, metric: str) -> Set[str]:
+        """Metrics that directly depend on 'metric'."""
+        return set(self.dependents.get(metric, ()))
 
     def get_calculation_order(self, target_metrics: List[str]) -> List[List[str]]:
         """
         Determine the topological order of calculation layers.
-        
+
         Args:
             target_metrics: List of metrics we want to calculate.
-            
+
         Returns:
             List of sets (layers), where each layer can be calculated in parallel.
             [[independent_metrics], [dependent_layer_1], [dependent_layer_2], ...]
         """
+        cache_key = frozenset(target_metrics)
+        cached = self._order_cache.get(cache_key)
+        if cached is not None:
+            return [list(layer) for layer in cached[1]]
+
         # Filter graph to only relevant nodes (subgraph)
         relevant_nodes = self._get_relevant_subgraph(target_metrics)
-        
-        # Topological sort with layering
-        # Calculate in-degrees for the relevant subgraph
-        in_degree = {node: 0 for node in relevant_nodes}
-        for node in relevant_nodes:
-            for dep in self.dependencies.get(node, []):
-                if dep in relevant_nodes:
-                    # Note: self.dependencies is "depends on", so the edge is dep -> node
-                    in_degree[node] += 1
-        
+
+        # Topological sort with layering (Kahn's algorithm)
+        in_degree = self._get_in_degrees(relevant_nodes)
+
         # Queue of nodes with 0 in-degree (dependencies satisfied)
         queue = [node for node in relevant_nodes if in_degree[node] == 0]
-        
+
         layers = []
-        
+
         while queue:
             layers.append(queue)
             next_queue = []
-            
+
             for node in queue:
-                # Find nodes that depend on this node
-                # Since we store 'depends on', we need to scan or iterate
-                # This is inefficient for reverse lookup, ideally we'd build the reverse graph too
-                # But for now, we iterate through relevant nodes
-                for candidate in relevant_nodes:
-                    if node in self.dependencies.get(candidate, []):
+                # Reverse index gives the nodes that depend on this node directly
+                for candidate in self.dependents.get(node, ()):
+                    if candidate in in_degree:
                         in_degree[candidate] -= 1
                         if in_degree[candidate] == 0:
                             next_queue.append(candidate)
-            
+
             queue = next_queue
-            
+
         # Check for cycles / unvisited nodes
         visited_count = sum(len(layer) for layer in layers)
         if visited_count < len(relevant_nodes):
             raise ValueError("Circular dependency detected or dependencies missing in subgraph")
-            
-        return layers
+
+        self._order_cache[cache_key] = (relevant_nodes, layers)
+        for node in relevant_nodes:
+            self._cache_index.setdefault(node, set()).add(cache_key)
+
+        return [list(layer) for layer in layers]
+
+    def scheduler(self, target_metrics: List[str]) -> "CalculationScheduler":
+        """
+        Create a streaming scheduler for the targets.
+
+        Unlike get_calculation_order, the scheduler releases each metric as
+        soon as its own dependencies are done instead of waiting for the whole
+        previous layer.
+
+        Raises:
+            ValueError: If the subgraph contains a cycle
+        """
+        # Validates acyclicity (and warms the cache for layered callers)
+        self.get_calculation_order(target_metrics)
+        relevant_nodes = self._get_relevant_subgraph(target_metrics)
+        return CalculationScheduler(self, relevant_nodes, self._get_in_degrees(relevant_nodes))
+
+    def _get_in_degrees(self, relevant_nodes: Set[str]) -> Dict[str, int]:
+        """Count unresolved dependencies of each node within the subgraph."""
+        # Note: self.dependencies is "depends on", so the edge is dep -> node
+        return {
+            node: sum(1 for dep in self.dependencies.get(node, ()) if dep in relevant_nodes)
+            for node in relevant_nodes
+        }
+
+    def _invalidate(self, metric: str):
+        """Drop cached orders whose subgraph contains 'metric'."""
+        for cache_key in self._cache_index.pop(metric, set()):
+            entry = self._order_cache.pop(cache_key, None)
+            if entry is None:
+                continue
+            for node in entry[0]:
+                keys = self._cache_index.get(node)
+                if keys is not None:
+                    keys.discard(cache_key)
+                    if not keys:
+                        del self._cache_index[node]
 
     def _get_relevant_subgraph(self, targets: List[str]) -> Set[str]:
         """Identify all metrics needed to calculate targets (transitive closure)."""
         needed = set()
         stack = list(targets)
-        
+
         while stack:
             node = stack.pop()
             if node in needed:
                 continue
             needed.add(node)
-            
+
             # Add dependencies of this node to stack
             deps = self.dependencies.get(node, set())
             for dep in deps:
                 if dep not in needed:
                     stack.append(dep)
-        
+
         return needed
+
+
+class CalculationScheduler:
+    """
+    Incremental ready-set over a DependencyGraph subgraph.
+
+    Usage:
+        scheduler = graph.scheduler(targets)
+        while scheduler.is_active():
+            for metric in scheduler.get_ready():
+                start(metric)
+            finished = await next_completed()
+            scheduler.done(finished)
+    """
+    def __init__(self, graph: DependencyGraph, nodes: Set[str], in_degree: Dict[str, int]):
+        self._graph = graph
+        self._in_degree = in_degree
+        self._ready: List[str] = [node for node in nodes if in_degree[node] == 0]
+        self._in_progress: Set[str] = set()
+        self._finished: Set[str] = set()
+        self._total = len(nodes)
+
+    def get_ready(self) -> List[str]:
+        """Return metrics whose dependencies are all done (each returned once)."""
+        ready, self._ready = self._ready, []
+        self._in_progress.update(ready)
+        return ready
+
+    def done(self, *metrics: str) -> List[str]:
+        """
+        Mark metrics as finished.
+
+        Returns:
+            Metrics that became ready as a result (also queued for get_ready)
+        """
+        newly_ready = []
+        for metric in metrics:
+            if metric not in self._in_progress:
+                raise ValueError(f"Metric {metric} was not handed out by get_ready()")
+            self._in_progress.discard(metric)
+            self._finished.add(metric)
+
+            for candidate in self._graph.dependents.get(metric, ()):
+                if candidate in self._in_degree:
+                    self._in_degree[candidate] -= 1
+                    if self._in_degree[candidate] == 0:
+                        newly_ready.append(candidate)
+
+        self._ready.extend(newly_ready)
+        return newly_ready
+
+    def is_active(self) -> bool:
+        """True while metrics remain to be handed out or finished."""
+        return len(self._finished) < self._total
+
+    def pending_dependents(self, metric: str) -> Set[str]:
+        """All not-yet-finished metrics that transitively depend on 'metric'."""
+        result = set()
+        stack = [metric]
+        while stack:
+            for candidate in self._graph.dependents.get(stack.pop(), ()):
+                if candidate in self._in_degree and candidate not in result and candidate not in self._finished:
+                    result.add(candidate)
+                    stack.append(candidate)
+        return result
@@ -1,6 +1,20 @@
 import ast
+import operator
 from typing import List, Set, Any, Dict
 
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+
 class FormulaParser:
     """
     Parses string-based KPI formulas into structured ASTs.
@@ -28,3 +42,33 @@ class FormulaParser:
             if isinstance(node, ast.Name):
                 variables.add(node.id)
         return variables
+
+    def evaluate(self, parsed_formula: Dict[str, Any], values: Dict[str, float]) -> float:
+        """
+        Evaluates an arithmetic formula from known variable values.
+
+        Used when every variable of a formula is an already calculated KPI.
+
+        Raises:
+            ValueError: If the formula uses anything but arithmetic on numbers
+                and the given variables, or divides by zero
+        """
+        return float(self._evaluate_node(parsed_formula["ast"].body, values))
+
+    def _evaluate_node(self, node: ast.AST, values: Dict[str, float]) -> float:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name):
+            if node.id not in values:
+                raise ValueError(f"No value for variable: {node.id}")
+            return values[node.id]
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+            left = self._evaluate_node(node.left, values)
+            right = self._evaluate_node(node.right, values)
+            try:
+                return _BINARY_OPERATORS[type(node.op)](left, right)
+            except ZeroDivisionError:
+                raise ValueError("Division by zero")
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+            return _UNARY_OPERATORS[type(node.op)](self._evaluate_node(node.operand, values))
+        raise ValueError(f"Unsupported expression: {ast.dump(node)}")
@@ -0,0 +1,176 @@
+"""
+Result Cache
+
+Bounded in-process cache for calculation results.
+
+- LRU ordering via OrderedDict: lookups, inserts and evictions are O(1)
+- Expiry via a coarse timing wheel: entries are bucketed by expiry tick and
+  whole buckets are swept as time advances, so expiry never scans the cache
+- Budgets on both entry count and approximate payload bytes
+- Per-entry TTL so KPI definitions can override the default
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class _CacheEntry:
+    __slots__ = ("value", "expires_at", "tick", "size")
+
+    def __init__(self, value: Any, expires_at: float, tick: int, size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.tick = tick
+        self.size = size
+
+
+class ResultCache:
+    """
+    LRU + TTL cache with entry and byte budgets.
+
+    Not thread-safe; intended for use from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        default_ttl_seconds: float = 60,
+        tick_seconds: float = 1.0
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.tick_seconds = tick_seconds
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._wheel: Dict[int, Set[str]] = {}
+        self._next_tick = self._tick_for(time.monotonic())
+        self._bytes = 0
+
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "rejected": 0
+        }
+
+    def _tick_for(self, timestamp: float) -> int:
+        return int(timestamp // self.tick_seconds)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, or None on miss or expiry."""
+        now = time.monotonic()
+        self._expire(now)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        if entry.expires_at <= now:
+            self._remove(key)
+            self._stats["expirations"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry.value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting least recently used entries to fit budgets."""
+        now = time.monotonic()
+        self._expire(now)
+
+        size = self._estimate_size(value)
+        if size > self.max_bytes:
+            self._stats["rejected"] += 1
+            logger.debug(f"Result for {key} exceeds cache byte budget ({size} bytes)")
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        ttl = self.default_ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl
+        tick = self._tick_for(expires_at)
+
+        self._entries[key] = _CacheEntry(value, expires_at, tick, size)
+        self._wheel.setdefault(tick, set()).add(key)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self._stats["evictions"] += 1
+
+    def delete(self, key: str) -> bool:
+        """Remove a key; returns True if it was present."""
+        if key in self._entries:
+            self._remove(key)
+            return True
+        return False
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        self._entries.clear()
+        self._wheel.clear()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters and current usage."""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_rate": self._stats["hits"] / lookups if lookups > 0 else 0.0,
+            "size": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        bucket = self._wheel.get(entry.tick)
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._wheel[entry.tick]
+
+    def _expire(self, now: float):
+        """Sweep wheel buckets whose tick has fully elapsed."""
+        current_tick = self._tick_for(now)
+        if current_tick <= self._next_tick:
+            return
+
+        # After a long idle gap, walk only the populated buckets
+        if current_tick - self._next_tick > len(self._wheel):
+            due_ticks = sorted(t for t in self._wheel if t < current_tick)
+        else:
+            due_ticks = range(self._next_tick, current_tick)
+
+        for tick in due_ticks:
+            for key in self._wheel.pop(tick, ()):
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._bytes -= entry.size
+                    self._stats["expirations"] += 1
+
+        self._next_tick = current_tick
+
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        try:
+            return len(json.dumps(value, default=str))
+        except (TypeError, ValueError):
+            return len(repr(value))
@@ -20,11 +20,23 @@ Supported Operations:
 - AVERAGEX: Average a column across a set
 """
 
-from typing import Dict, Any, List, Optional, Union
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from enum import Enum
 from pydantic import BaseModel, Field
+import hashlib
 import logging
+import re
+
+from .set_planner import (
+    SetOperationPlanner,
+    get_base_set_pushdown,
+    get_pushdown_filters,
+    get_pushdown_param,
+    render_literal,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -134,6 +146,10 @@ class SetDefinition(BaseModel):
     # Key column for set operations (e.g., customer_id for customer sets)
     key_column: str = Field(default="id", description="Primary key column for set membership")
     
+    # Other columns of the base entity; runtime filters are only pushed into
+    # base sets that have the filter column
+    columns: Optional[List[str]] = Field(None, description="Filterable columns of the base entity")
+    
     def is_base_set(self) -> bool:
         """Check if this is a base set (not derived from operations)."""
         return self.base_entity is not None and self.operation is None
@@ -230,119 +246,618 @@ class SetBasedKPIDefinition(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+@dataclass
+class CompiledSetBasedQuery:
+    """
+    A set-based KPI compiled into a fully bind-parameterized statement.
+    
+    The SQL text depends only on the KPI definition and the filter shape
+    (the names of the additional filters), never on parameter values, so
+    every period window of the same KPI produces an identical statement
+    that the database can prepare once and re-execute.
+    """
+    kpi_code: str
+    statement_key: str
+    sql: str
+    filter_shape: Tuple[str, ...]
+    # Literal values from filter conditions, bound as :c<n> parameters
+    literal_params: Dict[str, Any] = field(default_factory=dict)
+    # Runtime parameters referenced by the statement (e.g. PeriodStart)
+    runtime_params: Tuple[str, ...] = ()
+    # Pushed-down filters, bound as arrays under get_pushdown_param names
+    # (scalars are wrapped on bind)
+    array_params: Tuple[str, ...] = ()
+    # Digest of the definition the statement was compiled from
+    definition_hash: str = ""
+    
+    def bind(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        additional_filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the bind parameters for one execution of the statement."""
+        values = {
+            "PeriodStart": period_start,
+            "PeriodEnd": period_end
+        }
+        if additional_filters:
+            values.update(additional_filters)
+        
+        params = dict(self.literal_params)
+        for name in self.runtime_params:
+            params[name] = values[name]
+        for name in self.array_params:
+            value = values[name]
+            if not isinstance(value, (list, tuple, set)):
+                value = [value]
+            params[get_pushdown_param(name)] = list(value)
+        return params
+
+
+@dataclass
+class CompiledSetBasedBatch:
+    """
+    Several set-based KPIs fused into one bind-parameterized statement.
+    
+    Structurally identical sets and aggregations across the KPIs are emitted
+    once as shared CTEs; the statement returns one row with a column per KPI
+    (see result_columns).
+    """
+    kpi_codes: Tuple[str, ...]
+    statement_key: str
+    sql: str
+    filter_shape: Tuple[str, ...]
+    # kpi_code -> result column in the returned row
+    result_columns: Dict[str, str] = field(default_factory=dict)
+    literal_params: Dict[str, Any] = field(default_factory=dict)
+    runtime_params: Tuple[str, ...] = ()
+    # Pushed-down filters, bound as arrays under get_pushdown_param names
+    # (scalars are wrapped on bind)
+    array_params: Tuple[str, ...] = ()
+    # Set steps before / after deduplication (for metrics and explain)
+    total_sets: int = 0
+    shared_sets: int = 0
+    
+    def bind(
+        self,
+        period_start: datetime,
+        period_end: datetime,
+        additional_filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Build the bind parameters for one execution of the statement."""
+        values = {
+            "PeriodStart": period_start,
+            "PeriodEnd": period_end
+        }
+        if additional_filters:
+            values.update(additional_filters)
+        
+        params = dict(self.literal_params)
+        for name in self.runtime_params:
+            params[name] = values[name]
+        for name in self.array_params:
+            value = values[name]
+            if not isinstance(value, (list, tuple, set)):
+                value = [value]
+            params[get_pushdown_param(name)] = list(value)
+        return params
+
+
+def get_parameter_types(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Describe temporal bind parameters so they survive JSON transport.
+    
+    Datetimes are serialized as ISO strings on the wire; the database service
+    uses these hints to restore them before binding.
+    """
+    types = {}
+    for name, value in params.items():
+        if isinstance(value, datetime):
+            types[name] = "timestamp"
+        elif isinstance(value, date):
+            types[name] = "date"
+    return types
+
+
 class SetBasedSQLGenerator:
     """
     Generates SQL for set-based calculations.
     
     Uses CTEs (Common Table Expressions) to build up intermediate sets
     and then combines them for the final calculation.
+    
+    Two modes are supported:
+    - generate_sql(): resolves parameters inline (readable, used for explain)
+    - compile(): emits a bind-parameterized statement that is cached per
+      kpi_code + definition digest + filter shape with LRU eviction,
+      suitable for server-side prepared statement execution
     """
     
-    def __init__(self, schema_name: str = "analytics_data"):
+    def __init__(self, schema_name: str = "analytics_data", plan_cache_size: int = 256):
         self.schema_name = schema_name
+        self.plan_cache_size = plan_cache_size
+        self._plan_cache: "OrderedDict[Tuple[str, str, Tuple[str, ...]], CompiledSetBasedQuery]" = OrderedDict()
+        self._batch_cache: "OrderedDict[Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]], CompiledSetBasedBatch]" = OrderedDict()
+        self._plan_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
     
-    def generate_sql(
+    def compile(
         self,
         kpi_def: SetBasedKPIDefinition,
-        period_start: datetime,
-        period_end: datetime,
-        additional_filters: Optional[Dict[str, Any]] = None
-    ) -> tuple[str, Dict[str, Any]]:
+        filter_keys: Optional[List[str]] = None
+    ) -> CompiledSetBasedQuery:
         """
-        Generate complete SQL for a set-based KPI calculation.
+        Compile a KPI definition into a cached, bind-parameterized statement.
         
+        Args:
+            kpi_def: The set-based KPI definition
+            filter_keys: Names of the additional filters supplied at runtime
+            
         Returns:
-            Tuple of (SQL string, parameters dict)
+            CompiledSetBasedQuery shared by every calculation with the same shape
         """
-        params = {
-            "PeriodStart": period_start,
-            "PeriodEnd": period_end
+        filter_shape = tuple(sorted(filter_keys or ()))
+        definition_hash = self._definition_hash(kpi_def)
+        cache_key = (kpi_def.kpi_code.upper(), definition_hash, filter_shape)
+        
+        compiled = self._plan_cache.get(cache_key)
+        if compiled is not None:
+            self._plan_cache.move_to_end(cache_key)
+            self._plan_cache_stats["hits"] += 1
+            return compiled
+        
+        self._plan_cache_stats["misses"] += 1
+        compiled = self._compile_definition(kpi_def, filter_shape)
+        compiled.definition_hash = definition_hash
+        self._plan_cache[cache_key] = compiled
+        self._plan_cache.move_to_end(cache_key)
+        
+        while len(self._plan_cache) > self.plan_cache_size:
+            self._plan_cache.popitem(last=False)
+            self._plan_cache_stats["evictions"] += 1
+        
+        return compiled
+    
+    def compile_batch(
+        self,
+        kpi_defs: List[SetBasedKPIDefinition],
+        filter_keys: Optional[List[str]] = None
+    ) -> CompiledSetBasedBatch:
+        """
+        Fuse several KPI definitions into one cached statement.
+        
+        Base sets with the same entity, key column and filters (and derived
+        sets / aggregations built from identical inputs) are emitted once, so
+        e.g. CHURN_RATE and RETENTION_RATE share a single scan per period
+        set instead of one each.
+        
+        Args:
+            kpi_defs: Set-based KPI definitions to evaluate together
+            filter_keys: Names of the additional filters supplied at runtime
+            
+        Returns:
+            CompiledSetBasedBatch with one result column per KPI
+        """
+        filter_shape = tuple(sorted(filter_keys or ()))
+        cache_key = (
+            tuple(d.kpi_code.upper() for d in kpi_defs),
+            tuple(self._definition_hash(d) for d in kpi_defs),
+            filter_shape
+        )
+        
+        compiled = self._batch_cache.get(cache_key)
+        if compiled is not None:
+            self._batch_cache.move_to_end(cache_key)
+            self._plan_cache_stats["hits"] += 1
+            return compiled
+        
+        self._plan_cache_stats["misses"] += 1
+        compiled = self._compile_batch(kpi_defs, filter_shape)
+        self._batch_cache[cache_key] = compiled
+        self._batch_cache.move_to_end(cache_key)
+        
+        while len(self._batch_cache) > self.plan_cache_size:
+            self._batch_cache.popitem(last=False)
+            self._plan_cache_stats["evictions"] += 1
+        
+        return compiled
+    
+    def invalidate(self, kpi_code: Optional[str] = None):
+        """Drop compiled statements for one KPI, or all of them."""
+        if kpi_code is None:
+            self._plan_cache.clear()
+            self._batch_cache.clear()
+            return
+        code = kpi_code.upper()
+        for key in [k for k in self._plan_cache if k[0] == code]:
+            del self._plan_cache[key]
+        for key in [k for k in self._batch_cache if code in k[0]]:
+            del self._batch_cache[key]
+    
+    def get_plan_cache_stats(self) -> Dict[str, Any]:
+        """Get compiled statement cache statistics."""
+        return {
+            **self._plan_cache_stats,
+            "size": len(self._plan_cache),
+            "batch_size": len(self._batch_cache),
+            "max_size": self.plan_cache_size
         }
-        if additional_filters:
-            params.update(additional_filters)
+    
+    @staticmethod
+    def _definition_hash(kpi_def: SetBasedKPIDefinition) -> str:
+        """
+        Stable digest of a definition's content.
+        
+        Definitions are rebuilt from metadata on every request, so cached
+        statements are matched by content rather than object identity; an
+        edited definition gets a new digest and is recompiled.
+        """
+        return hashlib.sha1(kpi_def.model_dump_json().encode()).hexdigest()
+    
+    def _compile_batch(
+        self,
+        kpi_defs: List[SetBasedKPIDefinition],
+        filter_shape: Tuple[str, ...]
+    ) -> CompiledSetBasedBatch:
+        """Compile a fused batch without consulting the cache."""
+        known_params = {"PeriodStart", "PeriodEnd"} | set(filter_shape)
+        for kpi_def in kpi_defs:
+            known_params |= set(kpi_def.period_parameters)
+        literal_params: Dict[str, Any] = {}
+        runtime_params: List[str] = []
+        array_params: List[str] = []
         
+        # Structural signature -> shared CTE / aggregation alias
+        set_aliases: Dict[str, str] = {}
+        agg_aliases: Dict[str, str] = {}
+        used_names: set = set()
         cte_parts = []
         aggregation_selects = []
+        formula_selects = []
+        result_columns: Dict[str, str] = {}
+        total_sets = 0
+        
+        for kpi_def in kpi_defs:
+            # Step name (local to this KPI) -> signature / shared alias
+            local_signatures: Dict[str, str] = {}
+            local_names: Dict[str, str] = {}
+            
+            # Count-only inlining is per KPI, so it is not applied when fusing
+            planner = SetOperationPlanner.for_definition(kpi_def)
+            pushdown = get_pushdown_filters(kpi_def, list(filter_shape))
+            pushdown_sql = {
+                key: f"{key} = ANY(:{get_pushdown_param(key)})" for key in pushdown
+            }
+            for key in pushdown:
+                if key not in array_params:
+                    array_params.append(key)
+            
+            for step in kpi_def.steps:
+                if step.set_definition:
+                    total_sets += 1
+                    set_def = step.set_definition
+                    signature = self._set_signature(
+                        set_def, local_signatures, planner.strategy, pushdown
+                    )
+                    local_signatures[step.name] = signature
+                    local_signatures.setdefault(set_def.name, signature)
+                    
+                    alias = set_aliases.get(signature)
+                    if alias is None:
+                        alias = self._unique_name(step.name, used_names)
+                        set_aliases[signature] = alias
+                        if set_def.is_base_set():
+                            where_sql = None
+                            if set_def.filter_conditions:
+                                where_sql = self._bind_filter_conditions(
+                                    set_def.filter_conditions,
+                                    known_params,
+                                    literal_params,
+                                    runtime_params
+                                )
+                            cte_sql = self._base_set_sql(set_def, where_sql, pushdown_sql)
+                        else:
+                            cte_sql = planner.derived_set_sql(set_def, [
+                                local_names[name] for name in set_def.source_sets or []
+                            ])
+                        cte_parts.append(f"{alias} AS (\n{cte_sql}\n)")
+                    local_names[step.name] = alias
+                    local_names.setdefault(set_def.name, alias)
+                    
+                elif step.aggregation:
+                    agg = step.aggregation
+                    signature = "|".join([
+                        agg.aggregation_type.value,
+                        agg.column or "",
+                        local_signatures.get(agg.set_name, agg.set_name)
+                    ])
+                    alias = agg_aliases.get(signature)
+                    if alias is None:
+                        alias = self._unique_name(step.name, used_names)
+                        agg_aliases[signature] = alias
+                        agg_sql = self._generate_aggregation_select(agg.model_copy(update={
+                            "set_name": local_names.get(agg.set_name, agg.set_name)
+                        }))
+                        aggregation_selects.append(f"{agg_sql} AS {alias}")
+                    local_names[step.name] = alias
+            
+            column = self._unique_name(kpi_def.kpi_code.lower(), used_names)
+            result_columns[kpi_def.kpi_code] = column
+            formula_selects.append(
+                f"{self._rename_identifiers(kpi_def.final_formula, local_names)} AS {column}"
+            )
+        
+        sql_parts = ["WITH", ",\n".join(cte_parts)]
+        select_sql = ",\n       ".join(formula_selects)
+        if aggregation_selects:
+            agg_sql = ", ".join(aggregation_selects)
+            sql_parts.append(f"SELECT {select_sql}\nFROM (SELECT {agg_sql}) AS aggs")
+        else:
+            sql_parts.append(f"SELECT {select_sql}")
+        sql = "\n".join(sql_parts)
+        
+        digest = hashlib.sha1(sql.encode()).hexdigest()[:16]
+        
+        return CompiledSetBasedBatch(
+            kpi_codes=tuple(d.kpi_code for d in kpi_defs),
+            statement_key=f"batch_{len(kpi_defs)}_{digest}",
+            sql=sql,
+            filter_shape=filter_shape,
+            result_columns=result_columns,
+            literal_params=literal_params,
+            runtime_params=tuple(runtime_params),
+            array_params=tuple(array_params),
+            total_sets=total_sets,
+            shared_sets=total_sets - len(cte_parts)
+        )
+    
+    def _set_signature(
+        self,
+        set_def: SetDefinition,
+        local_signatures: Dict[str, str],
+        strategy: str,
+        pushdown: List[str]
+    ) -> str:
+        """Structural identity of a set, independent of its name."""
+        if set_def.is_base_set():
+            filters = (
+                set_def.filter_conditions.model_dump_json()
+                if set_def.filter_conditions else ""
+            )
+            applied = get_base_set_pushdown(set_def, pushdown)
+            return f"base|{set_def.base_entity}|{set_def.key_column}|{filters}|{','.join(applied)}"
+        
+        sources = []
+        for name in set_def.source_sets or []:
+            if name not in local_signatures:
+                raise ValueError(f"Set {set_def.name} references unknown set: {name}")
+            sources.append(local_signatures[name])
+        return f"{set_def.operation.value}|{strategy}|{set_def.key_column}|({')|('.join(sources)})"
+    
+    @staticmethod
+    def _unique_name(name: str, used_names: set) -> str:
+        """Return name, suffixed if another shared CTE/column already uses it."""
+        candidate = name
+        suffix = 2
+        while candidate.lower() in used_names:
+            candidate = f"{name}_{suffix}"
+            suffix += 1
+        used_names.add(candidate.lower())
+        return candidate
+    
+    @staticmethod
+    def _rename_identifiers(formula: str, names: Dict[str, str]) -> str:
+        """Point a KPI formula at the shared aggregation aliases."""
+        renames = {k: v for k, v in names.items() if k != v}
+        if not renames:
+            return formula
+        pattern = re.compile(r"\b(" + "|".join(map(re.escape, renames)) + r")\b")
+        return pattern.sub(lambda m: renames[m.group(1)], formula)
+    
+    def _compile_definition(
+        self,
+        kpi_def: SetBasedKPIDefinition,
+        filter_shape: Tuple[str, ...]
+    ) -> CompiledSetBasedQuery:
+        """Compile a definition without consulting the cache."""
+        known_params = set(kpi_def.period_parameters) | {"PeriodStart", "PeriodEnd"} | set(filter_shape)
+        literal_params: Dict[str, Any] = {}
+        runtime_params: List[str] = []
+        
+        planner = SetOperationPlanner.for_definition(kpi_def)
+        pushdown = get_pushdown_filters(kpi_def, list(filter_shape))
+        pushdown_sql = {
+            key: f"{key} = ANY(:{get_pushdown_param(key)})" for key in pushdown
+        }
+        
+        cte_parts = []
+        count_sql: Dict[str, str] = {}
+        aggregation_selects = []
         
         for step in kpi_def.steps:
             if step.set_definition:
-                cte_sql = self._generate_set_cte(step.set_definition, params)
-                cte_parts.append(f"{step.name} AS (\n{cte_sql}\n)")
+                set_def = step.set_definition
+                count_only = step.name in planner.count_only_sets
+                if set_def.is_base_set():
+                    where_sql = None
+                    if set_def.filter_conditions:
+                        where_sql = self._bind_filter_conditions(
+                            set_def.filter_conditions,
+                            known_params,
+                            literal_params,
+                            runtime_params
+                        )
+                    cte_sql = self._base_set_sql(set_def, where_sql, pushdown_sql, count_only)
+                else:
+                    cte_sql = planner.derived_set_sql(set_def, count_only=count_only)
+                if count_only:
+                    count_sql[step.name] = cte_sql
+                else:
+                    cte_parts.append(f"{step.name} AS (\n{cte_sql}\n)")
                 
             elif step.aggregation:
-                agg_sql = self._generate_aggregation_select(step.aggregation)
+                agg_sql = self._generate_aggregation_select(step.aggregation, count_sql)
                 aggregation_selects.append(f"{agg_sql} AS {step.name}")
         
-        # Build final SQL
-        sql_parts = ["WITH"]
-        sql_parts.append(",\n".join(cte_parts))
+        sql = self._assemble_sql(cte_parts, kpi_def.final_formula, aggregation_selects)
         
-        # Final SELECT with aggregations and formula
-        final_select = self._generate_final_select(
-            kpi_def.final_formula,
-            aggregation_selects
-        )
-        sql_parts.append(final_select)
+        digest = hashlib.sha1(sql.encode()).hexdigest()[:16]
         
-        return "\n".join(sql_parts), params
+        return CompiledSetBasedQuery(
+            kpi_code=kpi_def.kpi_code,
+            statement_key=f"{kpi_def.kpi_code.lower()}_{digest}",
+            sql=sql,
+            filter_shape=filter_shape,
+            literal_params=literal_params,
+            runtime_params=tuple(runtime_params),
+            array_params=tuple(pushdown)
+        )
     
-    def _generate_set_cte(
+    def _base_set_sql(
         self,
         set_def: SetDefinition,
-        params: Dict[str, Any]
+        where_sql: Optional[str],
+        pushdown_sql: Dict[str, str],
+        count_only: bool = False
     ) -> str:
-        """Generate CTE for a set definition."""
-        if set_def.is_base_set():
-            return self._generate_base_set_sql(set_def, params)
-        else:
-            return self._generate_derived_set_sql(set_def)
+        """
+        Render a base set with its own filters plus pushed-down predicates.
+        
+        pushdown_sql maps filter column to predicate; only predicates on
+        columns the set has are applied.
+        """
+        projection = "COUNT(*)" if count_only else set_def.key_column
+        sql = f"SELECT {projection} FROM {self.schema_name}.{set_def.base_entity}"
+        
+        predicates = [where_sql] if where_sql else []
+        predicates.extend(
+            f"({pushdown_sql[key]})" for key in get_base_set_pushdown(set_def, list(pushdown_sql))
+        )
+        if predicates:
+            sql += "\nWHERE " + " AND ".join(predicates)
+        return sql
     
-    def _generate_base_set_sql(
+    def _assemble_sql(
         self,
-        set_def: SetDefinition,
-        params: Dict[str, Any]
+        cte_parts: List[str],
+        formula: str,
+        aggregation_selects: List[str]
     ) -> str:
-        """Generate SQL for a base set with filters."""
-        table_name = f"{self.schema_name}.{set_def.base_entity}"
+        """Join CTEs and the final SELECT (no WITH when everything was inlined)."""
+        final_select = self._generate_final_select(formula, aggregation_selects)
+        if not cte_parts:
+            return final_select
+        return "\n".join(["WITH", ",\n".join(cte_parts), final_select])
+    
+    def _bind_filter_conditions(
+        self,
+        filter_group: FilterGroup,
+        known_params: set,
+        literal_params: Dict[str, Any],
+        runtime_params: List[str]
+    ) -> str:
+        """Render filter conditions with bind placeholders instead of literals."""
+        sql_parts = []
         
-        sql = f"SELECT {set_def.key_column} FROM {table_name}"
+        for condition in filter_group.conditions:
+            if isinstance(condition, FilterCondition):
+                sql_part = self._bind_single_condition(
+                    condition, known_params, literal_params, runtime_params
+                )
+            else:
+                sql_part = self._bind_filter_conditions(
+                    condition, known_params, literal_params, runtime_params
+                )
+            sql_parts.append(f"({sql_part})")
         
-        if set_def.filter_conditions:
-            where_sql = self._resolve_filter_conditions(
-                set_def.filter_conditions,
-                params
-            )
-            sql += f"\nWHERE {where_sql}"
+        joiner = f" {filter_group.logical_operator.value} "
+        return joiner.join(sql_parts)
+    
+    def _bind_single_condition(
+        self,
+        condition: FilterCondition,
+        known_params: set,
+        literal_params: Dict[str, Any],
+        runtime_params: List[str]
+    ) -> str:
+        """Render a single condition with a bind placeholder."""
+        if condition.operator == ComparisonOperator.IS_NULL:
+            return f"{condition.column} IS NULL"
+        elif condition.operator == ComparisonOperator.IS_NOT_NULL:
+            return f"{condition.column} IS NOT NULL"
         
-        return sql
+        value = condition.value
+        if isinstance(value, str) and value.startswith("@"):
+            param_name = value[1:]  # Remove @
+            if param_name not in known_params:
+                raise ValueError(f"Unknown parameter reference: {value}")
+            if param_name not in runtime_params:
+                runtime_params.append(param_name)
+        else:
+            param_name = f"c{len(literal_params)}"
+            literal_params[param_name] = value
+        
+        if condition.operator == ComparisonOperator.IN:
+            return f"{condition.column} = ANY(:{param_name})"
+        elif condition.operator == ComparisonOperator.NOT_IN:
+            return f"{condition.column} != ALL(:{param_name})"
+        return f"{condition.column} {condition.operator.value} :{param_name}"
     
-    def _generate_derived_set_sql(self, set_def: SetDefinition) -> str:
-        """Generate SQL for a derived set (set operation result)."""
-        if not set_def.source_sets or len(set_def.source_sets) < 2:
-            raise ValueError(f"Set operation requires at least 2 source sets: {set_def.name}")
+    def generate_sql(
+        self,
+        kpi_def: SetBasedKPIDefinition,
+        period_start: datetime,
+        period_end: datetime,
+        additional_filters: Optional[Dict[str, Any]] = None
+    ) -> tuple[str, Dict[str, Any]]:
+        """
+        Generate complete SQL for a set-based KPI calculation.
         
-        set_a = set_def.source_sets[0]
-        set_b = set_def.source_sets[1]
-        key_col = set_def.key_column
+        Returns:
+            Tuple of (SQL string, parameters dict)
+        """
+        params = {
+            "PeriodStart": period_start,
+            "PeriodEnd": period_end
+        }
+        if additional_filters:
+            params.update(additional_filters)
         
-        if set_def.operation == SetOperationType.EXCEPT:
-            # A EXCEPT B = rows in A but not in B
-            return f"""SELECT {key_col} FROM {set_a}
-WHERE {key_col} NOT IN (SELECT {key_col} FROM {set_b})"""
+        planner = SetOperationPlanner.for_definition(kpi_def)
+        pushdown_sql = {}
+        for key in get_pushdown_filters(kpi_def, list(additional_filters or {})):
+            value = additional_filters[key]
+            if isinstance(value, (list, tuple, set)):
+                values = ", ".join(render_literal(v) for v in value)
+                pushdown_sql[key] = f"{key} IN ({values})"
+            else:
+                pushdown_sql[key] = f"{key} = {render_literal(value)}"
         
-        elif set_def.operation == SetOperationType.INTERSECT:
-            # A INTERSECT B = rows in both A and B
-            return f"""SELECT {key_col} FROM {set_a}
-WHERE {key_col} IN (SELECT {key_col} FROM {set_b})"""
+        cte_parts = []
+        count_sql: Dict[str, str] = {}
+        aggregation_selects = []
         
-        elif set_def.operation == SetOperationType.UNION:
-            # A UNION B = all rows from A and B (deduplicated)
-            return f"""SELECT {key_col} FROM {set_a}
-UNION
-SELECT {key_col} FROM {set_b}"""
+        for step in kpi_def.steps:
+            if step.set_definition:
+                set_def = step.set_definition
+                count_only = step.name in planner.count_only_sets
+                if set_def.is_base_set():
+                    where_sql = None
+                    if set_def.filter_conditions:
+                        where_sql = self._resolve_filter_conditions(set_def.filter_conditions, params)
+                    cte_sql = self._base_set_sql(set_def, where_sql, pushdown_sql, count_only)
+                else:
+                    cte_sql = planner.derived_set_sql(set_def, count_only=count_only)
+                if count_only:
+                    count_sql[step.name] = cte_sql
+                else:
+                    cte_parts.append(f"{step.name} AS (\n{cte_sql}\n)")
+                
+            elif step.aggregation:
+                agg_sql = self._generate_aggregation_select(step.aggregation, count_sql)
+                aggregation_selects.append(f"{agg_sql} AS {step.name}")
         
-        else:
-            raise ValueError(f"Unsupported set operation: {set_def.operation}")
+        return self._assemble_sql(cte_parts, kpi_def.final_formula, aggregation_selects), params
     
     def _resolve_filter_conditions(
         self,
@@ -393,9 +908,22 @@ SELECT {key_col} FROM {set_b}"""
         
         return f"{condition.column} {condition.operator.value} {value}"
     
-    def _generate_aggregation_select(self, agg: SetAggregation) -> str:
-        """Generate SQL for an aggregation."""
+    def _generate_aggregation_select(
+        self,
+        agg: SetAggregation,
+        count_sql: Optional[Dict[str, str]] = None
+    ) -> str:
+        """
+        Generate SQL for an aggregation.
+        
+        Args:
+            agg: The aggregation
+            count_sql: COUNT(*) queries for sets the planner chose not to
+                materialize (used directly for COUNTROWS)
+        """
         if agg.aggregation_type == AggregationType.COUNTROWS:
+            if count_sql and agg.set_name in count_sql:
+                return f"({count_sql[agg.set_name]})"
             return f"(SELECT COUNT(*) FROM {agg.set_name})"
         elif agg.aggregation_type == AggregationType.SUMX:
             return f"(SELECT SUM({agg.column}) FROM {agg.set_name})"
@@ -0,0 +1,258 @@
+"""
+Set Operation Planner
+
+Chooses SQL forms for derived sets in set-based KPI definitions.
+
+- EXCEPT / INTERSECT are emitted as correlated NOT EXISTS / EXISTS, which
+  PostgreSQL plans as hash anti/semi joins and which are NULL-safe (NOT IN
+  returns no rows at all as soon as the subtracted set contains a NULL key)
+- Operations are N-ary: every source set after the first is applied in turn
+- INTERSECT operands are reordered by size hint so the smallest set drives
+- The native EXCEPT / INTERSECT operators (HashSetOp, deduplicating) can be
+  selected per KPI via metadata["set_operation_strategy"] = "set_op"
+- Sets consumed only once, by a COUNTROWS aggregation, are counted inline
+  instead of being materialized as a CTE of keys
+- Runtime filters not referenced by a definition are pushed down as
+  predicates into the base sets that have the filter column, rather than
+  being ignored
+"""
+
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set
+import re
+import logging
+
+if TYPE_CHECKING:
+    # set_operations imports this module; enums below are compared by value
+    from .set_operations import FilterGroup, SetBasedKPIDefinition, SetDefinition
+
+logger = logging.getLogger(__name__)
+
+STRATEGY_EXISTS = "exists"
+STRATEGY_SET_OP = "set_op"
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class SetOperationPlanner:
+    """
+    Plans derived-set SQL for one KPI definition.
+
+    Usage:
+        planner = SetOperationPlanner.for_definition(kpi_def)
+        sql = planner.derived_set_sql(set_def, ["StartPeriodCustomers", "EndPeriodCustomers"])
+        if step.name in planner.count_only_sets: ...
+    """
+
+    def __init__(
+        self,
+        strategy: str = STRATEGY_EXISTS,
+        size_hints: Optional[Dict[str, int]] = None,
+        count_only_sets: Optional[Set[str]] = None
+    ):
+        """
+        Initialize the planner.
+
+        Args:
+            strategy: "exists" (anti/semi joins, keeps duplicate keys of the
+                first set) or "set_op" (native EXCEPT/INTERSECT, deduplicates)
+            size_hints: Estimated row counts per set name
+            count_only_sets: Sets that may be counted inline (see plan_count_only_sets)
+        """
+        if strategy not in (STRATEGY_EXISTS, STRATEGY_SET_OP):
+            raise ValueError(f"Unknown set operation strategy: {strategy}")
+        self.strategy = strategy
+        self.size_hints = size_hints or {}
+        self.count_only_sets = count_only_sets or set()
+
+    @classmethod
+    def for_definition(cls, kpi_def: "SetBasedKPIDefinition") -> "SetOperationPlanner":
+        """Build a planner from a definition's metadata and step graph."""
+        return cls(
+            strategy=kpi_def.metadata.get("set_operation_strategy", STRATEGY_EXISTS),
+            size_hints=kpi_def.metadata.get("set_size_hints"),
+            count_only_sets=plan_count_only_sets(kpi_def)
+        )
+
+    def derived_set_sql(
+        self,
+        set_def: "SetDefinition",
+        source_names: Optional[List[str]] = None,
+        count_only: bool = False
+    ) -> str:
+        """
+        Generate SQL for a derived set.
+
+        Args:
+            set_def: Derived set definition
+            source_names: CTE names to read the source sets from (defaults to
+                set_def.source_sets)
+            count_only: Emit a COUNT(*) instead of the key column
+
+        Returns:
+            SELECT statement producing the set (or its row count)
+        """
+        sources = list(source_names or set_def.source_sets or [])
+        if len(sources) < 2:
+            raise ValueError(f"Set operation requires at least 2 source sets: {set_def.name}")
+        key_col = set_def.key_column
+
+        if set_def.operation == "UNION":
+            # A UNION B UNION ... = all keys, deduplicated
+            sql = "\nUNION\n".join(f"SELECT {key_col} FROM {name}" for name in sources)
+            return self._count_wrapper(sql) if count_only else sql
+
+        if set_def.operation == "INTERSECT":
+            # Intersection is commutative: let the smallest set drive
+            sources = sorted(sources, key=lambda name: self.size_hints.get(name, float("inf")))
+            keyword, exists = "INTERSECT", "EXISTS"
+        elif set_def.operation == "EXCEPT":
+            keyword, exists = "EXCEPT", "NOT EXISTS"
+        else:
+            raise ValueError(f"Unsupported set operation: {set_def.operation}")
+
+        if self.strategy == STRATEGY_SET_OP:
+            sql = f"\n{keyword}\n".join(f"SELECT {key_col} FROM {name}" for name in sources)
+            return self._count_wrapper(sql) if count_only else sql
+
+        projection = "COUNT(*)" if count_only else f"s0.{key_col}"
+        predicates = [
+            f"{exists} (SELECT 1 FROM {name} s{i} WHERE s{i}.{key_col} = s0.{key_col})"
+            for i, name in enumerate(sources[1:], start=1)
+        ]
+        return f"SELECT {projection} FROM {sources[0]} s0\nWHERE " + "\n  AND ".join(predicates)
+
+    @staticmethod
+    def _count_wrapper(sql: str) -> str:
+        return f"SELECT COUNT(*) FROM (\n{sql}\n) AS counted"
+
+
+def plan_count_only_sets(kpi_def: "SetBasedKPIDefinition") -> Set[str]:
+    """
+    Find sets whose only consumer is a single COUNTROWS aggregation.
+
+    Such sets never need their keys materialized: the aggregation can run
+    COUNT(*) directly over the set's query.
+    """
+    set_names = {step.name for step in kpi_def.steps if step.set_definition}
+    consumers: Dict[str, int] = {name: 0 for name in set_names}
+    counted: Set[str] = set()
+
+    for step in kpi_def.steps:
+        if step.set_definition:
+            for source in step.set_definition.source_sets or []:
+                if source in consumers:
+                    consumers[source] += 1
+        elif step.aggregation:
+            agg = step.aggregation
+            if agg.set_name in consumers:
+                consumers[agg.set_name] += 1
+                if agg.aggregation_type == "COUNTROWS":
+                    counted.add(agg.set_name)
+                else:
+                    consumers[agg.set_name] += 1  # keys are needed
+
+    return {name for name in counted if consumers[name] == 1}
+
+
+def get_referenced_parameters(kpi_def: "SetBasedKPIDefinition") -> Set[str]:
+    """Names of @Parameters referenced by a definition's filter conditions."""
+    referenced: Set[str] = set()
+
+    def walk(group: "FilterGroup"):
+        for condition in group.conditions:
+            if hasattr(condition, "conditions"):
+                walk(condition)
+            elif isinstance(condition.value, str) and condition.value.startswith("@"):
+                referenced.add(condition.value[1:])
+
+    for step in kpi_def.steps:
+        set_def = step.set_definition
+        if set_def and set_def.filter_conditions:
+            walk(set_def.filter_conditions)
+    return referenced
+
+
+def get_base_set_columns(set_def: "SetDefinition") -> Set[str]:
+    """
+    Columns known to exist on a base set's entity.
+
+    These are the declared columns, the key column and any column the set's
+    own filter conditions use.
+    """
+    columns = set(set_def.columns or [])
+    columns.add(set_def.key_column)
+
+    def walk(group: "FilterGroup"):
+        for condition in group.conditions:
+            if hasattr(condition, "conditions"):
+                walk(condition)
+            else:
+                columns.add(condition.column)
+
+    if set_def.filter_conditions:
+        walk(set_def.filter_conditions)
+    return columns
+
+
+def get_base_set_pushdown(set_def: "SetDefinition", pushdown: List[str]) -> List[str]:
+    """Pushed-down filters that apply to one base set."""
+    columns = get_base_set_columns(set_def)
+    return [key for key in pushdown if key in columns]
+
+
+def get_pushdown_filters(
+    kpi_def: "SetBasedKPIDefinition",
+    filter_keys: List[str]
+) -> List[str]:
+    """
+    Runtime filters to push into base sets as column predicates.
+
+    Filters referenced as @Parameters are bound where the definition uses
+    them. The rest are treated as column filters on the base sets that have
+    that column (see get_base_set_pushdown); a filter no base set has is
+    not applied.
+
+    Raises:
+        ValueError: If a pushed-down filter name is not a plain identifier
+    """
+    referenced = get_referenced_parameters(kpi_def) | set(kpi_def.period_parameters)
+    candidates = sorted(key for key in filter_keys if key not in referenced)
+    for key in candidates:
+        if not _IDENTIFIER.match(key):
+            raise ValueError(f"Invalid filter column: {key}")
+
+    base_columns: Set[str] = set()
+    for step in kpi_def.steps:
+        set_def = step.set_definition
+        if set_def and set_def.is_base_set():
+            base_columns |= get_base_set_columns(set_def)
+
+    pushdown = [key for key in candidates if key in base_columns]
+    ignored = [key for key in candidates if key not in base_columns]
+    if ignored:
+        logger.debug(f"Filters {ignored} match no base set column of {kpi_def.kpi_code}; not applied")
+    return pushdown
+
+
+def get_pushdown_param(key: str) -> str:
+    """
+    Bind name for a pushed-down filter.
+
+    Pushed-down filters are bound as arrays, so they get a name of their own;
+    in a fused batch another KPI may reference the same filter as a scalar
+    @Parameter.
+    """
+    return f"{key}__any"
+
+
+def render_literal(value: Any) -> str:
+    """Render a filter value inline (for the readable, non-prepared SQL)."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return "'" + str(value).replace("'", "''") + "'"
@@ -190,6 +190,15 @@ class DynamicCalculationHandler(BaseCalculationHandler):
             parsed_formula = self.parser.parse(formula)
         except Exception as e:
             raise CalculationError(f"Formula parsing failed for '{formula}': {e}")
+        
+        # Formula over KPIs the orchestrator already calculated: no query needed
+        dependency_results = params.metadata.get("dependency_results") or {}
+        if parsed_formula["variables"] and all(
+            variable in dependency_results for variable in parsed_formula["variables"]
+        ):
+            return self._calculate_from_dependencies(
+                params, kpi_def, parsed_formula, dependency_results, start_time
+            )
             
         # 3. Determine Execution Strategy (Hierarchical Query Logic & Approximation)
         # Check for approximate mode preference (Params override Metadata)
@@ -290,6 +299,40 @@ class DynamicCalculationHandler(BaseCalculationHandler):
             }
         )
 
+    def _calculate_from_dependencies(
+        self,
+        params: CalculationParams,
+        kpi_def: Dict[str, Any],
+        parsed_formula: Dict[str, Any],
+        dependency_results: Dict[str, float],
+        start_time: datetime
+    ) -> CalculationResult:
+        """
+        Calculate a formula whose variables are all dependency KPI results.
+        """
+        try:
+            value = self.parser.evaluate(parsed_formula, dependency_results)
+        except ValueError as e:
+            raise CalculationError(f"Formula evaluation failed for '{parsed_formula['original']}': {e}")
+        
+        calculation_time = (datetime.utcnow() - start_time).total_seconds() * 1000
+        
+        return CalculationResult(
+            kpi_code=params.kpi_code,
+            value=value,
+            unit=kpi_def.get("unit", "Number"),
+            timestamp=datetime.utcnow(),
+            calculation_time_ms=calculation_time,
+            metadata={
+                "calculation_type": "simple",
+                "formula": parsed_formula["original"],
+                "dependency_results": {
+                    variable: dependency_results[variable]
+                    for variable in sorted(parsed_formula["variables"])
+                }
+            }
+        )
+
     async def validate_params(self, params: CalculationParams) -> bool:
         """Validate calculation parameters."""
         if not params.start_date or not params.end_date:
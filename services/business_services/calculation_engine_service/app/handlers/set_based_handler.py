@@ -25,9 +25,11 @@ from ..base_handler import (
 from ..engine.set_operations import (
     SetBasedKPIDefinition,
     SetBasedSQLGenerator,
+    get_parameter_types,
     get_set_based_kpi_definition,
     SET_BASED_KPI_REGISTRY
 )
+from ..engine.result_cache import ResultCache
 from ..clients.database_client_pubsub import DatabaseClientPubSub
 from ..clients.metadata_client_pubsub import MetadataClientPubSub
 
@@ -58,7 +60,10 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
         cache_enabled: bool = True,
         cache_ttl: int = 300,
         schema_name: str = "analytics_data",
-        service_name: str = "calculation_engine"
+        service_name: str = "calculation_engine",
+        plan_cache_size: int = 256,
+        use_prepared_statements: bool = True,
+        database_transport: str = "pubsub"
     ):
         super().__init__(
             value_chain_code=value_chain_code,
@@ -69,7 +74,12 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
             cache_ttl=cache_ttl
         )
         self.redis_url = redis_url
-        self.sql_generator = SetBasedSQLGenerator(schema_name=schema_name)
+        self.sql_generator = SetBasedSQLGenerator(
+            schema_name=schema_name,
+            plan_cache_size=plan_cache_size
+        )
+        self.use_prepared_statements = use_prepared_statements
+        self.database_transport = database_transport
         
         # Pub/sub clients for event-driven communication
         self._database_client: Optional[DatabaseClientPubSub] = None
@@ -81,7 +91,8 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
         if self._database_client is None:
             self._database_client = DatabaseClientPubSub(
                 redis_url=self.redis_url,
-                service_name=self._service_name
+                service_name=self._service_name,
+                transport=self.database_transport
             )
             await self._database_client.connect()
         return self._database_client
@@ -126,20 +137,27 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
             )
         
         # 3. Generate SQL
+        statement_key = None
         try:
-            sql, sql_params = self.sql_generator.generate_sql(
-                kpi_def=kpi_def,
-                period_start=params.start_date,
-                period_end=params.end_date,
-                additional_filters=params.filters
-            )
+            if self.use_prepared_statements:
+                compiled = self.sql_generator.compile(kpi_def, list(params.filters or {}))
+                sql = compiled.sql
+                statement_key = compiled.statement_key
+                sql_params = compiled.bind(params.start_date, params.end_date, params.filters)
+            else:
+                sql, sql_params = self.sql_generator.generate_sql(
+                    kpi_def=kpi_def,
+                    period_start=params.start_date,
+                    period_end=params.end_date,
+                    additional_filters=params.filters
+                )
             logger.debug(f"Generated SQL for {params.kpi_code}:\n{sql}")
         except Exception as e:
             raise CalculationError(f"SQL generation failed: {e}")
         
         # 4. Execute query
         try:
-            result_value = await self._execute_query(sql, sql_params)
+            result_value = await self._execute_query(sql, sql_params, statement_key)
         except Exception as e:
             raise CalculationError(f"Query execution failed: {e}")
         
@@ -158,6 +176,7 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
                 "period_start": params.start_date.isoformat(),
                 "period_end": params.end_date.isoformat(),
                 "sql_generated": sql,
+                "statement_key": statement_key,
                 "final_formula": kpi_def.final_formula
             }
         )
@@ -217,12 +236,15 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
     async def _execute_query(
         self,
         sql: str,
-        params: Dict[str, Any]
+        params: Dict[str, Any],
+        statement_key: Optional[str] = None
     ) -> float:
         """
         Execute SQL query against the database via pub/sub.
         
-        Uses the database service via request/reply pattern.
+        Uses the database service via request/reply pattern. When a
+        statement_key is given the SQL is bind-parameterized and is executed
+        as a prepared statement.
         """
         try:
             db_client = await self._get_database_client()
@@ -234,10 +256,18 @@ class SetBasedCalculationHandler(BaseCalculationHandler):
             }
             
             # Execute query via pub/sub
-            result = await db_client.execute_query(
-                query=sql,
-                parameters=serialized_params
-            )
+            if statement_key:
+                result = await db_client.execute_prepared(
+                    statement_key=statement_key,
+                    query=sql,
+                    parameters=serialized_params,
+                    parameter_types=get_parameter_types(params)
+                )
+            else:
+                result = await db_client.execute_query(
+                    query=sql,
+                    parameters=serialized_params
+                )
             
             # Extract the result value from the response
             rows = result.get("rows", [])
@@ -283,13 +313,17 @@ class SetBasedCalculationEngine:
     
     Performance Optimizations for 1-second SLA:
     ============================================
-    1. **Pre-compiled SQL**: KPI definitions are converted to SQL at registration time,
-       not at query time. The SQL generator caches CTE structures.
+    1. **Pre-compiled SQL**: Each KPI definition is compiled once per filter shape
+       into a bind-parameterized statement (LRU-cached by the SQL generator) and
+       executed as a server-side prepared statement, so Postgres plans it once
+       instead of once per period window.
     
     2. **Connection Pooling**: HTTP client uses connection pooling with keep-alive
        to minimize connection overhead (~50-100ms savings per request).
     
-    3. **Result Caching**: Recent calculation results are cached with TTL.
+    3. **Result Caching**: Recent calculation results are cached per engine in a
+       bounded LRU/TTL cache (O(1) eviction, entry and byte budgets). KPI
+       definitions may override the TTL via metadata["cache_ttl_seconds"].
        Cache key = kpi_code + period_start + period_end + filters_hash.
     
     4. **Query Optimization**: Generated SQL uses CTEs which PostgreSQL/TimescaleDB
@@ -297,6 +331,10 @@ class SetBasedCalculationEngine:
     
     5. **Timeout Configuration**: Aggressive timeouts ensure fast failure.
     
+    6. **Batch Fusion**: calculate_batch() evaluates several KPIs in one
+       statement, emitting structurally identical base sets once as shared
+       CTEs, so a dashboard refresh scans each base set once.
+    
     Performance Breakdown (target: <1000ms total):
     - HTTP overhead: ~20-50ms (with connection pooling)
     - SQL generation: ~1-5ms (pre-compiled templates)
@@ -307,35 +345,39 @@ class SetBasedCalculationEngine:
     NOT during calculation. LLM calls (1-5 seconds) only happen at definition time.
     """
     
-    # Class-level cache for SQL templates (shared across instances)
-    _sql_cache: Dict[str, str] = {}
-    
-    # Result cache with TTL
-    _result_cache: Dict[str, Dict[str, Any]] = {}
-    _cache_ttl_seconds: int = 60  # 1 minute default TTL
-    _cache_timestamps: Dict[str, datetime] = {}
-    
     def __init__(
         self,
         redis_url: str,
         schema_name: str = "analytics_data",
         cache_ttl_seconds: int = 60,
         query_timeout_seconds: float = 0.8,  # Leave 200ms buffer for overhead
-        service_name: str = "calculation_engine"
+        service_name: str = "calculation_engine",
+        plan_cache_size: int = 256,
+        use_prepared_statements: bool = True,
+        cache_max_entries: int = 1000,
+        cache_max_bytes: int = 64 * 1024 * 1024,
+        database_transport: str = "pubsub"
     ):
         self.redis_url = redis_url
         self.schema_name = schema_name
-        self.sql_generator = SetBasedSQLGenerator(schema_name=schema_name)
+        self.sql_generator = SetBasedSQLGenerator(
+            schema_name=schema_name,
+            plan_cache_size=plan_cache_size
+        )
+        self.use_prepared_statements = use_prepared_statements
+        self.database_transport = database_transport
         self._database_client: Optional[DatabaseClientPubSub] = None
-        self._cache_ttl_seconds = cache_ttl_seconds
+        self._result_cache = ResultCache(
+            max_entries=cache_max_entries,
+            max_bytes=cache_max_bytes,
+            default_ttl_seconds=cache_ttl_seconds
+        )
         self._query_timeout = query_timeout_seconds
         self._service_name = service_name
         
         # Performance metrics
         self._metrics = {
             "total_calculations": 0,
-            "cache_hits": 0,
-            "cache_misses": 0,
             "avg_calculation_time_ms": 0.0,
             "max_calculation_time_ms": 0.0,
             "sla_violations": 0  # Calculations > 1000ms
@@ -351,7 +393,8 @@ class SetBasedCalculationEngine:
             self._database_client = DatabaseClientPubSub(
                 redis_url=self.redis_url,
                 service_name=self._service_name,
-                default_timeout=self._query_timeout + 0.5  # Add buffer for pub/sub overhead
+                default_timeout=self._query_timeout + 0.5,  # Add buffer for pub/sub overhead
+                transport=self.database_transport
             )
             await self._database_client.connect()
         return self._database_client
@@ -371,29 +414,21 @@ class SetBasedCalculationEngine:
     
     def _check_cache(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Check if result is in cache and not expired."""
-        if cache_key in self._result_cache:
-            timestamp = self._cache_timestamps.get(cache_key)
-            if timestamp and (datetime.utcnow() - timestamp).total_seconds() < self._cache_ttl_seconds:
-                self._metrics["cache_hits"] += 1
-                return self._result_cache[cache_key]
-            else:
-                # Expired - remove from cache
-                del self._result_cache[cache_key]
-                if cache_key in self._cache_timestamps:
-                    del self._cache_timestamps[cache_key]
-        self._metrics["cache_misses"] += 1
-        return None
+        cached = self._result_cache.get(cache_key)
+        # Copy so per-request fields don't leak into the cached entry
+        return dict(cached) if cached is not None else None
     
-    def _store_cache(self, cache_key: str, result: Dict[str, Any]):
-        """Store result in cache."""
-        # Simple LRU: remove oldest if cache is too large
-        if len(self._result_cache) > 1000:
-            oldest_key = min(self._cache_timestamps, key=self._cache_timestamps.get)
-            del self._result_cache[oldest_key]
-            del self._cache_timestamps[oldest_key]
-        
-        self._result_cache[cache_key] = result
-        self._cache_timestamps[cache_key] = datetime.utcnow()
+    def _store_cache(
+        self,
+        cache_key: str,
+        result: Dict[str, Any],
+        kpi_def: Optional[SetBasedKPIDefinition] = None
+    ):
+        """Store result in cache, honouring a per-KPI TTL override."""
+        ttl = None
+        if kpi_def is not None:
+            ttl = kpi_def.metadata.get("cache_ttl_seconds")
+        self._result_cache.set(cache_key, result, ttl_seconds=ttl)
     
     def _update_metrics(self, calculation_time_ms: float):
         """Update performance metrics."""
@@ -453,14 +488,21 @@ class SetBasedCalculationEngine:
         if not kpi_def:
             raise ValueError(f"Unknown set-based KPI: {kpi_code}")
         
-        # Generate SQL (fast - uses cached templates)
+        # Generate SQL (fast - uses compiled statements)
         sql_start = time.perf_counter()
-        sql, params = self.sql_generator.generate_sql(
-            kpi_def=kpi_def,
-            period_start=period_start,
-            period_end=period_end,
-            additional_filters=filters
-        )
+        statement_key = None
+        if self.use_prepared_statements:
+            compiled = self.sql_generator.compile(kpi_def, list(filters or {}))
+            sql = compiled.sql
+            statement_key = compiled.statement_key
+            params = compiled.bind(period_start, period_end, filters)
+        else:
+            sql, params = self.sql_generator.generate_sql(
+                kpi_def=kpi_def,
+                period_start=period_start,
+                period_end=period_end,
+                additional_filters=filters
+            )
         sql_time_ms = (time.perf_counter() - sql_start) * 1000
         
         # Execute query via pub/sub
@@ -474,11 +516,20 @@ class SetBasedCalculationEngine:
                 for k, v in params.items()
             }
             
-            result = await db_client.execute_query(
-                query=sql,
-                parameters=serialized_params,
-                timeout=self._query_timeout
-            )
+            if statement_key:
+                result = await db_client.execute_prepared(
+                    statement_key=statement_key,
+                    query=sql,
+                    parameters=serialized_params,
+                    parameter_types=get_parameter_types(params),
+                    timeout=self._query_timeout
+                )
+            else:
+                result = await db_client.execute_query(
+                    query=sql,
+                    parameters=serialized_params,
+                    timeout=self._query_timeout
+                )
             
             rows = result.get("rows", [])
             value = float(rows[0].get("result", 0)) if rows else 0.0
@@ -510,6 +561,7 @@ class SetBasedCalculationEngine:
                 "sla_met": total_time_ms < 1000
             },
             "sql": sql,
+            "statement_key": statement_key,
             "steps": [
                 {
                     "step": step.step_number,
@@ -522,10 +574,149 @@ class SetBasedCalculationEngine:
         
         # Store in cache
         if use_cache:
-            self._store_cache(cache_key, result)
+            self._store_cache(cache_key, result, kpi_def)
         
         return result
     
+    async def calculate_batch(
+        self,
+        kpi_codes: List[str],
+        period_start: datetime,
+        period_end: datetime,
+        filters: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Calculate several set-based KPIs over the same period in one query.
+        
+        Cached KPIs are answered from the result cache; the rest are fused by
+        SetBasedSQLGenerator.compile_batch so shared base sets (e.g.
+        StartPeriodCustomers for churn and retention) are scanned once.
+        
+        Args:
+            kpi_codes: KPI codes to calculate
+            period_start: Start of the calculation period
+            period_end: End of the calculation period
+            filters: Optional additional filters (applied to every KPI)
+            use_cache: Whether to use result caching (default: True)
+            
+        Returns:
+            Dictionary of KPI code to the same result shape as calculate()
+        """
+        import time
+        start_time = time.perf_counter()
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        pending: List[SetBasedKPIDefinition] = []
+        # Definition kpi_code -> (requested code, cache key)
+        requested: Dict[str, tuple] = {}
+        
+        for kpi_code in dict.fromkeys(kpi_codes):
+            cache_key = self._get_cache_key(kpi_code, period_start, period_end, filters)
+            if use_cache:
+                cached_result = self._check_cache(cache_key)
+                if cached_result:
+                    cached_result["from_cache"] = True
+                    cached_result["calculation_time_ms"] = (time.perf_counter() - start_time) * 1000
+                    results[kpi_code] = cached_result
+                    continue
+            
+            kpi_def = get_set_based_kpi_definition(kpi_code)
+            if not kpi_def:
+                raise ValueError(f"Unknown set-based KPI: {kpi_code}")
+            if kpi_def.kpi_code not in requested:
+                pending.append(kpi_def)
+            requested[kpi_def.kpi_code] = (kpi_code, cache_key)
+        
+        if not pending:
+            return results
+        
+        # Fuse the remaining KPIs into one statement
+        sql_start = time.perf_counter()
+        compiled = self.sql_generator.compile_batch(pending, list(filters or {}))
+        params = compiled.bind(period_start, period_end, filters)
+        sql_time_ms = (time.perf_counter() - sql_start) * 1000
+        
+        query_start = time.perf_counter()
+        try:
+            db_client = await self._get_database_client()
+            
+            serialized_params = {
+                k: v.isoformat() if isinstance(v, datetime) else v
+                for k, v in params.items()
+            }
+            
+            if self.use_prepared_statements:
+                result = await db_client.execute_prepared(
+                    statement_key=compiled.statement_key,
+                    query=compiled.sql,
+                    parameters=serialized_params,
+                    parameter_types=get_parameter_types(params),
+                    timeout=self._query_timeout
+                )
+            else:
+                result = await db_client.execute_query(
+                    query=compiled.sql,
+                    parameters=serialized_params,
+                    timeout=self._query_timeout
+                )
+            
+            rows = result.get("rows", [])
+            row = rows[0] if rows else {}
+            
+        except asyncio.TimeoutError:
+            raise CalculationError("Query timeout - SLA exceeded")
+        except Exception as e:
+            raise CalculationError(f"Database query failed: {e}")
+        
+        query_time_ms = (time.perf_counter() - query_start) * 1000
+        total_time_ms = (time.perf_counter() - start_time) * 1000
+        
+        # One query served every pending KPI
+        self._update_metrics(total_time_ms)
+        
+        for kpi_def in pending:
+            kpi_code, cache_key = requested[kpi_def.kpi_code]
+            value = row.get(compiled.result_columns[kpi_def.kpi_code])
+            kpi_result = {
+                "kpi_code": kpi_def.kpi_code,
+                "name": kpi_def.name,
+                "value": float(value) if value is not None else 0.0,
+                "unit": kpi_def.unit,
+                "period_start": period_start.isoformat(),
+                "period_end": period_end.isoformat(),
+                "calculation_time_ms": total_time_ms,
+                "from_cache": False,
+                "performance": {
+                    "sql_generation_ms": sql_time_ms,
+                    "query_execution_ms": query_time_ms,
+                    "total_ms": total_time_ms,
+                    "sla_met": total_time_ms < 1000
+                },
+                "sql": compiled.sql,
+                "statement_key": compiled.statement_key,
+                "batch": {
+                    "kpi_codes": list(compiled.kpi_codes),
+                    "result_column": compiled.result_columns[kpi_def.kpi_code],
+                    "total_sets": compiled.total_sets,
+                    "shared_sets": compiled.shared_sets
+                },
+                "steps": [
+                    {
+                        "step": step.step_number,
+                        "name": step.name,
+                        "description": step.description
+                    }
+                    for step in kpi_def.steps
+                ]
+            }
+            results[kpi_code] = kpi_result
+            
+            if use_cache:
+                self._store_cache(cache_key, kpi_result, kpi_def)
+        
+        return results
+    
     async def explain(
         self,
         kpi_code: str,
@@ -588,33 +779,35 @@ class SetBasedCalculationEngine:
         Returns:
             Dictionary with performance statistics including:
             - total_calculations: Total number of calculations performed
-            - cache_hits/misses: Cache performance
+            - cache_hits/misses/evictions/expirations: Cache performance
             - avg_calculation_time_ms: Average calculation time
             - max_calculation_time_ms: Maximum calculation time
             - sla_violations: Number of calculations exceeding 1000ms
             - sla_compliance_rate: Percentage of calculations meeting SLA
+            - plan_cache: Compiled statement cache hits/misses/evictions
         """
         total = self._metrics["total_calculations"]
         violations = self._metrics["sla_violations"]
+        cache_stats = self._result_cache.get_stats()
         
         return {
             **self._metrics,
-            "cache_hit_rate": (
-                self._metrics["cache_hits"] / 
-                (self._metrics["cache_hits"] + self._metrics["cache_misses"])
-                if (self._metrics["cache_hits"] + self._metrics["cache_misses"]) > 0
-                else 0.0
-            ),
+            "cache_hits": cache_stats["hits"],
+            "cache_misses": cache_stats["misses"],
+            "cache_evictions": cache_stats["evictions"],
+            "cache_expirations": cache_stats["expirations"],
+            "cache_hit_rate": cache_stats["hit_rate"],
             "sla_compliance_rate": (
                 (total - violations) / total if total > 0 else 1.0
             ),
-            "cache_size": len(self._result_cache)
+            "cache_size": cache_stats["size"],
+            "cache_bytes": cache_stats["bytes"],
+            "plan_cache": self.sql_generator.get_plan_cache_stats()
         }
     
     def clear_cache(self):
         """Clear the result cache."""
         self._result_cache.clear()
-        self._cache_timestamps.clear()
         logger.info("Result cache cleared")
     
     async def close(self):
@@ -7,6 +7,7 @@ to dynamic handlers based on metadata definitions.
 
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
 from datetime import datetime
@@ -20,6 +21,7 @@ from .handlers.set_based_handler import SetBasedCalculationHandler, SetBasedCalc
 from .engine.set_operations import SET_BASED_KPI_REGISTRY
 from .stream_processor import StreamProcessor
 from .clients import DatabaseClient, MessagingClientWrapper
+from .clients.metadata_client_pubsub import MetadataClientPubSub
 from .config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -54,7 +56,9 @@ async def lifespan(app: FastAPI):
     logger.info("MessagingClient connected")
     
     # Initialize orchestrator
-    orchestrator = CalculationOrchestrator()
+    orchestrator = CalculationOrchestrator(
+        max_concurrency_per_handler=settings.max_concurrency_per_handler
+    )
     
     # Register Generic Dynamic Handler
     # In a fully generic system, we might iterate over active value chains from metadata
@@ -79,28 +83,55 @@ async def lifespan(app: FastAPI):
         value_chain_code="SET_BASED",
         redis_url=settings.redis_url,
         cache_enabled=settings.cache_enabled,
-        cache_ttl=settings.cache_ttl
+        cache_ttl=settings.cache_ttl,
+        plan_cache_size=settings.set_based_plan_cache_size,
+        use_prepared_statements=settings.set_based_prepared_statements,
+        database_transport=settings.database_transport
     )
     orchestrator.register_handler("SET_BASED", set_based_handler)
     
     # Register set-based KPIs in the KPI-to-handler map
-    for kpi_code in SET_BASED_KPI_REGISTRY.keys():
+    for kpi_code, kpi_def in SET_BASED_KPI_REGISTRY.items():
         orchestrator.kpi_to_handler_map[kpi_code] = "SET_BASED"
+        orchestrator.register_kpi_metadata(kpi_code, kpi_def.metadata)
     
     # Initialize standalone set-based engine for direct API access (uses pub/sub)
     set_based_engine = SetBasedCalculationEngine(
-        redis_url=settings.redis_url
+        redis_url=settings.redis_url,
+        cache_ttl_seconds=settings.set_based_cache_ttl,
+        plan_cache_size=settings.set_based_plan_cache_size,
+        use_prepared_statements=settings.set_based_prepared_statements,
+        cache_max_entries=settings.set_based_cache_max_entries,
+        cache_max_bytes=settings.set_based_cache_max_bytes,
+        database_transport=settings.database_transport
     )
     
     # Load KPI mappings
     await orchestrator.load_kpi_mappings(settings.metadata_service_url)
     
+    # Load KPI dependencies declared in the metric definitions
+    metadata_client = MetadataClientPubSub(
+        redis_url=settings.redis_url,
+        service_name="calculation_engine"
+    )
+    try:
+        await metadata_client.connect()
+        definitions = await orchestrator.load_kpi_dependencies(metadata_client)
+        logger.info(f"Loaded KPI dependencies from {definitions} metric definitions")
+    except Exception as e:
+        logger.warning(f"Could not load KPI dependencies: {e}")
+    finally:
+        await metadata_client.close()
+    
     # Initialize stream processor
     stream_processor = StreamProcessor(
         orchestrator=orchestrator,
         database_client=db_client,
         messaging_client=msg_client,
-        redis_url=settings.redis_url
+        redis_url=settings.redis_url,
+        pubsub_shards=settings.stream_pubsub_shards,
+        batch_window_seconds=settings.stream_batch_window_ms / 1000,
+        max_concurrent_recalculations=settings.stream_max_concurrent_recalculations
     )
     await stream_processor.start()
     
@@ -216,11 +247,44 @@ async def calculate_dashboard(dashboard_config: Dict[str, Any]):
     try:
         results = await orchestrator.calculate_dashboard(dashboard_config)
         return results
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Dashboard calculation failed: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/calculate/dashboard/stream")
+async def stream_dashboard(dashboard_config: Dict[str, Any]):
+    """
+    Calculate dashboard KPIs and stream each result as it completes.
+    
+    Args:
+        dashboard_config: Dashboard configuration
+        
+    Returns:
+        NDJSON stream of DashboardEvent (one line per KPI)
+    """
+    events = orchestrator.stream_dashboard(dashboard_config)
+    
+    # Pull the first event eagerly so dependency cycles surface as a 400
+    try:
+        first_event = await events.__anext__()
+    except StopAsyncIteration:
+        first_event = None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    async def ndjson():
+        if first_event is None:
+            return
+        yield first_event.model_dump_json() + "\n"
+        async for event in events:
+            yield event.model_dump_json() + "\n"
+    
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
 @app.get("/handlers")
 async def get_handlers():
     """Get information about registered handlers."""
@@ -313,6 +377,46 @@ async def calculate_set_based_kpi(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+class SetBasedBatchRequest(BaseModel):
+    """Request model for fused multi-KPI set-based calculation."""
+    kpi_codes: List[str]
+    period_start: datetime
+    period_end: datetime
+    filters: Optional[Dict[str, Any]] = None
+
+
+@app.post("/set-based/calculate-batch")
+async def calculate_set_based_batch(request: SetBasedBatchRequest):
+    """
+    Calculate several set-based KPIs over the same period in one query.
+    
+    Shared base sets (e.g. StartPeriodCustomers for CHURN_RATE and
+    RETENTION_RATE) are evaluated once.
+    
+    Args:
+        request: KPI codes, period and optional filters
+        
+    Returns:
+        Dictionary of KPI code to calculation result
+    """
+    if not set_based_engine:
+        raise HTTPException(status_code=503, detail="Set-based engine not initialized")
+    
+    try:
+        results = await set_based_engine.calculate_batch(
+            kpi_codes=request.kpi_codes,
+            period_start=request.period_start,
+            period_end=request.period_end,
+            filters=request.filters
+        )
+        return {"results": results}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Set-based batch calculation failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.get("/set-based/explain/{kpi_code}")
 async def explain_set_based_kpi(
     kpi_code: str,
@@ -485,6 +589,7 @@ async def convert_nlp_to_sets(request: NLPConversionRequest):
             # Add to orchestrator's KPI map (in-memory)
             if orchestrator:
                 orchestrator.kpi_to_handler_map[request.kpi_code.upper()] = "SET_BASED"
+                orchestrator.register_kpi_metadata(request.kpi_code.upper(), request.metadata)
             
             # Persist to metadata service
             try:
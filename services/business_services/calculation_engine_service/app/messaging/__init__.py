@@ -7,8 +7,10 @@ Messaging components for calculation_engine_service.
 
 Components:
 - CalculationCommandConsumer: Processes calculation commands from Redis Streams
+- PubSubMultiplexer: Shares a few pub/sub connections across many channels
 """
 
 from .command_consumer import CalculationCommandConsumer
+from .pubsub_multiplexer import PubSubMultiplexer
 
-__all__ = ["CalculationCommandConsumer"]
+__all__ = ["CalculationCommandConsumer", "PubSubMultiplexer"]
@@ -0,0 +1,223 @@
+# =============================================================================
+# Pub/Sub Multiplexer
+# Shares a small pool of Redis pub/sub connections across many channels
+# =============================================================================
+"""
+Multiplexed pub/sub consumer for calculation_engine_service.
+
+Instead of one Redis connection and polling task per subscribed channel,
+channels are hashed onto a fixed number of shards. Each shard owns one
+pub/sub connection and one reader task that blocks on the socket and
+dispatches messages to per-channel handlers via a dict lookup. Channels can
+be added and removed at any time without reconnecting.
+"""
+
+import asyncio
+import logging
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str, Any], Awaitable[None]]
+
+
+class _Shard:
+    """One pub/sub connection and its reader task."""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Optional[redis.Redis] = None
+        self.pubsub: Optional[redis.client.PubSub] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.channels: Set[str] = set()
+        self.has_channels = asyncio.Event()
+
+
+class PubSubMultiplexer:
+    """
+    Routes messages from many Redis channels over a few shared connections.
+
+    Usage:
+        mux = PubSubMultiplexer(redis_url, shards=2)
+        await mux.start()
+        await mux.subscribe("stream.KPI.E1.minute", handler)
+        ...
+        await mux.unsubscribe("stream.KPI.E1.minute")
+        await mux.stop()
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        shards: int = 1,
+        max_inflight: int = 100
+    ):
+        """
+        Initialize the multiplexer.
+
+        Args:
+            redis_url: Redis connection URL
+            shards: Number of pub/sub connections to spread channels across
+            max_inflight: Max handler invocations running concurrently; the
+                reader stops pulling from Redis while the limit is reached
+        """
+        self.redis_url = redis_url
+        self._shards = [_Shard(i) for i in range(max(1, shards))]
+        self._handlers: Dict[str, MessageHandler] = {}
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._handler_tasks: Set[asyncio.Task] = set()
+        self._running = False
+
+        self._stats = {
+            "messages_received": 0,
+            "messages_unrouted": 0,
+            "handler_errors": 0
+        }
+
+    async def start(self):
+        """Open the shard connections and start their readers."""
+        if self._running:
+            return
+        self._running = True
+
+        for shard in self._shards:
+            shard.client = redis.from_url(self.redis_url, decode_responses=True)
+            shard.pubsub = shard.client.pubsub(ignore_subscribe_messages=True)
+            shard.reader_task = asyncio.create_task(self._read_shard(shard))
+
+        logger.info(f"PubSubMultiplexer started with {len(self._shards)} shard(s)")
+
+    async def stop(self):
+        """Stop readers, wait for in-flight handlers and close connections."""
+        self._running = False
+
+        for shard in self._shards:
+            if shard.reader_task:
+                shard.reader_task.cancel()
+        await asyncio.gather(
+            *(s.reader_task for s in self._shards if s.reader_task),
+            return_exceptions=True
+        )
+
+        if self._handler_tasks:
+            await asyncio.gather(*self._handler_tasks, return_exceptions=True)
+
+        for shard in self._shards:
+            if shard.pubsub:
+                if shard.channels:
+                    await shard.pubsub.unsubscribe(*shard.channels)
+                await shard.pubsub.close()
+            if shard.client:
+                await shard.client.close()
+            shard.channels.clear()
+            shard.has_channels.clear()
+            shard.reader_task = None
+
+        self._handlers.clear()
+        logger.info("PubSubMultiplexer stopped")
+
+    def _shard_for(self, channel: str) -> _Shard:
+        return self._shards[zlib.crc32(channel.encode()) % len(self._shards)]
+
+    async def subscribe(self, channel: str, handler: MessageHandler):
+        """
+        Route messages on a channel to a handler.
+
+        Re-subscribing an existing channel replaces its handler.
+        """
+        already_subscribed = channel in self._handlers
+        self._handlers[channel] = handler
+        if already_subscribed:
+            return
+
+        shard = self._shard_for(channel)
+        shard.channels.add(channel)
+        await shard.pubsub.subscribe(channel)
+        shard.has_channels.set()
+
+    async def subscribe_many(self, handlers: Dict[str, MessageHandler]):
+        """Subscribe several channels with one SUBSCRIBE per shard."""
+        by_shard: Dict[int, List[str]] = {}
+        for channel, handler in handlers.items():
+            if channel not in self._handlers:
+                by_shard.setdefault(self._shard_for(channel).index, []).append(channel)
+            self._handlers[channel] = handler
+
+        for index, channels in by_shard.items():
+            shard = self._shards[index]
+            shard.channels.update(channels)
+            await shard.pubsub.subscribe(*channels)
+            shard.has_channels.set()
+
+    async def unsubscribe(self, channel: str) -> bool:
+        """Stop routing a channel; returns False if it was not subscribed."""
+        if self._handlers.pop(channel, None) is None:
+            return False
+
+        shard = self._shard_for(channel)
+        shard.channels.discard(channel)
+        if shard.pubsub:
+            await shard.pubsub.unsubscribe(channel)
+        if not shard.channels:
+            shard.has_channels.clear()
+        return True
+
+    def is_subscribed(self, channel: str) -> bool:
+        return channel in self._handlers
+
+    async def _read_shard(self, shard: _Shard):
+        """Block on the shard connection and dispatch messages."""
+        while self._running:
+            try:
+                if not shard.channels:
+                    await shard.has_channels.wait()
+                    continue
+
+                # Blocks on the socket; no polling interval
+                message = await shard.pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=None
+                )
+                if not message or message.get("type") != "message":
+                    continue
+
+                self._stats["messages_received"] += 1
+                channel = message["channel"]
+                handler = self._handlers.get(channel)
+                if handler is None:
+                    # Late message for a channel that was just unsubscribed
+                    self._stats["messages_unrouted"] += 1
+                    continue
+
+                await self._inflight.acquire()
+                task = asyncio.create_task(self._dispatch(handler, channel, message["data"]))
+                self._handler_tasks.add(task)
+                task.add_done_callback(self._handler_tasks.discard)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Pub/sub shard {shard.index} read failed: {e}")
+                await asyncio.sleep(1)
+
+    async def _dispatch(self, handler: MessageHandler, channel: str, data: Any):
+        try:
+            await handler(channel, data)
+        except Exception as e:
+            self._stats["handler_errors"] += 1
+            logger.error(f"Handler for channel {channel} failed: {e}")
+        finally:
+            self._inflight.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get routing counters and connection usage."""
+        return {
+            **self._stats,
+            "connections": sum(1 for s in self._shards if s.client is not None),
+            "channels": len(self._handlers),
+            "channels_per_shard": [len(s.channels) for s in self._shards],
+            "inflight_handlers": len(self._handler_tasks)
+        }
@@ -5,23 +5,34 @@ Routes calculation requests to appropriate value chain handlers,
 manages parallel execution, and aggregates results.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import AsyncIterator, Dict, List, Any, Optional
 from datetime import datetime
 import asyncio
 import logging
 import hashlib
 import json
 
+from pydantic import BaseModel
+
 from .base_handler import (
     BaseCalculationHandler,
     CalculationParams,
     CalculationResult,
     CalculationError
 )
+from .engine.dependency_graph import DependencyGraph
 
 logger = logging.getLogger(__name__)
 
 
+class DashboardEvent(BaseModel):
+    """Progress event emitted as each dashboard KPI finishes."""
+    kpi_code: str
+    status: str  # completed, failed, skipped
+    result: Optional[CalculationResult] = None
+    error: Optional[str] = None
+
+
 class CalculationOrchestrator:
     """
     Orchestrates calculation requests across multiple value chain handlers.
@@ -32,13 +43,26 @@ class CalculationOrchestrator:
     - Aggregate multi-KPI results
     - Handle errors and retries
     - Request Coalescing (Single-flight)
+    - Dependency-aware dashboard scheduling
     """
     
-    def __init__(self):
-        """Initialize orchestrator."""
+    def __init__(self, max_concurrency_per_handler: int = 10):
+        """
+        Initialize orchestrator.
+        
+        Args:
+            max_concurrency_per_handler: Max calculations running at once
+                on a single handler; further requests wait for a slot
+        """
         self.handlers: Dict[str, BaseCalculationHandler] = {}
         self.kpi_to_handler_map: Dict[str, str] = {}
         self._pending_calculations: Dict[str, asyncio.Task] = {}
+        
+        # KPI -> KPIs whose results it consumes
+        self.dependency_graph = DependencyGraph()
+        self.max_concurrency_per_handler = max(1, max_concurrency_per_handler)
+        self._handler_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._failed_calculations = 0
     
     def register_handler(
         self,
@@ -55,6 +79,61 @@ class CalculationOrchestrator:
         self.handlers[value_chain_code] = handler
         logger.info(f"Registered handler for value chain: {value_chain_code}")
     
+    def register_dependencies(self, kpi_code: str, depends_on: List[str]):
+        """
+        Record that a KPI is calculated from other KPIs' results.
+        
+        Edges that would close a cycle are skipped with a warning, so one bad
+        definition cannot break every dashboard that uses its KPIs.
+        
+        Args:
+            kpi_code: Dependent KPI
+            depends_on: KPIs that must be calculated first
+        """
+        for dependency in depends_on:
+            if dependency == kpi_code or self.dependency_graph.depends_on(dependency, kpi_code):
+                logger.warning(
+                    f"Ignoring dependency {kpi_code} -> {dependency}: it would create a cycle"
+                )
+                continue
+            self.dependency_graph.add_dependency(kpi_code, dependency)
+    
+    def register_kpi_metadata(self, kpi_code: str, metadata: Dict[str, Any]):
+        """
+        Register the dependencies declared in a KPI definition's metadata.
+        
+        Args:
+            kpi_code: KPI code
+            metadata: The definition's metadata; "depends_on" lists the KPI
+                codes whose results the KPI is calculated from
+        """
+        depends_on = (metadata or {}).get("depends_on") or []
+        if depends_on:
+            self.register_dependencies(kpi_code, depends_on)
+    
+    async def load_kpi_dependencies(self, metadata_client, page_size: int = 100) -> int:
+        """
+        Load KPI dependencies from the metric definitions in the metadata service.
+        
+        Args:
+            metadata_client: MetadataClientPubSub
+            page_size: Definitions fetched per request
+            
+        Returns:
+            Number of definitions read
+        """
+        offset = 0
+        while True:
+            definitions = await metadata_client.list_definitions(
+                kind="metric_definition", limit=page_size, offset=offset
+            )
+            for definition in definitions:
+                if definition.get("code"):
+                    self.register_kpi_metadata(definition["code"], definition.get("metadata_"))
+            offset += len(definitions)
+            if len(definitions) < page_size:
+                return offset
+    
     async def load_kpi_mappings(self, metadata_service_url: str):
         """
         Load KPI to value chain mappings from metadata service.
@@ -123,11 +202,13 @@ class CalculationOrchestrator:
         # Validate parameters
         await handler.validate_params(params)
         
-        # Calculate with caching
-        start_time = datetime.utcnow()
+        # Calculate with caching, bounded per handler
+        semaphore = self._get_handler_semaphore(handler.value_chain_code)
         
         try:
-            result = await handler.calculate_with_cache(params)
+            async with semaphore:
+                start_time = datetime.utcnow()
+                result = await handler.calculate_with_cache(params)
             
             # Add orchestration metadata
             result.metadata["orchestrator"] = {
@@ -153,6 +234,14 @@ class CalculationOrchestrator:
         # Sort keys to ensure consistent hash
         params_json = json.dumps(params_dict, sort_keys=True)
         return hashlib.sha256(params_json.encode()).hexdigest()
+    
+    def _get_handler_semaphore(self, handler_code: str) -> asyncio.Semaphore:
+        """Get (or create) the concurrency limiter for a handler."""
+        semaphore = self._handler_semaphores.get(handler_code)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency_per_handler)
+            self._handler_semaphores[handler_code] = semaphore
+        return semaphore
 
     async def calculate_batch(
         self,
@@ -170,8 +259,9 @@ class CalculationOrchestrator:
         # Group by handler for optimization
         handler_groups = self._group_by_handler(params_list)
         
-        # Execute in parallel per handler
+        # Execute in parallel per handler (bounded by handler semaphores)
         tasks = []
+        task_params = []
         for handler_code, params_group in handler_groups.items():
             handler = self.handlers.get(handler_code)
             if handler:
@@ -179,15 +269,21 @@ class CalculationOrchestrator:
                     tasks.append(
                         self.calculate_single(params)
                     )
+                    task_params.append(params)
         
         # Wait for all calculations
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
-        # Filter out errors (or handle them)
-        valid_results = [
-            r for r in results
-            if isinstance(r, CalculationResult)
-        ]
+        # Keep successful results, record failures
+        valid_results = []
+        for params, result in zip(task_params, results):
+            if isinstance(result, CalculationResult):
+                valid_results.append(result)
+            else:
+                self._failed_calculations += 1
+                logger.warning(
+                    f"Batch calculation failed for {params.kpi_code}: {result}"
+                )
         
         return valid_results
     
@@ -202,31 +298,124 @@ class CalculationOrchestrator:
             dashboard_config: Dashboard configuration with KPI list
             
         Returns:
-            Dictionary of KPI code to CalculationResult
+            Dictionary of KPI code to CalculationResult (failed or skipped
+            KPIs are omitted)
+        """
+        results = {}
+        async for event in self.stream_dashboard(dashboard_config):
+            if event.result is not None:
+                results[event.kpi_code] = event.result
+        return results
+    
+    async def stream_dashboard(
+        self,
+        dashboard_config: Dict[str, Any]
+    ) -> AsyncIterator[DashboardEvent]:
+        """
+        Calculate dashboard KPIs in dependency order, yielding each as it finishes.
+        
+        A KPI starts as soon as its own dependencies are done (not when the
+        whole previous layer is). Dependencies come from the registered KPI
+        metadata; their values are passed to the dependent calculation in
+        params.metadata["dependency_results"]. If a KPI fails, everything
+        that depends on it is skipped.
+        
+        Args:
+            dashboard_config: Dashboard configuration. "kpis" lists the KPIs
+                to return; their dependencies are calculated as well.
+                
+        Yields:
+            DashboardEvent for every requested KPI
+            
+        Raises:
+            ValueError: If the KPI dependencies contain a cycle
         """
-        # Extract KPI codes from dashboard config
         kpi_codes = dashboard_config.get("kpis", [])
+        requested = set(kpi_codes)
         
-        # Build params for each KPI
-        params_list = [
-            CalculationParams(
-                kpi_code=kpi_code,
-                filters=dashboard_config.get("filters", {}),
-                time_period=dashboard_config.get("time_period", "monthly"),
-                start_date=dashboard_config.get("start_date"),
-                end_date=dashboard_config.get("end_date")
-            )
-            for kpi_code in kpi_codes
-        ]
+        scheduler = self.dependency_graph.scheduler(kpi_codes)
+        results: Dict[str, CalculationResult] = {}
+        blocked: Dict[str, str] = {}  # skipped KPI -> failed dependency
+        running: Dict[asyncio.Task, str] = {}
         
-        # Calculate in parallel
-        results = await self.calculate_batch(params_list)
+        try:
+            while scheduler.is_active():
+                ready = scheduler.get_ready()
+                while ready:
+                    for kpi_code in ready:
+                        if kpi_code in blocked:
+                            scheduler.done(kpi_code)
+                            if kpi_code in requested:
+                                yield DashboardEvent(
+                                    kpi_code=kpi_code,
+                                    status="skipped",
+                                    error=f"Dependency {blocked[kpi_code]} failed"
+                                )
+                            continue
+                        params = self._build_dashboard_params(
+                            kpi_code, dashboard_config, results
+                        )
+                        running[asyncio.create_task(self.calculate_single(params))] = kpi_code
+                    ready = scheduler.get_ready()
+                
+                if not running:
+                    break
+                
+                finished, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in finished:
+                    kpi_code = running.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        results[kpi_code] = task.result()
+                        event = DashboardEvent(
+                            kpi_code=kpi_code,
+                            status="completed",
+                            result=results[kpi_code]
+                        )
+                    else:
+                        self._failed_calculations += 1
+                        logger.warning(f"Dashboard KPI {kpi_code} failed: {error}")
+                        for dependent in scheduler.pending_dependents(kpi_code):
+                            blocked.setdefault(dependent, kpi_code)
+                        event = DashboardEvent(
+                            kpi_code=kpi_code,
+                            status="failed",
+                            error=str(error)
+                        )
+                    scheduler.done(kpi_code)
+                    if kpi_code in requested:
+                        yield event
+        finally:
+            # Consumer went away (or we failed): don't leave work running
+            for task in running:
+                task.cancel()
+    
+    def _build_dashboard_params(
+        self,
+        kpi_code: str,
+        dashboard_config: Dict[str, Any],
+        results: Dict[str, CalculationResult]
+    ) -> CalculationParams:
+        """Build params for a dashboard KPI, including its dependencies' values."""
+        metadata = {}
+        dependencies = self.dependency_graph.dependencies.get(kpi_code)
+        if dependencies:
+            metadata["dependency_results"] = {
+                dependency: results[dependency].value
+                for dependency in sorted(dependencies)
+                if dependency in results
+            }
         
-        # Return as dictionary
-        return {
-            result.kpi_code: result
-            for result in results
-        }
+        return CalculationParams(
+            kpi_code=kpi_code,
+            filters=dashboard_config.get("filters", {}),
+            time_period=dashboard_config.get("time_period", "monthly"),
+            start_date=dashboard_config.get("start_date"),
+            end_date=dashboard_config.get("end_date"),
+            metadata=metadata
+        )
     
     def _get_handler_for_kpi(
         self,
@@ -301,5 +490,7 @@ class CalculationOrchestrator:
                     if v == handler_code
                 ])
                 for handler_code in self.handlers.keys()
-            }
+            },
+            "max_concurrency_per_handler": self.max_concurrency_per_handler,
+            "failed_calculations": self._failed_calculations
         }
@@ -3,11 +3,11 @@ Stream Processor for Calculation Engine
 Subscribes to data streams and calculates KPIs in real-time
 """
 import asyncio
+import functools
 import logging
 import json
-from typing import Dict, Optional, Set, Callable, Any
+from typing import Dict, List, Optional, Set, Callable, Any, Tuple
 from datetime import datetime
-import redis.asyncio as redis
 import httpx
 
 from .base_handler import CalculationParams, CalculationResult
@@ -15,6 +15,7 @@ from .orchestrator import CalculationOrchestrator
 from .engine.stream_aggregator import StreamAggregator
 from .engine.storage_sync import StorageSyncManager
 from .clients import DatabaseClient, MessagingClientWrapper
+from .messaging.pubsub_multiplexer import PubSubMultiplexer
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +28,8 @@ class StreamProcessor:
     - Subscribe to data streams from database service
     - Listen for stream updates via messaging service
     - Ingest high-velocity data into StreamAggregator (Redis TimeSeries)
-    - Calculate KPIs when new data arrives
+    - Calculate KPIs when new data arrives (coalesced per stream within a
+      short batching window, so bursts trigger one recalculation per window)
     - Publish calculation results back to messaging service
     - Manage stream subscriptions lifecycle
     - Sync in-memory data to TimescaleDB (Write-Behind)
@@ -40,7 +42,10 @@ class StreamProcessor:
         messaging_client: MessagingClientWrapper,
         redis_url: str,
         subscriber_id: Optional[str] = None,
-        database_service_url: Optional[str] = None
+        database_service_url: Optional[str] = None,
+        pubsub_shards: int = 1,
+        batch_window_seconds: float = 0.25,
+        max_concurrent_recalculations: int = 16
     ):
         """
         Initialize stream processor
@@ -52,6 +57,13 @@ class StreamProcessor:
             redis_url: Redis connection URL for StreamAggregator
             subscriber_id: Optional subscriber ID (generated if not provided)
             database_service_url: URL for database service (for heartbeat)
+            pubsub_shards: Number of shared pub/sub connections used for all
+                stream channels
+            batch_window_seconds: Window within which updates for the same
+                (kpi_code, entity_id, period) are coalesced into one
+                recalculation. 0 recalculates on every message.
+            max_concurrent_recalculations: Max calculations running at once
+                when a batch is recalculated
         """
         self.orchestrator = orchestrator
         self.database_client = database_client
@@ -75,8 +87,20 @@ class StreamProcessor:
         # Track active subscriptions: stream_key -> subscription_info
         self._active_subscriptions: Dict[str, Dict] = {}
         
-        # Track message consumers: channel -> consumer_task
-        self._message_consumers: Dict[str, asyncio.Task] = {}
+        # All stream channels share a few pub/sub connections
+        self._multiplexer = PubSubMultiplexer(redis_url=redis_url, shards=pubsub_shards)
+        
+        # Micro-batching: stream_key -> latest pending update
+        self.batch_window_seconds = batch_window_seconds
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._recalculation_semaphore = asyncio.Semaphore(max_concurrent_recalculations)
+        self._batch_stats = {
+            "updates_received": 0,
+            "updates_coalesced": 0,
+            "recalculations": 0,
+            "batches_published": 0
+        }
         
         # Control flag
         self._running = False
@@ -99,6 +123,13 @@ class StreamProcessor:
         # Start Sync Manager
         await self.sync_manager.start()
         
+        # Open shared pub/sub connections
+        await self._multiplexer.start()
+        
+        # Start batched recalculation loop
+        if self.batch_window_seconds > 0:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        
         logger.info("StreamProcessor started")
     
     async def stop(self):
@@ -112,13 +143,18 @@ class StreamProcessor:
         for stream_key in list(self._active_subscriptions.keys()):
             await self.unsubscribe_from_stream(stream_key)
         
-        # Cancel all message consumers
-        for channel, task in self._message_consumers.items():
-            logger.info(f"Cancelling consumer for channel: {channel}")
-            task.cancel()
+        # Close shared pub/sub connections (drops remaining channels)
+        await self._multiplexer.stop()
         
-        if self._message_consumers:
-            await asyncio.gather(*self._message_consumers.values(), return_exceptions=True)
+        # Stop batching loop and flush what is still pending
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self._flush_pending_updates()
         
         # Cancel heartbeat task
         if self._heartbeat_task:
@@ -222,15 +258,8 @@ class StreamProcessor:
         channel = subscription["channel"]
         
         try:
-            # Stop message consumer
-            if channel in self._message_consumers:
-                task = self._message_consumers[channel]
-                task.cancel()
-                try:
-                    await task
-                except asyncio.CancelledError:
-                    pass
-                del self._message_consumers[channel]
+            # Stop routing the channel (shared connection stays open)
+            await self._multiplexer.unsubscribe(channel)
             
             # Unsubscribe via pub/sub messaging
             parts = stream_key.split(":")
@@ -266,7 +295,10 @@ class StreamProcessor:
         calculation_params: Optional[Dict[str, Any]]
     ):
         """
-        Start a message consumer for a specific channel
+        Route a stream channel to the KPI calculation path
+        
+        The channel is added to the shared pub/sub multiplexer; no new
+        Redis connection or polling task is created per stream.
         
         Args:
             channel: Redis channel to subscribe to
@@ -275,81 +307,40 @@ class StreamProcessor:
             period: Time period
             calculation_params: Additional calculation parameters
         """
-        if channel in self._message_consumers:
+        if self._multiplexer.is_subscribed(channel):
             logger.warning(f"Consumer already exists for channel: {channel}")
             return
         
-        # Create consumer task
-        task = asyncio.create_task(
-            self._consume_messages(channel, kpi_code, entity_id, period, calculation_params)
+        handler = functools.partial(
+            self._handle_stream_message,
+            kpi_code=kpi_code,
+            entity_id=entity_id,
+            period=period,
+            calculation_params=calculation_params or {}
         )
-        self._message_consumers[channel] = task
+        await self._multiplexer.subscribe(channel, handler)
         
         logger.info(f"Started message consumer for channel: {channel}")
     
-    async def _consume_messages(
+    async def _handle_stream_message(
         self,
         channel: str,
+        data: str,
         kpi_code: str,
         entity_id: str,
         period: str,
-        calculation_params: Optional[Dict[str, Any]]
+        calculation_params: Dict[str, Any]
     ):
-        """
-        Consume messages from a Redis channel and calculate KPIs
-        """
-        logger.info(f"Message consumer started for channel: {channel}")
-        
-        redis_client = None
-        pubsub = None
-        
+        """Decode a message routed by the multiplexer and process it"""
         try:
-            # Connect to Redis
-            redis_client = redis.from_url(self.redis_url, decode_responses=True)
-            pubsub = redis_client.pubsub()
-            await pubsub.subscribe(channel)
-            
-            logger.info(f"Subscribed to Redis channel: {channel}")
-            
-            while self._running:
-                try:
-                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                    
-                    if message:
-                        try:
-                            data = json.loads(message["data"])
-                            await self._process_stream_update(
-                                data, kpi_code, entity_id, period, calculation_params
-                            )
-                        except json.JSONDecodeError:
-                            logger.warning(f"Received invalid JSON on channel {channel}: {message['data']}")
-                        except Exception as e:
-                            logger.error(f"Error processing message on channel {channel}: {e}")
-                    
-                    # Small sleep to yield control if no message (though get_message with timeout handles waiting)
-                    if not message:
-                        await asyncio.sleep(0.01)
-                
-                except asyncio.CancelledError:
-                    raise
-                
-                except Exception as e:
-                    logger.error(f"Error consuming messages from {channel}: {e}")
-                    await asyncio.sleep(5)  # Back off on error
-        
-        except asyncio.CancelledError:
-            logger.info(f"Message consumer stopped for channel: {channel}")
-            raise
+            message = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Received invalid JSON on channel {channel}: {data}")
+            return
         
-        except Exception as e:
-            logger.error(f"Message consumer failed for channel {channel}: {e}")
-            
-        finally:
-            if pubsub:
-                await pubsub.unsubscribe(channel)
-                await pubsub.close()
-            if redis_client:
-                await redis_client.close()
+        await self._process_stream_update(
+            message, kpi_code, entity_id, period, calculation_params
+        )
     
     async def _process_stream_update(
         self,
@@ -360,7 +351,10 @@ class StreamProcessor:
         calculation_params: Optional[Dict[str, Any]]
     ):
         """
-        Process a stream update message and calculate KPI
+        Process a stream update message and schedule a KPI recalculation
+        
+        The sample is ingested immediately; the recalculation is coalesced
+        with other updates for the same stream and runs once per batch window.
         
         Args:
             message: Stream update message
@@ -385,77 +379,132 @@ class StreamProcessor:
                     dimensions={"entity_id": entity_id, "period": period}
                 )
             
-            # Create calculation parameters
-            params = CalculationParams(
-                kpi_code=kpi_code,
-                entity_id=entity_id,
-                start_date=timestamp,
-                end_date=timestamp,
-                filters=calculation_params.get("filters", {}),
-                aggregation=calculation_params.get("aggregation", "average")
-            )
-            
-            # Calculate KPI
-            result = await self.orchestrator.calculate_single(params)
+            self._batch_stats["updates_received"] += 1
+            update = {
+                "kpi_code": kpi_code,
+                "entity_id": entity_id,
+                "period": period,
+                "timestamp": timestamp,
+                "calculation_params": calculation_params or {}
+            }
             
-            # Publish result to messaging service
-            await self._publish_calculation_result(result, kpi_code, entity_id, period)
+            if self.batch_window_seconds <= 0:
+                await self._recalculate_and_publish([update])
+                return
             
-            logger.debug(f"Calculated {kpi_code} for {entity_id}: {result.value}")
+            stream_key = f"{kpi_code}:{entity_id}:{period}"
+            if stream_key in self._pending_updates:
+                self._batch_stats["updates_coalesced"] += 1
+            # Latest update wins; the aggregator already holds every sample
+            self._pending_updates[stream_key] = update
         
         except Exception as e:
             logger.error(f"Failed to process stream update: {e}")
     
-    async def _publish_calculation_result(
+    async def _flush_loop(self):
+        """Recalculate coalesced stream updates once per batch window"""
+        try:
+            while self._running:
+                await asyncio.sleep(self.batch_window_seconds)
+                await self._flush_pending_updates()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Batch flush loop failed: {e}")
+    
+    async def _flush_pending_updates(self):
+        """Recalculate every stream that changed in the current window"""
+        if not self._pending_updates:
+            return
+        
+        updates = list(self._pending_updates.values())
+        self._pending_updates = {}
+        
+        try:
+            await self._recalculate_and_publish(updates)
+        except Exception as e:
+            logger.error(f"Failed to flush {len(updates)} stream updates: {e}")
+    
+    async def _recalculate_and_publish(self, updates: List[Dict[str, Any]]):
+        """Calculate KPIs for a batch of updates and publish results together"""
+        async def calculate(update: Dict[str, Any]) -> CalculationResult:
+            calculation_params = update["calculation_params"]
+            params = CalculationParams(
+                kpi_code=update["kpi_code"],
+                entity_id=update["entity_id"],
+                start_date=update["timestamp"],
+                end_date=update["timestamp"],
+                filters=calculation_params.get("filters", {}),
+                aggregation=calculation_params.get("aggregation", "average")
+            )
+            async with self._recalculation_semaphore:
+                return await self.orchestrator.calculate_single(params)
+        
+        results = await asyncio.gather(
+            *(calculate(update) for update in updates),
+            return_exceptions=True
+        )
+        self._batch_stats["recalculations"] += len(updates)
+        
+        calculated = []
+        for update, result in zip(updates, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    f"Failed to calculate {update['kpi_code']} for {update['entity_id']}: {result}"
+                )
+                continue
+            calculated.append((result, update["kpi_code"], update["entity_id"], update["period"]))
+            logger.debug(f"Calculated {update['kpi_code']} for {update['entity_id']}: {result.value}")
+        
+        if calculated:
+            await self._publish_calculation_results(calculated)
+    
+    def _build_result_message(
         self,
         result: CalculationResult,
         kpi_code: str,
         entity_id: str,
         period: str
+    ) -> Dict[str, Any]:
+        """Build the kpi.calculated payload for a result"""
+        return {
+            "source": "calculation_engine",
+            "kpi_code": kpi_code,
+            "entity_id": entity_id,
+            "period": period,
+            "value": result.value,
+            "unit": result.unit,
+            "timestamp": result.timestamp.isoformat() if result.timestamp else None,
+            "calculated_at": datetime.utcnow().isoformat(),
+            "metadata": result.metadata
+        }
+    
+    async def _publish_calculation_results(
+        self,
+        calculated: List[Tuple[CalculationResult, str, str, str]]
     ):
         """
-        Publish calculation result to messaging service.
+        Publish a batch of calculation results in one pipelined round trip.
         
-        Publishes to:
-        - kpi.calculated (general channel for database service to persist/archive)
-        - kpi.calculated.{kpi_code} (specific channel for subscribers)
+        Each result goes to kpi.calculated and kpi.calculated.{kpi_code}.
         
         Args:
-            result: Calculation result
-            kpi_code: KPI code
-            entity_id: Entity ID
-            period: Time period
+            calculated: (result, kpi_code, entity_id, period) tuples
         """
         try:
-            message = {
-                "source": "calculation_engine",
-                "kpi_code": kpi_code,
-                "entity_id": entity_id,
-                "period": period,
-                "value": result.value,
-                "unit": result.unit,
-                "timestamp": result.timestamp.isoformat() if result.timestamp else None,
-                "calculated_at": datetime.utcnow().isoformat(),
-                "metadata": result.metadata
-            }
+            events = []
+            for result, kpi_code, entity_id, period in calculated:
+                message = self._build_result_message(result, kpi_code, entity_id, period)
+                events.append(("kpi.calculated", message))
+                events.append((f"kpi.calculated.{kpi_code}", message))
             
-            # Publish via messaging client to standard channel
-            # Database service subscribes to this for persistence and archival
-            await self.messaging_client.publish_event(
-                event_type="kpi.calculated",
-                payload=message
-            )
-            
-            # Also publish to KPI-specific channel for targeted subscribers
-            await self.messaging_client.publish_event(
-                event_type=f"kpi.calculated.{kpi_code}",
-                payload=message
-            )
+            await self.messaging_client.publish_events(events)
+            self._batch_stats["batches_published"] += 1
             
-            logger.debug(f"Published KPI result: {kpi_code}={result.value}")
+            logger.debug(f"Published {len(calculated)} KPI results in one batch")
         
         except Exception as e:
-            logger.error(f"Failed to publish calculation result: {e}")
+            logger.error(f"Failed to publish calculation results: {e}")
     
     async def _heartbeat_loop(self):
         """Send periodic heartbeats via pub/sub to keep subscriptions alive"""
@@ -498,7 +547,13 @@ class StreamProcessor:
             "running": self._running,
             "subscriber_id": self.subscriber_id,
             "active_subscriptions": len(self._active_subscriptions),
-            "active_consumers": len(self._message_consumers),
+            "active_consumers": self._multiplexer.get_stats()["channels"],
+            "pubsub": self._multiplexer.get_stats(),
+            "batching": {
+                **self._batch_stats,
+                "window_seconds": self.batch_window_seconds,
+                "pending": len(self._pending_updates)
+            },
             "subscriptions": {
                 stream_key: {
                     "channel": sub["channel"],
@@ -524,65 +579,31 @@ class StreamProcessor:
         """
         channel = "simulation.entity.created"
         
-        if channel in self._message_consumers:
+        if self._multiplexer.is_subscribed(channel):
             logger.warning(f"Already subscribed to simulation events")
             return
         
-        # Create consumer task for simulation events
-        task = asyncio.create_task(
-            self._consume_simulation_events(channel, kpi_codes)
+        await self._multiplexer.subscribe(
+            channel,
+            functools.partial(self._handle_simulation_message, kpi_codes=kpi_codes)
         )
-        self._message_consumers[channel] = task
         
         logger.info(f"Subscribed to simulation entity events")
     
-    async def _consume_simulation_events(
+    async def _handle_simulation_message(
         self,
         channel: str,
+        data: str,
         kpi_codes: Optional[Set[str]]
     ):
-        """Consume simulation entity events and calculate KPIs."""
-        logger.info(f"Simulation event consumer started for channel: {channel}")
-        
-        redis_client = None
-        pubsub = None
-        
+        """Decode a simulation entity event routed by the multiplexer."""
         try:
-            redis_client = redis.from_url(self.redis_url, decode_responses=True)
-            pubsub = redis_client.pubsub()
-            await pubsub.subscribe(channel)
-            
-            while self._running:
-                try:
-                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                    
-                    if message:
-                        try:
-                            data = json.loads(message["data"])
-                            await self._process_simulation_entity_event(data, kpi_codes)
-                        except json.JSONDecodeError:
-                            logger.warning(f"Invalid JSON in simulation event")
-                        except Exception as e:
-                            logger.error(f"Error processing simulation event: {e}")
-                    
-                    if not message:
-                        await asyncio.sleep(0.01)
-                
-                except asyncio.CancelledError:
-                    raise
-                except Exception as e:
-                    logger.error(f"Error consuming simulation events: {e}")
-                    await asyncio.sleep(5)
+            event = json.loads(data)
+        except json.JSONDecodeError:
+            logger.warning(f"Invalid JSON in simulation event")
+            return
         
-        except asyncio.CancelledError:
-            logger.info("Simulation event consumer stopped")
-            raise
-        finally:
-            if pubsub:
-                await pubsub.unsubscribe(channel)
-                await pubsub.close()
-            if redis_client:
-                await redis_client.close()
+        await self._process_simulation_entity_event(event, kpi_codes)
     
     async def _process_simulation_entity_event(
         self,
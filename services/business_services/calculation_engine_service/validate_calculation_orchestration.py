@@ -92,6 +92,49 @@ class TestCalculationOrchestration(unittest.TestCase):
             graph.get_calculation_order(["A"])
         print("✅ Circular dependency detected")
 
+    def test_order_cache_invalidation(self):
+        """Test that cached layerings are invalidated only for affected targets."""
+        print("\nTesting Calculation Order Cache...")
+        graph = DependencyGraph()
+        graph.add_dependency("A", "B")
+        graph.add_dependency("X", "Y")
+
+        self.assertEqual(graph.get_calculation_order(["A"]), [["B"], ["A"]])
+        self.assertEqual(graph.get_calculation_order(["X"]), [["Y"], ["X"]])
+
+        # New edge under B changes A's subgraph but not X's
+        graph.add_dependency("B", "C")
+        self.assertNotIn(frozenset(["A"]), graph._order_cache)
+        self.assertIn(frozenset(["X"]), graph._order_cache)
+        self.assertEqual(graph.get_calculation_order(["A"]), [["C"], ["B"], ["A"]])
+        print("✅ Cache invalidated for affected subgraph only")
+
+    def test_streaming_scheduler(self):
+        """Test that the scheduler releases metrics as their own dependencies finish."""
+        print("\nTesting Streaming Scheduler...")
+        graph = DependencyGraph()
+        # A depends on B, B depends on D; C depends on slow E
+        graph.add_dependency("A", "B")
+        graph.add_dependency("B", "D")
+        graph.add_dependency("C", "E")
+
+        scheduler = graph.scheduler(["A", "C"])
+        self.assertEqual(sorted(scheduler.get_ready()), ["D", "E"])
+
+        # D finishes while E is still running: B starts immediately
+        self.assertEqual(scheduler.done("D"), ["B"])
+        self.assertEqual(scheduler.get_ready(), ["B"])
+        self.assertEqual(scheduler.done("B"), ["A"])
+        self.assertEqual(scheduler.get_ready(), ["A"])
+        scheduler.done("A")
+        self.assertTrue(scheduler.is_active())
+
+        scheduler.done("E")
+        self.assertEqual(scheduler.get_ready(), ["C"])
+        scheduler.done("C")
+        self.assertFalse(scheduler.is_active())
+        print("✅ Ready set advances per metric, not per layer")
+
     async def async_test_orchestrator(self):
         """Async test for orchestrator execution."""
         print("\nTesting Calculation Orchestrator...")
@@ -135,5 +178,130 @@ class TestCalculationOrchestration(unittest.TestCase):
         """Wrapper to run async test."""
         asyncio.run(self.async_test_orchestrator())
 
+    def test_dashboard_dependency_execution(self):
+        """Test dependency-ordered, bounded, streaming dashboard execution."""
+        print("\nTesting Dashboard Execution Engine...")
+
+        class RecordingHandler(MockHandler):
+            def __init__(self, code):
+                super().__init__(code)
+                self.inflight = 0
+                self.max_inflight = 0
+                self.seen_inputs = {}
+
+            async def calculate(self, params: CalculationParams) -> CalculationResult:
+                self.inflight += 1
+                self.max_inflight = max(self.max_inflight, self.inflight)
+                try:
+                    await asyncio.sleep(0.01)
+                    if params.kpi_code == "BROKEN":
+                        raise ValueError("boom")
+                    inputs = params.metadata.get("dependency_results", {})
+                    self.seen_inputs[params.kpi_code] = inputs
+                    return CalculationResult(
+                        kpi_code=params.kpi_code,
+                        value=sum(inputs.values()) or 1.0,
+                        unit="Number",
+                        timestamp=datetime.utcnow(),
+                        calculation_time_ms=10.0
+                    )
+                finally:
+                    self.inflight -= 1
+
+        async def run_test():
+            orch = CalculationOrchestrator(max_concurrency_per_handler=2)
+            handler = RecordingHandler("SUPPLY_CHAIN")
+            orch.register_handler("SUPPLY_CHAIN", handler)
+            kpis = ["TOTAL", "LEFT", "RIGHT", "BASE", "BROKEN", "AFTER_BROKEN"] + [f"K{i}" for i in range(6)]
+            for kpi in kpis:
+                orch.kpi_to_handler_map[kpi] = "SUPPLY_CHAIN"
+            orch.register_dependencies("TOTAL", ["LEFT", "RIGHT"])
+            orch.register_dependencies("LEFT", ["BASE"])
+            orch.register_dependencies("RIGHT", ["BASE"])
+            orch.register_dependencies("AFTER_BROKEN", ["BROKEN"])
+
+            config = {
+                "kpis": kpis,
+                "start_date": datetime(2025, 1, 1),
+                "end_date": datetime(2025, 2, 1)
+            }
+            events = [event async for event in orch.stream_dashboard(config)]
+            return orch, handler, events
+
+        orch, handler, events = asyncio.run(run_test())
+        order = [e.kpi_code for e in events]
+        by_code = {e.kpi_code: e for e in events}
+
+        # Dependencies finish before dependents, and their values flow through
+        self.assertLess(order.index("BASE"), order.index("LEFT"))
+        self.assertLess(order.index("LEFT"), order.index("TOTAL"))
+        self.assertEqual(handler.seen_inputs["TOTAL"], {"LEFT": 1.0, "RIGHT": 1.0})
+        self.assertEqual(by_code["TOTAL"].result.value, 2.0)
+
+        # Failures are reported and their dependents skipped, not dropped
+        self.assertEqual(by_code["BROKEN"].status, "failed")
+        self.assertEqual(by_code["AFTER_BROKEN"].status, "skipped")
+        self.assertNotIn("AFTER_BROKEN", handler.seen_inputs)
+        self.assertEqual(len(events), 12)
+
+        # Concurrency bounded per handler
+        self.assertLessEqual(handler.max_inflight, 2)
+        self.assertEqual(orch.get_handler_stats()["failed_calculations"], 1)
+        print(f"✅ {len(events)} KPIs streamed in dependency order, max in-flight {handler.max_inflight}")
+
+    def test_dependencies_loaded_from_kpi_metadata(self):
+        """Test that KPI metadata declares dependencies and cycles are refused."""
+        print("\nTesting KPI dependencies from metadata...")
+
+        class FakeMetadataClient:
+            def __init__(self, definitions):
+                self.definitions = definitions
+
+            async def list_definitions(self, kind=None, limit=100, offset=0, timeout=None):
+                return self.definitions[offset:offset + limit]
+
+        definitions = [
+            {"code": "MARGIN", "metadata_": {"depends_on": ["REVENUE", "COST"]}},
+            {"code": "REVENUE", "metadata_": {}},
+            {"code": "COST", "metadata_": {"depends_on": ["MARGIN"]}},  # would be a cycle
+            {"code": "GROWTH"}
+        ]
+
+        async def run_test():
+            orch = CalculationOrchestrator()
+            count = await orch.load_kpi_dependencies(FakeMetadataClient(definitions), page_size=3)
+            return orch, count
+
+        orch, count = asyncio.run(run_test())
+
+        self.assertEqual(count, 4)
+        self.assertEqual(orch.dependency_graph.dependencies["MARGIN"], {"REVENUE", "COST"})
+        self.assertEqual(orch.dependency_graph.dependencies["COST"], set())
+        self.assertEqual(orch.dependency_graph.get_calculation_order(["MARGIN"])[-1], ["MARGIN"])
+        print("✅ Dependencies loaded from metadata, cyclic edge skipped")
+
+    def test_dynamic_handler_uses_dependency_results(self):
+        """Test that a formula over dependency KPIs is evaluated from their results."""
+        print("\nTesting derived KPI from dependency results...")
+        from app.handlers.dynamic_handler import DynamicCalculationHandler
+
+        class DefinitionHandler(DynamicCalculationHandler):
+            async def get_kpi_definition(self, kpi_code):
+                return {"formula": "(REVENUE - COST) / REVENUE * 100", "unit": "Percentage"}
+
+        handler = DefinitionHandler("GENERIC", "http://mock-db", "http://mock-msg", "http://mock-meta")
+        params = CalculationParams(
+            kpi_code="MARGIN",
+            start_date=datetime(2025, 1, 1),
+            end_date=datetime(2025, 2, 1),
+            metadata={"dependency_results": {"REVENUE": 200.0, "COST": 150.0}}
+        )
+        result = asyncio.run(handler.calculate(params))
+
+        self.assertEqual(result.value, 25.0)
+        self.assertEqual(result.metadata["dependency_results"], {"COST": 150.0, "REVENUE": 200.0})
+        self.assertNotIn("sql_generated", result.metadata)
+        print("✅ Derived KPI calculated without a query")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add service dir to path
+service_dir = os.path.dirname(os.path.abspath(__file__))
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from app.engine.result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.clock_patcher = patch("app.engine.result_cache.time.monotonic", self.clock)
+        self.clock_patcher.start()
+
+    def tearDown(self):
+        self.clock_patcher.stop()
+
+    def test_hit_and_miss(self):
+        """Stored values are returned; unknown keys miss"""
+        cache = ResultCache(max_entries=10, default_ttl_seconds=60)
+        cache.set("kpi:a", {"value": 1})
+
+        self.assertEqual(cache.get("kpi:a"), {"value": 1})
+        self.assertIsNone(cache.get("kpi:b"))
+
+        stats = cache.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_ttl_expiry(self):
+        """Entries expire after their TTL, including per-entry overrides"""
+        cache = ResultCache(max_entries=10, default_ttl_seconds=60)
+        cache.set("default", 1)
+        cache.set("short", 2, ttl_seconds=5)
+
+        self.clock.now += 5
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("default"), 1)
+
+        self.clock.now += 56
+        self.assertIsNone(cache.get("default"))
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get_stats()["bytes"], 0)
+
+    def test_wheel_sweeps_expired_entries_without_lookup(self):
+        """Expired entries are dropped by the wheel even if never read again"""
+        cache = ResultCache(max_entries=100, default_ttl_seconds=10)
+        for i in range(20):
+            cache.set(f"kpi:{i}", i)
+
+        self.clock.now += 3600
+        cache.set("fresh", "x")
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get_stats()["expirations"], 20)
+
+    def test_lru_eviction_by_entries(self):
+        """Least recently used entry is evicted when the entry budget is exceeded"""
+        cache = ResultCache(max_entries=2, default_ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.get_stats()["evictions"], 1)
+
+    def test_eviction_by_bytes_and_oversized_rejected(self):
+        """Byte budget evicts old entries and rejects values that can never fit"""
+        cache = ResultCache(max_entries=100, max_bytes=50, default_ttl_seconds=60)
+        cache.set("a", "x" * 30)
+        cache.set("b", "y" * 30)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+
+        cache.set("huge", "z" * 100)
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.get_stats()["rejected"], 1)
+        self.assertLessEqual(cache.get_stats()["bytes"], 50)
+
+    def test_overwrite_replaces_size_and_ttl(self):
+        """Re-setting a key replaces its value, size and expiry"""
+        cache = ResultCache(max_entries=10, default_ttl_seconds=60)
+        cache.set("a", "x" * 40, ttl_seconds=5)
+        cache.set("a", "y", ttl_seconds=60)
+
+        self.clock.now += 10
+        self.assertEqual(cache.get("a"), "y")
+        self.assertEqual(cache.get_stats()["bytes"], len('"y"'))
+
+    def test_invalidation(self):
+        """delete removes one key and clear removes everything"""
+        cache = ResultCache(max_entries=10, default_ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        self.assertTrue(cache.delete("a"))
+        self.assertFalse(cache.delete("a"))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), 2)
+
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get_stats()["bytes"], 0)
+        self.assertIsNone(cache.get("b"))
+
+        # Deleted keys must not be swept twice from the wheel later
+        cache.set("c", 3)
+        self.clock.now += 120
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.get_stats()["expirations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,238 @@
+import sys
+import os
+import unittest
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+# Add service dir to path
+service_dir = os.path.dirname(os.path.abspath(__file__))
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from app.engine.set_operations import (
+    ComparisonOperator,
+    FilterCondition,
+    SetBasedSQLGenerator,
+    SetDefinition,
+    SetOperationType,
+    CHURN_RATE_DEFINITION,
+    RETENTION_RATE_DEFINITION,
+)
+from app.engine.set_planner import SetOperationPlanner, plan_count_only_sets
+from app.handlers.set_based_handler import SetBasedCalculationEngine
+
+
+class TestSetOperations(unittest.TestCase):
+
+    def test_anti_join_rewrite(self):
+        """EXCEPT/INTERSECT use NULL-safe (NOT) EXISTS instead of (NOT) IN."""
+        print("\nTesting anti/semi-join rewriting...")
+        generator = SetBasedSQLGenerator()
+        sql = generator.compile(CHURN_RATE_DEFINITION).sql
+
+        self.assertNotIn("NOT IN", sql)
+        self.assertIn(
+            "NOT EXISTS (SELECT 1 FROM EndPeriodCustomers s1 WHERE s1.customer_id = s0.customer_id)",
+            sql
+        )
+        retention_sql = generator.compile(RETENTION_RATE_DEFINITION).sql
+        self.assertIn("WHERE EXISTS (SELECT 1 FROM EndPeriodCustomers s1", retention_sql)
+        print("✅ NOT IN replaced by NOT EXISTS")
+
+    def test_n_ary_operations(self):
+        """All source sets take part, not only the first two."""
+        print("\nTesting N-ary set operations...")
+        planner = SetOperationPlanner(size_hints={"Small": 10, "Large": 1_000_000})
+
+        except_sql = planner.derived_set_sql(SetDefinition(
+            name="D", operation=SetOperationType.EXCEPT,
+            source_sets=["A", "B", "C"], key_column="k"
+        ))
+        self.assertIn("FROM A s0", except_sql)
+        self.assertIn("NOT EXISTS (SELECT 1 FROM B s1", except_sql)
+        self.assertIn("NOT EXISTS (SELECT 1 FROM C s2", except_sql)
+
+        # Smallest known set drives the semi-joins
+        intersect_sql = planner.derived_set_sql(SetDefinition(
+            name="I", operation=SetOperationType.INTERSECT,
+            source_sets=["Large", "Unknown", "Small"], key_column="k"
+        ))
+        self.assertTrue(intersect_sql.startswith("SELECT s0.k FROM Small s0"))
+
+        union_sql = planner.derived_set_sql(SetDefinition(
+            name="U", operation=SetOperationType.UNION,
+            source_sets=["A", "B", "C"], key_column="k"
+        ))
+        self.assertEqual(union_sql.count("UNION"), 2)
+
+        native = SetOperationPlanner(strategy="set_op").derived_set_sql(SetDefinition(
+            name="D", operation=SetOperationType.EXCEPT,
+            source_sets=["A", "B", "C"], key_column="k"
+        ))
+        self.assertEqual(native, "SELECT k FROM A\nEXCEPT\nSELECT k FROM B\nEXCEPT\nSELECT k FROM C")
+        print("✅ EXCEPT/INTERSECT/UNION over 3 sets")
+
+    def test_count_only_shortcut(self):
+        """Sets consumed only by COUNTROWS are counted inline, not materialized."""
+        print("\nTesting COUNT-only shortcut...")
+        self.assertEqual(plan_count_only_sets(CHURN_RATE_DEFINITION), {"LostDuringPeriodCustomers"})
+
+        sql = SetBasedSQLGenerator().compile(CHURN_RATE_DEFINITION).sql
+        self.assertNotIn("LostDuringPeriodCustomers AS", sql)
+        self.assertIn("(SELECT COUNT(*) FROM StartPeriodCustomers s0", sql)
+        print("✅ LostDuringPeriodCustomers counted without a key CTE")
+
+    def test_plan_cache_matches_rebuilt_definitions(self):
+        """Definitions rebuilt from metadata reuse the compiled statement until they change."""
+        print("\nTesting plan cache keyed by definition content...")
+        generator = SetBasedSQLGenerator()
+        compiled = generator.compile(CHURN_RATE_DEFINITION)
+        self.assertIs(generator.compile(CHURN_RATE_DEFINITION.model_copy(deep=True)), compiled)
+
+        edited = CHURN_RATE_DEFINITION.model_copy(deep=True)
+        edited.steps[0].set_definition.base_entity = "vip_customers"
+        self.assertIsNot(generator.compile(edited), compiled)
+
+        batch = generator.compile_batch([CHURN_RATE_DEFINITION, RETENTION_RATE_DEFINITION])
+        rebuilt = [d.model_copy(deep=True) for d in (CHURN_RATE_DEFINITION, RETENTION_RATE_DEFINITION)]
+        self.assertIs(generator.compile_batch(rebuilt), batch)
+        self.assertEqual(generator.get_plan_cache_stats()["hits"], 2)
+        print("✅ Rebuilt definitions hit the plan cache")
+
+    def test_filter_pushdown(self):
+        """Unreferenced runtime filters become predicates on base sets that have the column."""
+        print("\nTesting filter pushdown...")
+        definition = CHURN_RATE_DEFINITION.model_copy(deep=True)
+        for step in definition.steps:
+            if step.set_definition and step.set_definition.is_base_set():
+                step.set_definition.columns = ["region"]
+        compiled = SetBasedSQLGenerator().compile(definition, ["region"])
+
+        self.assertEqual(compiled.sql.count("(region = ANY(:region__any))"), 2)
+        params = compiled.bind(datetime(2025, 1, 1), datetime(2025, 2, 1), {"region": "EU"})
+        self.assertEqual(params["region__any"], ["EU"])
+
+        with self.assertRaises(ValueError):
+            SetBasedSQLGenerator().compile(definition, ["region; DROP TABLE x"])
+        print("✅ Filters pushed into both base sets")
+
+    def test_filter_pushdown_skips_sets_without_column(self):
+        """A filter is only pushed into base sets whose columns include it."""
+        print("\nTesting filter pushdown column check...")
+        definition = CHURN_RATE_DEFINITION.model_copy(deep=True)
+        base_sets = [
+            step.set_definition for step in definition.steps
+            if step.set_definition and step.set_definition.is_base_set()
+        ]
+        base_sets[0].columns = ["region"]
+
+        generator = SetBasedSQLGenerator()
+        compiled = generator.compile(definition, ["region", "warehouse"])
+        self.assertEqual(compiled.sql.count("(region = ANY(:region__any))"), 1)
+        self.assertNotIn("warehouse", compiled.sql)
+        self.assertEqual(compiled.array_params, ("region",))
+        params = compiled.bind(
+            datetime(2025, 1, 1), datetime(2025, 2, 1), {"region": "EU", "warehouse": "W1"}
+        )
+        self.assertNotIn("warehouse", params)
+
+        # Filters on a column used by the set's own conditions are applied
+        compiled = generator.compile(definition, ["inactive_date"])
+        self.assertEqual(compiled.sql.count("(inactive_date = ANY(:inactive_date__any))"), 2)
+
+        sql, _ = generator.generate_sql(
+            definition, datetime(2025, 1, 1), datetime(2025, 2, 1), {"warehouse": "W1"}
+        )
+        self.assertNotIn("warehouse", sql)
+        print("✅ Filters skipped on base sets without the column")
+
+    def test_batch_fuses_shared_base_sets(self):
+        """Churn + retention share their period sets in one statement."""
+        print("\nTesting multi-KPI CTE fusion...")
+        generator = SetBasedSQLGenerator()
+        batch = generator.compile_batch([CHURN_RATE_DEFINITION, RETENTION_RATE_DEFINITION])
+
+        # One scan per distinct base set instead of one per KPI
+        self.assertEqual(batch.sql.count("FROM analytics_data.customers"), 2)
+        self.assertEqual(batch.total_sets, 6)
+        self.assertEqual(batch.shared_sets, 2)
+        self.assertEqual(batch.sql.count("StartCustomerCount AS"), 0)
+        self.assertEqual(batch.sql.count("AS StartCustomerCount"), 1)
+        self.assertEqual(
+            batch.result_columns,
+            {"CHURN_RATE": "churn_rate", "RETENTION_RATE": "retention_rate"}
+        )
+        self.assertEqual(set(batch.runtime_params), {"PeriodStart", "PeriodEnd"})
+
+        # Compiled once per KPI set + filter shape
+        self.assertIs(
+            generator.compile_batch([CHURN_RATE_DEFINITION, RETENTION_RATE_DEFINITION]),
+            batch
+        )
+        generator.invalidate("RETENTION_RATE")
+        self.assertEqual(generator.get_plan_cache_stats()["batch_size"], 0)
+        print(f"✅ {batch.total_sets} sets -> {batch.total_sets - batch.shared_sets} CTEs")
+
+    def test_batch_renames_conflicting_step_names(self):
+        """Different sets with the same step name get distinct CTEs."""
+        print("\nTesting name collisions in fused batches...")
+        other = CHURN_RATE_DEFINITION.model_copy(deep=True)
+        other.kpi_code = "VIP_CHURN_RATE"
+        other.steps[0].set_definition.base_entity = "vip_customers"
+
+        batch = SetBasedSQLGenerator().compile_batch([CHURN_RATE_DEFINITION, other])
+
+        self.assertIn("StartPeriodCustomers_2 AS", batch.sql)
+        self.assertIn("FROM StartPeriodCustomers_2", batch.sql)
+        # The second KPI's formula points at its own counts
+        self.assertIn("LostCustomerCount_2::float / StartCustomerCount_2::float", batch.sql)
+        print("✅ Conflicting sets kept separate")
+
+    def test_batch_scalar_and_pushed_down_filter(self):
+        """A filter one KPI binds as @Parameter and another pushes down keeps both forms."""
+        print("\nTesting mixed filter binding in fused batches...")
+        scalar = CHURN_RATE_DEFINITION.model_copy(deep=True)
+        scalar.steps[0].set_definition.filter_conditions.conditions.append(
+            FilterCondition(column="region", operator=ComparisonOperator.EQ, value="@region")
+        )
+        pushed = RETENTION_RATE_DEFINITION.model_copy(deep=True)
+        for step in pushed.steps:
+            if step.set_definition and step.set_definition.is_base_set():
+                step.set_definition.columns = ["region"]
+
+        batch = SetBasedSQLGenerator().compile_batch([scalar, pushed], ["region"])
+        self.assertIn("region = :region", batch.sql)
+        self.assertIn("(region = ANY(:region__any))", batch.sql)
+        params = batch.bind(datetime(2025, 1, 1), datetime(2025, 2, 1), {"region": "EU"})
+        self.assertEqual(params["region"], "EU")
+        self.assertEqual(params["region__any"], ["EU"])
+        print("✅ Scalar and array binds kept apart")
+
+    def test_engine_calculate_batch_single_query(self):
+        """calculate_batch issues one query and fills every KPI from it."""
+        print("\nTesting SetBasedCalculationEngine.calculate_batch...")
+        engine = SetBasedCalculationEngine(redis_url="redis://fake")
+        db_client = MagicMock()
+        db_client.execute_prepared = AsyncMock(return_value={
+            "rows": [{"churn_rate": 12.5, "retention_rate": 87.5}]
+        })
+        engine._database_client = db_client
+
+        async def run_test():
+            args = (["CHURN_RATE", "RETENTION_RATE"], datetime(2025, 1, 1), datetime(2025, 2, 1))
+            first = await engine.calculate_batch(*args)
+            second = await engine.calculate_batch(*args)
+            return first, second
+
+        first, second = asyncio.run(run_test())
+
+        db_client.execute_prepared.assert_called_once()
+        self.assertEqual(first["CHURN_RATE"]["value"], 12.5)
+        self.assertEqual(first["RETENTION_RATE"]["value"], 87.5)
+        self.assertTrue(second["CHURN_RATE"]["from_cache"])
+        print("✅ 2 KPIs computed with 1 query, then served from cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
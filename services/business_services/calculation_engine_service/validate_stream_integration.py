@@ -116,5 +116,95 @@ class TestStreamIntegration(unittest.TestCase):
         
         print("✅ CQRS Components (StreamProcessor, Aggregator, SyncManager, UnifiedQueryManager) present")
 
+    def test_stream_update_batching(self):
+        """Bursts for the same stream collapse into one recalculation per window."""
+        print("\nTesting batched stream recalculation...")
+
+        from app.stream_processor import StreamProcessor
+        from app.base_handler import CalculationResult
+
+        orchestrator = MagicMock()
+        orchestrator.calculate_single = AsyncMock(return_value=CalculationResult(
+            kpi_code="KPI_1", value=1.0, unit="Number",
+            timestamp=datetime.utcnow(), calculation_time_ms=1.0
+        ))
+        messaging_client = MagicMock()
+        messaging_client.publish_events = AsyncMock(return_value=True)
+        database_client = MagicMock(base_url="http://db-service")
+
+        processor = StreamProcessor(
+            orchestrator, database_client, messaging_client, "redis://localhost",
+            batch_window_seconds=0.1
+        )
+        processor.aggregator = MagicMock(add_sample=AsyncMock())
+
+        async def run_test():
+            for i in range(100):
+                await processor._process_stream_update(
+                    {"timestamp": datetime.utcnow(), "avg_value": i},
+                    "KPI_1", "E1", "minute", {}
+                )
+            await processor._process_stream_update(
+                {"timestamp": datetime.utcnow(), "avg_value": 1}, "KPI_1", "E2", "minute", {}
+            )
+            await processor._flush_pending_updates()
+
+        asyncio.run(run_test())
+
+        # Every sample is ingested, but only one calculation per stream
+        self.assertEqual(processor.aggregator.add_sample.call_count, 101)
+        self.assertEqual(orchestrator.calculate_single.call_count, 2)
+        # Both results (x2 channels) go out in a single pipelined publish
+        messaging_client.publish_events.assert_called_once()
+        self.assertEqual(len(messaging_client.publish_events.call_args[0][0]), 4)
+        print("✅ 101 updates -> 2 recalculations, 1 publish batch")
+
+    def test_batch_recalculation_concurrency_limit(self):
+        """A large batch never runs more than the configured recalculations at once."""
+        print("\nTesting bounded batch recalculation...")
+
+        from app.stream_processor import StreamProcessor
+        from app.base_handler import CalculationResult
+
+        active = 0
+        max_active = 0
+
+        async def calculate_single(params):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(max_active, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return CalculationResult(
+                kpi_code=params.kpi_code, value=1.0, unit="Number",
+                timestamp=datetime.utcnow(), calculation_time_ms=1.0
+            )
+
+        orchestrator = MagicMock()
+        orchestrator.calculate_single = calculate_single
+        messaging_client = MagicMock()
+        messaging_client.publish_events = AsyncMock(return_value=True)
+        database_client = MagicMock(base_url="http://db-service")
+
+        async def run_test():
+            processor = StreamProcessor(
+                orchestrator, database_client, messaging_client, "redis://localhost",
+                max_concurrent_recalculations=4
+            )
+            updates = [
+                {
+                    "kpi_code": "KPI_1", "entity_id": f"E{i}", "period": "minute",
+                    "timestamp": datetime.utcnow(), "calculation_params": {}
+                }
+                for i in range(40)
+            ]
+            await processor._recalculate_and_publish(updates)
+
+        asyncio.run(run_test())
+
+        self.assertEqual(max_active, 4)
+        self.assertEqual(len(messaging_client.publish_events.call_args[0][0]), 80)
+        print("✅ 40 recalculations, at most 4 in flight")
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,230 @@
+"""
+Validation and benchmark for the shared pub/sub multiplexer.
+
+    python validate_stream_multiplexer.py             # routing tests (no Redis needed)
+    python validate_stream_multiplexer.py --benchmark # needs Redis at REDIS_URL
+
+The benchmark subscribes 1k and 10k stream channels, first with one
+connection + polling task per channel (the previous StreamProcessor model)
+and then through PubSubMultiplexer, and reports client connections seen by
+Redis, process CPU time while idle, and CPU time to deliver a burst of
+messages. Set BENCH_LEGACY_MAX to cap the legacy run (default 1000) since
+10k per-channel connections can exceed Redis maxclients.
+"""
+
+import unittest
+import asyncio
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+# Add service dir to path
+service_dir = os.path.dirname(os.path.abspath(__file__))
+if service_dir not in sys.path:
+    sys.path.insert(0, service_dir)
+
+from app.messaging import pubsub_multiplexer
+from app.messaging.pubsub_multiplexer import PubSubMultiplexer
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+
+
+class FakePubSub:
+    """In-memory pub/sub connection backed by a shared broker."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.queue = asyncio.Queue()
+        broker.connections.append(self)
+
+    async def subscribe(self, *channels):
+        for channel in channels:
+            self.broker.routes.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels):
+        for channel in channels:
+            self.broker.routes.get(channel, set()).discard(self)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        return await self.queue.get()
+
+    async def close(self):
+        pass
+
+
+class FakeBroker:
+    def __init__(self):
+        self.connections = []
+        self.routes = {}
+
+    def from_url(self, url, decode_responses=True):
+        broker = self
+
+        class _Client:
+            def pubsub(self, ignore_subscribe_messages=True):
+                return FakePubSub(broker)
+
+            async def close(self):
+                pass
+
+        return _Client()
+
+    def publish(self, channel, data):
+        for conn in self.routes.get(channel, ()):
+            conn.queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+
+class TestPubSubMultiplexer(unittest.TestCase):
+
+    def test_routes_many_channels_over_shared_connections(self):
+        """Messages reach the right handler; connections stay at shard count."""
+        print("\nTesting channel routing over shared connections...")
+
+        async def run_test():
+            broker = FakeBroker()
+            received = {}
+
+            async def handler(channel, data):
+                received.setdefault(channel, []).append(json.loads(data))
+
+            with patch.object(pubsub_multiplexer.redis, "from_url", broker.from_url):
+                mux = PubSubMultiplexer("redis://fake", shards=2)
+                await mux.start()
+                channels = {f"stream.KPI_{i}.E1.minute": handler for i in range(1000)}
+                await mux.subscribe_many(channels)
+
+                broker.publish("stream.KPI_7.E1.minute", json.dumps({"avg_value": 7}))
+                broker.publish("stream.KPI_999.E1.minute", json.dumps({"avg_value": 999}))
+                await asyncio.sleep(0.05)
+
+                # Dynamic unsubscribe keeps the connection and stops routing
+                await mux.unsubscribe("stream.KPI_7.E1.minute")
+                broker.publish("stream.KPI_7.E1.minute", json.dumps({"avg_value": 8}))
+                await asyncio.sleep(0.05)
+
+                stats = mux.get_stats()
+                await mux.stop()
+
+            self.assertEqual(len(broker.connections), 2)
+            self.assertEqual(stats["connections"], 2)
+            self.assertEqual(stats["channels"], 999)
+            self.assertEqual(received["stream.KPI_7.E1.minute"], [{"avg_value": 7}])
+            self.assertEqual(received["stream.KPI_999.E1.minute"], [{"avg_value": 999}])
+            print(f"✅ 1000 channels routed over {stats['connections']} connections")
+
+        asyncio.run(run_test())
+
+
+async def _client_count(admin) -> int:
+    return len(await admin.client_list())
+
+
+async def _benchmark_legacy(n_streams: int, messages: int) -> dict:
+    """One connection + polling loop per channel (previous model)."""
+    import redis.asyncio as redis
+
+    admin = redis.from_url(REDIS_URL, decode_responses=True)
+    baseline = await _client_count(admin)
+    delivered = 0
+    done = asyncio.Event()
+    running = True
+
+    async def consume(channel):
+        nonlocal delivered
+        client = redis.from_url(REDIS_URL, decode_responses=True)
+        pubsub = client.pubsub()
+        await pubsub.subscribe(channel)
+        try:
+            while running:
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                if message:
+                    delivered += 1
+                    if delivered >= messages:
+                        done.set()
+                else:
+                    await asyncio.sleep(0.01)
+        finally:
+            await pubsub.close()
+            await client.close()
+
+    channels = [f"bench.stream.{i}" for i in range(n_streams)]
+    tasks = [asyncio.create_task(consume(c)) for c in channels]
+    await asyncio.sleep(2)
+    connections = await _client_count(admin) - baseline
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(5)
+    idle_cpu = time.process_time() - cpu_start
+
+    cpu_start = time.process_time()
+    for i in range(messages):
+        await admin.publish(channels[i % n_streams], "{}")
+    await asyncio.wait_for(done.wait(), timeout=60)
+    burst_cpu = time.process_time() - cpu_start
+
+    running = False
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await admin.close()
+    return {"connections": connections, "idle_cpu_s": idle_cpu, "burst_cpu_s": burst_cpu}
+
+
+async def _benchmark_multiplexed(n_streams: int, messages: int, shards: int = 1) -> dict:
+    import redis.asyncio as redis
+
+    admin = redis.from_url(REDIS_URL, decode_responses=True)
+    baseline = await _client_count(admin)
+    delivered = 0
+    done = asyncio.Event()
+
+    async def handler(channel, data):
+        nonlocal delivered
+        delivered += 1
+        if delivered >= messages:
+            done.set()
+
+    mux = PubSubMultiplexer(REDIS_URL, shards=shards)
+    await mux.start()
+    channels = [f"bench.stream.{i}" for i in range(n_streams)]
+    await mux.subscribe_many({c: handler for c in channels})
+    await asyncio.sleep(2)
+    connections = await _client_count(admin) - baseline
+
+    cpu_start = time.process_time()
+    await asyncio.sleep(5)
+    idle_cpu = time.process_time() - cpu_start
+
+    cpu_start = time.process_time()
+    for i in range(messages):
+        await admin.publish(channels[i % n_streams], "{}")
+    await asyncio.wait_for(done.wait(), timeout=60)
+    burst_cpu = time.process_time() - cpu_start
+
+    await mux.stop()
+    await admin.close()
+    return {"connections": connections, "idle_cpu_s": idle_cpu, "burst_cpu_s": burst_cpu}
+
+
+async def run_benchmark():
+    legacy_max = int(os.getenv("BENCH_LEGACY_MAX", "1000"))
+    messages = 20000
+    print(f"Redis: {REDIS_URL}, burst of {messages} messages")
+    print(f"{'streams':>8} {'mode':>12} {'conns':>7} {'idle cpu (5s)':>14} {'burst cpu':>10}")
+    for n_streams in (1000, 10000):
+        if n_streams <= legacy_max:
+            r = await _benchmark_legacy(n_streams, messages)
+            print(f"{n_streams:>8} {'per-channel':>12} {r['connections']:>7} "
+                  f"{r['idle_cpu_s']:>13.2f}s {r['burst_cpu_s']:>9.2f}s")
+        r = await _benchmark_multiplexed(n_streams, messages)
+        print(f"{n_streams:>8} {'multiplexed':>12} {r['connections']:>7} "
+              f"{r['idle_cpu_s']:>13.2f}s {r['burst_cpu_s']:>9.2f}s")
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        asyncio.run(run_benchmark())
+    else:
+        unittest.main()
@@ -29,6 +29,20 @@ class Settings(BaseSettings):
     ANTHROPIC_COORDINATOR_MODEL: str = os.getenv("ANTHROPIC_COORDINATOR_MODEL", "claude-opus-4-20250514")
     ANTHROPIC_SUBAGENT_MODEL: str = os.getenv("ANTHROPIC_SUBAGENT_MODEL", "claude-sonnet-4-20250514")
     
+    # LLM client
+    ANTHROPIC_BASE_URL: str = os.getenv("ANTHROPIC_BASE_URL", "")  # empty = provider default
+    OPENAI_BASE_URL: str = os.getenv("OPENAI_BASE_URL", "")
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))  # in-flight LLM calls per worker
+    LLM_SESSION_CONCURRENCY: int = int(os.getenv("LLM_SESSION_CONCURRENCY", "2"))  # in-flight LLM calls per session
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+    LLM_CACHE_MAX_TEMPERATURE: float = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))  # calls at or below are cached
+    LLM_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+    
+    # Strategic recommender
+    VALUE_CHAIN_EXTRACT_CONCURRENCY: int = int(os.getenv("VALUE_CHAIN_EXTRACT_CONCURRENCY", "8"))  # parallel extract calls at warm-up
+    VALUE_CHAIN_ENTITY_TTL_SECONDS: int = int(os.getenv("VALUE_CHAIN_ENTITY_TTL_SECONDS", "604800"))  # persisted value chain entities
+    
     # Database Service (for secure storage)
     DATABASE_SERVICE_URL: str = os.getenv("DATABASE_SERVICE_URL", "http://database_service:8025")
     
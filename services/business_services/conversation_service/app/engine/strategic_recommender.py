@@ -2,12 +2,24 @@
 Strategic Recommender
 Maps business context to recommended value chains using NLP-based semantic search.
 Integrates with Entity Resolution Service for vector embeddings and semantic similarity.
+
+Value chain entities are extracted once at warm-up, persisted in Redis keyed by a
+hash of the chain text, and kept in an inverted index so each query is scored
+against every value chain in a single pass.
 """
 
 from typing import List, Dict, Any, Optional, Set
+from collections import defaultdict
 from pydantic import BaseModel
+import asyncio
+import hashlib
+import json
 import logging
+import time
 import httpx
+import redis.asyncio as redis
+
+from ..config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -38,53 +50,117 @@ class StrategicRecommender:
     Uses Entity Resolution Service for NLP-based vector embeddings and similarity.
     """
     
+    ENTITY_KEY_PREFIX = "strategic_recommender:entities:"
+    REDIS_BACKOFF_SECONDS = 30.0
+    
     def __init__(
         self, 
         entity_resolution_url: str = "http://entity_resolution_service:8000",
-        metadata_service_url: str = "http://business_metadata:8000"
+        metadata_service_url: str = "http://business_metadata:8000",
+        redis_url: Optional[str] = None
     ):
         self.entity_resolution_url = entity_resolution_url
         self.metadata_service_url = metadata_service_url
         self.timeout = 30.0
         self._value_chain_cache: Dict[str, ValueChainSet] = {}
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._redis_url = redis_url
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+        
+        # Inverted index over value chain entities (see _build_index)
+        self._chains: List[ValueChainSet] = []
+        self._chain_names: List[str] = []
+        self._chain_entities: List[Set[str]] = []
+        self._entity_index: Dict[str, List[int]] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """Shared HTTP client so calls reuse pooled keep-alive connections."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=settings.VALUE_CHAIN_EXTRACT_CONCURRENCY * 2,
+                    max_keepalive_connections=settings.VALUE_CHAIN_EXTRACT_CONCURRENCY
+                )
+            )
+        return self._client
+    
+    def _get_redis(self) -> Optional[redis.Redis]:
+        if not self._redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self._redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1
+            )
+        return self._redis
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"Value chain entity store: Redis unavailable, extracting instead: {e}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_BACKOFF_SECONDS
+    
+    async def close(self) -> None:
+        """Close the pooled HTTP client and the Redis connection."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+    
+    async def warm_up(self) -> None:
+        """Load, extract and index value chains ahead of the first recommendation."""
+        try:
+            await self._initialize_value_chains()
+        except Exception as e:
+            logger.warning(f"Strategic recommender warm-up failed: {e}")
         
     async def _initialize_value_chains(self):
         """Load and index value chains from metadata service."""
         if self._initialized:
             return
+        
+        async with self._init_lock:
+            if self._initialized:
+                return
             
-        # Try to fetch from metadata service
+            chains = await self._fetch_value_chains()
+            if chains is None:
+                # Fallback to built-in value chains
+                chains = self._default_value_chains()
+            
+            await self._index_value_chains(chains)
+            self._initialized = True
+    
+    async def _fetch_value_chains(self) -> Optional[List[ValueChainSet]]:
+        """Fetch value chains from metadata service, or None if unavailable."""
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.get(
-                    f"{self.metadata_service_url}/api/v1/metadata/value-chains"
-                )
-                if response.status_code == 200:
-                    chains = response.json()
-                    for chain in chains:
-                        vc = ValueChainSet(
-                            industry_code=chain.get("code", ""),
-                            name=chain.get("name", ""),
-                            description=chain.get("description", ""),
-                            processes=chain.get("processes", []),
-                            activities=chain.get("activities", [])
-                        )
-                        # Extract semantic entities for this value chain
-                        vc.domain_entities = await self._extract_domain_entities(vc)
-                        self._value_chain_cache[vc.industry_code] = vc
-                    self._initialized = True
-                    return
+            response = await self._get_client().get(
+                f"{self.metadata_service_url}/api/v1/metadata/value-chains"
+            )
+            if response.status_code == 200:
+                return [
+                    ValueChainSet(
+                        industry_code=chain.get("code", ""),
+                        name=chain.get("name", ""),
+                        description=chain.get("description", ""),
+                        processes=chain.get("processes", []),
+                        activities=chain.get("activities", [])
+                    )
+                    for chain in response.json()
+                ]
         except Exception as e:
             logger.warning(f"Could not fetch value chains from metadata service: {e}")
-        
-        # Fallback to built-in value chains
-        await self._load_default_value_chains()
-        self._initialized = True
+        return None
     
-    async def _load_default_value_chains(self):
-        """Load default value chain definitions."""
-        default_chains = [
+    def _default_value_chains(self) -> List[ValueChainSet]:
+        """Default value chain definitions."""
+        return [
             ValueChainSet(
                 industry_code="62",
                 name="Standard Model for Healthcare",
@@ -121,70 +197,144 @@ class StrategicRecommender:
                 activities=["Proposal Development", "Engagement Planning", "Deliverable Creation", "Knowledge Management"]
             )
         ]
+    
+    async def _index_value_chains(self, chains: List[ValueChainSet]) -> None:
+        """
+        Attach domain entities to each value chain and rebuild the search index.
         
-        for vc in default_chains:
-            # Extract semantic entities using Entity Resolution Service
-            vc.domain_entities = await self._extract_domain_entities(vc)
+        Entities persisted for an unchanged chain text are reused and the rest are
+        extracted concurrently. Fallback word lists are not persisted, so the next
+        warm-up retries the Entity Resolution Service.
+        """
+        keys = [self._entity_key(vc) for vc in chains]
+        entities_by_chain = await self._load_persisted_entities(keys)
+        missing = [i for i, entities in enumerate(entities_by_chain) if entities is None]
+        
+        semaphore = asyncio.Semaphore(settings.VALUE_CHAIN_EXTRACT_CONCURRENCY)
+        
+        async def extract(vc: ValueChainSet) -> Optional[List[str]]:
+            async with semaphore:
+                return await self._extract_domain_entities(vc)
+        
+        extracted = await asyncio.gather(*[extract(chains[i]) for i in missing])
+        
+        to_persist = {}
+        for i, entities in zip(missing, extracted):
+            if entities is None:
+                entities_by_chain[i] = self._fallback_entities(self._entity_text(chains[i]))
+            else:
+                entities_by_chain[i] = entities
+                to_persist[keys[i]] = entities
+        await self._persist_entities(to_persist)
+        
+        for vc, entities in zip(chains, entities_by_chain):
+            vc.domain_entities = entities
             self._value_chain_cache[vc.industry_code] = vc
+        self._build_index()
+        logger.info(f"Indexed {len(chains)} value chains ({len(chains) - len(missing)} from persisted entities)")
+    
+    def _build_index(self) -> None:
+        """Build the inverted index from lowercased entity to value chain positions."""
+        self._chains = list(self._value_chain_cache.values())
+        self._chain_names = [vc.name.lower() for vc in self._chains]
+        self._chain_entities = [set(e.lower() for e in vc.domain_entities) for vc in self._chains]
+        
+        index = defaultdict(list)
+        for position, entities in enumerate(self._chain_entities):
+            for entity in entities:
+                index[entity].append(position)
+        self._entity_index = dict(index)
     
-    async def _extract_domain_entities(self, vc: ValueChainSet) -> List[str]:
-        """Extract semantic entities from a value chain definition."""
-        # Combine all text from the value chain
+    @staticmethod
+    def _entity_text(vc: ValueChainSet) -> str:
+        """Combine all text from the value chain."""
         text_parts = [
             vc.name,
             vc.description,
             " ".join(vc.processes),
             " ".join(vc.activities)
         ]
-        combined_text = " ".join(text_parts)
-        
+        return " ".join(text_parts)
+    
+    def _entity_key(self, vc: ValueChainSet) -> str:
+        """Redis key for a value chain's entities, changing whenever its text does."""
+        payload = json.dumps([self._entity_text(vc), vc.name, vc.description])
+        return self.ENTITY_KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    @staticmethod
+    def _fallback_entities(text: str) -> List[str]:
+        """Simple words, used when entity extraction is unavailable."""
+        words = text.lower().split()
+        return [w for w in words if len(w) > 3][:20]
+    
+    async def _load_persisted_entities(self, keys: List[str]) -> List[Optional[List[str]]]:
+        client = self._get_redis()
+        if client is None or not keys:
+            return [None] * len(keys)
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.entity_resolution_url}/api/v1/entity-resolution/semantic/extract",
-                    json={
-                        "text": combined_text,
-                        "name": vc.name,
-                        "description": vc.description
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Collect entities and noun phrases
-                entities = [e.get("lemma", "") for e in result.get("entities", [])]
-                phrases = result.get("noun_phrases", [])
-                return list(set(entities + phrases))
-                
+            values = await client.mget(keys)
+        except Exception as e:
+            self._redis_failed(e)
+            return [None] * len(keys)
+        return [json.loads(value) if value else None for value in values]
+    
+    async def _persist_entities(self, entities_by_key: Dict[str, List[str]]) -> None:
+        client = self._get_redis()
+        if client is None or not entities_by_key:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, entities in entities_by_key.items():
+                    pipe.set(key, json.dumps(entities), ex=settings.VALUE_CHAIN_ENTITY_TTL_SECONDS)
+                await pipe.execute()
+        except Exception as e:
+            self._redis_failed(e)
+    
+    async def _extract_domain_entities(self, vc: ValueChainSet) -> Optional[List[str]]:
+        """Extract semantic entities from a value chain definition, or None on failure."""
+        try:
+            response = await self._get_client().post(
+                f"{self.entity_resolution_url}/api/v1/entity-resolution/semantic/extract",
+                json={
+                    "text": self._entity_text(vc),
+                    "name": vc.name,
+                    "description": vc.description
+                }
+            )
+            response.raise_for_status()
+            result = response.json()
+            
+            # Collect entities and noun phrases
+            entities = [e.get("lemma", "") for e in result.get("entities", [])]
+            phrases = result.get("noun_phrases", [])
+            return list(set(entities + phrases))
+            
         except Exception as e:
             logger.warning(f"Entity extraction failed for {vc.name}: {e}")
-            # Fallback: extract simple words
-            words = combined_text.lower().split()
-            return [w for w in words if len(w) > 3][:20]
+            return None
     
     async def _extract_query_semantics(self, business_description: str, use_cases: List[str]) -> Dict[str, Any]:
         """Extract semantic representation from user query."""
         combined_text = f"{business_description} {' '.join(use_cases)}"
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.entity_resolution_url}/api/v1/entity-resolution/semantic/extract",
-                    json={
-                        "text": combined_text,
-                        "name": "User Query",
-                        "description": business_description
-                    }
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                return {
-                    "entities": set(e.get("lemma", "") for e in result.get("entities", [])),
-                    "phrases": set(result.get("noun_phrases", [])),
-                    "domain": result.get("domain"),
-                    "domain_confidence": result.get("domain_confidence", 0.0)
+            response = await self._get_client().post(
+                f"{self.entity_resolution_url}/api/v1/entity-resolution/semantic/extract",
+                json={
+                    "text": combined_text,
+                    "name": "User Query",
+                    "description": business_description
                 }
+            )
+            response.raise_for_status()
+            result = response.json()
+            
+            return {
+                "entities": set(e.get("lemma", "") for e in result.get("entities", [])),
+                "phrases": set(result.get("noun_phrases", [])),
+                "domain": result.get("domain"),
+                "domain_confidence": result.get("domain_confidence", 0.0)
+            }
                 
         except Exception as e:
             logger.warning(f"Query semantic extraction failed: {e}")
@@ -197,38 +347,51 @@ class StrategicRecommender:
                 "domain_confidence": 0.0
             }
     
-    def _calculate_semantic_similarity(
+    def _score_value_chains(
         self, 
         query_entities: Set[str], 
-        query_phrases: Set[str],
-        vc_entities: List[str]
-    ) -> tuple[float, List[str], List[str]]:
+        query_phrases: Set[str]
+    ) -> List[tuple[float, List[str], List[str]]]:
         """
-        Calculate semantic similarity using Jaccard coefficient on extracted entities.
-        Returns (score, matched_entities, matched_phrases).
+        Score every indexed value chain against the query in one pass.
+        
+        The score is 0.7 * Jaccard coefficient on entities plus 0.3 * the share of
+        query phrases contained in, or containing, one of the chain's entities.
+        Intersections come from the inverted index, so only chains sharing a term
+        are touched. Returns (score, matched_entities, matched_phrases) per chain.
         """
-        vc_entity_set = set(e.lower() for e in vc_entities)
         query_entity_set = set(e.lower() for e in query_entities)
         query_phrase_set = set(p.lower() for p in query_phrases)
+        chain_count = len(self._chains)
         
         # Entity overlap
-        entity_intersection = query_entity_set & vc_entity_set
-        entity_union = query_entity_set | vc_entity_set
-        entity_similarity = len(entity_intersection) / len(entity_union) if entity_union else 0.0
+        matched_entities: List[List[str]] = [[] for _ in range(chain_count)]
+        for entity in query_entity_set:
+            for position in self._entity_index.get(entity, ()):
+                matched_entities[position].append(entity)
         
-        # Phrase overlap (partial matching)
-        phrase_matches = []
-        for qp in query_phrase_set:
-            for ve in vc_entity_set:
-                if qp in ve or ve in qp:
-                    phrase_matches.append(qp)
-                    break
-        phrase_similarity = len(phrase_matches) / len(query_phrase_set) if query_phrase_set else 0.0
+        # Phrase overlap (partial matching), one scan of the distinct vocabulary per phrase
+        matched_phrases: List[List[str]] = [[] for _ in range(chain_count)]
+        for phrase in query_phrase_set:
+            positions = set()
+            for entity, entity_positions in self._entity_index.items():
+                if phrase in entity or entity in phrase:
+                    positions.update(entity_positions)
+            for position in positions:
+                matched_phrases[position].append(phrase)
         
-        # Combined score (weighted)
-        combined_score = (entity_similarity * 0.7) + (phrase_similarity * 0.3)
+        scores = []
+        for position in range(chain_count):
+            intersection = len(matched_entities[position])
+            union = len(query_entity_set) + len(self._chain_entities[position]) - intersection
+            entity_similarity = intersection / union if union else 0.0
+            phrase_similarity = len(matched_phrases[position]) / len(query_phrase_set) if query_phrase_set else 0.0
+            
+            # Combined score (weighted)
+            combined_score = (entity_similarity * 0.7) + (phrase_similarity * 0.3)
+            scores.append((combined_score, matched_entities[position], matched_phrases[position]))
         
-        return combined_score, list(entity_intersection), phrase_matches
+        return scores
         
     async def recommend_value_chains(
         self, 
@@ -251,15 +414,10 @@ class StrategicRecommender:
         recommendations = []
         
         # Compare against all value chains
-        for industry_code, vc in self._value_chain_cache.items():
-            score, matched_entities, matched_phrases = self._calculate_semantic_similarity(
-                query_entities, 
-                query_phrases,
-                vc.domain_entities
-            )
-            
+        scores = self._score_value_chains(query_entities, query_phrases)
+        for vc, vc_name, (score, matched_entities, matched_phrases) in zip(self._chains, self._chain_names, scores):
             # Boost score if domain matches
-            if inferred_domain and inferred_domain.lower() in vc.name.lower():
+            if inferred_domain and inferred_domain.lower() in vc_name:
                 score = min(1.0, score + 0.2)
             
             if score > 0.1:  # Minimum threshold
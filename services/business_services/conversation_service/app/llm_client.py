@@ -6,13 +6,27 @@ The multi-agent architecture uses Claude Opus 4.5 for coordination and Claude So
 for specialized sub-agents.
 
 Legacy OpenAI support is maintained for backward compatibility but Claude is preferred.
+
+All calls go through one async SDK client per worker, whose keep-alive
+connection pool they share, so a slow completion never blocks the event loop. Calls are bounded
+by a global and a per-session semaphore. Low-temperature calls (intent
+extraction, value chain generation) are cached by a hash of the full request, in
+memory and in Redis, and identical requests already in flight are coalesced into
+one provider call.
 """
 
+import asyncio
+import contextlib
+import hashlib
 import json
 import logging
-from typing import List, Dict, Any, Optional
+import time
+import weakref
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 
 import anthropic
+import redis.asyncio as redis
 from .config import settings
 from .models import BusinessIntent, CompanyValueChainModel, ValueChainNode, ValueChainLink
 from .secrets_manager import get_anthropic_api_key
@@ -20,6 +34,94 @@ from .secrets_manager import get_anthropic_api_key
 logger = logging.getLogger(__name__)
 
 
+class LLMResponseCache:
+    """
+    Cache of LLM completions keyed by a hash of the request.
+    
+    Lookups hit an in-process LRU first and Redis second, so workers share
+    completions. Redis errors are logged and the cache degrades to memory only
+    for a short backoff period.
+    """
+    
+    KEY_PREFIX = "conversation:llm_cache:"
+    REDIS_BACKOFF_SECONDS = 30.0
+    
+    def __init__(self, redis_url: Optional[str], max_entries: int, ttl_seconds: int):
+        self._redis_url = redis_url
+        self._redis: Optional[redis.Redis] = None
+        self._redis_retry_at = 0.0
+        self._max_entries = max_entries
+        self._ttl = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+    
+    @staticmethod
+    def key(request: Dict[str, Any]) -> str:
+        """Content hash of a completion request."""
+        payload = json.dumps(request, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _get_redis(self) -> Optional[redis.Redis]:
+        if not self._redis_url or time.monotonic() < self._redis_retry_at:
+            return None
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(
+                self._redis_url,
+                decode_responses=True,
+                socket_connect_timeout=1,
+                socket_timeout=1
+            )
+        return self._redis
+    
+    def _redis_failed(self, e: Exception) -> None:
+        logger.warning(f"LLM response cache: Redis unavailable, using memory only: {e}")
+        self._redis_retry_at = time.monotonic() + self.REDIS_BACKOFF_SECONDS
+    
+    async def get(self, key: str) -> Optional[str]:
+        """Get a cached completion."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                return value
+            del self._entries[key]
+        
+        client = self._get_redis()
+        if client is None:
+            return None
+        try:
+            value = await client.get(self.KEY_PREFIX + key)
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        if value is not None:
+            self._remember(key, value)
+        return value
+    
+    async def set(self, key: str, value: str) -> None:
+        """Cache a completion."""
+        self._remember(key, value)
+        client = self._get_redis()
+        if client is None:
+            return
+        try:
+            await client.set(self.KEY_PREFIX + key, value, ex=self._ttl)
+        except Exception as e:
+            self._redis_failed(e)
+    
+    def _remember(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+    
+    async def close(self) -> None:
+        """Close the Redis connection."""
+        if self._redis is not None:
+            await self._redis.close()
+            self._redis = None
+
+
 class LLMClient:
     """
     LLM Client that uses Anthropic Claude as the primary provider.
@@ -33,47 +135,173 @@ class LLMClient:
     and should be preferred for complex design tasks.
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[LLMResponseCache] = None):
         self.provider = settings.LLM_PROVIDER
         self._api_key = api_key
         self.client = None
         self.model = None
         self._initialized = False
+        self._init_lock = asyncio.Lock()
+        
+        self._global_limit = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        self._session_limits: "weakref.WeakValueDictionary[str, asyncio.Semaphore]" = weakref.WeakValueDictionary()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._cache = cache or LLMResponseCache(
+            settings.REDIS_URL,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS
+        )
+        self.stats = {"provider_calls": 0, "cache_hits": 0, "coalesced": 0}
     
     async def _ensure_initialized(self):
         """Lazy initialization - fetch API key from secure storage if needed."""
         if self._initialized:
             return
         
-        # Get API key from secure storage or use provided key
-        api_key = self._api_key or await get_anthropic_api_key()
+        async with self._init_lock:
+            if self._initialized:
+                return
+            
+            # Get API key from secure storage or use provided key
+            api_key = self._api_key or await get_anthropic_api_key()
+            
+            # Also check settings as fallback
+            if not api_key:
+                api_key = settings.ANTHROPIC_API_KEY
+            
+            if api_key:
+                self.client = anthropic.AsyncAnthropic(
+                    api_key=api_key,
+                    base_url=settings.ANTHROPIC_BASE_URL or None,
+                    timeout=settings.LLM_TIMEOUT_SECONDS
+                )
+                self.model = settings.ANTHROPIC_SUBAGENT_MODEL or "claude-sonnet-4-20250514"
+                self.provider = "anthropic"
+                logger.info(f"LLMClient initialized with Anthropic Claude: {self.model}")
+            else:
+                # Fallback to OpenAI if no Anthropic key (legacy support)
+                import openai
+                self.model = settings.LLM_MODEL
+                if self.provider == "azure":
+                    self.client = openai.AsyncAzureOpenAI(
+                        api_key=settings.AZURE_OPENAI_API_KEY,
+                        api_version="2023-12-01-preview",
+                        azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+                        timeout=settings.LLM_TIMEOUT_SECONDS
+                    )
+                else:
+                    self.client = openai.AsyncOpenAI(
+                        api_key=settings.OPENAI_API_KEY,
+                        base_url=settings.OPENAI_BASE_URL or None,
+                        timeout=settings.LLM_TIMEOUT_SECONDS
+                    )
+                logger.info(f"LLMClient initialized with OpenAI: {self.model}")
+            
+            self._initialized = True
+    
+    async def close(self) -> None:
+        """Close the provider client's connection pool and the response cache."""
+        if self.client is not None:
+            await self.client.close()
+        await self._cache.close()
+    
+    async def get_completion(
+        self,
+        messages: List[Dict[str, str]],
+        json_mode: bool = False,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Get a completion for chat messages.
+        
+        Args:
+            messages: Chat messages; "system" messages become the system prompt
+            json_mode: Ask the provider for a JSON object (OpenAI only)
+            temperature: Sampling temperature; calls at or below
+                LLM_CACHE_MAX_TEMPERATURE are cached and coalesced
+            max_tokens: Maximum tokens to generate (Anthropic only)
+            session_id: Session the call is made for, to apply the per-session limit
+        
+        Returns:
+            The completion text
+        """
+        await self._ensure_initialized()
+        
+        request = {
+            "provider": self.provider,
+            "model": self.model,
+            "messages": messages,
+            "json_mode": json_mode,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if temperature > settings.LLM_CACHE_MAX_TEMPERATURE:
+            return await self._call_provider(request, session_id)
         
-        # Also check settings as fallback
-        if not api_key:
-            api_key = settings.ANTHROPIC_API_KEY
+        key = self._cache.key(request)
+        cached = await self._cache.get(key)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
         
-        if api_key:
-            self.client = anthropic.Anthropic(api_key=api_key)
-            self.model = settings.ANTHROPIC_SUBAGENT_MODEL or "claude-sonnet-4-20250514"
-            self.provider = "anthropic"
-            logger.info(f"LLMClient initialized with Anthropic Claude: {self.model}")
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
         else:
-            # Fallback to OpenAI if no Anthropic key (legacy support)
-            import openai
-            self.model = settings.LLM_MODEL
-            if self.provider == "azure":
-                self.client = openai.AzureOpenAI(
-                    api_key=settings.AZURE_OPENAI_API_KEY,
-                    api_version="2023-12-01-preview",
-                    azure_endpoint=settings.AZURE_OPENAI_ENDPOINT
+            task = asyncio.create_task(self._call_and_cache(key, request, session_id))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so a cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+    
+    async def _call_and_cache(self, key: str, request: Dict[str, Any], session_id: Optional[str]) -> str:
+        content = await self._call_provider(request, session_id)
+        await self._cache.set(key, content)
+        return content
+    
+    def _session_limit(self, session_id: Optional[str]):
+        if not session_id:
+            return contextlib.nullcontext()
+        semaphore = self._session_limits.get(session_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(settings.LLM_SESSION_CONCURRENCY)
+            self._session_limits[session_id] = semaphore
+        return semaphore
+    
+    async def _call_provider(self, request: Dict[str, Any], session_id: Optional[str]) -> str:
+        """Make one provider call within the global and per-session limits."""
+        async with self._session_limit(session_id), self._global_limit:
+            self.stats["provider_calls"] += 1
+            if self.provider == "anthropic":
+                system = "\n\n".join(m["content"] for m in request["messages"] if m["role"] == "system")
+                response = await self.client.messages.create(
+                    model=request["model"],
+                    max_tokens=request["max_tokens"],
+                    system=system,
+                    messages=[m for m in request["messages"] if m["role"] != "system"],
+                    # Not every SDK release has a temperature argument; the API takes it in the body
+                    extra_body={"temperature": request["temperature"]}
                 )
-            else:
-                self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-            logger.info(f"LLMClient initialized with OpenAI: {self.model}")
-        
-        self._initialized = True
-
-    async def generate_value_chain(self, context: List[Dict[str, str]]) -> CompanyValueChainModel:
+                return response.content[0].text
+            
+            kwargs = {}
+            if request["json_mode"]:
+                kwargs["response_format"] = {"type": "json_object"}
+            response = await self.client.chat.completions.create(
+                model=request["model"],
+                messages=request["messages"],
+                temperature=request["temperature"],
+                **kwargs
+            )
+            return response.choices[0].message.content
+    
+    async def generate_value_chain(
+        self,
+        context: List[Dict[str, str]],
+        session_id: Optional[str] = None
+    ) -> CompanyValueChainModel:
         """
         Generate a Company Value Chain Model from the conversation history.
         """
@@ -114,32 +342,24 @@ class LLMClient:
         
         # Build conversation content
         conversation_text = "\n".join([
-            f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
+            f"{msg.get('role', 'user')}: {msg.get('content', '')}"
             for msg in context
         ])
-
+        
         try:
+            messages = [{"role": "system", "content": system_prompt}]
             if self.provider == "anthropic":
-                # Use Anthropic Claude API
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": f"Conversation history:\n{conversation_text}\n\nPlease analyze and return JSON."}]
-                )
-                content = response.content[0].text
+                messages.append({"role": "user", "content": f"Conversation history:\n{conversation_text}\n\nPlease analyze and return JSON."})
             else:
-                # Legacy OpenAI API
-                messages = [{"role": "system", "content": system_prompt}]
-                # Filter out empty content messages
+                # Legacy OpenAI API: filter out empty content messages
                 messages.extend([m for m in context if m.get('content', '').strip()])
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    response_format={"type": "json_object"},
-                    temperature=0.2
-                )
-                content = response.choices[0].message.content
+            content = await self.get_completion(
+                messages,
+                json_mode=True,
+                temperature=0.2,
+                max_tokens=4096,
+                session_id=session_id
+            )
             
             # Parse JSON from response (handle markdown code blocks)
             if "```json" in content:
@@ -176,15 +396,20 @@ class LLMClient:
                         type=link_data.get("type", "related_to")
                     )
                     model.links.append(link)
-                
-            return model
             
+            return model
+        
         except Exception as e:
             print(f"LLM Error during value chain generation: {e}")
             # Return empty model on error
             return CompanyValueChainModel(name="Error Generating Model")
-
-    async def extract_intents(self, text: str, context: List[Dict[str, str]]) -> List[BusinessIntent]:
+    
+    async def extract_intents(
+        self,
+        text: str,
+        context: List[Dict[str, str]],
+        session_id: Optional[str] = None
+    ) -> List[BusinessIntent]:
         """
         Analyze text to extract business intents using LLM.
         """
@@ -223,35 +448,27 @@ class LLMClient:
         # Build conversation content
         recent_context = context[-5:]
         conversation_text = "\n".join([
-            f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
+            f"{msg.get('role', 'user')}: {msg.get('content', '')}"
             for msg in recent_context
         ])
-
+        
         await self._ensure_initialized()
         
         try:
+            messages = [{"role": "system", "content": system_prompt}]
             if self.provider == "anthropic":
-                # Use Anthropic Claude API
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": f"Context:\n{conversation_text}\n\nNew message: {text}\n\nPlease extract intents and return JSON."}]
-                )
-                content = response.content[0].text
+                messages.append({"role": "user", "content": f"Context:\n{conversation_text}\n\nNew message: {text}\n\nPlease extract intents and return JSON."})
             else:
-                # Legacy OpenAI API
-                messages = [{"role": "system", "content": system_prompt}]
-                # Filter out empty content messages
+                # Legacy OpenAI API: filter out empty content messages
                 messages.extend([m for m in recent_context if m.get('content', '').strip()])
                 messages.append({"role": "user", "content": text})
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    response_format={"type": "json_object"},
-                    temperature=0.3
-                )
-                content = response.choices[0].message.content
+            content = await self.get_completion(
+                messages,
+                json_mode=True,
+                temperature=0.3,
+                max_tokens=2048,
+                session_id=session_id
+            )
             
             # Parse JSON from response (handle markdown code blocks)
             if "```json" in content:
@@ -264,14 +481,20 @@ class LLMClient:
             intents = []
             for item in data.get("intents", []):
                 intents.append(BusinessIntent(**item))
-                
-            return intents
             
+            return intents
+        
         except Exception as e:
             print(f"LLM Error during intent extraction: {e}")
             return []
-
-    async def generate_response(self, text: str, context: List[Dict[str, str]], intents: List[BusinessIntent]) -> str:
+    
+    async def generate_response(
+        self,
+        text: str,
+        context: List[Dict[str, str]],
+        intents: List[BusinessIntent],
+        session_id: Optional[str] = None
+    ) -> str:
         """
         Generate a conversational response based on the user's input and identified intents.
         """
@@ -284,7 +507,7 @@ class LLMClient:
         # Build conversation content
         recent_context = context[-5:]
         conversation_text = "\n".join([
-            f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
+            f"{msg.get('role', 'user')}: {msg.get('content', '')}"
             for msg in recent_context
         ])
         
@@ -292,33 +515,25 @@ class LLMClient:
         intent_summary = ""
         if intents:
             intent_summary = f"\n\nIdentified Intents: " + ", ".join([f"{i.name} ({i.confidence})" for i in intents])
-
+        
         await self._ensure_initialized()
         
         try:
+            messages = [{"role": "system", "content": system_prompt}]
             if self.provider == "anthropic":
-                # Use Anthropic Claude API
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=2048,
-                    system=system_prompt,
-                    messages=[{"role": "user", "content": f"Context:\n{conversation_text}{intent_summary}\n\nUser message: {text}"}]
-                )
-                return response.content[0].text
+                messages.append({"role": "user", "content": f"Context:\n{conversation_text}{intent_summary}\n\nUser message: {text}"})
             else:
-                # Legacy OpenAI API
-                messages = [{"role": "system", "content": system_prompt}]
-                # Filter out empty content messages
+                # Legacy OpenAI API: filter out empty content messages
                 messages.extend([m for m in recent_context if m.get('content', '').strip()])
                 if intents:
                     messages.append({"role": "system", "content": f"Identified Intents: {', '.join([f'{i.name} ({i.confidence})' for i in intents])}"})
                 messages.append({"role": "user", "content": text})
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.7
-                )
-                return response.choices[0].message.content
+            return await self.get_completion(
+                messages,
+                temperature=0.7,
+                max_tokens=2048,
+                session_id=session_id
+            )
         except Exception as e:
             logger.error(f"LLM Error during response generation: {e}")
             return "I apologize, but I'm having trouble processing your request right now."
@@ -336,6 +551,14 @@ def get_llm_client() -> LLMClient:
     return _llm_client
 
 
+async def close_llm_client() -> None:
+    """Close the LLM client instance, if one was created."""
+    global _llm_client
+    if _llm_client is not None:
+        await _llm_client.close()
+        _llm_client = None
+
+
 class _LLMClientProxy:
     """Proxy class for lazy initialization of LLMClient."""
     
@@ -26,7 +26,7 @@ from .models import (
     InterviewSession, CompanyValueChainModel, ValueChainNode, ValueChainLink,
     SenderType, RecommendStrategyRequest
 )
-from .llm_client import llm_client, get_llm_client
+from .llm_client import llm_client, get_llm_client, close_llm_client
 from .engine.pattern_matcher import PatternMatcher, DesignSuggester
 from .engine.strategic_recommender import StrategicRecommender, StrategyScore
 from .database import init_db, close_db
@@ -42,7 +42,7 @@ logger = logging.getLogger("conversation_service")
 messaging_client: Optional[MessagingClient] = None
 pattern_matcher = PatternMatcher()
 design_suggester = DesignSuggester()
-strategic_recommender = StrategicRecommender()
+strategic_recommender = StrategicRecommender(redis_url=settings.REDIS_URL)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -69,13 +69,21 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize MessagingClient: {e}")
         raise RuntimeError("MessagingClient initialization failed - cannot start service") from e
     
+    # Index value chains in the background so the first recommendation is fast
+    warm_up_task = asyncio.create_task(strategic_recommender.warm_up())
+    
     yield
     
+    warm_up_task.cancel()
+    await strategic_recommender.close()
+    
     # Cleanup
     if messaging_client:
         await messaging_client.disconnect()
         logger.info("MessagingClient disconnected")
     
+    await close_llm_client()
+    
     await close_db()
     logger.info("Database connections closed")
 
@@ -162,7 +170,7 @@ async def generate_value_chain_model(session_id: str):
 
     try:
         # Use LLM to generate model structure from conversation history
-        model = await llm_client.generate_value_chain(context)
+        model = await llm_client.generate_value_chain(context, session_id=session_id)
         model.name = f"Value Chain - {session_id}"
         
         # In a real scenario, we would persist this to the Business Metadata Service
@@ -213,7 +221,7 @@ async def chat_endpoint(request: ChatRequest):
     
     # Extract Intents
     try:
-        intents = await llm_client.extract_intents(request.message, session_context)
+        intents = await llm_client.extract_intents(request.message, session_context, session_id=session_id)
         logger.info(f"Extracted intents for session {session_id}: {intents}")
         
         # Update session metadata with new intents
@@ -229,7 +237,9 @@ async def chat_endpoint(request: ChatRequest):
         response_text = ""
     else:
         try:
-            response_text = await llm_client.generate_response(request.message, session_context, intents)
+            response_text = await llm_client.generate_response(
+                request.message, session_context, intents, session_id=session_id
+            )
         except Exception as e:
             logger.error(f"Error generating response: {e}")
             response_text = "I encountered an error processing your request."
@@ -302,8 +312,8 @@ async def websocket_endpoint(websocket: WebSocket, user_id: str):
             
             # Async processing using Claude (or fallback to OpenAI)
             client = get_llm_client()
-            intents = await client.extract_intents(data, session_context)
-            response_text = await client.generate_response(data, session_context, intents)
+            intents = await client.extract_intents(data, session_context, session_id=session_id)
+            response_text = await client.generate_response(data, session_context, intents, session_id=session_id)
             
             # Update Context
             session_context.append({"role": "user", "content": data})
@@ -0,0 +1,142 @@
+import unittest
+import asyncio
+import json
+import socket
+import sys
+import os
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.llm_client import LLMClient, LLMResponseCache
+
+STUB_DELAY = 0.3
+INTENTS = {"intents": [{"name": "Analyze Revenue", "confidence": 0.9, "domain": "finance"}]}
+
+
+class StubAnthropicServer:
+    """Local stand-in for the Anthropic Messages API that answers after STUB_DELAY."""
+
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.app = FastAPI()
+        self.app.post("/v1/messages")(self.messages)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(self.app, port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    async def messages(self, request: Request):
+        body = await request.json()
+        self.requests.append(body)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(STUB_DELAY)
+        self.active -= 1
+        text = json.dumps(INTENTS) if "extract intents" in body["messages"][-1]["content"] else "Sure."
+        return {
+            "id": f"msg_{len(self.requests)}",
+            "type": "message",
+            "role": "assistant",
+            "model": body["model"],
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1}
+        }
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class TestLLMClient(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubAnthropicServer()
+        cls.stub.start()
+        settings.ANTHROPIC_BASE_URL = f"http://127.0.0.1:{cls.stub.port}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    async def asyncSetUp(self):
+        self.stub.requests.clear()
+        self.stub.max_active = 0
+        self.client = LLMClient(api_key="test-key", cache=LLMResponseCache(None, max_entries=100, ttl_seconds=60))
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_event_loop_not_blocked(self):
+        """Other coroutines keep running while a completion is in flight"""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        await self.client.generate_response("hello", [], [])
+        task.cancel()
+        self.assertGreater(ticks, 10)
+
+    async def test_identical_requests_coalesced_then_cached(self):
+        """Concurrent identical intent extractions make one provider call; repeats hit the cache"""
+        results = await asyncio.gather(*[
+            self.client.extract_intents("Show revenue by region", [], session_id=f"s{i}") for i in range(5)
+        ])
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertEqual(self.stub.requests[0]["temperature"], 0.3)
+        self.assertTrue(all(r[0].name == "Analyze Revenue" for r in results))
+        self.assertEqual(self.client.stats["coalesced"], 4)
+
+        await self.client.extract_intents("Show revenue by region", [])
+        self.assertEqual(len(self.stub.requests), 1)
+        self.assertEqual(self.client.stats["cache_hits"], 1)
+
+    async def test_high_temperature_not_cached(self):
+        """Conversational responses are not cached"""
+        await self.client.generate_response("hello", [], [])
+        await self.client.generate_response("hello", [], [])
+        self.assertEqual(len(self.stub.requests), 2)
+
+    async def test_global_concurrency_limit(self):
+        """No more than the global limit of calls reach the provider at once"""
+        self.client._global_limit = asyncio.Semaphore(2)
+        await asyncio.gather(*[self.client.generate_response(f"message {i}", [], []) for i in range(6)])
+        self.assertEqual(len(self.stub.requests), 6)
+        self.assertEqual(self.stub.max_active, 2)
+
+    async def test_session_concurrency_limit(self):
+        """Calls for one session are limited separately"""
+        original = settings.LLM_SESSION_CONCURRENCY
+        settings.LLM_SESSION_CONCURRENCY = 1
+        try:
+            await asyncio.gather(*[
+                self.client.generate_response(f"message {i}", [], [], session_id="busy") for i in range(3)
+            ])
+        finally:
+            settings.LLM_SESSION_CONCURRENCY = original
+        self.assertEqual(self.stub.max_active, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
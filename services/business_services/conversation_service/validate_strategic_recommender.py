@@ -0,0 +1,195 @@
+import unittest
+import asyncio
+import json
+import socket
+import sys
+import os
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request, HTTPException
+
+# Add parent directory to path to allow importing app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.engine.strategic_recommender import StrategicRecommender
+
+STUB_DELAY = 0.2
+FAILING_CHAIN = "Standard Model for Retail"
+
+
+class StubEntityResolutionServer:
+    """Local stand-in for the semantic extract endpoint that answers after STUB_DELAY."""
+
+    def __init__(self):
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.app = FastAPI()
+        self.app.post("/api/v1/entity-resolution/semantic/extract")(self.extract)
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.server = uvicorn.Server(uvicorn.Config(self.app, port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    async def extract(self, request: Request):
+        body = await request.json()
+        self.requests.append(body)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(STUB_DELAY)
+        self.active -= 1
+        if body["name"] == FAILING_CHAIN:
+            raise HTTPException(status_code=500, detail="extraction failed")
+        words = [w.strip(",.").lower() for w in body["text"].split()]
+        return {
+            "entities": [{"lemma": w} for w in words if len(w) > 4],
+            "noun_phrases": [w for w in words if len(w) > 8]
+        }
+
+    def start(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+class InMemoryRedis:
+    """Just enough of redis.asyncio.Redis for the persisted entity lists."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def execute(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def close(self):
+        pass
+
+
+def reference_score(query_entities, query_phrases, vc_entities):
+    """Scoring formula applied to a single value chain by brute force."""
+    vc_entity_set = set(e.lower() for e in vc_entities)
+    query_entity_set = set(e.lower() for e in query_entities)
+    query_phrase_set = set(p.lower() for p in query_phrases)
+    union = query_entity_set | vc_entity_set
+    entity_similarity = len(query_entity_set & vc_entity_set) / len(union) if union else 0.0
+    phrase_matches = [qp for qp in query_phrase_set if any(qp in ve or ve in qp for ve in vc_entity_set)]
+    phrase_similarity = len(phrase_matches) / len(query_phrase_set) if query_phrase_set else 0.0
+    return entity_similarity * 0.7 + phrase_similarity * 0.3
+
+
+class TestStrategicRecommender(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stub = StubEntityResolutionServer()
+        cls.stub.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stub.stop()
+
+    async def asyncSetUp(self):
+        self.stub.requests.clear()
+        self.stub.max_active = 0
+        # Metadata service is unreachable, so the built-in value chains are used
+        self.recommender = StrategicRecommender(
+            entity_resolution_url=f"http://127.0.0.1:{self.stub.port}",
+            metadata_service_url="http://127.0.0.1:1"
+        )
+
+    async def asyncTearDown(self):
+        await self.recommender.close()
+
+    async def test_warm_up_extracts_concurrently(self):
+        """Value chain extraction runs in parallel at warm-up, not per request"""
+        started = time.monotonic()
+        await self.recommender.warm_up()
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(len(self.stub.requests), 5)
+        self.assertGreater(self.stub.max_active, 1)
+        self.assertLess(elapsed, STUB_DELAY * 3)
+
+        await self.recommender.recommend_value_chains("hospital patient care", [])
+        self.assertEqual(len(self.stub.requests), 6)
+
+    async def test_failed_extraction_uses_fallback(self):
+        """A chain whose extraction fails is still indexed from its own words"""
+        await self.recommender.warm_up()
+        retail = self.recommender._value_chain_cache["44-45"]
+        self.assertIn("merchandising", retail.domain_entities)
+        self.assertEqual(len(retail.domain_entities), 20)
+
+    async def test_index_matches_reference_scores(self):
+        """Scores from the inverted index equal the per-chain formula"""
+        await self.recommender.warm_up()
+        queries = [
+            ({"patient", "billing", "diagnosis", "unknown"}, {"revenue cycle", "claims"}),
+            ({"procurement", "logistics"}, {"quality"}),
+            ({"nothing"}, set()),
+            (set(), {"management"}),
+        ]
+        for query_entities, query_phrases in queries:
+            scores = self.recommender._score_value_chains(query_entities, query_phrases)
+            for vc, (score, _, _) in zip(self.recommender._chains, scores):
+                expected = reference_score(query_entities, query_phrases, vc.domain_entities)
+                self.assertAlmostEqual(score, expected, msg=f"{vc.name}: {query_entities} {query_phrases}")
+
+    async def test_recommendation_ranks_matching_chain_first(self):
+        """Healthcare query recommends the healthcare value chain"""
+        recommendations = await self.recommender.recommend_value_chains(
+            "hospital network focused on patient admission and diagnosis",
+            ["treatment billing", "claims processing"]
+        )
+        self.assertEqual(recommendations[0].value_chain_name, "Standard Model for Healthcare")
+        self.assertIn("patient", recommendations[0].matched_entities)
+
+    async def test_persisted_entities_skip_extraction(self):
+        """A second warm-up reuses persisted entities; fallback lists are retried"""
+        store = InMemoryRedis()
+        self.recommender._redis_url = "redis://in-memory"
+        self.recommender._redis = store
+        await self.recommender.warm_up()
+        self.assertEqual(len(store.data), 4)
+
+        second = StrategicRecommender(
+            entity_resolution_url=f"http://127.0.0.1:{self.stub.port}",
+            metadata_service_url="http://127.0.0.1:1",
+            redis_url="redis://in-memory"
+        )
+        second._redis = store
+        self.stub.requests.clear()
+        await second.warm_up()
+        await second.close()
+
+        self.assertEqual([r["name"] for r in self.stub.requests], [FAILING_CHAIN])
+        healthcare = second._value_chain_cache["62"]
+        self.assertEqual(
+            sorted(healthcare.domain_entities),
+            sorted(json.loads(next(v for v in store.data.values() if "healthcare" in v)))
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
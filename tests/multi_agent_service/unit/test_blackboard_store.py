@@ -0,0 +1,219 @@
+# =============================================================================
+# Blackboard Store Tests
+# Based on: Tangi Vass - "Adversarial Vibe Coding" / LIZA System
+# Reference: https://github.com/liza-mas/liza
+# =============================================================================
+"""Tests for blackboard store operations and the Redis hash encoding."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.blackboard.models import BlackboardArtifact, BlackboardTask, ArtifactType, TaskStatus
+from app.blackboard.store import InMemoryBlackboardStore, RedisBlackboardStore, _decode, _encode
+from app.contracts.violations import ContractViolation
+
+
+def make_task(**overrides) -> BlackboardTask:
+    return BlackboardTask(title="Build KPI", description="Compute churn", created_by="coordinator", **overrides)
+
+
+def make_redis_store(*script_results) -> RedisBlackboardStore:
+    """Redis store whose scripts return the given replies in order."""
+    client = MagicMock()
+    script = AsyncMock(side_effect=list(script_results))
+    client.register_script.return_value = script
+    client.xadd = AsyncMock()
+    return RedisBlackboardStore(client)
+
+
+class TestInMemoryStore:
+    """The in-memory store applies the same contract rules."""
+
+    def test_claim_then_second_claim_rejected(self, session_id):
+        async def scenario():
+            store = InMemoryBlackboardStore()
+            task = await store.add_task(session_id, "coordinator", make_task())
+
+            claimed = await store.claim_task(session_id, "developer", task.task_id)
+            assert claimed.status == TaskStatus.CLAIMED
+            assert claimed.reviewer == "tester"
+
+            with pytest.raises(ContractViolation) as exc:
+                await store.claim_task(session_id, "architect", task.task_id)
+            assert exc.value.rule == "Cannot claim already-claimed task"
+
+            actions = [entry["action"] for entry in await store.get_audit_log(session_id)]
+            assert actions == ["create_task", "claim_task"]
+
+        asyncio.run(scenario())
+
+    def test_filters_and_review_queue(self, session_id):
+        async def scenario():
+            store = InMemoryBlackboardStore()
+            task = await store.add_task(session_id, "coordinator", make_task())
+            await store.add_task(session_id, "coordinator", make_task())
+            await store.claim_task(session_id, "developer", task.task_id)
+
+            artifact = BlackboardArtifact(
+                artifact_type=ArtifactType.CODE,
+                task_id=task.task_id,
+                content={"sql": "select 1"},
+                created_by="developer"
+            )
+            await store.submit_artifact(session_id, "developer", artifact)
+
+            assert len(await store.list_tasks(session_id, status="unclaimed")) == 1
+            assert [t.task_id for t in await store.list_tasks(session_id, assigned_to="developer")] == [task.task_id]
+            assert [a.artifact_id for a in await store.get_review_queue(session_id, "tester")] == [artifact.artifact_id]
+            assert await store.get_review_queue(session_id, "architect") == []
+
+        asyncio.run(scenario())
+
+    def test_audit_log_pages_and_compaction(self, session_id):
+        async def scenario():
+            store = InMemoryBlackboardStore()
+            for i in range(10):
+                await store.append_audit_entry(session_id, {"action": f"action_{i}"})
+
+            page = await store.get_audit_log(session_id, limit=3)
+            assert [e["action"] for e in page] == ["action_7", "action_8", "action_9"]
+            older = await store.get_audit_log(session_id, limit=3, before=page[0]["stream_id"])
+            assert [e["action"] for e in older] == ["action_4", "action_5", "action_6"]
+
+            assert await store.compact_audit_log(session_id, keep=5) == 5
+            assert len(await store.get_audit_log(session_id)) == 5
+            archived = await store.get_archived_audit_log(session_id)
+            assert [e["action"] for e in archived] == [f"action_{i}" for i in range(5)]
+
+        asyncio.run(scenario())
+
+
+class TestRedisStore:
+    """Hash encoding and mapping of the Lua script replies."""
+
+    def test_hash_encoding_round_trip(self):
+        task = make_task(dependencies=["a", "b"], failure_reasons=["too slow"])
+        fields = _encode(task)
+
+        assert json.loads(fields["status"]) == "unclaimed"
+        assert json.loads(fields["dependencies"]) == ["a", "b"]
+        assert _decode(BlackboardTask, fields) == task
+
+    def test_claim_returns_updated_task(self, session_id):
+        task = make_task()
+        flat = [item for pair in _encode(task).items() for item in pair]
+        store = make_redis_store(["ok", *flat])
+
+        claimed = asyncio.run(store.claim_task(session_id, "developer", task.task_id))
+
+        assert claimed.status == TaskStatus.CLAIMED
+        assert claimed.assigned_to == "developer"
+        assert claimed.reviewer == "tester"
+        entry = json.loads(store.redis.xadd.call_args[0][1]["entry"])
+        assert entry["action"] == "claim_task"
+        assert entry["previous_state"] == {
+            "assigned_to": None, "claimed_at": None, "reviewer": None, "status": "unclaimed"
+        }
+        assert entry["new_state"]["status"] == "claimed"
+        assert "description" not in entry["new_state"]
+
+    @pytest.mark.parametrize("reply, rule", [
+        (["not_unclaimed", "claimed"], "Cannot claim already-claimed task"),
+        (["failed_before"], "Cannot claim task previously failed by this agent"),
+        (["dependency", "dep-1", "in_progress"], "Cannot claim task with unsatisfied dependencies"),
+    ])
+    def test_claim_rejections_raise_contract_violations(self, session_id, reply, rule):
+        store = make_redis_store(reply)
+
+        with pytest.raises(ContractViolation) as exc:
+            asyncio.run(store.claim_task(session_id, "developer", "task-1"))
+
+        assert exc.value.rule == rule
+        store.redis.xadd.assert_not_called()
+
+    def test_review_by_creator_rejected(self, session_id):
+        store = make_redis_store(["own_work"])
+
+        with pytest.raises(ContractViolation) as exc:
+            asyncio.run(store.review_artifact(session_id, "developer", "artifact-1", True, "lgtm"))
+
+        assert exc.value.rule == "Agents cannot review their own work"
+
+    def test_missing_task_raises_value_error(self, session_id):
+        store = make_redis_store(["not_found"])
+
+        with pytest.raises(ValueError):
+            asyncio.run(store.claim_task(session_id, "developer", "missing"))
+
+
+class TestRedisScripts:
+    """The Lua scripts and the audit stream run against a fake Redis server."""
+
+    @pytest.fixture
+    def store(self) -> RedisBlackboardStore:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        return RedisBlackboardStore(fakeredis.FakeAsyncRedis(decode_responses=True))
+
+    def test_claim_submit_and_reject(self, store, session_id):
+        async def scenario():
+            task = await store.add_task(session_id, "coordinator", make_task())
+
+            await store.claim_task(session_id, "developer", task.task_id)
+            with pytest.raises(ContractViolation):
+                await store.claim_task(session_id, "architect", task.task_id)
+
+            artifact = BlackboardArtifact(
+                artifact_type=ArtifactType.CODE,
+                task_id=task.task_id,
+                content={"sql": "select 1"},
+                created_by="developer"
+            )
+            await store.submit_artifact(session_id, "developer", artifact)
+            assert [a.artifact_id for a in await store.get_review_queue(session_id, "tester")] == [artifact.artifact_id]
+
+            reviewed = await store.review_artifact(session_id, "tester", artifact.artifact_id, False, "wrong grain")
+            assert reviewed.review_status == "rejected"
+
+            stored = await store.get_task(session_id, task.task_id)
+            assert stored.status == TaskStatus.REJECTED
+            assert stored.failed_by == ["developer"]
+            assert stored.failure_reasons == ["wrong grain"]
+            assert [t.task_id for t in await store.list_tasks(session_id, status="rejected")] == [task.task_id]
+            assert await store.get_review_queue(session_id) == []
+
+        asyncio.run(scenario())
+
+    def test_agent_state_change_keeps_concurrent_claims(self, store, session_id):
+        async def scenario():
+            task = await store.add_task(session_id, "coordinator", make_task())
+            current = await store.get_agent_state(session_id, "developer")
+
+            await store.claim_task(session_id, "developer", task.task_id)
+            assert await store.set_agent_state(session_id, "developer", "analysis", expected_state=current)
+            assert await store.set_agent_state(session_id, "tester", "analysis")
+
+            assert (await store.get_task(session_id, task.task_id)).status == TaskStatus.CLAIMED
+            blackboard = await store.load_blackboard(session_id)
+            assert blackboard.agent_states == {"developer": "analysis", "tester": "analysis"}
+
+            assert not await store.set_agent_state(session_id, "developer", "execution", expected_state="idle")
+            assert await store.get_agent_state(session_id, "developer") == "analysis"
+
+        asyncio.run(scenario())
+
+    def test_audit_entries_are_archived_before_leaving_the_stream(self, store, session_id):
+        async def scenario():
+            for i in range(20):
+                await store.append_audit_entry(session_id, {"action": f"action_{i}"})
+            assert len(await store.get_audit_log(session_id, limit=100)) == 20
+
+            assert await store.compact_audit_log(session_id, keep=5) == 15
+            remaining = await store.get_audit_log(session_id, limit=100)
+            archived = await store.get_archived_audit_log(session_id)
+            assert [e["action"] for e in archived + remaining] == [f"action_{i}" for i in range(20)]
+
+        asyncio.run(scenario())
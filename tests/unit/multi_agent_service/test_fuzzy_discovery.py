@@ -102,6 +102,24 @@ class TestFuzzyAgentDiscoverySearch:
         assert "deployment_specialist" in roles
 
 
+    def test_repeated_query_served_from_cache(self):
+        """Verify repeated queries return equal results from the LRU cache."""
+        discovery = FuzzyAgentDiscovery(cache_size=2)
+        first = discovery.search("inventory analysis")
+        discovery._calculate_scores = None  # a cache miss would fail
+        
+        assert discovery.search("Inventory, analysis") == first
+    
+    def test_cache_evicts_least_recently_used(self):
+        """Verify the query cache is bounded."""
+        discovery = FuzzyAgentDiscovery(cache_size=2)
+        for query in ["architect", "developer", "tester"]:
+            discovery.search(query)
+        
+        assert len(discovery._result_cache) == 2
+        assert (("architect",), 10) not in discovery._result_cache
+
+
 class TestFuzzyAgentDiscoveryRegistration:
     """Tests for agent registration."""
     
@@ -125,6 +143,38 @@ class TestFuzzyAgentDiscoveryRegistration:
         assert len(results) > 0
         assert results[0].agent_role == "custom_specialist"
     
+    def test_reregister_replaces_indexed_terms(self):
+        """Verify re-registering a role drops its previous terms from the index."""
+        discovery = FuzzyAgentDiscovery()
+        discovery.register_agent(AgentCapability(
+            role="custom_specialist",
+            display_name="Custom Specialist",
+            domain_keywords=["telemetry"]
+        ))
+        assert discovery.search("telemetry")[0].agent_role == "custom_specialist"
+        
+        discovery.register_agent(AgentCapability(
+            role="custom_specialist",
+            display_name="Custom Specialist",
+            domain_keywords=["geospatial"]
+        ))
+        
+        assert "custom_specialist" not in [r.agent_role for r in discovery.search("telemetry")]
+        assert discovery.search("geospatial")[0].agent_role == "custom_specialist"
+    
+    def test_registration_invalidates_cached_results(self):
+        """Verify cached query results are dropped when an agent is registered."""
+        discovery = FuzzyAgentDiscovery()
+        assert discovery.search("quantum") == []
+        
+        discovery.register_agent(AgentCapability(
+            role="quantum_specialist",
+            display_name="Quantum Specialist",
+            domain_keywords=["quantum"]
+        ))
+        
+        assert discovery.search("quantum")[0].agent_role == "quantum_specialist"
+    
     def test_get_agent_info(self):
         """Verify agent info retrieval."""
         discovery = FuzzyAgentDiscovery()